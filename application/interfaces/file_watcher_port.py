@@ -4,6 +4,7 @@ Re-export File Watcher Interfaces from domain layer to maintain backward compati
 
 from domain.ports.file_watcher_port import (
     FileChangeEvent,
+    TreeDelta,
     WatcherCallbacks,
     IIgnoreStrategy,
     IEventDebouncer,
@@ -12,6 +13,7 @@ from domain.ports.file_watcher_port import (
 
 __all__ = [
     "FileChangeEvent",
+    "TreeDelta",
     "WatcherCallbacks",
     "IIgnoreStrategy",
     "IEventDebouncer",
@@ -38,59 +38,29 @@ class AIPickFilesWorkerSignals(QObject):
     progress = Signal(str)
 
 
-def _get_workspace_files_summary(workspace_path: str, excluded_patterns: List[str]) -> str:
+def _get_workspace_files_summary(workspace_path: str) -> str:
     """
-    Duyệt nhanh và trả về danh sách các tệp tin trong workspace dưới dạng chuỗi rút gọn,
-    sử dụng IgnoreEngine (source of truth) để lọc — bao gồm .gitignore, global gitignore
-    và EXTENDED_IGNORE_PATTERNS đã được định nghĩa trong toàn ứng dụng.
+    Trả về danh sách các tệp tin trong workspace dưới dạng chuỗi rút gọn.
+
+    Đọc từ workspace catalog dùng chung (đã lọc theo IgnoreEngine - .gitignore,
+    global gitignore, EXTENDED_IGNORE_PATTERNS và excluded patterns trong
+    settings), nên không cần walk lại workspace.
     Giới hạn tối đa 1000 tệp tin để tránh tràn context.
     """
     from domain.ports.registry import DomainRegistry
     from pathlib import Path
 
-    root = Path(workspace_path)
-    engine = DomainRegistry.ignore_engine()
-    spec = engine.build_pathspec(
-        root,
-        use_default_ignores=True,
-        excluded_patterns=excluded_patterns or [],
-        use_gitignore=True,
-    )
+    catalog = DomainRegistry.workspace_catalog().get_catalog(Path(workspace_path))
 
-    files_list = []
     max_files = 1000
-    count = 0
-
-    for root_dir, dirs, files in os.walk(workspace_path):
-        rel_root = os.path.relpath(root_dir, workspace_path)
-        if rel_root == ".":
-            rel_root = ""
-
-        # Prune ignored directories để tránh quét sâu vào .venv, node_modules...
-        pruned = []
-        for d in dirs:
-            d_path = (os.path.join(rel_root, d) if rel_root else d) + "/"
-            if spec.match_file(d_path):
-                continue
-            pruned.append(d)
-        dirs[:] = pruned
-
-        for f in files:
-            f_path = os.path.join(rel_root, f) if rel_root else f
-            if spec.match_file(f_path):
-                continue
-            files_list.append(f_path)
-            count += 1
-            if count >= max_files:
-                break
-        if count >= max_files:
-            break
+    rel_paths = sorted(entry.rel_path for entry in catalog.entries())
+    files_list = [rel.replace("/", os.sep) for rel in rel_paths[:max_files]]
 
     if not files_list:
         return "No files found or all files are excluded."
 
     summary = "\n".join([f"- {fp}" for fp in files_list])
-    if count >= max_files:
+    if len(rel_paths) >= max_files:
         summary += "\n- ... (truncated, too many files)"
     return summary
 
@@ -200,7 +170,7 @@ class AIPickFilesWorker(QRunnable):
 
             # Tạo danh sách file tree tóm tắt của workspace để cung cấp sẵn cho Agent
             try:
-                files_summary = _get_workspace_files_summary(self._workspace, excluded_patterns)
+                files_summary = _get_workspace_files_summary(self._workspace)
             except Exception as ex:
                 logger.warning("Failed to generate workspace files summary: %s", ex)
                 files_summary = "Error scanning workspace files."
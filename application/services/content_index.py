@@ -0,0 +1,365 @@
+"""
+Content Index - Trigram inverted index cho `code:` search.
+
+Truoc day moi lan search `code:` mo va lowercase TUNG file da index (toi da
+2MB/file), tuan tu, moi lan go phim. ContentIndexService thay bang:
+- Index trigram (3 ky tu lowercase) -> file ids, build trong background
+- Query: giao posting lists cua cac trigram trong query, chi doc lai cac
+  file ung vien de xac nhan (ket qua stream qua on_match)
+- Cap nhat tang dan: so (mtime, size) voi workspace catalog, chi doc lai
+  file moi/da sua, bo file da xoa
+- Luu xuong dia qua IContentIndexStore, khoi dong lai chi doc file da doi
+
+Query ngan hon 3 ky tu khong loc duoc bang trigram -> moi file la ung vien.
+
+KHONG import bat ky module Qt nao.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from domain.ports.content_index_port import IContentIndexService, IContentIndexStore
+
+if TYPE_CHECKING:
+    from domain.ports.workspace_catalog_port import (
+        IWorkspaceCatalog,
+        IWorkspaceCatalogService,
+    )
+
+logger = logging.getLogger(__name__)
+
+# File lon hon khong duoc index/search (giong gioi han cu cua code: search)
+MAX_INDEXED_FILE_SIZE = 2 * 1024 * 1024
+
+# Tang khi doi cach tach trigram hoac format luu
+CONTENT_INDEX_VERSION = 1
+
+# Compact postings khi so file id da chet vuot ty le nay so voi file con song
+COMPACT_DEAD_RATIO = 0.25
+
+# Khoang cach toi thieu giua 2 lan luu index sau search (warm luon luu)
+SAVE_INTERVAL_SECONDS = 60.0
+
+# So workspace giu index trong memory cung luc
+MAX_INDEXES = 2
+
+# rel_path -> (file_id, mtime_ns, size)
+_FileRecord = Tuple[int, int, int]
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Tap trigram cua text (da lowercase)."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _read_lower(path: str) -> Optional[str]:
+    """Doc file (utf-8, thay ky tu loi) va lowercase. None neu khong doc duoc."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().lower()
+    except OSError:
+        return None
+
+
+def _contains_sorted(ids: "array[int]", file_id: int) -> bool:
+    """Membership O(log n) tren posting list tang dan."""
+    pos = bisect.bisect_left(ids, file_id)
+    return pos < len(ids) and ids[pos] == file_id
+
+
+class TrigramIndex:
+    """
+    Inverted index trigram -> file ids.
+
+    Posting list la array('I') append-only, id cap tang dan nen list luon
+    sorted. Sua/xoa file khong cham postings: id cu bi danh dau chet, file
+    sua nhan id moi; compact() don id chet khi ty le vuot COMPACT_DEAD_RATIO.
+
+    Attributes:
+        files: rel_path -> (file_id, mtime_ns, size) cua cac file con song
+        dirty: True neu co thay doi chua luu
+    """
+
+    def __init__(self) -> None:
+        self.files: Dict[str, _FileRecord] = {}
+        self.dirty = False
+        self._paths: Dict[int, str] = {}
+        self._postings: Dict[str, "array[int]"] = {}
+        self._next_id = 0
+        self._dead = 0
+
+    def add(self, rel_path: str, mtime_ns: int, size: int, text: str) -> None:
+        """Index (lai) noi dung da lowercase cua 1 file."""
+        self.remove(rel_path)
+        file_id = self._next_id
+        self._next_id += 1
+        self.files[rel_path] = (file_id, mtime_ns, size)
+        self._paths[file_id] = rel_path
+
+        postings = self._postings
+        for gram in _trigrams(text):
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = array("I", (file_id,))
+            else:
+                ids.append(file_id)
+        self.dirty = True
+
+    def remove(self, rel_path: str) -> None:
+        record = self.files.pop(rel_path, None)
+        if record is None:
+            return
+        del self._paths[record[0]]
+        self._dead += 1
+        self.dirty = True
+
+    def candidates(self, query_lower: str) -> List[str]:
+        """
+        Rel paths co the chua query (chua xac nhan).
+
+        Giao posting lists tu ngan den dai: list ngan nhat thanh set,
+        cac list con lai chi kiem tra membership bang binary search.
+        """
+        if len(query_lower) < 3:
+            return list(self.files)
+
+        lists: List["array[int]"] = []
+        for gram in _trigrams(query_lower):
+            ids = self._postings.get(gram)
+            if ids is None:
+                return []
+            lists.append(ids)
+        lists.sort(key=len)
+
+        live = self._paths
+        matched = {file_id for file_id in lists[0] if file_id in live}
+        for ids in lists[1:]:
+            if not matched:
+                break
+            matched = {file_id for file_id in matched if _contains_sorted(ids, file_id)}
+        return [live[file_id] for file_id in matched]
+
+    def compact(self, force: bool = False) -> None:
+        """Don id chet, danh so lai id lien tuc (giu thu tu -> postings van sorted)."""
+        if not self._dead:
+            return
+        if not force and self._dead < COMPACT_DEAD_RATIO * max(len(self.files), 1):
+            return
+
+        remap = {old: new for new, old in enumerate(sorted(self._paths))}
+        postings: Dict[str, "array[int]"] = {}
+        for gram, ids in self._postings.items():
+            kept = array("I", [remap[i] for i in ids if i in remap])
+            if kept:
+                postings[gram] = kept
+
+        self._postings = postings
+        self.files = {
+            rel_path: (remap[file_id], mtime_ns, size)
+            for rel_path, (file_id, mtime_ns, size) in self.files.items()
+        }
+        self._paths = {
+            file_id: rel_path for rel_path, (file_id, _, _) in self.files.items()
+        }
+        self._next_id = len(remap)
+        self._dead = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize (compact truoc de khong luu id chet)."""
+        self.compact(force=True)
+        return {
+            "version": CONTENT_INDEX_VERSION,
+            "files": {rel: list(record) for rel, record in self.files.items()},
+            "postings": {gram: ids.tolist() for gram, ids in self._postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["TrigramIndex"]:
+        """Deserialize, tra ve None neu version khong khop hoac data hong."""
+        if not isinstance(data, dict) or data.get("version") != CONTENT_INDEX_VERSION:
+            return None
+        index = cls()
+        try:
+            index.files = {
+                str(rel): (int(values[0]), int(values[1]), int(values[2]))
+                for rel, values in data["files"].items()
+            }
+            index._postings = {
+                str(gram): array("I", ids) for gram, ids in data["postings"].items()
+            }
+        except (KeyError, IndexError, TypeError, ValueError, OverflowError):
+            return None
+        index._paths = {file_id: rel for rel, (file_id, _, _) in index.files.items()}
+        index._next_id = max(index._paths, default=-1) + 1
+        return index
+
+
+class _WorkspaceContentIndex:
+    """TrigramIndex cua 1 workspace + lock + thoi diem luu cuoi."""
+
+    def __init__(self, index: TrigramIndex) -> None:
+        self.index = index
+        self.lock = threading.Lock()
+        self.saved_at = time.monotonic()
+
+
+class ContentIndexService(IContentIndexService):
+    """
+    Quan ly TrigramIndex theo workspace (LRU MAX_INDEXES).
+
+    Attributes:
+        _catalog_service: Nguon danh sach files + (mtime, size)
+            (None -> lay tu DomainRegistry khi can)
+        _store: Luu/doc index (None -> chi giu trong memory)
+    """
+
+    def __init__(
+        self,
+        catalog_service: Optional["IWorkspaceCatalogService"] = None,
+        store: Optional[IContentIndexStore] = None,
+        max_indexes: int = MAX_INDEXES,
+    ) -> None:
+        self._catalog_service = catalog_service
+        self._store = store
+        self._max_indexes = max_indexes
+        self._indexes: "OrderedDict[str, _WorkspaceContentIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def warm(self, workspace_root: Path) -> None:
+        holder = self._holder(workspace_root)
+        catalog = self._catalogs().get_catalog(workspace_root)
+        with holder.lock:
+            self._sync(holder.index, catalog)
+            self._save(workspace_root, holder)
+
+    def search(
+        self,
+        workspace_root: Path,
+        query: str,
+        on_match: Optional[Callable[[str], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> List[str]:
+        query_lower = query.strip().lower()
+        if not query_lower:
+            return []
+
+        holder = self._holder(workspace_root)
+        catalog = self._catalogs().get_catalog(workspace_root)
+        with holder.lock:
+            if not self._sync(holder.index, catalog, is_cancelled):
+                return []
+            candidates = sorted(holder.index.candidates(query_lower))
+            if time.monotonic() - holder.saved_at >= SAVE_INTERVAL_SECONDS:
+                self._save(workspace_root, holder)
+
+        results: List[str] = []
+        for rel_path in candidates:
+            if is_cancelled is not None and is_cancelled():
+                break
+            entry = catalog.get(rel_path)
+            if entry is None:
+                continue
+            # Xac nhan tren noi dung hien tai (index co the cu vai ms)
+            text = _read_lower(entry.abs_path)
+            if text is None or query_lower not in text:
+                continue
+            results.append(entry.abs_path)
+            if on_match is not None:
+                on_match(entry.abs_path)
+        return results
+
+    def invalidate(self, workspace_root: Optional[Path] = None) -> None:
+        with self._lock:
+            if workspace_root is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(os.path.abspath(str(workspace_root)), None)
+
+    def _catalogs(self) -> "IWorkspaceCatalogService":
+        if self._catalog_service is None:
+            from domain.ports.registry import DomainRegistry
+
+            return DomainRegistry.workspace_catalog()
+        return self._catalog_service
+
+    def _holder(self, workspace_root: Path) -> _WorkspaceContentIndex:
+        """Lay index cua workspace, load tu store neu chua co trong memory."""
+        key = os.path.abspath(str(workspace_root))
+        with self._lock:
+            holder = self._indexes.get(key)
+            if holder is not None:
+                self._indexes.move_to_end(key)
+                return holder
+
+        index: Optional[TrigramIndex] = None
+        if self._store is not None:
+            data = self._store.load(workspace_root)
+            if data is not None:
+                index = TrigramIndex.from_dict(data)
+
+        with self._lock:
+            # Thread khac co the da load xong trong luc doc store
+            holder = self._indexes.get(key)
+            if holder is None:
+                holder = _WorkspaceContentIndex(index or TrigramIndex())
+                self._indexes[key] = holder
+                while len(self._indexes) > self._max_indexes:
+                    self._indexes.popitem(last=False)
+            return holder
+
+    def _sync(
+        self,
+        index: TrigramIndex,
+        catalog: "IWorkspaceCatalog",
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> bool:
+        """
+        Dong bo index voi catalog: doc lai file moi/da sua, bo file da xoa.
+
+        File vua sua (trong racy window) duoc ghi mtime -1 de lan sync sau
+        doc lai, tranh bo sot lan sua thu 2 cung mtime.
+
+        Returns:
+            False neu bi cancel giua chung
+        """
+        from shared.utils.binary_cache import RACY_WINDOW_NS
+
+        seen: Set[str] = set()
+        for entry in catalog.entries():
+            if entry.is_binary or entry.size > MAX_INDEXED_FILE_SIZE:
+                continue
+            seen.add(entry.rel_path)
+            record = index.files.get(entry.rel_path)
+            if record is not None and record[1:] == (entry.mtime_ns, entry.size):
+                continue
+            if is_cancelled is not None and is_cancelled():
+                return False
+
+            text = _read_lower(entry.abs_path)
+            if text is None:
+                index.remove(entry.rel_path)
+                continue
+            mtime_ns = entry.mtime_ns
+            if time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+                mtime_ns = -1
+            index.add(entry.rel_path, mtime_ns, entry.size, text)
+
+        for rel_path in [rel for rel in index.files if rel not in seen]:
+            index.remove(rel_path)
+        index.compact()
+        return True
+
+    def _save(self, workspace_root: Path, holder: _WorkspaceContentIndex) -> None:
+        """Luu index neu co thay doi (goi khi dang giu holder.lock)."""
+        holder.saved_at = time.monotonic()
+        if self._store is None or not holder.index.dirty:
+            return
+        if self._store.save(workspace_root, holder.index.to_dict()):
+            holder.index.dirty = False
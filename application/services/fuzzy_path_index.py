@@ -0,0 +1,315 @@
+"""
+Fuzzy Path Index - Tim file theo ten kieu fzf, co xep hang.
+
+Truoc day search_in_index quet substring tren moi filename roi sort theo
+alphabet: khong co xep hang, moi phim go lai quet tu dau. FuzzyPathIndex:
+- Precompute 1 lan: path tuong doi lowercase + vi tri basename, do dai (array)
+- Match subsequence (go "fpi" tim ra "fuzzy_path_index.py"), cham diem theo
+  ky tu lien tiep, dau segment/camelCase va match trong basename
+- Thu hep tang dan: query mo rong query truoc chi loc lai tren tap ung vien
+  cua query truoc (xoa ky tu -> quay lai tap da luu)
+- Xep hang theo tier (prefix basename > substring basename > substring path
+  > rai rac) roi theo diem; top-K chi cham diem cac tier can de du K, moi
+  tier toi da MAX_SCORED_PER_TIER path ngan nhat
+
+KHONG thread-safe: build o background thread roi chi dung tren 1 thread.
+KHONG import bat ky module Qt nao.
+"""
+
+import heapq
+import operator
+import os
+import re
+from array import array
+from itertools import compress
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+# Diem co ban moi ky tu match
+SCORE_MATCH = 16
+# Ky tu match ngay sau separator (/ _ - . space) hoac dau path
+BONUS_BOUNDARY = 10
+# Ky tu hoa sau ky tu thuong (camelCase)
+BONUS_CAMEL = 8
+# Ky tu match lien tiep ky tu match truoc do
+BONUS_CONSECUTIVE = 6
+# Ky tu match nam trong basename
+BONUS_BASENAME = 4
+# Query la prefix cua basename
+BONUS_BASENAME_PREFIX = 24
+# Phat khoang trong giua 2 ky tu match (mo khoang + moi ky tu them)
+PENALTY_GAP_START = 3
+PENALTY_GAP_EXTENSION = 1
+
+# Ty le id da chet truoc khi compact
+COMPACT_DEAD_RATIO = 0.25
+
+# So buoc thu hep giu lai (moi buoc = 1 query prefix + ung vien cua no)
+MAX_NARROWING_STEPS = 32
+
+# Khi co limit: so path toi da duoc cham diem trong 1 tier (chon path ngan
+# nhat truoc) - giu do tre on dinh voi query ngan tren workspace 500k+ files
+MAX_SCORED_PER_TIER = 20_000
+
+_SEPARATORS = frozenset("/\\_-. ")
+
+# So tier xep hang (xem FuzzyPathIndex._tier_flags)
+_TIER_COUNT = 4
+
+
+def _subsequence_pattern(query: str) -> Pattern[str]:
+    """
+    Regex match text chua query dang subsequence, group k = vi tri ky tu k.
+
+    Dang `[^a]*(a)[^b]*(b)...` khong backtrack nen chay nhanh hon vong find().
+    """
+    return re.compile("".join(f"[^{re.escape(c)}]*({re.escape(c)})" for c in query))
+
+
+def _match_positions(
+    query: str, pattern: Pattern[str], text: str, base_start: int
+) -> Optional[List[int]]:
+    """
+    Vi tri cac ky tu cua query trong text (da lowercase).
+
+    Uu tien substring lien tiep (trong basename truoc), nguoc lai lay cua so
+    ngan nhat ket thuc o lan match forward dau tien (giong fzf v1).
+    """
+    n = len(query)
+    pos = text.find(query, base_start)
+    if pos < 0:
+        pos = text.rfind(query)
+    if pos >= 0:
+        return list(range(pos, pos + n))
+
+    match = pattern.match(text)
+    if match is None:
+        return None
+    positions = [match.start(k) for k in range(1, n + 1)]
+    # Lui tu end de tim start gan nhat
+    start = positions[-1] + 1
+    for c in reversed(query):
+        start = text.rfind(c, 0, start)
+    if start == positions[0]:
+        return positions
+    positions = []
+    pos = start - 1
+    for c in query:
+        pos = text.find(c, pos + 1)
+        positions.append(pos)
+    return positions
+
+
+def _score(
+    query: str, pattern: Pattern[str], text: str, original: str, base_start: int
+) -> Optional[int]:
+    """Diem match cua query tren 1 path (None neu khong match)."""
+    positions = _match_positions(query, pattern, text, base_start)
+    if positions is None:
+        return None
+    if len(original) != len(text):
+        # lower() doi do dai (vd. ky tu unicode dac biet) -> bo camelCase
+        original = text
+
+    score = 0
+    prev = -2
+    for pos in positions:
+        score += SCORE_MATCH
+        if pos == 0 or text[pos - 1] in _SEPARATORS:
+            score += BONUS_BOUNDARY
+        elif original[pos].isupper() and original[pos - 1].islower():
+            score += BONUS_CAMEL
+        if pos == prev + 1:
+            score += BONUS_CONSECUTIVE
+        elif prev >= 0:
+            score -= PENALTY_GAP_START + PENALTY_GAP_EXTENSION * (pos - prev - 2)
+        if pos >= base_start:
+            score += BONUS_BASENAME
+        prev = pos
+
+    if text.startswith(query, base_start):
+        score += BONUS_BASENAME_PREFIX
+    return score
+
+
+def common_root(paths: Iterable[str]) -> str:
+    """Thu muc cha chung cua cac paths ('' neu khong co, vd. khac o dia)."""
+    dirs = {os.path.dirname(p) for p in paths}
+    if not dirs:
+        return ""
+    try:
+        return os.path.commonpath(list(dirs))
+    except ValueError:
+        return ""
+
+
+class FuzzyPathIndex:
+    """
+    Index fuzzy tren danh sach absolute paths.
+
+    Match va cham diem tren path tuong doi tu `root` (separator giu nguyen).
+    Xoa path chi danh dau id chet (text rong -> khong bao gio match);
+    compact() don lai khi ty le vuot COMPACT_DEAD_RATIO.
+
+    Attributes:
+        last_match_count: Tong so path match query gan nhat (truoc khi cat top-K)
+    """
+
+    def __init__(self, paths: Iterable[str] = (), root: Optional[str] = None) -> None:
+        path_list = list(paths)
+        if root is None:
+            root = common_root(path_list)
+        self._root_len = len(root.rstrip("/\\")) + 1 if root else 0
+        self._paths: List[Optional[str]] = []
+        self._texts: List[str] = []
+        self._base_starts = array("I")
+        self._lengths = array("I")
+        self._ids: Dict[str, int] = {}
+        self._dead = 0
+        # (query, ids match query do), moi phan tu sau la query mo rong phan tu truoc
+        self._narrowing: List[Tuple[str, List[int]]] = []
+        self.last_match_count = 0
+        for path in path_list:
+            self._append(path)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, path: str) -> None:
+        if path in self._ids:
+            return
+        self._append(path)
+        self._narrowing.clear()
+
+    def remove(self, path: str) -> None:
+        file_id = self._ids.pop(path, None)
+        if file_id is None:
+            return
+        self._paths[file_id] = None
+        self._texts[file_id] = ""
+        self._dead += 1
+        self._narrowing.clear()
+        if self._dead > COMPACT_DEAD_RATIO * max(len(self._ids), 1):
+            self.compact()
+
+    def compact(self) -> None:
+        """Danh so lai id, bo id da chet."""
+        live = [p for p in self._paths if p is not None]
+        self._paths = []
+        self._texts = []
+        self._base_starts = array("I")
+        self._lengths = array("I")
+        self._ids = {}
+        self._dead = 0
+        self._narrowing.clear()
+        for path in live:
+            self._append(path)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Tim paths match fuzzy `query` (case-insensitive), diem cao truoc.
+
+        Thu tu: tier (xem _tier_flags), roi diem, roi path ngan truoc, roi
+        alphabet. Voi `limit`, chi cham diem cac tier can de du `limit`.
+
+        Args:
+            query: Chuoi can tim
+            limit: Chi tra ve top `limit` ket qua (None = tat ca)
+        """
+        query_lower = query.strip().lower()
+        if not query_lower:
+            self.last_match_count = 0
+            return []
+
+        remaining = self._narrow(query_lower)
+        self.last_match_count = len(remaining)
+
+        pattern = _subsequence_pattern(query_lower)
+        results: List[str] = []
+        for tier in range(_TIER_COUNT):
+            if not remaining or (limit is not None and len(results) >= limit):
+                break
+            if tier == _TIER_COUNT - 1:
+                bucket, remaining = remaining, []
+            else:
+                flags = self._tier_flags(query_lower, remaining, tier)
+                bucket = list(compress(remaining, flags))
+                remaining = list(compress(remaining, map(operator.not_, flags)))
+            bucket_limit = None
+            if limit is not None:
+                bucket_limit = limit - len(results)
+                if len(bucket) > MAX_SCORED_PER_TIER:
+                    bucket = heapq.nsmallest(
+                        MAX_SCORED_PER_TIER, bucket, key=self._lengths.__getitem__
+                    )
+            results.extend(self._rank(query_lower, pattern, bucket, bucket_limit))
+        return results
+
+    def _tier_flags(self, query_lower: str, ids: List[int], tier: int) -> List[bool]:
+        """
+        Ids nao thuoc `tier` (kiem tra bang str method, khong cham diem).
+
+        Tier 0: basename bat dau bang query; 1: query nam trong basename;
+        2: query nam lien tiep trong path; 3 (con lai): match rai rac.
+        """
+        texts = self._texts
+        base_starts = self._base_starts
+        if tier == 0:
+            return [texts[i].startswith(query_lower, base_starts[i]) for i in ids]
+        if tier == 1:
+            return [texts[i].find(query_lower, base_starts[i]) >= 0 for i in ids]
+        return [query_lower in texts[i] for i in ids]
+
+    def _rank(
+        self,
+        query_lower: str,
+        pattern: Pattern[str],
+        ids: List[int],
+        limit: Optional[int],
+    ) -> List[str]:
+        """Cham diem va sap xep ids (diem cao, path ngan, alphabet)."""
+        paths = self._paths
+        texts = self._texts
+        base_starts = self._base_starts
+        root_len = self._root_len
+        ranked: List[Tuple[int, int, str]] = []
+        for file_id in ids:
+            path = paths[file_id]
+            if path is None:
+                continue
+            text = texts[file_id]
+            score = _score(
+                query_lower, pattern, text, path[root_len:], base_starts[file_id]
+            )
+            if score is not None:
+                ranked.append((-score, len(text), path))
+
+        if limit is not None and limit < len(ranked):
+            ranked = heapq.nsmallest(limit, ranked)
+        else:
+            ranked.sort()
+        return [path for _, _, path in ranked]
+
+    def _append(self, path: str) -> None:
+        text = path[self._root_len :].lower()
+        self._ids[path] = len(self._paths)
+        self._paths.append(path)
+        self._texts.append(text)
+        self._base_starts.append(max(text.rfind("/"), text.rfind("\\")) + 1)
+        self._lengths.append(len(text))
+
+    def _narrow(self, query_lower: str) -> List[int]:
+        """Ids co chua query dang subsequence, loc tu buoc thu hep gan nhat."""
+        steps = self._narrowing
+        while steps and not query_lower.startswith(steps[-1][0]):
+            steps.pop()
+        if steps and steps[-1][0] == query_lower:
+            return steps[-1][1]
+
+        source: Iterable[int] = steps[-1][1] if steps else range(len(self._paths))
+        texts = self._texts
+        match = _subsequence_pattern(query_lower).match
+        matched = [file_id for file_id in source if match(texts[file_id])]
+        steps.append((query_lower, matched))
+        if len(steps) > MAX_NARROWING_STEPS:
+            del steps[0]
+        return matched
@@ -17,14 +17,20 @@ from domain.prompt.generator import (
     generate_file_contents_plain,
     OutputStyle,
 )
+from domain.prompt.content_snapshot import ContentSnapshot
 from domain.prompt.copy_mode import CopyConfig, CopyMode
+from domain.prompt.fragment_cache import FragmentCache
+from domain.prompt.prompt_sink import PromptSink
 from domain.smart_context.tree_item import TreeItem
 from shared.types.prompt_types_extra import BuildResult
 from application.services.prompt_helpers import (
+    account_prompt_tokens,
     count_per_file_tokens,
-    calculate_prompt_breakdown,
     apply_context_trimming,
+    resolve_copy_config,
+    stream_prompt,
 )
+from domain.prompt.token_ledger import TokenLedger
 
 
 # Mapping output_format string -> OutputStyle enum
@@ -49,8 +55,8 @@ class PromptBuildService:
     """
     Build prompt tu file paths va settings.
 
-    Khong co state internal - moi call doc lap.
-    Thread-safe vi khong mutate state.
+    State duy nhat la cac cache thread-safe dung chung giua cac lan build
+    (TokenLedger, FragmentCache); moi call van doc lap.
     """
 
     def __init__(
@@ -62,6 +68,10 @@ class PromptBuildService:
 
             tokenization_service = DomainRegistry.tokenization_service()
         self._tokenization_service = tokenization_service
+        # Memo token count theo content hash, dung chung giua cac lan build
+        self._ledger = TokenLedger(tokenization_service)
+        # Block file da render + token count: build sau chi render file da doi
+        self.fragment_cache = FragmentCache(self._ledger)
 
     def build_prompt(
         self,
@@ -78,6 +88,9 @@ class PromptBuildService:
         instructions_at_top: bool = False,
         full_tree: bool = False,
         semantic_index: bool = False,  # Deprecated
+        *,
+        snapshot: Optional[ContentSnapshot] = None,
+        sink: Optional[PromptSink] = None,
     ) -> Tuple[str, int, Dict[str, int]]:
         """
         Generate prompt theo output format (backward-compatible API).
@@ -97,6 +110,8 @@ class PromptBuildService:
             include_xml_formatting: Co bao gom OPX khong
             codemap_paths: Optional set cac file paths chi lay AST signatures.
             instructions_at_top: Di chuyen instructions len dau
+            snapshot: Noi dung file da doc (vd. boi security scan), xem build_prompt_full
+            sink: Ghi prompt vao day thay vi tra ve (xem build_prompt_full)
 
         Returns:
             Tuple (prompt_text, token_count, breakdown)
@@ -115,6 +130,8 @@ class PromptBuildService:
             instructions_at_top=instructions_at_top,
             full_tree=full_tree,
             semantic_index=semantic_index,
+            snapshot=snapshot,
+            sink=sink,
         )
         return result.to_legacy_tuple()
 
@@ -136,6 +153,8 @@ class PromptBuildService:
         instructions_at_top: bool = False,
         full_tree: bool = False,
         semantic_index: bool = False,  # Deprecated
+        snapshot: Optional[ContentSnapshot] = None,
+        sink: Optional[PromptSink] = None,
     ) -> BuildResult:
         """
         Generate prompt va tra ve BuildResult day du voi metadata.
@@ -160,6 +179,11 @@ class PromptBuildService:
             codemap_paths: Optional set các file paths chỉ lấy AST signatures.
             instructions_at_top: Di chuyển instructions lên đầu
             full_tree: Nếu True, hiển thị toàn bộ sơ đồ thư mục của workspace.
+            snapshot: Nội dung file đã đọc cho lần copy này (None = đọc mới).
+                Mọi bước (format, import, token, trim) dùng chung, mỗi file đọc 1 lần.
+            sink: Nếu có, prompt được ghi vào sink theo từng fragment (không
+                tạo chuỗi prompt, token đếm trên stream) và prompt_text = "".
+                Sink không bị close. Khi có max_tokens, prompt ghi sau khi trim.
 
         Returns:
             BuildResult voi tat ca metadata can thiet
@@ -185,47 +209,14 @@ class PromptBuildService:
                     cp_path = (workspace / cp).resolve()
                 normalized_codemap.add(str(cp_path))
 
-        # Parse output_format to CopyConfig
-        config: CopyConfig
-        if isinstance(output_format, CopyConfig):
-            config = output_format
-        elif isinstance(output_format, dict):
-            config = CopyConfig.from_dict(output_format)
-        else:
-            # Legacy string
-            fmt_str = str(output_format).lower()
-            if fmt_str in ("compress", "compress_plain"):
-                mode = CopyMode.SMART
-            elif fmt_str == "search_replace" or include_xml_formatting:
-                mode = CopyMode.APPLY
-            else:
-                mode = CopyMode.FULL
-
-            style = OutputStyle.PLAIN if "plain" in fmt_str else OutputStyle.XML
-            config = CopyConfig(
-                mode=mode,
-                include_git_diff=include_git_changes,
-                tree_map_only=False,
-                output_style=style,
-            )
-
+        config, legacy_format = resolve_copy_config(
+            output_format, include_git_changes, include_xml_formatting
+        )
         # Overwrite parameter values with CopyConfig fields
         include_git_changes = config.include_git_diff
         output_style = config.output_style
         include_xml_formatting = config.mode == CopyMode.APPLY
 
-        # Internal format string representation for legacy checkers/generators
-        if config.mode == CopyMode.SMART:
-            legacy_format = (
-                "compress_plain"
-                if config.output_style == OutputStyle.PLAIN
-                else "compress"
-            )
-        else:
-            legacy_format = (
-                "plain" if config.output_style == OutputStyle.PLAIN else "xml"
-            )
-
         # Initialize variables de tranh loi uninitialized
         file_map = ""
         project_rules = ""
@@ -272,8 +263,12 @@ class PromptBuildService:
 
         project_rules = get_rule_file_contents(workspace)
 
-        # 3. Generate file contents
+        # 3. Generate file contents (moi file doc 1 lan cho ca build)
         all_path_strs = {str(p) for p in all_file_paths}
+        if snapshot is None:
+            # Doc lazy: file co san trong fragment cache khong can doc lai
+            snapshot = ContentSnapshot(all_path_strs)
+        fragments = self.fragment_cache.session(snapshot)
 
         if config.tree_map_only:
             file_contents = ""
@@ -286,6 +281,8 @@ class PromptBuildService:
                 use_relative_paths=use_relative_paths,
                 # Smart context depends on the same semantic_index toggle for its internal detail level
                 include_relationships=False,
+                snapshot=snapshot,
+                fragments=fragments,
             )
         else:
             content_gen = _FORMAT_TO_GENERATOR.get(
@@ -296,11 +293,30 @@ class PromptBuildService:
                 workspace_root=workspace,
                 use_relative_paths=use_relative_paths,
                 codemap_paths=normalized_codemap,
+                snapshot=snapshot,
+                fragments=fragments,
             )
 
         from domain.prompt.generator import generate_prompt, build_smart_prompt
 
-        if config.mode == CopyMode.SMART:
+        # 4. Assemble; co sink va khong trim -> ghi thang ra sink, khong tao chuoi
+        prompt = ""
+        streamed_total: Optional[int] = None
+        if sink is not None and max_tokens is None:
+            streamed_total = stream_prompt(
+                sink,
+                config,
+                file_map,
+                file_contents,
+                instructions,
+                git_diffs,
+                git_logs,
+                project_rules,
+                workspace,
+                instructions_at_top,
+                self._ledger,
+            )
+        elif config.mode == CopyMode.SMART:
             prompt = build_smart_prompt(
                 smart_contents=file_contents,
                 file_map=file_map,
@@ -328,31 +344,27 @@ class PromptBuildService:
                 semantic_index="",
             )
 
-        token_count = self._tokenization_service.count_tokens(prompt)
-
-        # 5. Build breakdown
-        breakdown = calculate_prompt_breakdown(
+        # 5-6. Total, breakdown va per-file tokens: moi segment dem 1 lan
+        token_count, breakdown, per_file_tokens = account_prompt_tokens(
+            prompt,
+            file_contents,
             instructions,
             file_map,
             project_rules,
             git_diffs,
             git_logs,
-            file_contents,
-            include_git_changes,
-            include_xml_formatting,
-            self._tokenization_service,
-            legacy_format,
-            token_count,
-        )
-
-        # 6. Per-file token counting
-        per_file_tokens = count_per_file_tokens(
             all_file_paths,
             workspace,
             use_relative_paths,
             dep_path_set,
-            self._tokenization_service,
+            include_git_changes,
+            include_xml_formatting,
+            self._ledger,
+            legacy_format,
             codemap_paths=normalized_codemap,
+            snapshot=snapshot,
+            total=streamed_total,
+            fragments=fragments,
         )
 
         # 7. Auto-trim
@@ -372,28 +384,35 @@ class PromptBuildService:
                 git_diffs,
                 git_logs,
                 breakdown,
-                self._tokenization_service,
+                self._ledger,
                 legacy_format,
                 include_xml_formatting,
                 instructions_at_top,
                 "",
                 output_style,
+                snapshot=snapshot,
             )
             if notes:
                 trimmed = True
                 trimmed_notes = notes
                 prompt = prompt_trimmed
-                token_count = self._tokenization_service.count_tokens(prompt)
-                # Re-count per-file tokens after trimming
+                token_count = self._ledger.count_tokens(prompt)
+                # Re-count per-file tokens after trimming (memo hit tu ledger)
                 per_file_tokens = count_per_file_tokens(
                     all_file_paths,
                     workspace,
                     use_relative_paths,
                     dep_path_set,
-                    self._tokenization_service,
+                    self._ledger,
                     codemap_paths=normalized_codemap,
+                    fragments=fragments,
                 )
 
+        if sink is not None and streamed_total is None:
+            # Trim can tong token truoc khi ghi -> ghi prompt sau khi trim
+            sink.write(prompt)
+            prompt = ""
+
         # Tao BuildResult day du
         return BuildResult(
             prompt_text=prompt,
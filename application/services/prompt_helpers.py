@@ -5,12 +5,115 @@ Prompt Helpers - Separates token counting logic and utilities from PromptBuildSe
 from pathlib import Path
 from typing import List, Optional, Set, Dict, Any, Tuple
 from shared.types.prompt_types_extra import FileTokenInfo
+from domain.config.output_format import OutputStyle
+from domain.prompt.content_snapshot import ContentSnapshot
+from domain.prompt.copy_mode import CopyConfig, CopyMode
 from domain.prompt.file_collector import collect_files
+from domain.prompt.file_tokens import count_file_tokens_cached, token_text
+from domain.prompt.fragment_cache import FragmentSession
+from domain.prompt.prompt_sink import PromptSink, TokenCountingSink, write_fragments
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def resolve_copy_config(
+    output_format: Any, include_git_changes: bool, include_xml_formatting: bool
+) -> Tuple[CopyConfig, str]:
+    """
+    Parse output_format (CopyConfig, dict hoac legacy string) thanh CopyConfig.
+
+    Returns:
+        Tuple (config, legacy_format) - legacy_format la "xml", "plain",
+        "compress" hoac "compress_plain" cho cac generator/checker cu
+    """
+    config: CopyConfig
+    if isinstance(output_format, CopyConfig):
+        config = output_format
+    elif isinstance(output_format, dict):
+        config = CopyConfig.from_dict(output_format)
+    else:
+        # Legacy string
+        fmt_str = str(output_format).lower()
+        if fmt_str in ("compress", "compress_plain"):
+            mode = CopyMode.SMART
+        elif fmt_str == "search_replace" or include_xml_formatting:
+            mode = CopyMode.APPLY
+        else:
+            mode = CopyMode.FULL
+
+        style = OutputStyle.PLAIN if "plain" in fmt_str else OutputStyle.XML
+        config = CopyConfig(
+            mode=mode,
+            include_git_diff=include_git_changes,
+            tree_map_only=False,
+            output_style=style,
+        )
+
+    # Internal format string representation for legacy checkers/generators
+    if config.mode == CopyMode.SMART:
+        legacy_format = (
+            "compress_plain" if config.output_style == OutputStyle.PLAIN else "compress"
+        )
+    else:
+        legacy_format = "plain" if config.output_style == OutputStyle.PLAIN else "xml"
+    return config, legacy_format
+
+
+def stream_prompt(
+    sink: PromptSink,
+    config: CopyConfig,
+    file_map: str,
+    file_contents: str,
+    instructions: str,
+    git_diffs: Optional[Any],
+    git_logs: Optional[Any],
+    project_rules: str,
+    workspace: Path,
+    instructions_at_top: bool,
+    ledger: Any,
+) -> int:
+    """
+    Ghi prompt thang vao sink theo tung fragment, khong ghep thanh 1 chuoi.
+
+    Token duoc dem tren chinh stream (moi fragment qua `ledger`).
+
+    Returns:
+        Tong token cua prompt da ghi
+    """
+    from domain.prompt.assembler import iter_prompt, iter_smart_prompt
+
+    if config.mode == CopyMode.SMART:
+        fragments = iter_smart_prompt(
+            file_contents,
+            file_map,
+            instructions,
+            git_diffs,
+            git_logs,
+            project_rules,
+            instructions_at_top,
+            "",
+            config.output_style,
+        )
+    else:
+        fragments = iter_prompt(
+            file_map,
+            file_contents,
+            instructions,
+            config.mode == CopyMode.APPLY,
+            git_diffs,
+            git_logs,
+            config.output_style,
+            project_rules,
+            instructions_at_top,
+            workspace,
+            "",
+        )
+    counting = TokenCountingSink(sink, ledger.count_tokens)
+    write_fragments(fragments, counting)
+    return counting.tokens
+
+
 def count_per_file_tokens(
     file_paths: List[Path],
     workspace: Path,
@@ -18,18 +121,36 @@ def count_per_file_tokens(
     dep_path_set: set[str],
     tokenization_service: Any,
     codemap_paths: Optional[Set[str]] = None,
+    segments: Optional[List[str]] = None,
+    snapshot: Optional[ContentSnapshot] = None,
+    fragments: Optional[FragmentSession] = None,
 ) -> List[FileTokenInfo]:
     """
     Counts tokens for each file individually to provide detailed metadata.
+
+    If `segments` is given, the text counted for each file is appended to it
+    (in file order) so the caller can reuse the counts for the whole prompt.
+    File contents come from `snapshot` (the build's read-once contents) if given.
+    With `fragments`, unchanged files reuse their cached counts (no read).
     """
+    codemap_set = codemap_paths or set()
+    if fragments is not None:
+        return count_file_tokens_cached(
+            file_paths,
+            workspace,
+            use_relative_paths,
+            dep_path_set,
+            codemap_set,
+            fragments,
+        )
+
     entries = collect_files(
         selected_paths={str(p) for p in file_paths},
         workspace_root=workspace,
         use_relative_paths=use_relative_paths,
+        snapshot=snapshot,
     )
 
-    codemap_set = codemap_paths or set()
-
     result: list[FileTokenInfo] = []
     for entry in entries:
         entry_path_abs = str(entry.path)
@@ -37,24 +158,11 @@ def count_per_file_tokens(
             entry_path_abs = str((workspace / entry_path_abs).resolve())
 
         is_codemap_file = entry_path_abs in codemap_set
-        tokens = 0
-
-        if is_codemap_file and entry.content:
-            from domain.smart_context import smart_parse, is_supported
-
-            ext = Path(str(entry.path)).suffix.lstrip(".")
-            if is_supported(ext):
-                smart = smart_parse(
-                    str(entry.path), entry.content, include_relationships=False
-                )
-                if smart:
-                    tokens = tokenization_service.count_tokens(smart)
-                else:
-                    tokens = tokenization_service.count_tokens(entry.content)
-            else:
-                tokens = tokenization_service.count_tokens(entry.content)
-        elif entry.content:
-            tokens = tokenization_service.count_tokens(entry.content)
+        counted = token_text(str(entry.path), entry.content, is_codemap_file)
+
+        tokens = tokenization_service.count_tokens(counted) if counted else 0
+        if segments is not None and counted:
+            segments.append(counted)
 
         result.append(
             FileTokenInfo(
@@ -97,6 +205,92 @@ def reconstruct_file_contents(
         return "\n\n".join(parts)
 
 
+def _git_texts(git_diffs: Optional[Any], git_logs: Optional[Any]) -> List[str]:
+    """Git diff/log texts, counted separately as they appear in the prompt."""
+    texts: List[str] = []
+    if git_diffs:
+        texts += [git_diffs.work_tree_diff or "", git_diffs.staged_diff or ""]
+    if git_logs:
+        texts.append(git_logs.log_content or "")
+    return texts
+
+
+def account_prompt_tokens(
+    prompt: str,
+    file_contents: str,
+    instructions: str,
+    file_map: str,
+    project_rules: str,
+    git_diffs: Optional[Any],
+    git_logs: Optional[Any],
+    file_paths: List[Path],
+    workspace: Path,
+    use_relative_paths: bool,
+    dep_path_set: Set[str],
+    include_git_changes: bool,
+    include_xml_formatting: bool,
+    ledger: Any,
+    output_format: str,
+    codemap_paths: Optional[Set[str]] = None,
+    snapshot: Optional[ContentSnapshot] = None,
+    total: Optional[int] = None,
+    fragments: Optional[FragmentSession] = None,
+) -> Tuple[int, Dict[str, int], List[FileTokenInfo]]:
+    """
+    Token total, breakdown and per-file tokens from segment counts.
+
+    Each file block and prompt section is tokenized once through `ledger`
+    (a TokenLedger); the totals are segment sums plus the joins between them.
+    Pass `total` when the prompt was streamed (already counted, no text).
+    With `fragments`, file blocks reuse the counts cached with each block.
+
+    Returns:
+        Tuple (total_tokens, breakdown, per_file_tokens)
+    """
+    file_segments: List[str] = []
+    per_file_tokens = count_per_file_tokens(
+        file_paths,
+        workspace,
+        use_relative_paths,
+        dep_path_set,
+        ledger,
+        codemap_paths=codemap_paths,
+        segments=file_segments,
+        snapshot=snapshot,
+        fragments=fragments,
+    )
+    # Block tu fragment cache da kem token count -> khong dem lai
+    segments = file_segments if fragments is None else fragments.segments()
+    # File blocks chi cach nhau boi tag/header -> gioi han vung tim
+    ledger.count_composite(file_contents, segments, max_gap=4096)
+
+    if total is None:
+        sections = [instructions, file_map, project_rules, file_contents]
+        sections += _git_texts(git_diffs, git_logs)
+        if include_xml_formatting:
+            from domain.prompt.opx_instruction import XML_FORMATTING_INSTRUCTIONS
+
+            sections.append(XML_FORMATTING_INSTRUCTIONS)
+        # Thu tu section trong prompt thay doi theo option -> sap theo vi tri
+        sections.sort(key=lambda text: prompt.find(text) if text else -1)
+        total = ledger.count_composite(prompt, sections)
+
+    breakdown = calculate_prompt_breakdown(
+        instructions,
+        file_map,
+        project_rules,
+        git_diffs,
+        git_logs,
+        file_contents,
+        include_git_changes,
+        include_xml_formatting,
+        ledger,
+        output_format,
+        total,
+    )
+    return total, breakdown, per_file_tokens
+
+
 def calculate_prompt_breakdown(
     instructions: str,
     file_map: str,
@@ -119,13 +313,9 @@ def calculate_prompt_breakdown(
         "rule_tokens": tokenization_service.count_tokens(project_rules)
         if project_rules
         else 0,
-        "diff_tokens": (
-            tokenization_service.count_tokens(
-                (git_diffs.work_tree_diff + git_diffs.staged_diff) if git_diffs else ""
-            )
-            + tokenization_service.count_tokens(
-                git_logs.log_content if git_logs else ""
-            )
+        "diff_tokens": sum(
+            tokenization_service.count_tokens(text) if text else 0
+            for text in _git_texts(git_diffs, git_logs)
         )
         if include_git_changes
         else 0,
@@ -166,10 +356,10 @@ def apply_context_trimming(
     instructions_at_top: bool,
     semantic_index_text: str,
     output_style: Any,
+    snapshot: Optional[ContentSnapshot] = None,
 ) -> Tuple[str, List[str]]:
     """Performs context trimming when token limit is exceeded."""
     from domain.prompt.context_trimmer import ContextTrimmer, PromptComponents
-    from domain.prompt.file_collector import collect_files
     from domain.prompt.generator import generate_prompt
 
     # Collect per-file contents for the trimmer to process
@@ -179,6 +369,7 @@ def apply_context_trimming(
         selected_paths={str(p) for p in all_file_paths},
         workspace_root=workspace,
         use_relative_paths=use_relative_paths,
+        snapshot=snapshot,
     )
     protected_display_paths: Set[str] = set()
     for entry in entries:
@@ -25,6 +25,8 @@ from pathlib import Path
 from domain.ports.clipboard_port import IClipboardService as IClipboardService
 
 if TYPE_CHECKING:
+    from domain.prompt.content_snapshot import ContentSnapshot
+    from domain.prompt.prompt_sink import PromptSink
     from domain.smart_context.tree_item import TreeItem
 
 
@@ -51,6 +53,9 @@ class IPromptBuilder(Protocol):
         codemap_paths: Optional[Set[str]] = None,
         instructions_at_top: bool = False,
         full_tree: bool = False,
+        *,
+        snapshot: Optional["ContentSnapshot"] = None,
+        sink: Optional["PromptSink"] = None,
     ) -> Tuple[str, int, Dict[str, int]]:
         """
         Generate prompt tu danh sach file paths va settings.
@@ -65,6 +70,8 @@ class IPromptBuilder(Protocol):
             tree_item: Root TreeItem cho file map (optional)
             selected_paths: Set paths da chon cho file map (optional)
             include_xml_formatting: Co bao gom OPX instructions khong
+            snapshot: Noi dung file da doc cho lan copy nay (None = doc moi)
+            sink: Ghi prompt vao sink theo fragment (prompt tra ve = "")
 
         Returns:
             Tuple (prompt_text, token_count, breakdown_dict)
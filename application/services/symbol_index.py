@@ -0,0 +1,358 @@
+"""
+Symbol Index - Tim symbol definitions theo ten (`sym:` search).
+
+Search box truoc day chi khop ten file hoac noi dung tho. SymbolIndexService
+giu symbols (ten, loai, file, dong) cua moi workspace:
+- Trich xuat bang domain/codemap/symbol_extractor.extract_symbols trong
+  background, chia cho worker processes khi nhieu file (tree-sitter parse
+  giu GIL)
+- Cap nhat tang dan: so (mtime, size) voi workspace catalog, chi trich xuat
+  lai file moi/da sua; file watcher goi refresh_path() -> dong bo lai sau
+  SYNC_DELAY_SECONDS (gom nhieu thay doi lien tiep)
+- Tra cuu: ten khop chinh xac, roi prefix (bisect tren ten da sort), roi
+  fuzzy (FuzzyPathIndex tren ten)
+
+search() KHONG bao gio trich xuat (goi tu UI thread): workspace chua warm
+tra ve rong.
+
+KHONG import bat ky module Qt nao.
+"""
+
+import bisect
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from application.services.fuzzy_path_index import FuzzyPathIndex
+from domain.ports.symbol_index_port import ISymbolIndexService, SymbolLocation
+
+if TYPE_CHECKING:
+    from domain.ports.workspace_catalog_port import (
+        CatalogEntry,
+        IWorkspaceCatalog,
+        IWorkspaceCatalogService,
+    )
+
+logger = logging.getLogger(__name__)
+
+# File lon hon khong duoc parse (codemap cung bo qua file qua lon)
+MAX_SYMBOL_FILE_SIZE = 1024 * 1024
+
+# It file hon nguong nay -> trich xuat ngay trong thread (khoi dong process ton ~1s)
+PROCESS_POOL_MIN_FILES = 64
+
+# Gom thay doi tu file watcher truoc khi dong bo lai
+SYNC_DELAY_SECONDS = 0.5
+
+# So workspace giu index trong memory cung luc
+MAX_INDEXES = 2
+
+# Kinds khong phai definition (import, marker entry point) khong duoc index
+_SKIPPED_KINDS = frozenset({"import"})
+
+# (name, kind, line) - ket qua tra ve tu worker process
+_ExtractedSymbol = Tuple[str, str, int]
+
+# rel_path -> (mtime_ns, size, symbols)
+_FileSymbols = Tuple[int, int, List[SymbolLocation]]
+
+
+def _default_workers() -> int:
+    """Chua lai 1 core cho UI thread."""
+    return max(1, min(4, (os.cpu_count() or 1) - 1))
+
+
+def _is_symbol_source(rel_path: str) -> bool:
+    """File co ngon ngu tree-sitter ho tro."""
+    from domain.smart_context.config import get_config_by_extension
+
+    ext = os.path.splitext(rel_path)[1]
+    return bool(ext) and get_config_by_extension(ext[1:]) is not None
+
+
+def _extract_file(abs_path: str) -> Optional[List[_ExtractedSymbol]]:
+    """
+    Trich xuat symbols cua 1 file. Top-level de pickle sang worker process.
+
+    Returns:
+        None neu khong doc duoc file
+    """
+    try:
+        with open(abs_path, "r", encoding="utf-8", errors="replace") as f:
+            content = f.read()
+    except OSError:
+        return None
+
+    from domain.codemap.symbol_extractor import extract_symbols
+
+    return [
+        (symbol.name, symbol.kind.value, symbol.line_start)
+        for symbol in extract_symbols(abs_path, content)
+        if symbol.kind.value not in _SKIPPED_KINDS and not symbol.name.startswith("[")
+    ]
+
+
+class _WorkspaceSymbols:
+    """
+    Symbols cua 1 workspace + bang tra cuu ten (build lai sau moi lan dong bo).
+
+    Attributes:
+        files: rel_path -> (mtime_ns, size, symbols)
+        stale: True neu file watcher bao thay doi chua dong bo
+    """
+
+    def __init__(self) -> None:
+        self.files: Dict[str, _FileSymbols] = {}
+        self.stale = False
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self.sync_scheduled = False
+        self._by_name: Dict[str, List[SymbolLocation]] = {}
+        self._names: List[str] = []
+        self._fuzzy = FuzzyPathIndex(root="")
+
+    def update(self, changed: Dict[str, _FileSymbols], removed: List[str]) -> None:
+        """
+        Ap dung ket qua dong bo va build lai bang tra cuu ten.
+
+        Goi tu thread dong bo (dang giu sync_lock); bang moi duoc build ngoai
+        lock roi moi swap vao de search khong phai doi.
+        """
+        if not changed and not removed:
+            return
+        with self.lock:
+            for rel_path in removed:
+                self.files.pop(rel_path, None)
+            self.files.update(changed)
+            files = list(self.files.items())
+
+        by_name: Dict[str, List[SymbolLocation]] = {}
+        for _, (_, _, symbols) in sorted(files, key=lambda item: item[0]):
+            for symbol in symbols:
+                by_name.setdefault(symbol.name.lower(), []).append(symbol)
+        names = sorted(by_name)
+        fuzzy = FuzzyPathIndex(names, root="")
+
+        with self.lock:
+            self._by_name = by_name
+            self._names = names
+            self._fuzzy = fuzzy
+
+    def lookup(self, query_lower: str, limit: Optional[int]) -> List[SymbolLocation]:
+        """Exact -> prefix (ngan truoc) -> fuzzy; goi khi dang giu lock."""
+        by_name = self._by_name
+        names: List[str] = []
+        if query_lower in by_name:
+            names.append(query_lower)
+
+        prefixed: List[str] = []
+        pos = bisect.bisect_right(self._names, query_lower)
+        while pos < len(self._names) and self._names[pos].startswith(query_lower):
+            prefixed.append(self._names[pos])
+            pos += 1
+        prefixed.sort(key=len)
+        names.extend(prefixed)
+
+        results: List[SymbolLocation] = []
+        seen: Set[str] = set()
+        for name in names:
+            seen.add(name)
+            results.extend(by_name[name])
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+
+        for name in self._fuzzy.search(query_lower, limit):
+            if name in seen:
+                continue
+            results.extend(by_name[name])
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+        return results
+
+
+class SymbolIndexService(ISymbolIndexService):
+    """
+    Quan ly symbol index theo workspace (LRU MAX_INDEXES).
+
+    Attributes:
+        _catalog_service: Nguon danh sach files + (mtime, size)
+            (None -> lay tu DomainRegistry khi can)
+        _max_workers: So worker processes khi trich xuat (<2 -> trong thread)
+    """
+
+    def __init__(
+        self,
+        catalog_service: Optional["IWorkspaceCatalogService"] = None,
+        max_workers: Optional[int] = None,
+        max_indexes: int = MAX_INDEXES,
+    ) -> None:
+        self._catalog_service = catalog_service
+        self._max_workers = _default_workers() if max_workers is None else max_workers
+        self._max_indexes = max_indexes
+        self._indexes: "OrderedDict[str, _WorkspaceSymbols]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def warm(self, workspace_root: Path) -> None:
+        holder = self._ensure_holder(workspace_root)
+        catalog = self._catalogs().get_catalog(workspace_root)
+        with holder.sync_lock:
+            holder.stale = False
+            self._sync(holder, catalog)
+
+    def search(
+        self, workspace_root: Path, query: str, limit: Optional[int] = None
+    ) -> List[SymbolLocation]:
+        query_lower = query.strip().lower()
+        if not query_lower:
+            return []
+        with self._lock:
+            holder = self._indexes.get(os.path.abspath(str(workspace_root)))
+        if holder is None:
+            return []
+        with holder.lock:
+            return holder.lookup(query_lower, limit)
+
+    def refresh_path(self, path: str) -> None:
+        abs_path = os.path.abspath(path)
+        with self._lock:
+            targets = [
+                (root, holder)
+                for root, holder in self._indexes.items()
+                if abs_path == root or abs_path.startswith(root.rstrip(os.sep) + os.sep)
+            ]
+
+        for root, holder in targets:
+            with holder.lock:
+                holder.stale = True
+                if holder.sync_scheduled:
+                    continue
+                holder.sync_scheduled = True
+            threading.Thread(
+                target=self._delayed_sync, args=(Path(root), holder), daemon=True
+            ).start()
+
+    def invalidate(self, workspace_root: Optional[Path] = None) -> None:
+        with self._lock:
+            if workspace_root is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(os.path.abspath(str(workspace_root)), None)
+
+    def _catalogs(self) -> "IWorkspaceCatalogService":
+        if self._catalog_service is None:
+            from domain.ports.registry import DomainRegistry
+
+            return DomainRegistry.workspace_catalog()
+        return self._catalog_service
+
+    def _ensure_holder(self, workspace_root: Path) -> _WorkspaceSymbols:
+        key = os.path.abspath(str(workspace_root))
+        with self._lock:
+            holder = self._indexes.get(key)
+            if holder is not None:
+                self._indexes.move_to_end(key)
+            else:
+                holder = _WorkspaceSymbols()
+                self._indexes[key] = holder
+                while len(self._indexes) > self._max_indexes:
+                    self._indexes.popitem(last=False)
+            return holder
+
+    def _delayed_sync(self, workspace_root: Path, holder: _WorkspaceSymbols) -> None:
+        time.sleep(SYNC_DELAY_SECONDS)
+        with holder.lock:
+            holder.sync_scheduled = False
+        try:
+            catalog = self._catalogs().get_catalog(workspace_root)
+            with holder.sync_lock:
+                if holder.stale:
+                    holder.stale = False
+                    self._sync(holder, catalog)
+        except Exception as e:
+            logger.debug(f"Symbol index sync failed for {workspace_root}: {e}")
+
+    def _sync(self, holder: _WorkspaceSymbols, catalog: "IWorkspaceCatalog") -> None:
+        """
+        Dong bo holder voi catalog (goi khi dang giu holder.sync_lock).
+
+        Trich xuat ngoai holder.lock de search van chay trong luc parse.
+        File vua sua (trong racy window) ghi mtime -1 de lan sau parse lai.
+        """
+        from shared.utils.binary_cache import RACY_WINDOW_NS
+
+        with holder.lock:
+            known = {rel: record[:2] for rel, record in holder.files.items()}
+
+        changed: List["CatalogEntry"] = []
+        seen: Set[str] = set()
+        for entry in catalog.entries():
+            if (
+                entry.is_binary
+                or entry.size > MAX_SYMBOL_FILE_SIZE
+                or not _is_symbol_source(entry.rel_path)
+            ):
+                continue
+            seen.add(entry.rel_path)
+            if known.get(entry.rel_path) != (entry.mtime_ns, entry.size):
+                changed.append(entry)
+        removed = [rel for rel in known if rel not in seen]
+
+        extracted = self._extract_many([entry.abs_path for entry in changed])
+        now_ns = time.time_ns()
+        updates: Dict[str, _FileSymbols] = {}
+        for entry, symbols in zip(changed, extracted):
+            if symbols is None:
+                removed.append(entry.rel_path)
+                continue
+            mtime_ns = entry.mtime_ns
+            if now_ns - mtime_ns < RACY_WINDOW_NS:
+                mtime_ns = -1
+            updates[entry.rel_path] = (
+                mtime_ns,
+                entry.size,
+                [
+                    SymbolLocation(name, kind, entry.rel_path, entry.abs_path, line)
+                    for name, kind, line in symbols
+                ],
+            )
+
+        holder.update(updates, removed)
+        if updates or removed:
+            logger.debug(
+                f"Symbol index synced: {catalog.root} "
+                f"({len(updates)} parsed, {len(removed)} removed)"
+            )
+
+    def _extract_many(self, paths: List[str]) -> List[Optional[List[_ExtractedSymbol]]]:
+        """Trich xuat nhieu file, dung process pool neu du lon."""
+        if self._max_workers < 2 or len(paths) < PROCESS_POOL_MIN_FILES:
+            return [_extract_file(path) for path in paths]
+
+        try:
+            # spawn: fork process dang chay Qt + threads khong an toan
+            with ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                return list(pool.map(_extract_file, paths, chunksize=32))
+        except Exception as e:
+            logger.warning(f"Symbol extraction pool failed, falling back: {e}")
+            return [_extract_file(path) for path in paths]
+
+
+def search_symbol_files(
+    workspace_path: Optional[Path], query: str, limit: Optional[int] = None
+) -> List[str]:
+    """Files chua symbol khop `query` (theo thu tu xep hang, khong trung)."""
+    if workspace_path is None or not query.strip():
+        return []
+    from domain.ports.registry import DomainRegistry
+
+    locations = DomainRegistry.symbol_index().search(workspace_path, query, limit)
+    return list(dict.fromkeys(location.abs_path for location in locations))
@@ -0,0 +1,367 @@
+"""
+Workspace Catalog - Danh sach files cua workspace, walk 1 lan va dung chung.
+
+Truoc day search index, related files (DependencyResolver), AI pick va
+lazy-collect cua file tree moi noi tu os.walk + tu danh gia ignore rules.
+WorkspaceCatalogService giu 1 catalog in-memory cho moi workspace:
+- Build 1 lan (nhieu consumer goi dong thoi chi trigger 1 lan walk)
+- Moi entry co rel_path, size, mtime, extension, is_binary (language tinh lazy)
+- File watcher cap nhat tai cho qua refresh_path() thay vi build lai
+- Doi ignore settings/.gitignore -> compiled matcher doi -> build lai
+- Setting use_git_index: git repository lay danh sach tu `git ls-files`
+  (qua IGitService), fallback walker voi folder khong phai git repo
+
+KHONG import bat ky module Qt nao.
+"""
+
+import logging
+import os
+import stat
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from application.services.workspace_index import _get_ignore_matcher
+from domain.ports.workspace_catalog_port import (
+    CatalogEntry,
+    IWorkspaceCatalog,
+    IWorkspaceCatalogService,
+)
+
+if TYPE_CHECKING:
+    from domain.ports.git_port import IGitService
+    from domain.ports.ignore_engine_port import IIgnoreEngine, IIgnoreMatcher
+
+logger = logging.getLogger(__name__)
+
+# So workspace giu catalog cung luc (workspace hien tai + vai workspace vua mo)
+MAX_CATALOGS = 4
+
+# (rel_path posix, abs_path, stat)
+_FoundFile = Tuple[str, str, os.stat_result]
+
+
+def _walk_files(
+    root_str: str,
+    start: str,
+    matcher: "IIgnoreMatcher",
+    ignore_engine: "IIgnoreEngine",
+) -> List[_FoundFile]:
+    """
+    Walk subtree `start` bang os.scandir, prune directory bi ignore.
+
+    Stat lay luon tu DirEntry (Windows khong ton them syscall). Symlink toi
+    directory khong duoc di xuong (giong os.walk mac dinh).
+    """
+    from shared.constants import DIRECTORY_QUICK_SKIP
+    from shared.utils.file_utils import is_system_path_str
+
+    prefix_len = len(root_str) + 1
+    found: List[_FoundFile] = []
+    stack: List[Tuple[str, "IIgnoreMatcher"]] = [(start, matcher)]
+
+    while stack:
+        dirpath, dir_matcher = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        for entry in entries:
+            rel_path = entry.path[prefix_len:].replace(os.sep, "/")
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in DIRECTORY_QUICK_SKIP or dir_matcher.is_ignored(
+                        rel_path, is_dir=True
+                    ):
+                        continue
+                    child_matcher = ignore_engine.descend_matcher(
+                        dir_matcher, Path(entry.path), rel_path
+                    )
+                    stack.append((entry.path, child_matcher))
+                elif entry.is_file():
+                    if dir_matcher.is_ignored(rel_path) or is_system_path_str(
+                        entry.path
+                    ):
+                        continue
+                    found.append((rel_path, entry.path, entry.stat()))
+            except OSError:
+                continue
+
+    return found
+
+
+def _list_git_files(
+    root_str: str,
+    ignore_engine: "IIgnoreEngine",
+    git_service: "IGitService",
+) -> Optional[List[_FoundFile]]:
+    """
+    Lay files tu git index thay vi walk. None neu khong phai git repo.
+
+    Git da ap dung .gitignore, chi loc them default ignores + excluded
+    patterns. Path git liet ke nhung khong con la regular file bi bo qua.
+    """
+    from application.services.workspace_config import get_excluded_patterns
+
+    matcher = ignore_engine.compile_matcher(
+        Path(root_str),
+        use_default_ignores=True,
+        excluded_patterns=get_excluded_patterns() or None,
+        use_gitignore=False,
+    )
+    rel_paths = git_service.list_workspace_files(Path(root_str), matcher)
+    if rel_paths is None:
+        return None
+
+    found: List[_FoundFile] = []
+    for rel_path in rel_paths:
+        abs_path = os.path.join(root_str, *rel_path.split("/"))
+        try:
+            st = os.lstat(abs_path)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            found.append((rel_path, abs_path, st))
+    return found
+
+
+def _make_entries(found: List[_FoundFile]) -> Dict[str, CatalogEntry]:
+    """Tao CatalogEntry, phan loai binary 1 lan cho ca batch (dung chung cache)."""
+    from shared.utils.file_utils import classify_binary_batch
+
+    is_binary = classify_binary_batch([abs_path for _, abs_path, _ in found])
+    return {
+        rel_path: CatalogEntry(
+            rel_path=rel_path,
+            abs_path=abs_path,
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            extension=os.path.splitext(rel_path)[1].lower(),
+            is_binary=is_binary.get(abs_path, False),
+        )
+        for rel_path, abs_path, st in found
+    }
+
+
+class WorkspaceCatalog(IWorkspaceCatalog):
+    """
+    Catalog files cua 1 workspace.
+
+    Attributes:
+        matcher: Compiled ignore matcher luc build (so sanh identity de biet
+            ignore settings/.gitignore da doi)
+        git_indexed: True neu build tu git index (setting use_git_index)
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        entries: Dict[str, CatalogEntry],
+        matcher: "IIgnoreMatcher",
+        git_indexed: bool = False,
+    ) -> None:
+        self._root = root
+        self._root_str = str(root)
+        self._entries = entries
+        self._lock = threading.Lock()
+        self.matcher = matcher
+        self.git_indexed = git_indexed
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def relative(self, path: str) -> Optional[str]:
+        """Path tuong doi (posix) cua `path`, '' neu la root, None neu nam ngoai."""
+        path = os.path.abspath(path)
+        if path == self._root_str:
+            return ""
+        if not path.startswith(self._root_str.rstrip(os.sep) + os.sep):
+            return None
+        return path[len(self._root_str.rstrip(os.sep)) + 1 :].replace(os.sep, "/")
+
+    def get(self, rel_path: str) -> Optional[CatalogEntry]:
+        return self._entries.get(rel_path.replace(os.sep, "/"))
+
+    def entries(self) -> Iterator[CatalogEntry]:
+        with self._lock:
+            snapshot = list(self._entries.values())
+        return iter(snapshot)
+
+    def files(
+        self, folder: Optional[Path] = None, include_binary: bool = False
+    ) -> List[str]:
+        prefix = self.relative(str(folder)) if folder is not None else ""
+        if prefix is None:
+            return []
+        if prefix:
+            prefix += "/"
+        with self._lock:
+            return [
+                entry.abs_path
+                for entry in self._entries.values()
+                if (include_binary or not entry.is_binary)
+                and entry.rel_path.startswith(prefix)
+            ]
+
+    def search_index(self) -> Dict[str, List[str]]:
+        index: Dict[str, List[str]] = {}
+        for entry in self.entries():
+            if entry.is_binary:
+                continue
+            name = entry.rel_path.rsplit("/", 1)[-1].lower()
+            index.setdefault(name, []).append(entry.abs_path)
+        return index
+
+    def replace_subtree(self, rel_path: str, entries: Dict[str, CatalogEntry]) -> None:
+        """Thay toan bo entries tai rel_path (file hoac folder) bang `entries`."""
+        prefix = rel_path + "/"
+        with self._lock:
+            self._entries.pop(rel_path, None)
+            stale = [key for key in self._entries if key.startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+            self._entries.update(entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class WorkspaceCatalogService(IWorkspaceCatalogService):
+    """
+    Quan ly WorkspaceCatalog theo workspace root (LRU MAX_CATALOGS).
+
+    Attributes:
+        _ignore_engine: IgnoreEngine inject tu ServiceContainer
+            (None -> lay tu DomainRegistry khi can)
+        _git_service: GitService cho git index mode (None -> DomainRegistry)
+    """
+
+    def __init__(
+        self,
+        ignore_engine: Optional["IIgnoreEngine"] = None,
+        max_catalogs: int = MAX_CATALOGS,
+        git_service: Optional["IGitService"] = None,
+    ) -> None:
+        self._ignore_engine = ignore_engine
+        self._git_service = git_service
+        self._max_catalogs = max_catalogs
+        self._catalogs: "OrderedDict[str, WorkspaceCatalog]" = OrderedDict()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_catalog(self, workspace_root: Path) -> WorkspaceCatalog:
+        key = os.path.abspath(str(workspace_root))
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        # 1 build lock / workspace: caller thu 2 doi caller dau walk xong
+        with build_lock:
+            from application.services.workspace_config import get_use_git_index
+
+            engine = self._engine()
+            matcher = _get_ignore_matcher(Path(key).resolve(), engine)
+            use_git_index = get_use_git_index()
+            with self._lock:
+                catalog = self._catalogs.get(key)
+                if (
+                    catalog is not None
+                    and catalog.matcher is matcher
+                    and catalog.git_indexed == use_git_index
+                ):
+                    self._catalogs.move_to_end(key)
+                    return catalog
+
+            found = _list_git_files(key, engine, self._git()) if use_git_index else None
+            if found is None:
+                found = _walk_files(key, key, matcher, engine)
+            catalog = WorkspaceCatalog(
+                Path(key), _make_entries(found), matcher, git_indexed=use_git_index
+            )
+            logger.debug(f"Workspace catalog built: {key} ({len(catalog)} files)")
+
+            with self._lock:
+                self._catalogs[key] = catalog
+                self._catalogs.move_to_end(key)
+                while len(self._catalogs) > self._max_catalogs:
+                    evicted, _ = self._catalogs.popitem(last=False)
+                    self._build_locks.pop(evicted, None)
+            return catalog
+
+    def peek_catalog(self, workspace_root: Path) -> Optional[WorkspaceCatalog]:
+        with self._lock:
+            return self._catalogs.get(os.path.abspath(str(workspace_root)))
+
+    def refresh_path(self, path: str) -> None:
+        with self._lock:
+            catalogs = list(self._catalogs.values())
+
+        for catalog in catalogs:
+            rel_path = catalog.relative(path)
+            if not rel_path:
+                continue
+            try:
+                catalog.replace_subtree(rel_path, self._scan_path(catalog, rel_path))
+            except Exception as e:
+                logger.debug(f"Catalog refresh failed for {path}: {e}")
+
+    def invalidate(self, workspace_root: Optional[Path] = None) -> None:
+        with self._lock:
+            if workspace_root is None:
+                self._catalogs.clear()
+            else:
+                self._catalogs.pop(os.path.abspath(str(workspace_root)), None)
+
+    def _engine(self) -> "IIgnoreEngine":
+        if self._ignore_engine is None:
+            from domain.ports.registry import DomainRegistry
+
+            return DomainRegistry.ignore_engine()
+        return self._ignore_engine
+
+    def _git(self) -> "IGitService":
+        if self._git_service is None:
+            from domain.ports.registry import DomainRegistry
+
+            return DomainRegistry.git_service()
+        return self._git_service
+
+    def _scan_path(
+        self, catalog: WorkspaceCatalog, rel_path: str
+    ) -> Dict[str, CatalogEntry]:
+        """Doc lai 1 path (file/folder) theo ignore rules cua folder cha."""
+        from shared.constants import DIRECTORY_QUICK_SKIP
+        from shared.utils.file_utils import is_system_path_str
+
+        if any(part in DIRECTORY_QUICK_SKIP for part in rel_path.split("/")):
+            return {}
+
+        abs_path = os.path.join(str(catalog.root), *rel_path.split("/"))
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return {}
+
+        engine = self._engine()
+        matcher_root = catalog.root.resolve()
+        parent_matcher = _get_ignore_matcher(
+            matcher_root, engine, matcher_root.joinpath(*rel_path.split("/")[:-1])
+        )
+
+        if stat.S_ISDIR(st.st_mode):
+            if parent_matcher.is_ignored(rel_path, is_dir=True):
+                return {}
+            dir_matcher = engine.descend_matcher(
+                parent_matcher, Path(abs_path), rel_path
+            )
+            found = _walk_files(str(catalog.root), abs_path, dir_matcher, engine)
+        elif stat.S_ISREG(st.st_mode):
+            if parent_matcher.is_ignored(rel_path) or is_system_path_str(abs_path):
+                return {}
+            found = [(rel_path, abs_path, st)]
+        else:
+            return {}
+        return _make_entries(found)
@@ -8,6 +8,7 @@ model/component/service layers KHONG nen import tu view layer.
 Functions:
 - get_excluded_patterns(): Lay danh sach excluded patterns
 - get_use_gitignore(): Kiem tra co respect .gitignore khong
+- get_use_git_index(): Kiem tra co liet ke files tu git index khong
 - get_use_relative_paths(): Kiem tra co dung relative paths khong
 - add_excluded_patterns(): Them excluded patterns moi
 - remove_excluded_patterns(): Xoa excluded patterns
@@ -51,6 +52,14 @@ def get_use_gitignore() -> bool:
     return DomainRegistry.settings_service().load_settings().use_gitignore
 
 
+def get_use_git_index() -> bool:
+    """Tra ve co liet ke files tu git index (git ls-files) khong."""
+    from domain.ports.registry import DomainRegistry
+
+    settings = DomainRegistry.settings_service().load_settings()
+    return settings.use_gitignore and settings.use_git_index
+
+
 def get_use_relative_paths() -> bool:
     """Tra ve co dung workspace-relative paths trong prompts khong."""
     from domain.ports.registry import DomainRegistry
@@ -3,7 +3,7 @@ Workspace Index - Filesystem scanning va search index KHONG phu thuoc Qt.
 
 Module nay tach logic filesystem ra khoi file_tree_model.py:
 - build_search_index(): Build flat search index qua os.walk
-- search_in_index(): Tim files theo query (case-insensitive)
+- search_in_index(): Tim files theo ten (fuzzy), noi dung (code:), symbol (sym:)
 - collect_files_from_disk(): Scan folder de lay tat ca files (respect ignore rules)
 
 Dependency flow:
@@ -14,12 +14,12 @@ KHONG import bat ky module Qt nao.
 
 import os
 import logging
-import pathspec
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
 
 if TYPE_CHECKING:
-    from domain.ports.ignore_engine_port import IIgnoreEngine
+    from domain.ports.ignore_engine_port import IIgnoreEngine, IIgnoreMatcher
+    from domain.ports.workspace_catalog_port import IWorkspaceCatalogService
 
 from domain.ports.workspace_scanner import IWorkspaceScanner
 
@@ -28,22 +28,66 @@ logger = logging.getLogger(__name__)
 HAS_SCANDIR_RS = False
 
 
-def _get_ignore_spec(
-    workspace_path: Path, ignore_engine: "IIgnoreEngine"
-) -> pathspec.PathSpec:
-    """Helper để lấy pathspec cho workspace."""
+def _get_ignore_matcher(
+    workspace_path: Path,
+    ignore_engine: "IIgnoreEngine",
+    directory: Optional[Path] = None,
+) -> "IIgnoreMatcher":
+    """Helper để lấy compiled matcher cho workspace (hoặc folder con `directory`)."""
     from application.services.workspace_config import (
         get_excluded_patterns,
         get_use_gitignore,
     )
 
     excluded = get_excluded_patterns()
-    return ignore_engine.build_pathspec(
-        workspace_path,
-        use_default_ignores=True,
-        excluded_patterns=excluded if excluded else None,
-        use_gitignore=get_use_gitignore(),
-    )
+    options: Dict[str, Any] = {
+        "use_default_ignores": True,
+        "excluded_patterns": excluded if excluded else None,
+        "use_gitignore": get_use_gitignore(),
+    }
+    if directory is not None and directory != workspace_path:
+        return ignore_engine.matcher_for_directory(workspace_path, directory, **options)
+    return ignore_engine.compile_matcher(workspace_path, **options)
+
+
+def _scandir_walk_func() -> Optional[Callable[..., Any]]:
+    """Tra ve scandir_rs.Walk neu duoc bat va import duoc."""
+    if not HAS_SCANDIR_RS:
+        return None
+    try:
+        import scandir_rs
+    except ImportError:
+        return None
+    return getattr(scandir_rs, "Walk", None)
+
+
+def _prune_walk_dirs(
+    dirpath: str,
+    dirnames: List[str],
+    root_path_str: str,
+    matcher: "IIgnoreMatcher",
+    matchers: Dict[str, "IIgnoreMatcher"],
+    ignore_engine: "IIgnoreEngine",
+    quick_skip: Any,
+) -> None:
+    """
+    Loại directory bị ignore khỏi os.walk (in-place), ghi matcher của mỗi
+    directory con còn lại (gồm .gitignore lồng nhau) vào `matchers`.
+    """
+    rel_dir = dirpath[len(root_path_str) :] if dirpath.startswith(root_path_str) else ""
+    kept: List[str] = []
+    for name in dirnames:
+        if name in quick_skip:
+            continue
+        rel_child = os.path.join(rel_dir, name) if rel_dir else name
+        if matcher.is_ignored(rel_child, is_dir=True):
+            continue
+        kept.append(name)
+        child_path = os.path.join(dirpath, name)
+        matchers[child_path] = ignore_engine.descend_matcher(
+            matcher, Path(child_path), rel_child.replace(os.sep, "/")
+        )
+    dirnames[:] = kept
 
 
 def build_search_index(
@@ -58,20 +102,13 @@ def build_search_index(
         is_system_path_str,
     )
 
-    scandir_rs = None
-    if HAS_SCANDIR_RS:
-        try:
-            import scandir_rs
-        except ImportError:
-            pass
-
     root_path = workspace_path.resolve()
     if ignore_engine is None:
         from domain.ports.registry import DomainRegistry
 
         ignore_engine = DomainRegistry.ignore_engine()
 
-    spec = _get_ignore_spec(root_path, ignore_engine)
+    matcher = _get_ignore_matcher(root_path, ignore_engine)
     root_path_str = str(root_path)
     if not root_path_str.endswith(os.path.sep):
         root_path_str += os.path.sep
@@ -79,9 +116,7 @@ def build_search_index(
     index: Dict[str, List[str]] = {}
 
     # Optimization: Sử dụng scandir_rs.Walk nếu có (nhanh hơn rất nhiều)
-    walk_func = (
-        getattr(scandir_rs, "Walk", None) if (HAS_SCANDIR_RS and scandir_rs) else None
-    )
+    walk_func = _scandir_walk_func()
 
     if walk_func:
         try:
@@ -123,13 +158,10 @@ def build_search_index(
                 else:
                     rel_path = filename
 
-                if spec.match_file(rel_path):
+                if matcher.is_ignored(rel_path):
                     continue
 
-                key = filename.lower()
-                if key not in index:
-                    index[key] = []
-                index[key].append(full_path)
+                index.setdefault(filename.lower(), []).append(full_path)
 
             return index
         except Exception as e:
@@ -137,39 +169,51 @@ def build_search_index(
 
     # Fallback to os.walk
     try:
+        # dirpath -> matcher (gồm .gitignore lồng nhau) cho directory đó
+        dir_matchers: Dict[str, "IIgnoreMatcher"] = {}
         for dirpath, dirnames, filenames in os.walk(str(workspace_path)):
             if generation_check and not generation_check():
                 return {}
 
-            # Prune directories
-            dirnames[:] = [d for d in dirnames if d not in DIRECTORY_QUICK_SKIP]
+            # Prune directories bị ignore -> không đi xuống subtree
+            dir_matcher = dir_matchers.pop(dirpath, matcher)
+            _prune_walk_dirs(
+                dirpath,
+                dirnames,
+                root_path_str,
+                dir_matcher,
+                dir_matchers,
+                ignore_engine,
+                DIRECTORY_QUICK_SKIP,
+            )
 
             for filename in filenames:
                 full_path = os.path.join(dirpath, filename)
 
-                if is_system_path_str(full_path) or is_binary_file(full_path):
-                    continue
-
                 if full_path.startswith(root_path_str):
                     rel_path = full_path[len(root_path_str) :]
                 else:
                     rel_path = filename
 
-                if spec.match_file(rel_path):
+                if dir_matcher.is_ignored(rel_path):
                     continue
 
-                key = filename.lower()
-                if key not in index:
-                    index[key] = []
-                index[key].append(full_path)
+                if is_system_path_str(full_path) or is_binary_file(full_path):
+                    continue
+
+                index.setdefault(filename.lower(), []).append(full_path)
     except Exception as e:
         logger.debug(f"Error building search index: {e}")
 
     return index
 
 
-def search_in_index(index: Dict[str, List[str]], query: Optional[str]) -> List[str]:
-    """Tìm files theo query trong search index (case-insensitive substring)."""
+def search_in_index(
+    index: Dict[str, List[str]],
+    query: Optional[str],
+    workspace_path: Optional[Path] = None,
+) -> List[str]:
+    """Tìm files theo tên (fuzzy), nội dung ("code:") hoặc symbol ("sym:")."""
     if not index:
         return []
 
@@ -177,48 +221,25 @@ def search_in_index(index: Dict[str, List[str]], query: Optional[str]) -> List[s
     if not query_stripped:
         return []
 
-    # Check for "code:" prefix
+    if query_stripped.lower().startswith("sym:"):
+        from application.services.symbol_index import search_symbol_files
+
+        return search_symbol_files(workspace_path, query_stripped[4:])
+
+    # "code:" -> trigram content index (build/sync trong background)
     CODE_PREFIX = "code:"
     if query_stripped.lower().startswith(CODE_PREFIX):
         content_query = query_stripped[len(CODE_PREFIX) :].strip()
-        if not content_query:
+        if not content_query or workspace_path is None:
             return []
-        return _search_content_in_files(index, content_query)
-
-    query_lower = query_stripped.lower()
-    results: List[str] = []
-    for filename_lower, paths in index.items():
-        if query_lower in filename_lower:
-            results.extend(paths)
-
-    results.sort()
-    return results
-
-
-def _search_content_in_files(
-    index: Dict[str, List[str]], content_query: str
-) -> List[str]:
-    """Tìm kiếm nội dung trong các file đã được indexed."""
-    MAX_CONTENT_SEARCH_SIZE = 2 * 1024 * 1024
-    query_lower = content_query.lower()
-    results: List[str] = []
-
-    for paths in index.values():
-        for full_path in paths:
-            try:
-                if os.path.getsize(full_path) > MAX_CONTENT_SEARCH_SIZE:
-                    continue
+        from domain.ports.registry import DomainRegistry
 
-                with open(full_path, "r", encoding="utf-8", errors="replace") as f:
-                    content = f.read()
+        return DomainRegistry.content_index().search(workspace_path, content_query)
 
-                if query_lower in content.lower():
-                    results.append(full_path)
-            except (OSError, PermissionError, UnicodeDecodeError):
-                continue
+    from application.services.fuzzy_path_index import FuzzyPathIndex
 
-    results.sort()
-    return results
+    paths = [path for bucket in index.values() for path in bucket]
+    return FuzzyPathIndex(paths).search(query_stripped)
 
 
 def collect_files_from_disk(
@@ -233,13 +254,6 @@ def collect_files_from_disk(
         is_system_path_str,
     )
 
-    scandir_rs = None
-    if HAS_SCANDIR_RS:
-        try:
-            import scandir_rs
-        except ImportError:
-            pass
-
     if workspace_path is None:
         raise ValueError("workspace_path is required")
 
@@ -249,7 +263,7 @@ def collect_files_from_disk(
 
         ignore_engine = DomainRegistry.ignore_engine()
 
-    spec = _get_ignore_spec(root_path, ignore_engine)
+    matcher = _get_ignore_matcher(root_path, ignore_engine, folder.resolve())
     root_path_str = str(root_path)
     if not root_path_str.endswith(os.path.sep):
         root_path_str += os.path.sep
@@ -258,9 +272,7 @@ def collect_files_from_disk(
     seen: Set[str] = set()
 
     # Use scandir_rs if available
-    walk_func = (
-        getattr(scandir_rs, "Walk", None) if (HAS_SCANDIR_RS and scandir_rs) else None
-    )
+    walk_func = _scandir_walk_func()
     if walk_func:
         try:
             entries = walk_func(
@@ -290,7 +302,7 @@ def collect_files_from_disk(
                 else:
                     rel_path = os.path.basename(full_path)
 
-                if spec.match_file(rel_path):
+                if matcher.is_ignored(rel_path):
                     continue
 
                 if full_path not in seen:
@@ -305,8 +317,18 @@ def collect_files_from_disk(
         _sep = os.path.sep
         _skip_with_sep = {_sep + s + _sep for s in DIRECTORY_QUICK_SKIP}
 
+        dir_matchers: Dict[str, "IIgnoreMatcher"] = {}
         for dirpath, dirnames, filenames in os.walk(str(folder)):
-            dirnames[:] = [d for d in dirnames if d not in DIRECTORY_QUICK_SKIP]
+            dir_matcher = dir_matchers.pop(dirpath, matcher)
+            _prune_walk_dirs(
+                dirpath,
+                dirnames,
+                root_path_str,
+                dir_matcher,
+                dir_matchers,
+                ignore_engine,
+                DIRECTORY_QUICK_SKIP,
+            )
             for filename in filenames:
                 full_path = os.path.join(dirpath, filename)
 
@@ -320,11 +342,11 @@ def collect_files_from_disk(
                 if any(s in check_path for s in _skip_with_sep):
                     continue
 
-                # Skip system and binary files using strings
-                if is_system_path_str(full_path) or is_binary_file(full_path):
+                if dir_matcher.is_ignored(rel_path):
                     continue
 
-                if spec.match_file(rel_path):
+                # Skip system and binary files using strings
+                if is_system_path_str(full_path) or is_binary_file(full_path):
                     continue
 
                 if full_path not in seen:
@@ -338,10 +360,16 @@ def collect_files_from_disk(
 
 class WorkspaceScanner(IWorkspaceScanner):
     """
-    Adapter class for IWorkspaceScanner using collect_files_from_disk.
+    Adapter IWorkspaceScanner: doc tu workspace catalog neu duoc inject,
+    nguoc lai scan disk qua collect_files_from_disk.
     """
 
+    def __init__(self, catalog: Optional["IWorkspaceCatalogService"] = None) -> None:
+        self._catalog = catalog
+
     def collect_files(self, folder: Path) -> List[str]:
+        if self._catalog is not None:
+            return self._catalog.get_catalog(folder).files()
         return collect_files_from_disk(folder, workspace_path=folder)
 
 
@@ -380,7 +408,11 @@ def get_related_files_for_paths(
     from domain.codemap.dependency_resolver import DependencyResolver
 
     resolver = DependencyResolver(workspace_path)
-    resolver.build_file_index(tree)
+    if tree is None:
+        # Khong co TreeItem -> index tu workspace catalog (qua workspace_scanner)
+        resolver.build_file_index_from_disk(workspace_path)
+    else:
+        resolver.build_file_index(tree)
 
     related_strs: Set[str] = set()
     for file_path_str in paths:
@@ -40,6 +40,9 @@ class AppSettings:
     excluded_folders: str = field(default=_DEFAULT_EXCLUDED_FOLDERS)
     # Co respect .gitignore hay khong
     use_gitignore: bool = True
+    # Voi git repository: liet ke files tu `git ls-files` thay vi walk
+    # (chi co hieu luc khi use_gitignore bat)
+    use_git_index: bool = False
 
     # --- AI Context Settings ---
     # Model ID dang su dung (vd: "gpt-5.1")
@@ -87,6 +90,9 @@ class AppSettings:
     copy_mode: str = "full"
     tree_map_only: bool = False
     git_commit_depth: int = 0
+    # Build truoc prompt cho copy mode dang chon khi selection/instructions
+    # doi (tu tam dung khi may dang chay pin)
+    speculative_prebuild: bool = True
 
     # --- Rule Settings ---
     # Danh sach cac ten file project rules de tu dong boc tach (VD: .cursorrules)
@@ -157,6 +163,7 @@ class AppSettings:
         return {
             "excluded_folders": self.excluded_folders,
             "use_gitignore": self.use_gitignore,
+            "use_git_index": self.use_git_index,
             "model_id": self.model_id,
             "output_format": self.output_format,
             "include_git_changes": self.include_git_changes,
@@ -175,6 +182,7 @@ class AppSettings:
             "copy_mode": self.copy_mode,
             "tree_map_only": self.tree_map_only,
             "git_commit_depth": self.git_commit_depth,
+            "speculative_prebuild": self.speculative_prebuild,
         }
 
     def to_safe_dict(self) -> dict[str, Any]:
@@ -10,3 +10,5 @@ class ICacheRegistry(Protocol):
     def invalidate_for_workspace(self) -> None: ...
 
     def invalidate_for_path(self, path: str) -> None: ...
+
+    def invalidate_for_created_path(self, path: str) -> None: ...
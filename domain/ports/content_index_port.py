@@ -0,0 +1,65 @@
+"""
+Interface cho Content Index - tim kiem noi dung file (`code:` search).
+
+Thay vi mo va lowercase moi file cho moi lan search, index trigram cua noi
+dung duoc build 1 lan trong background, cap nhat tang dan theo workspace
+catalog va luu xuong dia de dung lai sau khi khoi dong lai app.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+class IContentIndexStore(ABC):
+    """Doc/ghi du lieu index (dict da serialize) theo workspace."""
+
+    @abstractmethod
+    def load(self, workspace_root: Path) -> Optional[Dict[str, Any]]:
+        """Tra ve du lieu da luu, None neu chua co hoac hong."""
+        ...
+
+    @abstractmethod
+    def save(self, workspace_root: Path, data: Dict[str, Any]) -> bool:
+        """Ghi du lieu (atomic). Tra ve True neu thanh cong."""
+        ...
+
+
+class IContentIndexService(ABC):
+    """
+    Quan ly content index theo workspace.
+
+    Thread-safe: search co the chay song song voi warm/sync tu thread khac.
+    """
+
+    @abstractmethod
+    def warm(self, workspace_root: Path) -> None:
+        """Load index da luu (neu co) va dong bo voi catalog. Blocking."""
+        ...
+
+    @abstractmethod
+    def search(
+        self,
+        workspace_root: Path,
+        query: str,
+        on_match: Optional[Callable[[str], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> List[str]:
+        """
+        Tim files co noi dung chua `query` (case-insensitive).
+
+        Args:
+            workspace_root: Workspace can search
+            query: Chuoi can tim (khong kem prefix "code:")
+            on_match: Goi ngay khi 1 file duoc xac nhan match (streaming)
+            is_cancelled: Tra ve True de dung som (query moi thay the)
+
+        Returns:
+            Absolute paths da match (sorted)
+        """
+        ...
+
+    @abstractmethod
+    def invalidate(self, workspace_root: Optional[Path] = None) -> None:
+        """Bo index trong memory (cua 1 workspace hoac tat ca)."""
+        ...
@@ -16,8 +16,17 @@ class IDirectoryScanner(abc.ABC):
         root_path: Path,
         excluded_patterns: Optional[List[str]] = None,
         use_gitignore: bool = True,
+        *,
+        use_snapshot: bool = False,
+        defer_binary_check: bool = False,
     ) -> TreeItem:
-        """Scan a directory recursively and build its TreeItem structure, respecting ignore rules."""  # pragma: no cover
+        """Scan a directory recursively and build its TreeItem structure, respecting ignore rules.
+
+        Chi tree hien thi bat 2 option sau:
+        - use_snapshot: dung lai va luu snapshot cho load_snapshot
+        - defer_binary_check: chi loc binary theo extension, file chua phan
+          loai duoc giu lai (classify khi chon)
+        """  # pragma: no cover
         pass  # pragma: no cover
 
     @abc.abstractmethod
@@ -42,3 +51,14 @@ class IDirectoryScanner(abc.ABC):
     ) -> None:
         """Load children for a folder node on-demand, respecting ignore rules."""  # pragma: no cover
         pass  # pragma: no cover
+
+    def load_snapshot(
+        self,
+        root_path: Path,
+        excluded_patterns: Optional[List[str]] = None,
+        use_gitignore: bool = True,
+        *,
+        defer_binary_check: bool = False,
+    ) -> Optional[TreeItem]:
+        """Tree luu tu lan scan_directory(use_snapshot=True) truoc (khong doc workspace); None neu khong co."""
+        return None
@@ -2,6 +2,7 @@
 Interfaces cho File Watcher Service.
 
 Dinh nghia contracts cho:
+- FileChangeEvent / TreeDelta: Su kien tho va thay doi cau truc tree da gom
 - IFileWatcherService: Start/stop theo doi file system
 - IIgnoreStrategy: Xac dinh path nao can bo qua
 - IEventDebouncer: Gom nhom events va dispatch sau debounce
@@ -9,7 +10,7 @@ Dinh nghia contracts cho:
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 
 from dataclasses import dataclass
 
@@ -23,11 +24,31 @@ class FileChangeEvent:
         event_type: Loai su kien ('created', 'deleted', 'modified', 'moved')
         path: Duong dan tuyet doi cua file/folder bi thay doi
         is_directory: True neu la thu muc
+        dest_path: Duong dan moi (chi co voi 'moved')
     """
 
     event_type: str
     path: str
     is_directory: bool
+    dest_path: Optional[str] = None
+
+
+@dataclass
+class TreeDelta:
+    """
+    Thay doi cau truc tree suy ra tu 1 batch events da debounce.
+
+    Attributes:
+        kind: 'insert', 'remove' hoac 'rename'
+        path: Path duoc them/xoa (path cu neu la rename)
+        is_directory: True neu la thu muc
+        new_path: Path moi (chi co voi 'rename')
+    """
+
+    kind: str
+    path: str
+    is_directory: bool
+    new_path: Optional[str] = None
 
 
 @dataclass
@@ -43,12 +64,16 @@ class WatcherCallbacks:
         on_file_created: Callback khi file moi duoc tao
         on_file_deleted: Callback khi file bi xoa
         on_batch_change: Fallback callback khi co nhieu thay doi
+        on_tree_deltas: Neu set, batch binh thuong duoc gui duoi dang
+            TreeDelta de patch tree; on_batch_change chi con dung khi
+            batch qua lon (overflow) -> full refresh
     """
 
     on_file_modified: Optional[Callable[[str], None]] = None
     on_file_created: Optional[Callable[[str], None]] = None
     on_file_deleted: Optional[Callable[[str], None]] = None
     on_batch_change: Optional[Callable[[], None]] = None
+    on_tree_deltas: Optional[Callable[[List[TreeDelta]], None]] = None
 
 
 class IIgnoreStrategy(ABC):
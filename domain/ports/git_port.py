@@ -1,6 +1,7 @@
 import abc
 from pathlib import Path
 from typing import Optional, List
+from domain.ports.ignore_engine_port import IIgnoreMatcher
 from shared.types.git_types import GitDiffResult, GitLogResult, DiffOnlyResult
 
 
@@ -56,3 +57,12 @@ class IGitService(abc.ABC):
     ) -> str:
         """Build prompt from diff result for Copy Diff Only."""  # pragma: no cover
         pass  # pragma: no cover
+
+    @abc.abstractmethod
+    def list_workspace_files(
+        self, root_path: Path, matcher: Optional[IIgnoreMatcher] = None
+    ) -> Optional[List[str]]:
+        """
+        Liet ke files (relative posix) tu git index, None neu khong phai git repo.
+        """  # pragma: no cover
+        pass  # pragma: no cover
@@ -1,8 +1,17 @@
-from typing import Protocol, Optional, List, runtime_checkable
+from typing import Protocol, Optional, List, Sequence, runtime_checkable
 from pathlib import Path
 import pathspec
 
 
+@runtime_checkable
+class IIgnoreMatcher(Protocol):
+    """Bo luat ignore da compile, match bang relative path string tu workspace root."""
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool: ...
+
+    def descend(self, rel_dir: str, patterns: Sequence[str]) -> "IIgnoreMatcher": ...
+
+
 @runtime_checkable
 class IIgnoreEngine(Protocol):
     def build_pathspec(
@@ -13,6 +22,29 @@ class IIgnoreEngine(Protocol):
         use_gitignore: bool = True,
     ) -> pathspec.PathSpec: ...
 
+    def compile_matcher(
+        self,
+        root_path: Path,
+        *,
+        use_default_ignores: bool = True,
+        excluded_patterns: Optional[List[str]] = None,
+        use_gitignore: bool = True,
+    ) -> IIgnoreMatcher: ...
+
+    def descend_matcher(
+        self, matcher: IIgnoreMatcher, directory: Path, rel_dir: str
+    ) -> IIgnoreMatcher: ...
+
+    def matcher_for_directory(
+        self,
+        root_path: Path,
+        directory: Path,
+        *,
+        use_default_ignores: bool = True,
+        excluded_patterns: Optional[List[str]] = None,
+        use_gitignore: bool = True,
+    ) -> IIgnoreMatcher: ...
+
     def read_gitignore(self, path: Path) -> List[str]: ...
 
     def find_git_root(self, path: Path) -> Optional[Path]: ...
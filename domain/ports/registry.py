@@ -1,6 +1,9 @@
 from typing import Callable, Optional
-from domain.ports.tokenization_port import ITokenizationService
+from domain.ports.tokenization_port import ITokenEstimator, ITokenizationService
 from domain.ports.workspace_scanner import IWorkspaceScanner
+from domain.ports.workspace_catalog_port import IWorkspaceCatalogService
+from domain.ports.content_index_port import IContentIndexService
+from domain.ports.symbol_index_port import ISymbolIndexService
 from domain.ports.directory_scanner import IDirectoryScanner
 from domain.ports.git_port import IGitService
 from domain.ports.ast_parser_port import IAstParser
@@ -33,7 +36,11 @@ class DomainRegistry:
     """
 
     _tokenization_service: Optional[ITokenizationService] = None
+    _token_estimator: Optional[ITokenEstimator] = None
     _workspace_scanner: Optional[IWorkspaceScanner] = None
+    _workspace_catalog: Optional[IWorkspaceCatalogService] = None
+    _content_index: Optional[IContentIndexService] = None
+    _symbol_index: Optional[ISymbolIndexService] = None
     _directory_scanner: Optional[IDirectoryScanner] = None
     _git_service: Optional[IGitService] = None
     _ast_parser: Optional[IAstParser] = None
@@ -68,6 +75,16 @@ class DomainRegistry:
             )
         return cls._tokenization_service
 
+    @classmethod
+    def register_token_estimator(cls, estimator: ITokenEstimator) -> None:
+        cls._token_estimator = estimator
+
+    @classmethod
+    def token_estimator(cls) -> ITokenEstimator:
+        if cls._token_estimator is None:
+            raise RuntimeError("ITokenEstimator is not registered in DomainRegistry")
+        return cls._token_estimator
+
     @classmethod
     def register_workspace_scanner(cls, scanner: IWorkspaceScanner) -> None:
         cls._workspace_scanner = scanner
@@ -78,6 +95,42 @@ class DomainRegistry:
             raise RuntimeError("IWorkspaceScanner is not registered in DomainRegistry")
         return cls._workspace_scanner
 
+    @classmethod
+    def register_workspace_catalog(cls, service: IWorkspaceCatalogService) -> None:
+        cls._workspace_catalog = service
+
+    @classmethod
+    def workspace_catalog(cls) -> IWorkspaceCatalogService:
+        if cls._workspace_catalog is None:
+            raise RuntimeError(
+                "IWorkspaceCatalogService is not registered in DomainRegistry"
+            )
+        return cls._workspace_catalog
+
+    @classmethod
+    def register_content_index(cls, service: IContentIndexService) -> None:
+        cls._content_index = service
+
+    @classmethod
+    def content_index(cls) -> IContentIndexService:
+        if cls._content_index is None:
+            raise RuntimeError(
+                "IContentIndexService is not registered in DomainRegistry"
+            )
+        return cls._content_index
+
+    @classmethod
+    def register_symbol_index(cls, service: ISymbolIndexService) -> None:
+        cls._symbol_index = service
+
+    @classmethod
+    def symbol_index(cls) -> ISymbolIndexService:
+        if cls._symbol_index is None:
+            raise RuntimeError(
+                "ISymbolIndexService is not registered in DomainRegistry"
+            )
+        return cls._symbol_index
+
     @classmethod
     def register_directory_scanner(cls, scanner: IDirectoryScanner) -> None:
         cls._directory_scanner = scanner
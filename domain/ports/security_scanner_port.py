@@ -1,5 +1,8 @@
 from dataclasses import dataclass
-from typing import Optional, List, Set, Protocol, runtime_checkable
+from typing import Optional, List, Set, Protocol, runtime_checkable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from domain.prompt.content_snapshot import ContentSnapshot
 
 
 @dataclass
@@ -13,7 +16,10 @@ class SecretMatch:
 @runtime_checkable
 class ISecurityScanner(Protocol):
     def scan_secrets_in_files_cached(
-        self, file_paths: Set[str], max_file_size: int = 1024 * 1024
+        self,
+        file_paths: Set[str],
+        max_file_size: int = 1024 * 1024,
+        snapshot: Optional["ContentSnapshot"] = None,
     ) -> List[SecretMatch]: ...
 
     def format_security_warning(self, matches: List[SecretMatch]) -> str: ...
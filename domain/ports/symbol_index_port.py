@@ -0,0 +1,69 @@
+"""
+Interface cho Symbol Index - tim symbol definitions (`sym:` search).
+
+Symbols (class, function, method, ...) cua moi file duoc trich xuat bang
+tree-sitter 1 lan trong background, cap nhat tang dan theo workspace catalog
+khi file watcher bao thay doi, va tra cuu theo ten (prefix + fuzzy).
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+
+@dataclass(frozen=True)
+class SymbolLocation:
+    """
+    1 symbol definition trong workspace.
+
+    Attributes:
+        name: Ten symbol (giu nguyen hoa thuong)
+        kind: SymbolKind.value ("class", "function", ...)
+        rel_path: Path tuong doi tu workspace root (posix separator)
+        abs_path: Path tuyet doi (separator native)
+        line: Dong bat dau (1-based)
+    """
+
+    name: str
+    kind: str
+    rel_path: str
+    abs_path: str
+    line: int
+
+
+class ISymbolIndexService(ABC):
+    """
+    Quan ly symbol index theo workspace.
+
+    Thread-safe: search co the chay song song voi warm/refresh tu thread khac.
+    """
+
+    @abstractmethod
+    def warm(self, workspace_root: Path) -> None:
+        """Trich xuat symbols cho files moi/da sua cua workspace. Blocking."""
+        ...
+
+    @abstractmethod
+    def search(
+        self, workspace_root: Path, query: str, limit: Optional[int] = None
+    ) -> List[SymbolLocation]:
+        """
+        Tim symbols theo ten (case-insensitive): khop chinh xac, prefix, roi fuzzy.
+
+        Args:
+            workspace_root: Workspace can search
+            query: Ten can tim (khong kem prefix "sym:")
+            limit: So symbols toi da (None = tat ca)
+        """
+        ...
+
+    @abstractmethod
+    def refresh_path(self, path: str) -> None:
+        """Danh dau path (file hoac folder) vua thay doi de dong bo lai lan sau."""
+        ...
+
+    @abstractmethod
+    def invalidate(self, workspace_root: Optional[Path] = None) -> None:
+        """Bo index trong memory (cua 1 workspace hoac tat ca)."""
+        ...
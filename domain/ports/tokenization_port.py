@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional
 
 
 class ITokenizationService(ABC):
@@ -68,6 +69,30 @@ class ITokenizationService(ABC):
         """
         ...
 
+    def count_tokens_for_large_file(
+        self,
+        file_path: Path,
+        progress: Optional[Callable[[int, int], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+        update_cache: bool = True,
+    ) -> Optional[int]:
+        """
+        Dem token cho file lon bang streaming theo chunk.
+
+        Mac dinh dem ca file qua count_tokens_for_file (khong streaming,
+        khong bao tien do).
+
+        Args:
+            file_path: File can dem
+            progress: Goi progress(bytes_done, total_bytes) sau moi chunk
+            is_cancelled: Tra ve True de dung giua chung
+            update_cache: Ghi ket qua vao cache
+
+        Returns:
+            So token, None neu bi huy hoac khong doc duoc
+        """
+        return self.count_tokens_for_file(file_path)
+
     @abstractmethod
     def set_model_config(self, tokenizer_repo: Optional[str] = None) -> None:
         """
@@ -106,3 +131,153 @@ class ITokenizationService(ABC):
             path: Duong dan file can xoa khoi cache
         """
         ...
+
+    def model_generation(self) -> int:
+        """
+        So tang moi khi model/encoder doi.
+
+        Cache token count theo text (vd. TokenLedger) so sanh gia tri nay de
+        biet khi nao phai xoa. Mac dinh 0 (encoder khong bao gio doi).
+        """
+        return 0
+
+    def fit_cache_to_workspace(self, file_count: int) -> None:
+        """
+        Co gian token cache theo so file cua workspace vua load.
+
+        Mac dinh khong lam gi (implementation khong co cache co gian).
+        """
+
+    def content_digest(self, file_path: Path) -> Optional[bytes]:
+        """
+        Content hash cua file ghi lai luc dem token (neu file chua doi).
+
+        Cho phep buoc sau (dedup prompt, cache) dung lai hash ma khong doc
+        lai file. Mac dinh None (implementation khong ghi hash).
+        """
+        return None
+
+
+class ITokenCountStore(ABC):
+    """
+    Kho luu token count ben vung (song sot qua restart, doi branch, doi encoder).
+
+    2 tang:
+    - Content: (content hash, encoder id) -> count. File giong nhau giua cac
+      branch/worktree chi dem 1 lan.
+    - Path: path -> (mtime_ns, size, content hash). Tra ve count ngay khi
+      file khong doi ma khong can doc lai noi dung.
+
+    Thread-safe. Ghi co the duoc buffer, flush() day xuong dia.
+    """
+
+    @abstractmethod
+    def get_by_path(
+        self, path: str, mtime_ns: int, size: int, encoder_id: str
+    ) -> Optional[int]:
+        """Count cua file neu (mtime_ns, size) khop lan ghi truoc, None neu miss."""
+        ...
+
+    @abstractmethod
+    def get_by_hash(self, content_hash: bytes, encoder_id: str) -> Optional[int]:
+        """Count da biet cho noi dung co hash nay, None neu miss."""
+        ...
+
+    @abstractmethod
+    def put(
+        self,
+        content_hash: bytes,
+        encoder_id: str,
+        count: int,
+        path: Optional[str] = None,
+        mtime_ns: int = 0,
+        size: int = 0,
+    ) -> None:
+        """
+        Ghi count cho noi dung va (tuy chon) gan path -> hash.
+
+        Args:
+            content_hash: Hash noi dung da dem
+            encoder_id: Dinh danh encoder/tokenizer (doi encoder = key khac)
+            count: So token
+            path: Path file chua noi dung (None = chi ghi tang content)
+            mtime_ns: mtime cua file luc doc
+            size: Kich thuoc file luc doc
+        """
+        ...
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Ghi cac entry dang buffer xuong dia."""
+        ...
+
+
+@dataclass(frozen=True)
+class TokenEstimate:
+    """
+    Uoc luong token kem khoang tin cay.
+
+    Attributes:
+        tokens: Gia tri uoc luong
+        low: Can duoi (khoang tin cay ~90%)
+        high: Can tren
+    """
+
+    tokens: int = 0
+    low: int = 0
+    high: int = 0
+
+    def __add__(self, other: "TokenEstimate") -> "TokenEstimate":
+        return TokenEstimate(
+            self.tokens + other.tokens, self.low + other.low, self.high + other.high
+        )
+
+
+class ITokenEstimator(ABC):
+    """
+    Uoc luong token tu kich thuoc file (bytes), khong can doc noi dung.
+
+    Ty le tokens/byte duoc hieu chinh online theo (encoder, ngon ngu) tu cac
+    lan dem chinh xac. Thread-safe.
+    """
+
+    @abstractmethod
+    def set_active_encoder(self, encoder_id: str) -> None:
+        """Encoder dang dung - cac lan estimate sau dung ty le cua encoder nay."""
+        ...
+
+    @abstractmethod
+    def observe(self, name: str, size: int, tokens: int) -> None:
+        """
+        Ghi nhan 1 lan dem chinh xac cho encoder dang dung.
+
+        Args:
+            name: Ten/path file (suy ra ngon ngu)
+            size: Kich thuoc file (bytes)
+            tokens: So token dem chinh xac
+        """
+        ...
+
+    @abstractmethod
+    def estimate_sizes(self, sizes_by_key: Mapping[str, int]) -> TokenEstimate:
+        """Uoc luong tu tong bytes theo language key (xem group_sizes)."""
+        ...
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Luu trang thai hieu chinh (neu co thay doi)."""
+        ...
+
+
+class ITokenEstimatorStore(ABC):
+    """Doc/ghi trang thai hieu chinh cua token estimator."""
+
+    @abstractmethod
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Tra ve du lieu da luu, None neu chua co hoac hong."""
+        ...
+
+    @abstractmethod
+    def save(self, data: Dict[str, Any]) -> bool:
+        """Ghi du lieu (atomic). Tra ve True neu thanh cong."""
+        ...
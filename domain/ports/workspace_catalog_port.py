@@ -0,0 +1,119 @@
+"""
+Interface cho Workspace Catalog - danh sach files cua workspace dung chung.
+
+Thay vi moi consumer (search index, related files, AI pick, ...) tu os.walk
+va tu danh gia ignore rules, catalog duoc build 1 lan cho moi workspace va
+duoc file watcher cap nhat tai cho.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """
+    Thong tin 1 file trong catalog.
+
+    Attributes:
+        rel_path: Path tuong doi tu workspace root (posix separator)
+        abs_path: Path tuyet doi (separator native)
+        size: Kich thuoc bytes
+        mtime_ns: Thoi diem sua cuoi (nanoseconds)
+        extension: Extension lowercase kem dau cham ('' neu khong co)
+        is_binary: True neu la binary file
+    """
+
+    rel_path: str
+    abs_path: str
+    size: int
+    mtime_ns: int
+    extension: str
+    is_binary: bool
+
+    @property
+    def language(self) -> str:
+        """
+        Ngon ngu (ten code fence) suy ra tu filename.
+
+        Tinh khi can thay vi luc walk: phan lon consumers khong dung toi,
+        ma moi lan tinh phai so khop ~70 compound extensions.
+        """
+        from shared.utils.language_utils import get_language_from_filename
+
+        return get_language_from_filename(self.rel_path.rsplit("/", 1)[-1])
+
+
+class IWorkspaceCatalog(ABC):
+    """Snapshot files (khong bi ignore) cua 1 workspace."""
+
+    @property
+    @abstractmethod
+    def root(self) -> Path:
+        """Workspace root (da resolve)."""
+        ...
+
+    @abstractmethod
+    def get(self, rel_path: str) -> Optional[CatalogEntry]:
+        """Lay entry theo path tuong doi (O(1)), None neu khong co."""
+        ...
+
+    @abstractmethod
+    def entries(self) -> Iterator[CatalogEntry]:
+        """Duyet tat ca entries (snapshot, thu tu khong xac dinh)."""
+        ...
+
+    @abstractmethod
+    def files(
+        self, folder: Optional[Path] = None, include_binary: bool = False
+    ) -> List[str]:
+        """
+        Tra ve absolute paths cua files (trong `folder` neu co).
+
+        Args:
+            folder: Chi lay files ben trong folder nay
+            include_binary: True de giu ca binary files
+        """
+        ...
+
+    @abstractmethod
+    def search_index(self) -> Dict[str, List[str]]:
+        """Flat index: filename lowercase -> absolute paths (bo binary)."""
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+
+class IWorkspaceCatalogService(ABC):
+    """
+    Quan ly catalog theo workspace.
+
+    Thread-safe: nhieu consumer goi dong thoi chi trigger 1 lan walk.
+    """
+
+    @abstractmethod
+    def get_catalog(self, workspace_root: Path) -> IWorkspaceCatalog:
+        """Tra ve catalog cua workspace, build (blocking) neu chua co."""
+        ...
+
+    @abstractmethod
+    def peek_catalog(self, workspace_root: Path) -> Optional[IWorkspaceCatalog]:
+        """Tra ve catalog neu da build xong, KHONG block."""
+        ...
+
+    @abstractmethod
+    def refresh_path(self, path: str) -> None:
+        """
+        Cap nhat catalog cho 1 path vua thay doi (file hoac folder).
+
+        Path khong con ton tai hoac bi ignore -> xoa khoi catalog.
+        """
+        ...
+
+    @abstractmethod
+    def invalidate(self, workspace_root: Optional[Path] = None) -> None:
+        """Bo catalog (cua 1 workspace hoac tat ca) de build lai lan sau."""
+        ...
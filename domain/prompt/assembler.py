@@ -12,12 +12,16 @@ Tat ca format deu bao gom:
 - Agent Role / System Instruction
 - File Summary (Purpose, Guidelines, Notes)
 - Git Diff / Git Log instructions (neu co)
+
+iter_prompt() / iter_smart_prompt() yield prompt theo tung fragment de ghi
+thang ra sink (file, clipboard) ma khong ghep thanh 1 chuoi lon;
+assemble_*() la "".join() cua cac ham nay.
 """
 
 import logging
 import re
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Union
 
 from shared.types.git_types import GitDiffResult, GitLogResult
 
@@ -43,6 +47,9 @@ from domain.prompt.formatters.system_prompts import (
 
 logger = logging.getLogger(__name__)
 
+# Noi dung section lon (file contents, smart contents): 1 chuoi hoac cac fragment
+PromptText = Union[str, Iterable[str]]
+
 
 def _has_git_content(
     git_diffs: Optional[GitDiffResult],
@@ -70,6 +77,42 @@ def assemble_prompt(
     """
     Lắp ráp prompt hoàn chỉnh từ các sections.
     """
+    return "".join(
+        iter_prompt(
+            file_map,
+            file_contents,
+            user_instructions,
+            include_xml_formatting,
+            git_diffs,
+            git_logs,
+            output_style,
+            project_rules,
+            instructions_at_top,
+            workspace_root,
+            semantic_index,
+        )
+    )
+
+
+def iter_prompt(
+    file_map: str,
+    file_contents: PromptText,
+    user_instructions: str = "",
+    include_xml_formatting: bool = False,
+    git_diffs: Optional[GitDiffResult] = None,
+    git_logs: Optional[GitLogResult] = None,
+    output_style: OutputStyle = OutputStyle.XML,
+    project_rules: str = "",
+    instructions_at_top: bool = False,
+    workspace_root: Optional[Path] = None,
+    semantic_index: str = "",
+) -> Iterator[str]:
+    """
+    Nhu assemble_prompt() nhung yield tung fragment theo thu tu.
+
+    file_contents co the la 1 iterable fragment (vd. tung file block) de
+    khong phai ghep file contents thanh 1 chuoi truoc.
+    """
 
     # Khong con tu dong cat '## Output format' / '## REPORT STRUCTURE' nua —
     # viec cat chuoi cung de gay xoa nham noi dung nguoi dung tu viet.
@@ -83,21 +126,8 @@ def assemble_prompt(
             "it is kept as-is (no longer auto-stripped)."
         )
 
-    if output_style == OutputStyle.XML:
-        return _assemble_xml(
-            file_map=file_map,
-            file_contents=file_contents,
-            user_instructions=user_instructions,
-            include_xml_formatting=include_xml_formatting,
-            git_diffs=git_diffs,
-            git_logs=git_logs,
-            project_rules=project_rules,
-            instructions_at_top=instructions_at_top,
-            workspace_root=workspace_root,
-            semantic_index=semantic_index,
-        )
-    elif output_style == OutputStyle.PLAIN:
-        return _assemble_plain(
+    if output_style == OutputStyle.PLAIN:
+        return _iter_plain(
             file_map,
             file_contents,
             user_instructions,
@@ -108,20 +138,19 @@ def assemble_prompt(
             instructions_at_top,
             semantic_index=semantic_index,
         )
-    else:
-        # Fallback to XML for unknown formats
-        return _assemble_xml(
-            file_map=file_map,
-            file_contents=file_contents,
-            user_instructions=user_instructions,
-            include_xml_formatting=include_xml_formatting,
-            git_diffs=git_diffs,
-            git_logs=git_logs,
-            project_rules=project_rules,
-            instructions_at_top=instructions_at_top,
-            workspace_root=workspace_root,
-            semantic_index=semantic_index,
-        )
+    # XML (va fallback cho format khong biet)
+    return _iter_xml(
+        file_map=file_map,
+        file_contents=file_contents,
+        user_instructions=user_instructions,
+        include_xml_formatting=include_xml_formatting,
+        git_diffs=git_diffs,
+        git_logs=git_logs,
+        project_rules=project_rules,
+        instructions_at_top=instructions_at_top,
+        workspace_root=workspace_root,
+        semantic_index=semantic_index,
+    )
 
 
 def assemble_smart_prompt(
@@ -138,8 +167,35 @@ def assemble_smart_prompt(
     """
     Lắp ráp prompt cho Copy Smart (hỗ trợ cả XML và Plaintext).
     """
+    return "".join(
+        iter_smart_prompt(
+            smart_contents,
+            file_map,
+            user_instructions,
+            git_diffs,
+            git_logs,
+            project_rules,
+            instructions_at_top,
+            semantic_index,
+            output_style,
+        )
+    )
+
+
+def iter_smart_prompt(
+    smart_contents: PromptText,
+    file_map: str,
+    user_instructions: str = "",
+    git_diffs: Optional[GitDiffResult] = None,
+    git_logs: Optional[GitLogResult] = None,
+    project_rules: str = "",
+    instructions_at_top: bool = False,
+    semantic_index: str = "",
+    output_style: OutputStyle = OutputStyle.XML,
+) -> Iterator[str]:
+    """Nhu assemble_smart_prompt() nhung yield tung fragment theo thu tu."""
     if output_style == OutputStyle.PLAIN:
-        return _assemble_smart_plain(
+        return _iter_smart_plain(
             smart_contents=smart_contents,
             file_map=file_map,
             user_instructions=user_instructions,
@@ -149,46 +205,65 @@ def assemble_smart_prompt(
             instructions_at_top=instructions_at_top,
             semantic_index=semantic_index,
         )
+    return _strip_fragments(
+        _iter_smart_xml(
+            smart_contents,
+            file_map,
+            user_instructions,
+            git_diffs,
+            git_logs,
+            project_rules,
+            instructions_at_top,
+            semantic_index,
+        )
+    )
 
+
+def _iter_smart_xml(
+    smart_contents: PromptText,
+    file_map: str,
+    user_instructions: str,
+    git_diffs: Optional[GitDiffResult],
+    git_logs: Optional[GitLogResult],
+    project_rules: str,
+    instructions_at_top: bool,
+    semantic_index: str,
+) -> Iterator[str]:
+    """Prompt Copy Smart dang XML (chua strip)."""
     legend = build_context_legend(
         is_smart=True, has_git=_has_git_content(git_diffs, git_logs)
     )
     file_summary = generate_smart_summary_xml(context_legend=legend)
 
-    prompt = ""
     # Nếu instructions_at_top=True
     if instructions_at_top:
+        has_top = False
         if user_instructions and user_instructions.strip():
-            prompt += f"<user_instructions>\n{user_instructions.strip()}\n</user_instructions>\n"
+            yield f"<user_instructions>\n{user_instructions.strip()}\n</user_instructions>\n"
+            has_top = True
         if project_rules and project_rules.strip():
-            prompt += f"<project_rules>\n{project_rules.strip()}\n</project_rules>\n"
+            yield f"<project_rules>\n{project_rules.strip()}\n</project_rules>\n"
+            has_top = True
         if semantic_index and semantic_index.strip():
-            prompt += f"{semantic_index.strip()}\n"
-        if prompt:
-            prompt += "\n"
-
-    prompt += f"""{file_summary}
-
-<structure>
-{file_map}
-</structure>
-
-<smart_context>
-{smart_contents}
-</smart_context>
-"""
+            yield f"{semantic_index.strip()}\n"
+            has_top = True
+        if has_top:
+            yield "\n"
+
+    yield f"{file_summary}\n\n<structure>\n{file_map}\n</structure>\n\n<smart_context>\n"
+    yield from _iter_text(smart_contents)
+    yield "\n</smart_context>\n"
     # Git changes section
-    prompt = _append_git_changes_xml(prompt, git_diffs, git_logs)
+    yield from _iter_git_changes_xml(git_diffs, git_logs)
 
     if not instructions_at_top and project_rules and project_rules.strip():
-        prompt += f"\n<project_rules>\n{project_rules.strip()}\n</project_rules>\n"
+        yield f"\n<project_rules>\n{project_rules.strip()}\n</project_rules>\n"
 
     if not instructions_at_top and semantic_index and semantic_index.strip():
-        prompt += f"\n{semantic_index.strip()}\n"
+        yield f"\n{semantic_index.strip()}\n"
 
     if not instructions_at_top and user_instructions and user_instructions.strip():
-        prompt += f"\n<user_instructions>\n{user_instructions.strip()}\n</user_instructions>\n"
-    return prompt.strip()
+        yield f"\n<user_instructions>\n{user_instructions.strip()}\n</user_instructions>\n"
 
 
 def _assemble_smart_plain(
@@ -202,7 +277,32 @@ def _assemble_smart_plain(
     semantic_index: str = "",
 ) -> str:
     """Lắp ráp prompt Copy Smart theo Plain Text format."""
-    prompt_parts: list[str] = []
+    return "".join(
+        _iter_smart_plain(
+            smart_contents,
+            file_map,
+            user_instructions,
+            git_diffs,
+            git_logs,
+            project_rules,
+            instructions_at_top,
+            semantic_index,
+        )
+    )
+
+
+def _iter_smart_plain(
+    smart_contents: PromptText,
+    file_map: str,
+    user_instructions: str = "",
+    git_diffs: Optional[GitDiffResult] = None,
+    git_logs: Optional[GitLogResult] = None,
+    project_rules: str = "",
+    instructions_at_top: bool = False,
+    semantic_index: str = "",
+) -> Iterator[str]:
+    """Prompt Copy Smart dang Plain Text, tung fragment."""
+    prompt_parts: list[_Section] = []
 
     # Context legend (khong ap role) thay cho agent role cu
     legend = build_context_legend(
@@ -241,7 +341,7 @@ def _assemble_smart_plain(
 
     # Compressed Contents
     prompt_parts.append(
-        f"{'=' * 48}\nCOMPRESSED FILE CONTEXT\n{'=' * 48}\n{smart_contents}"
+        (f"{'=' * 48}\nCOMPRESSED FILE CONTEXT\n{'=' * 48}\n", smart_contents)
     )
 
     # Git changes
@@ -262,11 +362,57 @@ def _assemble_smart_plain(
                 f"{'=' * 48}\nUSER INSTRUCTIONS\n{'=' * 48}\n{user_instructions.strip()}"
             )
 
-    return "\n\n".join(prompt_parts)
+    return _join_sections(prompt_parts)
 
 
 # === Private helpers ===
 
+# 1 section cua prompt plain: chuoi, hoac (header, noi dung lon)
+_Section = Union[str, tuple[str, PromptText]]
+
+
+def _iter_text(text: PromptText) -> Iterator[str]:
+    """Yield noi dung section (1 chuoi hoac cac fragment)."""
+    if isinstance(text, str):
+        if text:
+            yield text
+    else:
+        yield from text
+
+
+def _join_sections(sections: list[_Section], sep: str = "\n\n") -> Iterator[str]:
+    """Nhu sep.join(sections) nhung yield tung fragment."""
+    for index, section in enumerate(sections):
+        if index:
+            yield sep
+        if isinstance(section, str):
+            yield section
+        else:
+            header, body = section
+            yield header
+            yield from _iter_text(body)
+
+
+def _strip_fragments(fragments: Iterable[str]) -> Iterator[str]:
+    """Nhu "".join(fragments).strip() nhung van yield tung fragment."""
+    started = False
+    # Whitespace cuoi fragment truoc: chi ghi khi con noi dung phia sau
+    pending = ""
+    for fragment in fragments:
+        if not started:
+            fragment = fragment.lstrip()
+            if not fragment:
+                continue
+            started = True
+        body = fragment.rstrip()
+        if not body:
+            pending += fragment
+            continue
+        if pending:
+            yield pending
+        yield body
+        pending = fragment[len(body) :]
+
 
 def _append_git_changes_xml(
     prompt: str,
@@ -274,27 +420,32 @@ def _append_git_changes_xml(
     git_logs: Optional[GitLogResult],
 ) -> str:
     """Them section git_changes vao prompt dang XML voi instruction text."""
+    return prompt + "".join(_iter_git_changes_xml(git_diffs, git_logs))
+
+
+def _iter_git_changes_xml(
+    git_diffs: Optional[GitDiffResult],
+    git_logs: Optional[GitLogResult],
+) -> Iterator[str]:
+    """Section git_changes dang XML voi instruction text (rong neu khong co)."""
     # Kiem tra co du lieu thuc su truoc khi tao section
     has_diffs = git_diffs and (git_diffs.work_tree_diff or git_diffs.staged_diff)
     has_logs = git_logs and git_logs.log_content
 
     if has_diffs or has_logs:
-        prompt += "\n<git_changes>\n"
+        yield "\n<git_changes>\n"
         if has_diffs:
             assert git_diffs is not None  # type narrowing cho Pyrefly
-            prompt += f"<git_diff_instruction>\n{GIT_DIFF_INSTRUCTION}\n</git_diff_instruction>\n"
+            yield f"<git_diff_instruction>\n{GIT_DIFF_INSTRUCTION}\n</git_diff_instruction>\n"
             if git_diffs.work_tree_diff:
-                prompt += f"<git_diff_worktree>\n{git_diffs.work_tree_diff}\n</git_diff_worktree>\n"
+                yield f"<git_diff_worktree>\n{git_diffs.work_tree_diff}\n</git_diff_worktree>\n"
             if git_diffs.staged_diff:
-                prompt += (
-                    f"<git_diff_staged>\n{git_diffs.staged_diff}\n</git_diff_staged>\n"
-                )
+                yield f"<git_diff_staged>\n{git_diffs.staged_diff}\n</git_diff_staged>\n"
         if has_logs:
             assert git_logs is not None  # type narrowing cho Pyrefly
-            prompt += f"<git_log_instruction>\n{GIT_LOG_INSTRUCTION}\n</git_log_instruction>\n"
-            prompt += f"<git_log>\n{git_logs.log_content}\n</git_log>\n"
-        prompt += "</git_changes>\n"
-    return prompt
+            yield f"<git_log_instruction>\n{GIT_LOG_INSTRUCTION}\n</git_log_instruction>\n"
+            yield f"<git_log>\n{git_logs.log_content}\n</git_log>\n"
+        yield "</git_changes>\n"
 
 
 def _assemble_xml(
@@ -310,6 +461,35 @@ def _assemble_xml(
     semantic_index: str = "",
 ) -> str:
     """Lắp ráp prompt theo XML format với semantic_index ở đầu."""
+    return "".join(
+        _iter_xml(
+            file_map,
+            file_contents,
+            user_instructions,
+            include_xml_formatting,
+            git_diffs,
+            git_logs,
+            project_rules,
+            instructions_at_top,
+            workspace_root,
+            semantic_index,
+        )
+    )
+
+
+def _iter_xml(
+    file_map: str,
+    file_contents: PromptText,
+    user_instructions: str,
+    include_xml_formatting: bool,
+    git_diffs: Optional[GitDiffResult],
+    git_logs: Optional[GitLogResult],
+    project_rules: str = "",
+    instructions_at_top: bool = False,
+    workspace_root: Optional[Path] = None,
+    semantic_index: str = "",
+) -> Iterator[str]:
+    """Prompt XML format, tung fragment."""
     from datetime import datetime
     import html
 
@@ -328,59 +508,57 @@ def _assemble_xml(
         legend = build_context_legend(is_smart=False, has_git=has_git)
         file_summary = generate_file_summary_xml(context_legend=legend)
 
-    prompt = "<project>\n"
-    prompt += f"  <metadata>\n    <name>{project_name}</name>\n    <generated_at>{current_date}</generated_at>\n  </metadata>\n\n"
+    yield "<project>\n"
+    yield f"  <metadata>\n    <name>{project_name}</name>\n    <generated_at>{current_date}</generated_at>\n  </metadata>\n\n"
 
     # 1. Instructions and Rules at top
     if instructions_at_top:
         if user_instructions and user_instructions.strip():
-            prompt += f"  <user_instructions>\n{user_instructions.strip()}\n  </user_instructions>\n"
+            yield f"  <user_instructions>\n{user_instructions.strip()}\n  </user_instructions>\n"
         if project_rules and project_rules.strip():
-            prompt += (
-                f"  <project_rules>\n{project_rules.strip()}\n  </project_rules>\n"
-            )
+            yield f"  <project_rules>\n{project_rules.strip()}\n  </project_rules>\n"
         if semantic_index and semantic_index.strip():
-            prompt += f"  {semantic_index.strip()}\n"
-        prompt += "\n"
+            yield f"  {semantic_index.strip()}\n"
+        yield "\n"
 
     # 2. File Summary (Role, Purpose, Guidelines)
-    prompt += f"{file_summary}\n\n"
+    yield f"{file_summary}\n\n"
 
     # 3. Semantic Index (neu khong phai instructions_at_top thi dat o day cung duoc, hoac de sau summary)
     if not instructions_at_top and semantic_index and semantic_index.strip():
-        prompt += f"  {semantic_index.strip()}\n\n"
+        yield f"  {semantic_index.strip()}\n\n"
 
     # 4. Structure and Files
-    prompt += f"<structure>\n{file_map}\n</structure>\n\n"
-    prompt += f"{file_contents}\n"
+    yield f"<structure>\n{file_map}\n</structure>\n\n"
+    yield from _iter_text(file_contents)
+    yield "\n"
 
     # 5. Git changes
-    prompt = _append_git_changes_xml(prompt, git_diffs, git_logs)
+    yield from _iter_git_changes_xml(git_diffs, git_logs)
 
     # 6. Project Rules (bottom)
     if not instructions_at_top and project_rules and project_rules.strip():
-        prompt += f"\n  <project_rules>\n{project_rules.strip()}\n  </project_rules>\n"
+        yield f"\n  <project_rules>\n{project_rules.strip()}\n  </project_rules>\n"
 
     # 7. Output Format Instructions + Language directive
     from domain.prompt.template_manager import _get_language_directive
 
     if include_xml_formatting:
-        prompt += f"\n{XML_FORMATTING_INSTRUCTIONS}\n"
+        yield f"\n{XML_FORMATTING_INSTRUCTIONS}\n"
 
     # Language directive luon ap dung (ke ca OPX, vi phan giai thich cung can dung ngon ngu)
     lang = _get_language_directive()
     if lang:
-        prompt += f"\n<output_language>\n{lang}\n</output_language>\n"
+        yield f"\n<output_language>\n{lang}\n</output_language>\n"
 
     # 8. User Instructions (bottom)
     if user_instructions and user_instructions.strip():
         if instructions_at_top:
-            prompt += "\n  <reminder>\n    REITERATION: Please follow the user_instructions provided at the beginning of this prompt.\n  </reminder>\n"
+            yield "\n  <reminder>\n    REITERATION: Please follow the user_instructions provided at the beginning of this prompt.\n  </reminder>\n"
         else:
-            prompt += f"\n  <user_instructions>\n{user_instructions.strip()}\n  </user_instructions>\n"
+            yield f"\n  <user_instructions>\n{user_instructions.strip()}\n  </user_instructions>\n"
 
-    prompt += "\n</project>"
-    return prompt
+    yield "\n</project>"
 
 
 def _assemble_plain(
@@ -395,7 +573,34 @@ def _assemble_plain(
     semantic_index: str = "",
 ) -> str:
     """Lắp ráp prompt theo Plain Text format với Summary header và Git instructions."""
-    prompt_parts: list[str] = []
+    return "".join(
+        _iter_plain(
+            file_map,
+            file_contents,
+            user_instructions,
+            include_xml_formatting,
+            git_diffs,
+            git_logs,
+            project_rules,
+            instructions_at_top,
+            semantic_index,
+        )
+    )
+
+
+def _iter_plain(
+    file_map: str,
+    file_contents: PromptText,
+    user_instructions: str,
+    include_xml_formatting: bool,
+    git_diffs: Optional[GitDiffResult],
+    git_logs: Optional[GitLogResult],
+    project_rules: str = "",
+    instructions_at_top: bool = False,
+    semantic_index: str = "",
+) -> Iterator[str]:
+    """Prompt Plain Text format, tung fragment."""
+    prompt_parts: list[_Section] = []
 
     # Nếu instructions_at_top=True, đưa lên đầu cùng (trước SYSTEM INSTRUCTION)
     if instructions_at_top:
@@ -443,7 +648,7 @@ def _assemble_plain(
 
     prompt_parts.append(f"{'=' * 48}\nDIRECTORY STRUCTURE\n{'=' * 48}\n{file_map}")
 
-    prompt_parts.append(f"{'=' * 48}\nFILE CONTEXT\n{'=' * 48}\n{file_contents}")
+    prompt_parts.append((f"{'=' * 48}\nFILE CONTEXT\n{'=' * 48}\n", file_contents))
 
     # Them Git context voi instruction text, guard None values
     has_diffs = git_diffs and (git_diffs.work_tree_diff or git_diffs.staged_diff)
@@ -489,7 +694,7 @@ def _assemble_plain(
                 f"{'=' * 48}\nUSER INSTRUCTIONS\n{'=' * 48}\n{user_instructions.strip()}"
             )
 
-    return "\n\n".join(prompt_parts)
+    return _join_sections(prompt_parts)
 
 
 def _strip_xml_simple(text: str) -> str:
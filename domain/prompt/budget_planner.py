@@ -0,0 +1,137 @@
+"""
+Budget Planner - Chon 1 bieu dien cho moi muc cua prompt de vua token budget.
+
+Bai toan multiple-choice knapsack: moi muc (file, git diffs, git logs) co vai
+lua chon (vd. full / smart signatures / cat dau file / bo), moi lua chon co
+chi phi token va gia tri. Can chon dung 1 lua chon moi muc sao cho tong chi
+phi <= budget va tong gia tri lon nhat.
+
+Giai gan dung bang greedy tren convex hull cua tung muc: bat dau tu lua chon
+re nhat, nang cap theo hieu qua (gia tri tang them / token tang them) giam
+dan, cuoi cung lap cho trong bang lua chon ngoai hull. O(n log n) voi n la
+tong so lua chon; lech toi uu khong qua gia tri cua 1 lan nang cap.
+"""
+
+from dataclasses import dataclass
+from typing import List, Sequence
+
+
+@dataclass(frozen=True)
+class Choice:
+    """
+    1 lua chon bieu dien cho 1 muc.
+
+    Attributes:
+        name: Ten bieu dien (vd. "full", "smart", "omitted")
+        tokens: Chi phi token
+        value: Gia tri giu lai (cang cao cang tot)
+    """
+
+    name: str
+    tokens: int
+    value: float
+
+
+@dataclass
+class BudgetPlan:
+    """
+    Ket qua plan_budget().
+
+    Attributes:
+        picks: Index lua chon da chon cho tung muc (theo thu tu dau vao)
+        tokens: Tong chi phi token cua cac lua chon
+        value: Tong gia tri
+        feasible: False neu ca lua chon re nhat cua moi muc van vuot budget
+            (khi do picks la cac lua chon re nhat)
+    """
+
+    picks: List[int]
+    tokens: int
+    value: float
+    feasible: bool
+
+
+def _frontier(options: Sequence[Choice]) -> List[int]:
+    """Lua chon khong bi troi, sort theo chi phi (chi phi va gia tri cung tang)."""
+    order = sorted(
+        range(len(options)), key=lambda i: (options[i].tokens, -options[i].value)
+    )
+    frontier: List[int] = []
+    for i in order:
+        if frontier and options[i].value <= options[frontier[-1]].value:
+            continue  # Dat hon ma khong tot hon
+        frontier.append(i)
+    return frontier
+
+
+def _slope(options: Sequence[Choice], a: int, b: int) -> float:
+    return (options[b].value - options[a].value) / (
+        options[b].tokens - options[a].tokens
+    )
+
+
+def _hull(options: Sequence[Choice], frontier: List[int]) -> List[int]:
+    """Convex hull tren (tokens, value): hieu qua cac lan nang cap giam dan."""
+    hull: List[int] = []
+    for i in frontier:
+        while len(hull) >= 2 and _slope(options, hull[-2], hull[-1]) <= _slope(
+            options, hull[-1], i
+        ):
+            hull.pop()
+        hull.append(i)
+    return hull
+
+
+def plan_budget(items: Sequence[Sequence[Choice]], budget: int) -> BudgetPlan:
+    """
+    Chon 1 lua chon cho moi muc, tong token <= budget, tong gia tri lon nhat.
+
+    Khi hai lan nang cap cung hieu qua, muc dung sau duoc nang cap truoc (muc
+    dung truoc bi cat truoc, giong thu tu trim tuan tu).
+
+    Args:
+        items: Danh sach muc, moi muc la danh sach lua chon (it nhat 1)
+        budget: Tong token toi da
+    """
+    frontiers = [_frontier(options) for options in items]
+    hulls = [_hull(options, f) for options, f in zip(items, frontiers)]
+    picks = [hull[0] for hull in hulls]
+    used = sum(options[i].tokens for options, i in zip(items, picks))
+
+    if used > budget:
+        value = sum(options[i].value for options, i in zip(items, picks))
+        return BudgetPlan(picks, used, value, feasible=False)
+
+    upgrades = []
+    for item, (options, hull) in enumerate(zip(items, hulls)):
+        for step in range(1, len(hull)):
+            upgrades.append((_slope(options, hull[step - 1], hull[step]), item, step))
+    upgrades.sort(key=lambda u: (-u[0], -u[1]))
+
+    level = [0] * len(items)
+    for _efficiency, item, step in upgrades:
+        if level[item] != step - 1:
+            continue  # Buoc truoc cua muc nay khong vua -> bo cac buoc sau
+        options, hull = items[item], hulls[item]
+        delta = options[hull[step]].tokens - options[hull[step - 1]].tokens
+        if used + delta > budget:
+            continue
+        used += delta
+        level[item] = step
+        picks[item] = hull[step]
+
+    # Lap cho con trong bang lua chon tot hon nam ngoai hull
+    for item, options in enumerate(items):
+        best = picks[item]
+        current_tokens = options[best].tokens
+        for i in frontiers[item]:
+            if (
+                options[i].value > options[best].value
+                and used - current_tokens + options[i].tokens <= budget
+            ):
+                best = i
+        used += options[best].tokens - current_tokens
+        picks[item] = best
+
+    value = sum(options[i].value for options, i in zip(items, picks))
+    return BudgetPlan(picks, used, value, feasible=True)
@@ -0,0 +1,210 @@
+"""
+Content Snapshot - Doc moi file 1 lan cho ca 1 lan build prompt.
+
+1 lan "Copy Context" truoc day doc cung 1 file nhieu lan: security scan,
+collect_files (formatter), extract_local_imports, count_per_file_tokens,
+trimming... ContentSnapshot doc va decode moi file da chon DUNG 1 LAN (mmap
+voi file lon), roi dua cung 1 chuoi (immutable) cho moi buoc. Moi buoc vi the
+cung thay 1 phien ban file, ke ca khi file bi sua giua chung.
+
+- SnapshotEntry: ket qua doc 1 file (stat, binary, content hoac loi)
+- load_entry(): doc 1 file tu disk (khong cache), dung khi khong co snapshot
+- read_entry(): lay tu snapshot neu co va du gioi han, nguoc lai doc disk
+- ContentSnapshot.memo(): cache ket qua dan xuat (vd. FileEntry) theo key
+
+Snapshot chi song trong 1 lan build/copy; khong dung lai giua cac lan.
+"""
+
+import mmap
+import os
+import stat as stat_module
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from shared.utils.file_utils import classify_by_extension, is_binary_file
+
+# Gioi han kich thuoc file mac dinh cua prompt pipeline (giong collect_files)
+DEFAULT_MAX_FILE_BYTES = 1024 * 1024
+# File tu kich thuoc nay tro len doc bang mmap (it copy kernel -> user hon)
+MMAP_MIN_BYTES = 64 * 1024
+# Doc song song khi co nhieu hon nguong nay file
+PARALLEL_LOAD_THRESHOLD = 5
+MAX_LOAD_WORKERS = 8
+# So byte dau dung de nhan dien binary (giong is_binary_file)
+_BINARY_PROBE_BYTES = 1024
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotEntry:
+    """
+    Ket qua doc 1 file.
+
+    Attributes:
+        path: Path string nhu luc yeu cau
+        is_file: File ton tai va la regular file
+        binary: File binary (content = None)
+        size: Kich thuoc (bytes), 0 neu khong stat duoc
+        mtime: st_mtime (float, cung don vi voi cac cache theo mtime)
+        mtime_ns: st_mtime_ns
+        content: Noi dung da decode (utf-8, replace, newline chuan hoa nhu
+            Path.read_text), None neu binary/qua lon/loi doc
+        error: Thong bao loi doc file (None neu doc duoc)
+    """
+
+    path: str
+    is_file: bool
+    binary: bool
+    size: int
+    mtime: float
+    mtime_ns: int
+    content: Optional[str]
+    error: Optional[str] = None
+
+
+def _decode(data: bytes) -> str:
+    """Decode giong Path.read_text(encoding="utf-8", errors="replace")."""
+    text = data.decode("utf-8", errors="replace")
+    if "\r" in text:
+        # read_text dung universal newlines: \r\n va \r -> \n
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _read_bytes(path_str: str, size: int) -> bytes:
+    with open(path_str, "rb") as f:
+        if size < MMAP_MIN_BYTES:
+            return f.read()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.read()
+
+
+def load_entry(
+    path_str: str, max_file_size: int = DEFAULT_MAX_FILE_BYTES
+) -> SnapshotEntry:
+    """
+    Doc 1 file tu disk: stat, nhan dien binary, doc + decode neu du nho.
+
+    File lon hon max_file_size khong doc noi dung (content = None).
+    """
+    try:
+        st = os.stat(path_str)
+    except OSError:
+        return SnapshotEntry(path_str, False, False, 0, 0.0, 0, None)
+    if not stat_module.S_ISREG(st.st_mode):
+        return SnapshotEntry(path_str, False, False, 0, 0.0, 0, None)
+
+    size, mtime, mtime_ns = st.st_size, st.st_mtime, st.st_mtime_ns
+    binary = classify_by_extension(path_str)
+    if binary or size > max_file_size:
+        if binary is None:
+            binary = is_binary_file(path_str)
+        return SnapshotEntry(path_str, True, binary, size, mtime, mtime_ns, None)
+    if size == 0:
+        return SnapshotEntry(path_str, True, False, 0, mtime, mtime_ns, "")
+
+    try:
+        data = _read_bytes(path_str, size)
+    except (OSError, ValueError) as e:
+        return SnapshotEntry(
+            path_str, True, bool(binary), size, mtime, mtime_ns, None, str(e)
+        )
+    if binary is None and b"\x00" in data[:_BINARY_PROBE_BYTES]:
+        return SnapshotEntry(path_str, True, True, size, mtime, mtime_ns, None)
+    return SnapshotEntry(path_str, True, False, size, mtime, mtime_ns, _decode(data))
+
+
+class ContentSnapshot:
+    """
+    Noi dung cac file da chon, doc 1 lan va dung chung trong 1 lan build.
+
+    Thread-safe. Path ngoai tap da chon duoc doc lazy o lan hoi dau tien va
+    cung duoc giu lai (lan hoi sau thay cung phien ban).
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str | Path] = (),
+        max_file_size: int = DEFAULT_MAX_FILE_BYTES,
+    ) -> None:
+        """
+        Args:
+            paths: Cac file se dung trong build (doc khi goi load())
+            max_file_size: File lon hon khong doc noi dung
+        """
+        self.max_file_size = max_file_size
+        self._paths = sorted({str(p) for p in paths})
+        self._entries: Dict[str, SnapshotEntry] = {}
+        self._derived: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        # So file da doc tu disk (de kiem tra/monitoring)
+        self.disk_reads = 0
+
+    def load(self) -> "ContentSnapshot":
+        """Doc tat ca file chua co trong snapshot (song song neu nhieu)."""
+        with self._lock:
+            missing = [p for p in self._paths if p not in self._entries]
+        if len(missing) > PARALLEL_LOAD_THRESHOLD:
+            workers = min(MAX_LOAD_WORKERS, len(missing))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for entry in executor.map(self._load, missing):
+                    self._store(entry)
+        else:
+            for path_str in missing:
+                self._store(self._load(path_str))
+        return self
+
+    def get(self, path: str | Path) -> SnapshotEntry:
+        """Entry cua file, doc tu disk neu chua co."""
+        path_str = str(path)
+        with self._lock:
+            entry = self._entries.get(path_str)
+        if entry is not None:
+            return entry
+        return self._store(self._load(path_str))
+
+    def covers(self, max_file_size: int) -> bool:
+        """Snapshot co du noi dung cho buoc dung gioi han max_file_size."""
+        return max_file_size <= self.max_file_size
+
+    def memo(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Ket qua dan xuat tu noi dung snapshot, tinh 1 lan moi key."""
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+        value = compute()
+        with self._lock:
+            return self._derived.setdefault(key, value)
+
+    def __contains__(self, path: object) -> bool:
+        with self._lock:
+            return str(path) in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _load(self, path_str: str) -> SnapshotEntry:
+        entry = load_entry(path_str, self.max_file_size)
+        if entry.content:
+            with self._lock:
+                self.disk_reads += 1
+        return entry
+
+    def _store(self, entry: SnapshotEntry) -> SnapshotEntry:
+        """Giu entry dau tien neu 2 thread cung doc 1 path."""
+        with self._lock:
+            return self._entries.setdefault(entry.path, entry)
+
+
+def read_entry(
+    path: str | Path,
+    max_file_size: int = DEFAULT_MAX_FILE_BYTES,
+    snapshot: Optional[ContentSnapshot] = None,
+) -> SnapshotEntry:
+    """Entry tu snapshot (neu du gioi han) hoac doc thang tu disk."""
+    if snapshot is not None and snapshot.covers(max_file_size):
+        return snapshot.get(path)
+    return load_entry(str(path), max_file_size)
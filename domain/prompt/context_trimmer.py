@@ -1,31 +1,65 @@
 """
 Context Trimmer - Tu dong cat giam context khi prompt vuot token budget.
 
-Module nay implement chien luoc trim theo thu tu uu tien ro rang:
+Thu tu uu tien:
 1. Instructions + Project Rules + Structure tokens: LUON giu nguyen
-2. Primary file contents: Uu tien cao
-3. Git diffs/logs: Co the cat khi can
-4. Dependency file contents: Uu tien thap nhat, cat truoc tien
-
-Cac muc degrade:
-- Level 0 (Full): Giu nguyen tat ca
-- Level 1 (Trim deps + git): Loai bo dependency files, trim git logs/diffs
-- Level 2 (Smart degrade): Chuyen primary files tu full -> signatures only
-- Level 3 (Truncate): Cat bot files it quan trong nhat
+2. File user chon truc tiep (protected_paths): luon giu full
+3. Primary file contents: Uu tien cao
+4. Git diffs/logs: Co the bo khi can
+5. Dependency file contents: Uu tien thap nhat
+
+Thay vi degrade tuan tu theo level, trim() lap plan toi uu:
+- Dem 1 lan: cac phan co dinh, git diffs/logs, tung file
+- Moi file co cac bieu dien: full, smart (AST signatures), head (~30% dau),
+  severe (800 ky tu dau), omitted (chi dependency); moi bieu dien dem token
+  1 lan, gia tri = trong so muc (primary/dependency/git) x do day du
+- budget_planner.plan_budget() chon to hop gia tri cao nhat vua budget
+  (multiple-choice knapsack, O(n log n))
+- TrimResult ghi lai plan da chon va thoi gian tung stage
+
+levels_applied giu nghia cu: 1 = chi bo dependency/git, 2 = co file chuyen
+smart/cat 30%, 3 = co file cat manh hoac khong the vua budget.
 
 Su dung: ContextTrimmer duoc goi tu PromptBuildService khi max_tokens set
 va prompt vuot budget.
 """
 
 import logging
+import time
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from domain.prompt.budget_planner import Choice, plan_budget
 
 if TYPE_CHECKING:
     from domain.ports.tokenization_port import ITokenizationService
 
 logger = logging.getLogger(__name__)
 
+# Do day du cua tung bieu dien file (ty le gia tri so voi full)
+FIDELITY: Dict[str, float] = {
+    "full": 1.0,
+    "smart": 0.6,
+    "head": 0.4,
+    "severe": 0.15,
+    "omitted": 0.0,
+}
+# Trong so gia tri theo loai muc
+PRIMARY_WEIGHT = 4.0
+GIT_DIFFS_WEIGHT = 2.0
+GIT_LOGS_WEIGHT = 1.5
+DEPENDENCY_WEIGHT = 1.0
+# Level degrade tuong ung (TrimResult.levels_applied)
+_LEVELS: Dict[str, int] = {"full": 0, "omitted": 1, "smart": 2, "head": 2, "severe": 3}
+# Ten muc cua git trong plan
+GIT_DIFFS_ITEM = "git_diffs"
+GIT_LOGS_ITEM = "git_logs"
+# File ngan hon nguong nay khong cat
+_MIN_TRUNCATE_CHARS = 200
+_SEVERE_KEEP_CHARS = 800
+
+_Option = Tuple[Choice, Optional[str]]
+
 
 @dataclass
 class PromptComponents:
@@ -57,6 +91,24 @@ class PromptComponents:
     """Paths that must never be removed or truncated regardless of token pressure."""
 
 
+@dataclass(frozen=True)
+class TrimChoice:
+    """
+    Bieu dien da chon cho 1 muc trong plan trim.
+
+    Attributes:
+        item: display_path cua file, hoac GIT_DIFFS_ITEM / GIT_LOGS_ITEM
+        representation: "full", "smart", "head", "severe" hoac "omitted"
+        tokens: Token cua bieu dien da chon
+        full_tokens: Token cua muc khi giu nguyen
+    """
+
+    item: str
+    representation: str
+    tokens: int
+    full_tokens: int
+
+
 @dataclass
 class TrimResult:
     """
@@ -67,21 +119,24 @@ class TrimResult:
         notes: Danh sach ghi chu mo ta nhung gi bi cat
         actual_tokens: So token uoc tinh sau trim
         levels_applied: So muc degrade da ap dung (0-3)
+        plan: Bieu dien da chon cho tung muc (rong neu khong can trim)
+        stage_ms: Thoi gian tung stage (measure, represent, solve, apply)
     """
 
     components: PromptComponents
     notes: List[str] = field(default_factory=list)
     actual_tokens: int = 0
     levels_applied: int = 0
+    plan: List[TrimChoice] = field(default_factory=list)
+    stage_ms: Dict[str, float] = field(default_factory=dict)
 
 
 class ContextTrimmer:
     """
     Tu dong cat giam context de prompt vua voi token budget.
 
-    Su dung TokenizationService (DI) de dem token chinh xac.
-    Ap dung chien luoc trim theo thu tu uu tien:
-    dependencies -> git logs -> git diffs -> smart degrade primary files.
+    Su dung TokenizationService (DI) de dem token chinh xac. Moi thanh phan
+    va moi bieu dien file chi dem 1 lan; plan trim giai bang budget_planner.
     """
 
     def __init__(
@@ -124,26 +179,32 @@ class ContextTrimmer:
         """
         Trim context de vua voi max_tokens budget.
 
-        Ap dung cac level degrade tuan tu cho den khi fit:
-        - Level 0: Khong trim (da fit)
-        - Level 1: Xoa dependency files, trim git logs roi diffs
-        - Level 2: Chuyen primary files sang signatures only
-        - Level 3: Truncate cac files lon nhat
+        Stage:
+        - measure: dem token cac thanh phan (moi thanh phan 1 lan)
+        - represent: dem token cac bieu dien cua tung file
+        - solve: chon bieu dien cho moi muc (plan_budget)
+        - apply: ap dung plan vao components, ghi notes
 
         Args:
             components: PromptComponents chua toan bo thanh phan prompt
 
         Returns:
-            TrimResult voi components da trim va ghi chu
+            TrimResult voi components da trim, ghi chu va plan da chon
         """
         result = TrimResult(components=components)
 
-        # Xây dựng cache token count một lần duy nhất - O(N)
+        # Stage measure: moi thanh phan dem 1 lan - O(N)
+        started = time.perf_counter()
         file_cache: Dict[str, int] = self._build_file_token_cache(components)
-
-        # Tính tổng token hiện tại
-        current_total = self._estimate_total(components, file_cache)
+        fixed_tokens = self._fixed_tokens(components)
+        git_tokens = {
+            GIT_DIFFS_ITEM: self._count(components.git_diffs_text),
+            GIT_LOGS_ITEM: self._count(components.git_logs_text),
+        }
+        current_total = fixed_tokens + sum(git_tokens.values())
+        current_total += sum(file_cache.values())
         result.actual_tokens = current_total
+        started = self._mark(result, "measure", started)
 
         # Level 0: Đã fit, không cần trim
         if current_total <= self._max_tokens:
@@ -153,237 +214,184 @@ class ContextTrimmer:
             return result
 
         logger.info(
-            "Context exceeds budget: %d > %d tokens. Starting trim...",
+            "Context exceeds budget: %d > %d tokens. Planning trim...",
             current_total,
             self._max_tokens,
         )
 
-        # Level 1: Xóa dependency files, trim git
-        result = self._trim_level1(result, file_cache)
-        if result.actual_tokens <= self._max_tokens:
-            result.levels_applied = 1
-            return result
+        # Stage represent: cac lua chon cua tung muc
+        items: List[Tuple[str, List[_Option]]] = []
+        for path, content in components.file_contents.items():
+            items.append(
+                (path, self._file_options(components, path, content, file_cache[path]))
+            )
+        for item, text, weight in (
+            (GIT_LOGS_ITEM, components.git_logs_text, GIT_LOGS_WEIGHT),
+            (GIT_DIFFS_ITEM, components.git_diffs_text, GIT_DIFFS_WEIGHT),
+        ):
+            if text:
+                full = Choice("full", git_tokens[item], weight)
+                items.append((item, [(full, text), (Choice("omitted", 0, 0.0), None)]))
+        started = self._mark(result, "represent", started)
+
+        # Stage solve
+        plan = plan_budget(
+            [[choice for choice, _ in options] for _, options in items],
+            self._max_tokens - fixed_tokens,
+        )
+        started = self._mark(result, "solve", started)
 
-        # Level 2: Smart degrade primary files (full -> truncated)
-        result = self._trim_level2(result, file_cache)
-        if result.actual_tokens <= self._max_tokens:
-            result.levels_applied = 2
-            return result
+        # Stage apply
+        self._apply_plan(result, items, plan.picks)
+        result.actual_tokens = fixed_tokens + plan.tokens
+        if not plan.feasible:
+            result.levels_applied = 3
+            result.notes.append(
+                f"WARNING: Could not fit within {self._max_tokens:,} token budget. "
+                f"Current: {result.actual_tokens:,} tokens. "
+                f"Consider reducing file count or increasing budget."
+            )
+        self._mark(result, "apply", started)
 
-        # Level 3: Truncate cac files lon nhat
-        result = self._trim_level3(result, file_cache)
-        result.levels_applied = 3
+        logger.info(
+            "Trim plan: %d -> %d tokens (budget %d, level %d), stages %s",
+            current_total,
+            result.actual_tokens,
+            self._max_tokens,
+            result.levels_applied,
+            {k: round(v, 2) for k, v in result.stage_ms.items()},
+        )
         return result
 
-    def _estimate_total(
-        self, comp: PromptComponents, file_token_cache: Optional[Dict[str, int]] = None
-    ) -> int:
-        """
-        Ước tính tổng token của tất cả components.
-
-        Nếu file_token_cache được cung cấp, sử dụng giá trị đã cache thay vì đếm lại.
-        Điều này giảm độ phức tạp từ O(N) xuống O(1) khi cache hợp lệ.
-
-        Args:
-            comp: PromptComponents chứa các thành phần
-            file_token_cache: Optional dict cache token count của từng file
-
-        Returns:
-            Tổng số token ước tính
-        """
-        total = comp.structure_overhead
-        total += self._count(comp.instructions)
-        total += self._count(comp.project_rules)
-        total += self._count(comp.file_map)
-        total += self._count(comp.git_diffs_text)
-        total += self._count(comp.git_logs_text)
-        if file_token_cache is not None:
-            # Sử dụng cache - chỉ cộng các file còn lại trong file_contents
-            for path in comp.file_contents:
-                total += file_token_cache.get(path, 0)
-        else:
-            for content in comp.file_contents.values():
-                total += self._count(content)
-        return total
-
-    def _trim_level1(
-        self, result: TrimResult, file_cache: Dict[str, int]
-    ) -> TrimResult:
-        """
-        Level 1: Xóa dependency files trước, sau đó trim git logs rồi diffs.
-        Cập nhật file_cache khi xóa file để tránh đếm lại.
-
-        Args:
-            result: TrimResult hiện tại
-            file_cache: Dict cache token count từng file
-
-        Returns:
-            TrimResult đã cập nhật
-        """
-        comp = result.components
-
-        # 1a. Xóa dependency files
-        dep_paths = comp.dependency_paths
-        if dep_paths:
-            removed_deps = []
-            for dp in list(dep_paths):
-                if dp in comp.protected_paths:
-                    continue  # Never remove explicitly selected (protected) files
-                if dp in comp.file_contents:
-                    del comp.file_contents[dp]
-                    file_cache.pop(dp, None)  # Cập nhật cache
-                    removed_deps.append(dp)
-            if removed_deps:
-                result.notes.append(
-                    f"Removed {len(removed_deps)} dependency files to fit budget: "
-                    + ", ".join(removed_deps[:5])
-                    + ("..." if len(removed_deps) > 5 else "")
-                )
-                comp.dependency_paths.clear()
-
-        result.actual_tokens = self._estimate_total(comp, file_cache)
-        if result.actual_tokens <= self._max_tokens:
-            return result
-
-        # 1b. Trim git logs
-        if comp.git_logs_text:
-            result.notes.append("Removed git logs to fit budget.")
-            comp.git_logs_text = ""
-
-        result.actual_tokens = self._estimate_total(comp, file_cache)
-        if result.actual_tokens <= self._max_tokens:
-            return result
-
-        # 1c. Trim git diffs
-        if comp.git_diffs_text:
-            result.notes.append("Removed git diffs to fit budget.")
-            comp.git_diffs_text = ""
-
-        result.actual_tokens = self._estimate_total(comp, file_cache)
-        return result
+    @staticmethod
+    def _mark(result: TrimResult, stage: str, started: float) -> float:
+        """Ghi thoi gian stage (ms), tra ve moc bat dau stage tiep theo."""
+        now = time.perf_counter()
+        result.stage_ms[stage] = (now - started) * 1000
+        return now
+
+    def _fixed_tokens(self, comp: PromptComponents) -> int:
+        """Token cua cac phan luon giu nguyen (overhead, instructions, rules, map)."""
+        return (
+            comp.structure_overhead
+            + self._count(comp.instructions)
+            + self._count(comp.project_rules)
+            + self._count(comp.file_map)
+        )
 
-    def _trim_level2(
-        self, result: TrimResult, file_cache: Dict[str, int]
-    ) -> TrimResult:
+    def _file_options(
+        self, comp: PromptComponents, path: str, content: str, full_tokens: int
+    ) -> List[_Option]:
         """
-        Level 2: Chuyển primary files sang Smart Context (AST signatures) thay vì cắt text mù.
-        Cập nhật file_cache sau mỗi lần degrade để tránh đếm lại O(N).
-
-        Args:
-            result: TrimResult hiện tại
-            file_cache: Dict cache token count từng file
+        Cac bieu dien cua 1 file kem token count (moi bieu dien dem 1 lan).
 
-        Returns:
-            TrimResult đã cập nhật
+        File protected chi co "full"; "omitted" chi danh cho dependency.
+        Bieu dien khong nho hon full (file ngan) bi bo qua.
         """
-        from pathlib import Path as _Path
-        from domain.smart_context import smart_parse, is_supported
-
-        comp = result.components
+        full = Choice("full", full_tokens, PRIMARY_WEIGHT)
+        if path in comp.protected_paths:
+            return [(full, content)]  # Never degrade explicitly selected files
+
+        is_dependency = path in comp.dependency_paths
+        weight = DEPENDENCY_WEIGHT if is_dependency else PRIMARY_WEIGHT
+        texts: Dict[str, str] = {}
+
+        smart_content = self._smart_signatures(path, content)
+        if smart_content:
+            texts["smart"] = (
+                smart_content
+                + "\n\n[NOTE: Converted to Smart Context (AST signatures only) to fit token budget.]"
+            )
 
-        # Sắp xếp files theo token count giảm dần (dùng cache đã có)
-        file_sizes: list[tuple[str, int]] = [
-            (path, file_cache.get(path, self._count(content)))
-            for path, content in comp.file_contents.items()
-        ]
-        file_sizes.sort(key=lambda x: x[1], reverse=True)
-
-        for path, original_tokens in file_sizes:
-            if result.actual_tokens <= self._max_tokens:
-                break
-
-            if path in comp.protected_paths:
-                continue  # Skip files marked as protected — never degrade them
-
-            content = comp.file_contents[path]
-            ext = _Path(path).suffix.lstrip(".")
-
-            # Thử smart context trước (AST signatures - giữ logic nghiệp vụ)
-            if is_supported(ext):
-                try:
-                    smart_content = smart_parse(
-                        path, content, include_relationships=False
-                    )
-                    if smart_content:
-                        new_content = (
-                            smart_content
-                            + "\n\n[NOTE: Converted to Smart Context (AST signatures only) to fit token budget.]"
-                        )
-                        comp.file_contents[path] = new_content
-                        new_tokens = self._count(new_content)
-                        file_cache[path] = new_tokens  # Cập nhật cache
-                        result.notes.append(
-                            f"Smart Context {path}: {original_tokens:,} -> {new_tokens:,} tokens"
-                        )
-                        result.actual_tokens = self._estimate_total(comp, file_cache)
-                        continue
-                except Exception:
-                    pass  # Fallback về truncate
-
-            # Fallback: Giữ 30% đầu của file
-            keep_chars = max(200, len(content) // 3)
-            truncated = content[:keep_chars]
-            truncated += (
+        keep_chars = max(_MIN_TRUNCATE_CHARS, len(content) // 3)
+        if keep_chars < len(content):
+            texts["head"] = content[:keep_chars] + (
                 f"\n\n[NOTE: File content trimmed to ~30% ({keep_chars} chars) to fit token budget. "
                 f"Use read_file for full content.]"
             )
-            comp.file_contents[path] = truncated
-
-            new_tokens = self._count(truncated)
-            file_cache[path] = new_tokens  # Cập nhật cache
-            saved = original_tokens - new_tokens
-            result.notes.append(
-                f"Trimmed {path}: {original_tokens:,} -> {new_tokens:,} tokens (saved {saved:,})"
+        if len(content) > _SEVERE_KEEP_CHARS:
+            texts["severe"] = content[:_SEVERE_KEEP_CHARS] + (
+                f"\n[NOTE: File severely truncated to fit {self._max_tokens:,} token budget. "
+                f"Use read_file to get full content.]"
             )
 
-            result.actual_tokens = self._estimate_total(comp, file_cache)
-
-        return result
+        options: List[_Option] = [(Choice("full", full_tokens, weight), content)]
+        for name, text in texts.items():
+            options.append(
+                (Choice(name, self._count(text), weight * FIDELITY[name]), text)
+            )
+        if is_dependency:
+            options.append((Choice("omitted", 0, 0.0), None))
+        return options
 
-    def _trim_level3(
-        self, result: TrimResult, file_cache: Dict[str, int]
-    ) -> TrimResult:
-        """
-        Level 3: Truncate mạnh hơn - chỉ giữ 800 ký tự đầu + note.
-        Cập nhật file_cache sau mỗi lần truncate.
+    @staticmethod
+    def _smart_signatures(path: str, content: str) -> Optional[str]:
+        """AST signatures cua file (None neu khong ho tro/parse loi)."""
+        from pathlib import Path as _Path
+        from domain.smart_context import smart_parse, is_supported
 
-        Args:
-            result: TrimResult hiện tại
-            file_cache: Dict cache token count từng file
+        if not is_supported(_Path(path).suffix.lstrip(".")):
+            return None
+        try:
+            return smart_parse(path, content, include_relationships=False)
+        except Exception:
+            return None  # Fallback ve truncate
 
-        Returns:
-            TrimResult đã cập nhật
-        """
+    def _apply_plan(
+        self,
+        result: TrimResult,
+        items: List[Tuple[str, List[_Option]]],
+        picks: List[int],
+    ) -> None:
+        """Ap dung lua chon vao components, ghi plan va notes."""
         comp = result.components
-
-        for path in list(comp.file_contents.keys()):
-            if result.actual_tokens <= self._max_tokens:
-                break
-
-            if path in comp.protected_paths:
-                continue  # Skip files marked as protected — last resort still respects them
-
-            content = comp.file_contents[path]
-            if len(content) <= 200:
-                continue  # Đã nhỏ, skip
-
-            truncated = content[:800]
-            truncated += (
-                f"\n[NOTE: File severely truncated to fit {self._max_tokens:,} token budget. "
-                f"Use read_file to get full content.]"
+        removed_deps: List[str] = []
+        removed_git: List[str] = []
+        degraded: List[Tuple[int, str, Choice]] = []
+
+        for (item, options), pick in zip(items, picks):
+            choice, text = options[pick]
+            full_tokens = options[0][0].tokens
+            result.plan.append(
+                TrimChoice(item, choice.name, choice.tokens, full_tokens)
             )
-            comp.file_contents[path] = truncated
-            new_tokens = self._count(truncated)
-            file_cache[path] = new_tokens  # Cập nhật cache
-            result.notes.append(f"Severely truncated {path} to fit budget.")
-            result.actual_tokens = self._estimate_total(comp, file_cache)
-
-        # Warning nếu vẫn vượt budget
-        if result.actual_tokens > self._max_tokens:
+            result.levels_applied = max(result.levels_applied, _LEVELS[choice.name])
+            if choice.name == "full":
+                continue
+            if item == GIT_LOGS_ITEM:
+                comp.git_logs_text = ""
+                removed_git.append("Removed git logs to fit budget.")
+            elif item == GIT_DIFFS_ITEM:
+                comp.git_diffs_text = ""
+                removed_git.append("Removed git diffs to fit budget.")
+            elif text is None:
+                del comp.file_contents[item]
+                comp.dependency_paths.discard(item)
+                removed_deps.append(item)
+            else:
+                comp.file_contents[item] = text
+                degraded.append((full_tokens, item, choice))
+
+        if removed_deps:
             result.notes.append(
-                f"WARNING: Could not fit within {self._max_tokens:,} token budget. "
-                f"Current: {result.actual_tokens:,} tokens. "
-                f"Consider reducing file count or increasing budget."
+                f"Removed {len(removed_deps)} dependency files to fit budget: "
+                + ", ".join(removed_deps[:5])
+                + ("..." if len(removed_deps) > 5 else "")
             )
+        result.notes.extend(removed_git)
 
-        return result
+        # File lon nhat truoc (giong thu tu degrade cu)
+        degraded.sort(key=lambda d: d[0], reverse=True)
+        for original_tokens, path, choice in degraded:
+            new_tokens = choice.tokens
+            if choice.name == "smart":
+                result.notes.append(
+                    f"Smart Context {path}: {original_tokens:,} -> {new_tokens:,} tokens"
+                )
+            elif choice.name == "head":
+                saved = original_tokens - new_tokens
+                result.notes.append(
+                    f"Trimmed {path}: {original_tokens:,} -> {new_tokens:,} tokens (saved {saved:,})"
+                )
+            else:
+                result.notes.append(f"Severely truncated {path} to fit budget.")
@@ -8,12 +8,13 @@ Thay the logic doc file bi trung lap 4 lan trong:
 - generate_file_contents_plain() (Plain)
 
 Moi formatter goi collect_files() MOT LAN, roi format theo cach rieng.
+Noi dung file lay tu ContentSnapshot cua lan build (neu co) thay vi doc lai.
 """
 
 from pathlib import Path
 from typing import Optional
 
-from shared.utils.file_utils import is_binary_file
+from domain.prompt.content_snapshot import ContentSnapshot, read_entry
 from shared.types.prompt_types import FileEntry
 from shared.utils.import_parser import extract_local_imports
 from shared.utils.language_utils import get_language_from_path
@@ -46,6 +47,7 @@ def collect_files(
     max_file_size: int = 1024 * 1024,
     workspace_root: Optional[Path] = None,
     use_relative_paths: bool = False,
+    snapshot: Optional[ContentSnapshot] = None,
 ) -> list[FileEntry]:
     """
     Doc va thu thap cac files tu disk thanh List[FileEntry].
@@ -63,88 +65,99 @@ def collect_files(
         max_file_size: Kich thuoc toi da cua file (default 1MB)
         workspace_root: Thu muc goc de tinh relative paths
         use_relative_paths: Co dung relative paths khong
+        snapshot: Noi dung da doc cua lan build hien tai. Khi co, file khong
+            doc lai tu disk va FileEntry duoc tinh 1 lan cho ca build.
 
     Returns:
         List[FileEntry] da sort theo path
     """
     from concurrent.futures import ThreadPoolExecutor
-    from shared.utils.path_utils import path_for_display
 
-    # print(f"DEBUG: selected_paths types: {[type(p) for p in selected_paths]}")
     sorted_paths = sorted(selected_paths)
 
     def _process(path_str: str) -> Optional[FileEntry]:
-        path = Path(path_str)
-        display = path_for_display(path, workspace_root, use_relative_paths)
-        language = get_language_from_path(str(path))
-
-        try:
-            if not path.is_file():
-                return None  # Skip, khong them entry (giong behavior cu)
-
-            if is_binary_file(path):
-                return FileEntry(
-                    path=path,
-                    display_path=display,
-                    content=None,
-                    error="Binary file",
-                    language=language,
-                )
-
-            try:
-                file_size = path.stat().st_size
-                if file_size > max_file_size:
-                    return FileEntry(
-                        path=path,
-                        display_path=display,
-                        content=None,
-                        error=f"File too large ({file_size // 1024}KB)",
-                        language=language,
-                    )
-                if file_size == 0:
-                    return FileEntry(
-                        path=path,
-                        display_path=display,
-                        content="",
-                        error=None,
-                        language=language,
-                    )
-            except OSError:
-                pass
-
-            content = path.read_text(encoding="utf-8", errors="replace")
-
-            # Trich xuat metadata tu shared utility
-            deps: list[str] = []
-            if workspace_root:
-                raw_deps = extract_local_imports(path, workspace_root)
-                deps = []
-                for rd in raw_deps:
-                    dotted = _path_to_dotted(rd)
-                    if dotted.endswith(".__init__"):
-                        dotted = dotted[:-9]
-                    deps.append(dotted)
-
-            return FileEntry(
-                path=path,
-                display_path=display,
-                content=content,
-                error=None,
-                language=language,
-                dependencies=deps,
-            )
-
-        except (OSError, IOError) as e:
-            return FileEntry(
-                path=path,
-                display_path=display,
-                content=None,
-                error=f"Error reading file: {e}",
-                language=language,
+        if snapshot is None:
+            return _build_entry(
+                path_str, max_file_size, workspace_root, use_relative_paths, None
             )
+        key = (
+            "file_entry",
+            path_str,
+            max_file_size,
+            workspace_root,
+            use_relative_paths,
+        )
+        return snapshot.memo(
+            key,
+            lambda: _build_entry(
+                path_str, max_file_size, workspace_root, use_relative_paths, snapshot
+            ),
+        )
 
     if len(sorted_paths) > 5:
         with ThreadPoolExecutor(max_workers=min(8, len(sorted_paths))) as executor:
             return [e for e in executor.map(_process, sorted_paths) if e is not None]
     else:
         return [e for e in (_process(p) for p in sorted_paths) if e is not None]
+
+
+def _build_entry(
+    path_str: str,
+    max_file_size: int,
+    workspace_root: Optional[Path],
+    use_relative_paths: bool,
+    snapshot: Optional[ContentSnapshot],
+) -> Optional[FileEntry]:
+    """FileEntry cho 1 path (None neu khong phai file)."""
+    from shared.utils.path_utils import path_for_display
+
+    path = Path(path_str)
+    source = read_entry(path_str, max_file_size, snapshot)
+    if not source.is_file:
+        return None  # Skip, khong them entry (giong behavior cu)
+
+    display = path_for_display(path, workspace_root, use_relative_paths)
+    language = get_language_from_path(str(path))
+
+    def _skipped(error: str) -> FileEntry:
+        return FileEntry(
+            path=path,
+            display_path=display,
+            content=None,
+            error=error,
+            language=language,
+        )
+
+    if source.binary:
+        return _skipped("Binary file")
+    if source.size > max_file_size:
+        return _skipped(f"File too large ({source.size // 1024}KB)")
+    if source.content is None:
+        return _skipped(f"Error reading file: {source.error}")
+    if source.size == 0:
+        return FileEntry(
+            path=path,
+            display_path=display,
+            content="",
+            error=None,
+            language=language,
+        )
+
+    # Trich xuat metadata tu shared utility (dung noi dung da doc)
+    deps: list[str] = []
+    if workspace_root:
+        raw_deps = extract_local_imports(path, workspace_root, content=source.content)
+        for rd in raw_deps:
+            dotted = _path_to_dotted(rd)
+            if dotted.endswith(".__init__"):
+                dotted = dotted[:-9]
+            deps.append(dotted)
+
+    return FileEntry(
+        path=path,
+        display_path=display,
+        content=source.content,
+        error=None,
+        language=language,
+        dependencies=deps,
+    )
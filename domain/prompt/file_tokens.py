@@ -0,0 +1,70 @@
+"""
+File Tokens - Text dai dien cho 1 file khi dem per-file tokens.
+
+File codemap chi dua AST signatures vao prompt nen dem token tren codemap
+(neu parse duoc), con lai dem tren noi dung file.
+
+- token_text(): text dem token cua 1 file
+- count_file_tokens_cached(): per-file tokens qua FragmentCache
+"""
+
+from pathlib import Path
+from typing import List, Optional, Set
+
+from domain.prompt.content_snapshot import DEFAULT_MAX_FILE_BYTES
+from domain.prompt.fragment_cache import FragmentSession
+from shared.types.prompt_types_extra import FileTokenInfo
+from shared.utils.path_utils import path_for_display
+
+
+def token_text(path_str: str, content: Optional[str], is_codemap: bool) -> str:
+    """Text dung de dem token cua file (rong neu khong co noi dung)."""
+    if not content:
+        return ""
+    if is_codemap:
+        from domain.smart_context import smart_parse, is_supported
+
+        if is_supported(Path(path_str).suffix.lstrip(".")):
+            smart = smart_parse(path_str, content, include_relationships=False)
+            if smart:
+                return smart
+    return content
+
+
+def count_file_tokens_cached(
+    file_paths: List[Path],
+    workspace: Path,
+    use_relative_paths: bool,
+    dep_path_set: set[str],
+    codemap_set: Set[str],
+    fragments: FragmentSession,
+) -> List[FileTokenInfo]:
+    """
+    Per-file tokens qua fragment cache: file khong doi dung lai token count
+    theo content hash, khong doc lai.
+    """
+    result: list[FileTokenInfo] = []
+    for path_str in sorted({str(p) for p in file_paths}):
+        path = Path(path_str)
+        abs_path = path if path.is_absolute() else (workspace / path).resolve()
+        is_codemap = str(abs_path) in codemap_set
+        tokens = fragments.count(
+            path_str,
+            ("file_tokens", is_codemap),
+            DEFAULT_MAX_FILE_BYTES,
+            lambda e: (
+                token_text(path_str, e.content, is_codemap) if e.is_file else None
+            ),
+        )
+        if tokens is None:
+            continue  # Khong phai file (giong collect_files)
+        result.append(
+            FileTokenInfo(
+                path=path_for_display(path, workspace, use_relative_paths),
+                tokens=tokens,
+                is_dependency=str(path) in dep_path_set,
+                was_trimmed=False,
+                is_codemap=is_codemap,
+            )
+        )
+    return result
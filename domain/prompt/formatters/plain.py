@@ -7,6 +7,39 @@ Extracted tu: generate_file_contents_plain() trong core/prompt_generator.py
 from shared.types.prompt_types import FileEntry
 
 
+def format_file_plain(entry: FileEntry) -> str:
+    """
+    Render 1 FileEntry thanh plain text block.
+
+    Format:
+        FILE: path/to/file
+        ------------------
+        DEPENDS ON: ...
+
+        content
+    """
+    if entry.error:
+        if entry.error == "Binary file":
+            content_display = "Binary file (skipped)"
+        elif entry.error.startswith("File too large"):
+            content_display = f"{entry.error} (skipped)"
+        else:
+            content_display = entry.error
+    elif entry.content is not None:
+        # Metadata header
+        meta_lines = []
+        if entry.dependencies:
+            meta_lines.append(f"DEPENDS ON: {', '.join(entry.dependencies)}")
+
+        meta_block = "\n".join(meta_lines) + "\n" if meta_lines else ""
+        content_display = f"{meta_block}\n{entry.content.strip()}"
+    else:
+        content_display = ""
+
+    # Ghép tất cả lại: Header ranh giới, Metadata, rồi mới đến Code
+    return f"FILE: {entry.display_path}\n{'-' * (len(entry.display_path) + 6)}\n{content_display}"
+
+
 def format_files_plain(entries: list[FileEntry]) -> str:
     """
     Render List[FileEntry] thanh plain text format.
@@ -26,31 +59,7 @@ def format_files_plain(entries: list[FileEntry]) -> str:
     Returns:
         String chua file paths va contents dang plain text
     """
-    file_elements: list[str] = []
-
-    for entry in entries:
-        if entry.error:
-            if entry.error == "Binary file":
-                content_display = "Binary file (skipped)"
-            elif entry.error.startswith("File too large"):
-                content_display = f"{entry.error} (skipped)"
-            else:
-                content_display = entry.error
-        elif entry.content is not None:
-            # Metadata header
-            meta_lines = []
-            if entry.dependencies:
-                meta_lines.append(f"DEPENDS ON: {', '.join(entry.dependencies)}")
-
-            meta_block = "\n".join(meta_lines) + "\n" if meta_lines else ""
-            content_display = f"{meta_block}\n{entry.content.strip()}"
-        else:
-            content_display = ""
-
-        # Ghép tất cả lại: Header ranh giới, Metadata, rồi mới đến Code
-        file_elements.append(
-            f"FILE: {entry.display_path}\n{'-' * (len(entry.display_path) + 6)}\n{content_display}"
-        )
+    file_elements = [format_file_plain(entry) for entry in entries]
 
     if not file_elements:
         return "No files selected."
@@ -0,0 +1,283 @@
+"""
+Fragment Cache - Memo tung file block da render (kem token count) giua cac
+lan build prompt.
+
+PromptCache (copy_action_controller) chi giu 1 prompt hoan chinh moi mode:
+them 1 file vao selection 300 file la render + tokenize lai ca 300 block.
+FragmentCache giu tung block theo (path, content hash, variant) - variant gom
+output style, relative-path flag, codemap flag... - cung token count cua no.
+Build moi ghep tu fragment da co, chi render/dem cac file moi hoac da sua:
+chi phi O(so file thay doi).
+
+- FileFragment: block da render + token count
+- FragmentCache: LRU gioi han theo tong so ky tu, song qua nhieu lan build.
+  Content hash lay tu ContentHashIndex (path, mtime_ns, size) nen file khong
+  doi thi khong can doc lai.
+- FragmentSession: dung cache trong 1 lan build (gan voi ContentSnapshot),
+  ghi lai block theo thu tu xuat hien de dem token ca file contents.
+"""
+
+import os
+import stat as stat_module
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from domain.prompt.content_snapshot import (
+    ContentSnapshot,
+    SnapshotEntry,
+    read_entry,
+)
+from domain.prompt.token_ledger import TokenLedger
+from domain.tokenization.dedup import ContentHashIndex, content_hash
+from shared.utils.binary_cache import RACY_WINDOW_NS
+
+# Tong so ky tu fragment toi da giu trong cache (LRU)
+MAX_FRAGMENT_CHARS = 32 * 1024 * 1024
+# Chi phi co dinh moi entry (key, token count) tinh theo ky tu
+_ENTRY_OVERHEAD_CHARS = 256
+
+_Key = Tuple[str, bytes, Hashable]
+
+
+@dataclass(frozen=True, slots=True)
+class FileFragment:
+    """
+    Block da render cua 1 file.
+
+    Attributes:
+        text: Block (vd. `<file>` XML), rong voi variant chi luu token count
+        tokens: So token cua text (hoac cua noi dung da dem)
+    """
+
+    text: str
+    tokens: int
+
+
+class FragmentCache:
+    """
+    Fragment da render, dung lai giua cac lan build. Thread-safe.
+
+    Entry tu xoa khi tokenization service doi model (token count het dung).
+    """
+
+    def __init__(self, ledger: TokenLedger, max_chars: int = MAX_FRAGMENT_CHARS):
+        self._ledger = ledger
+        self._max_chars = max_chars
+        self._chars = 0
+        self._entries: "OrderedDict[_Key, FileFragment]" = OrderedDict()
+        self._by_path: Dict[str, Set[_Key]] = {}
+        self._hashes = ContentHashIndex()
+        self._generation: object = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def session(self, snapshot: ContentSnapshot) -> "FragmentSession":
+        """Phien dung cache cho 1 lan build tren snapshot cua lan do."""
+        return FragmentSession(self, snapshot)
+
+    def invalidate_path(self, path: str, created: bool = False) -> None:
+        """
+        File thay doi tren disk.
+
+        File moi tao (created) hoac da xoa co the doi ket qua resolve import
+        (`<dependencies>`) cua file khac -> xoa toan bo. File con ton tai chi
+        bi sua -> xoa entry cua no (khong co entry thi khong lam gi).
+        """
+        if created or not os.path.isfile(path):
+            self.clear()
+            return
+        self._hashes.remove(path)
+        with self._lock:
+            for key in self._by_path.pop(path, ()):
+                self._drop(key)
+
+    def clear(self) -> None:
+        self._hashes.clear()
+        with self._lock:
+            self._entries.clear()
+            self._by_path.clear()
+            self._chars = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _sync(self) -> object:
+        """Model generation hien tai; xoa entry cua model cu."""
+        generation = self._ledger.model_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._by_path.clear()
+                self._chars = 0
+                self._generation = generation
+        return generation
+
+    def _get(self, key: _Key) -> Optional[FileFragment]:
+        self._sync()
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fragment
+
+    def _put(self, key: _Key, fragment: FileFragment, generation: object) -> None:
+        size = len(fragment.text) + _ENTRY_OVERHEAD_CHARS
+        if size > self._max_chars:
+            return
+        with self._lock:
+            if generation != self._generation:
+                # Model doi trong luc render -> token count khong con dung
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = fragment
+            self._by_path.setdefault(key[0], set()).add(key)
+            self._chars += size
+            while self._chars > self._max_chars:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: _Key) -> None:
+        """Xoa 1 entry (goi khi dang giu lock)."""
+        fragment = self._entries.pop(key, None)
+        if fragment is None:
+            return
+        self._chars -= len(fragment.text) + _ENTRY_OVERHEAD_CHARS
+        keys = self._by_path.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_path[key[0]]
+
+
+class FragmentSession:
+    """
+    FragmentCache trong 1 lan build.
+
+    Content hash cua moi path duoc xac dinh 1 lan cho ca build; file chua co
+    trong cache duoc doc qua snapshot nhu binh thuong.
+    """
+
+    def __init__(self, cache: FragmentCache, snapshot: ContentSnapshot) -> None:
+        self._cache = cache
+        self.snapshot = snapshot
+        self._digests: Dict[str, bytes] = {}
+        self._segments: List[FileFragment] = []
+        self._lock = threading.Lock()
+
+    def fragment(
+        self,
+        path_str: str,
+        variant: Hashable,
+        max_file_size: int,
+        render: Callable[[SnapshotEntry], Optional[str]],
+    ) -> Optional[FileFragment]:
+        """
+        Block cua file cho variant, render(entry) khi chua co trong cache.
+
+        File khong co noi dung (binary, qua lon, loi doc) khong duoc cache.
+        """
+        return self._resolve(path_str, variant, max_file_size, render, keep_text=True)
+
+    def count(
+        self,
+        path_str: str,
+        variant: Hashable,
+        max_file_size: int,
+        text_of: Callable[[SnapshotEntry], Optional[str]],
+    ) -> Optional[int]:
+        """Token count cua text_of(entry) (vd. noi dung file), chi luu so."""
+        fragment = self._resolve(
+            path_str, variant, max_file_size, text_of, keep_text=False
+        )
+        return None if fragment is None else fragment.tokens
+
+    def record(self, fragments: List[FileFragment]) -> None:
+        """Ghi lai cac block theo thu tu xuat hien trong file contents."""
+        with self._lock:
+            self._segments.extend(fragments)
+
+    def segments(self) -> List[Tuple[str, int]]:
+        """(block, tokens) da ghi, dung cho TokenLedger.count_composite."""
+        with self._lock:
+            return [(f.text, f.tokens) for f in self._segments]
+
+    def _resolve(
+        self,
+        path_str: str,
+        variant: Hashable,
+        max_file_size: int,
+        render: Callable[[SnapshotEntry], Optional[str]],
+        keep_text: bool,
+    ) -> Optional[FileFragment]:
+        digest = self._known_digest(path_str)
+        if digest is not None:
+            cached = self._cache._get((path_str, digest, variant))
+            if cached is not None:
+                return cached
+
+        generation = self._cache._sync()
+        entry = read_entry(path_str, max_file_size, self.snapshot)
+        text = render(entry)
+        if text is None:
+            return None
+        if entry.content is None:
+            return FileFragment(text if keep_text else "", self._count(text, None))
+
+        fragment = FileFragment(
+            text if keep_text else "", self._count(text, entry.content)
+        )
+        key = (path_str, self._digest_of(entry), variant)
+        self._cache._put(key, fragment, generation)
+        return fragment
+
+    def _count(self, text: str, content: Optional[str]) -> int:
+        ledger = self._cache._ledger
+        if content is None or text == content:
+            return ledger.count_tokens(text)
+        # Block chua noi dung file: dem rieng noi dung (memo) + phan tag
+        return ledger.count_composite(text, (content, content.strip()))
+
+    def _known_digest(self, path_str: str) -> Optional[bytes]:
+        """Content hash cua path khong can doc file (None neu chua biet)."""
+        with self._lock:
+            digest = self._digests.get(path_str)
+        if digest is not None:
+            return digest
+
+        if path_str in self.snapshot:
+            # Cung phien ban voi cac buoc khac cua build
+            entry = self.snapshot.get(path_str)
+            if not entry.is_file:
+                return None
+            mtime_ns, size = entry.mtime_ns, entry.size
+        else:
+            try:
+                st = os.stat(path_str)
+            except OSError:
+                return None
+            if not stat_module.S_ISREG(st.st_mode):
+                return None
+            mtime_ns, size = st.st_mtime_ns, st.st_size
+
+        digest = self._cache._hashes.get(path_str, mtime_ns, size)
+        if digest is not None:
+            with self._lock:
+                digest = self._digests.setdefault(path_str, digest)
+        return digest
+
+    def _digest_of(self, entry: SnapshotEntry) -> bytes:
+        """Hash cua noi dung vua render, ghi vao index neu stat dang tin."""
+        digest = content_hash(entry.content or "")
+        if time.time_ns() - entry.mtime_ns >= RACY_WINDOW_NS:
+            self._cache._hashes.put(entry.path, entry.mtime_ns, entry.size, digest)
+        with self._lock:
+            self._digests.setdefault(entry.path, digest)
+        return digest
@@ -13,10 +13,9 @@ Giu lai trong file nay:
 
 import logging
 from pathlib import Path
-from typing import Optional, Set
+from typing import Callable, Hashable, Optional, Set
 
 from domain.smart_context.tree_item import TreeItem
-from shared.utils.file_utils import is_binary_file
 
 # Single source of truth cho path display
 from shared.utils.path_utils import path_for_display
@@ -25,11 +24,14 @@ from shared.types.git_types import GitDiffResult, GitLogResult
 from domain.config.output_format import OutputStyle
 
 # === Pipeline imports ===
+from domain.prompt.content_snapshot import ContentSnapshot, SnapshotEntry, read_entry
 from domain.prompt.file_collector import collect_files
 from domain.prompt.formatters.xml import (
     format_files_xml,
+    format_files_xml_elements,
 )
-from domain.prompt.formatters.plain import format_files_plain
+from domain.prompt.formatters.plain import format_file_plain, format_files_plain
+from domain.prompt.fragment_cache import FileFragment, FragmentSession
 from domain.prompt.assembler import (
     assemble_prompt,
     assemble_smart_prompt,
@@ -195,6 +197,8 @@ def generate_file_contents_xml(
     workspace_root: Optional[Path] = None,
     use_relative_paths: bool = False,
     codemap_paths: Optional[Set[str]] = None,
+    snapshot: Optional[ContentSnapshot] = None,
+    fragments: Optional[FragmentSession] = None,
 ) -> str:
     """
     Tao file contents theo Repomix XML format.
@@ -210,6 +214,9 @@ def generate_file_contents_xml(
         use_relative_paths: Su dung relative paths
         codemap_paths: Optional set cac file paths chi lay codemap (AST signatures).
                        Paths co the la absolute hoac relative tuy theo use_relative_paths.
+        snapshot: Noi dung file da doc cua lan build (None = doc tu disk)
+        fragments: Fragment cache cua lan build - file khong doi dung lai
+            block da render (None = render tat ca)
 
     Returns:
         File contents string voi XML structure
@@ -248,26 +255,34 @@ def generate_file_contents_xml(
             norm_to_orig[n] for n in codemap_only_normalized if n in norm_to_orig
         }
 
-        full_entries = []
+        full_elements: list[str] = []
         if full_paths:
-            full_entries = collect_files(
-                full_paths, max_file_size, workspace_root, use_relative_paths
+            full_elements = _xml_file_elements(
+                full_paths,
+                max_file_size,
+                workspace_root,
+                use_relative_paths,
+                snapshot,
+                fragments,
             )
 
         # Generate codemap cho codemap-only files (dang XML strings lẻ)
         codemap_xml_elements = []
         if codemap_only:
             codemap_xml_elements = _generate_codemap_xml_elements(
-                codemap_only, max_file_size, workspace_root, use_relative_paths
+                codemap_only,
+                max_file_size,
+                workspace_root,
+                use_relative_paths,
+                snapshot,
+                fragments,
             )
 
         # Build final XML structure
         file_elements: list[str] = []
 
         # 1. Add full content nodes
-        from domain.prompt.formatters.xml import format_files_xml_elements
-
-        file_elements.extend(format_files_xml_elements(full_entries))
+        file_elements.extend(full_elements)
 
         # 2. Add codemap nodes
         file_elements.extend(codemap_xml_elements)
@@ -276,78 +291,177 @@ def generate_file_contents_xml(
             return "<files></files>"
 
         return "<files>\n" + "\n".join(file_elements) + "\n</files>"
+    elif fragments is not None:
+        file_elements = _xml_file_elements(
+            selected_paths,
+            max_file_size,
+            workspace_root,
+            use_relative_paths,
+            snapshot,
+            fragments,
+        )
+        if not file_elements:
+            return "<files></files>"
+        return "<files>\n" + "\n".join(file_elements) + "\n</files>"
     else:
         entries = collect_files(
-            selected_paths, max_file_size, workspace_root, use_relative_paths
+            selected_paths, max_file_size, workspace_root, use_relative_paths, snapshot
         )
         return format_files_xml(entries)
 
 
+def _cached_blocks(
+    paths: Set[str],
+    variant: Hashable,
+    max_file_size: int,
+    fragments: FragmentSession,
+    render: Callable[[str, SnapshotEntry], Optional[str]],
+) -> list[str]:
+    """
+    Block cua tung file (sort theo path), lay tu fragment cache neu co.
+
+    Chi file moi/da sua duoc render. Block duoc ghi vao session theo thu tu
+    de dem token file contents theo tung block.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    sorted_paths = sorted(paths)
+
+    def _one(path_str: str) -> Optional[FileFragment]:
+        return fragments.fragment(
+            path_str, variant, max_file_size, lambda entry: render(path_str, entry)
+        )
+
+    if len(sorted_paths) > 5:
+        with ThreadPoolExecutor(max_workers=min(8, len(sorted_paths))) as executor:
+            results = list(executor.map(_one, sorted_paths))
+    else:
+        results = [_one(p) for p in sorted_paths]
+
+    blocks = [fragment for fragment in results if fragment is not None]
+    fragments.record(blocks)
+    return [fragment.text for fragment in blocks]
+
+
+def _xml_file_elements(
+    paths: Set[str],
+    max_file_size: int,
+    workspace_root: Optional[Path],
+    use_relative_paths: bool,
+    snapshot: Optional[ContentSnapshot],
+    fragments: Optional[FragmentSession],
+) -> list[str]:
+    """<file> nodes (full content) cua cac paths."""
+    if fragments is None:
+        entries = collect_files(
+            paths, max_file_size, workspace_root, use_relative_paths, snapshot
+        )
+        return format_files_xml_elements(entries)
+
+    def _render(path_str: str, _entry: SnapshotEntry) -> Optional[str]:
+        entries = collect_files(
+            {path_str},
+            max_file_size,
+            workspace_root,
+            use_relative_paths,
+            fragments.snapshot,
+        )
+        elements = format_files_xml_elements(entries)
+        return elements[0] if elements else None
+
+    variant = ("xml", str(workspace_root), use_relative_paths, max_file_size)
+    return _cached_blocks(paths, variant, max_file_size, fragments, _render)
+
+
 def _generate_codemap_xml_elements(
     paths: set[str],
     max_file_size: int,
     workspace_root: Optional[Path],
     use_relative_paths: bool,
+    snapshot: Optional[ContentSnapshot] = None,
+    fragments: Optional[FragmentSession] = None,
 ) -> list[str]:
     """
     Generate XML elements (<file> tags) cho codemap-only files.
     """
-    from domain.smart_context import smart_parse, is_supported
-    from xml.sax.saxutils import escape as xml_escape
 
-    def _xml_attr_escape(s: str) -> str:
-        """Escape string for XML attribute value."""
-        return xml_escape(s, {'"': "&quot;"})
+    def _render(path_str: str, source: SnapshotEntry) -> Optional[str]:
+        return _codemap_xml_element(
+            path_str, source, max_file_size, workspace_root, use_relative_paths
+        )
+
+    if fragments is not None:
+        variant = (
+            "xml-codemap",
+            str(workspace_root),
+            use_relative_paths,
+            max_file_size,
+        )
+        return _cached_blocks(paths, variant, max_file_size, fragments, _render)
 
     elements: list[str] = []
 
     for path_str in sorted(paths):
-        path = Path(path_str)
-
         try:
-            if not path.is_file():
-                continue
+            # Doc file 1 lan duy nhat (hoac lay tu snapshot cua lan build)
+            source = read_entry(path_str, max_file_size, snapshot)
+        except (OSError, IOError):
+            continue
+        element = _render(path_str, source)
+        if element is not None:
+            elements.append(element)
 
-            if is_binary_file(path):
-                continue
+    return elements
+
+
+def _codemap_xml_element(
+    path_str: str,
+    source: SnapshotEntry,
+    max_file_size: int,
+    workspace_root: Optional[Path],
+    use_relative_paths: bool,
+) -> Optional[str]:
+    """<file> tag codemap (hoac codemap-fallback) cua 1 file, None = skip."""
+    from domain.smart_context import smart_parse, is_supported
+    from xml.sax.saxutils import escape as xml_escape
 
-            try:
-                file_size = path.stat().st_size
-                if file_size > max_file_size:
-                    continue
-            except OSError:
-                continue  # Khong doc duoc metadata -> skip an toan
+    def _xml_attr_escape(s: str) -> str:
+        """Escape string for XML attribute value."""
+        return xml_escape(s, {'"': "&quot;"})
 
-            display_path = path_for_display(path, workspace_root, use_relative_paths)
+    path = Path(path_str)
 
-            # Doc file 1 lan duy nhat
-            raw_content = path.read_text(encoding="utf-8", errors="replace")
+    try:
+        if source.binary or source.size > max_file_size:
+            return None
+        raw_content = source.content
+        if raw_content is None:
+            return None  # Khong phai file / khong doc duoc -> skip an toan
 
-            # Try smart parse (AST signatures)
-            ext = path.suffix.lstrip(".")
-            if is_supported(ext):
-                smart_content = smart_parse(
-                    path_str, raw_content, include_relationships=False
-                )
-                if smart_content is not None:
-                    elements.append(
-                        f'  <file path="{_xml_attr_escape(display_path)}" context="codemap">\n'
-                        f"    <content><![CDATA[\n{smart_content}\n]]></content>\n"
-                        f"  </file>"
-                    )
-                    continue
+        display_path = path_for_display(path, workspace_root, use_relative_paths)
 
-            # Fallback
-            elements.append(
-                f'  <file path="{_xml_attr_escape(display_path)}" context="codemap-fallback">\n'
-                f"    <content><![CDATA[\n{raw_content}\n]]></content>\n"
-                f"  </file>"
+        # Try smart parse (AST signatures)
+        ext = path.suffix.lstrip(".")
+        if is_supported(ext):
+            smart_content = smart_parse(
+                path_str, raw_content, include_relationships=False
             )
+            if smart_content is not None:
+                return (
+                    f'  <file path="{_xml_attr_escape(display_path)}" context="codemap">\n'
+                    f"    <content><![CDATA[\n{smart_content}\n]]></content>\n"
+                    f"  </file>"
+                )
 
-        except (OSError, IOError):
-            continue
+        # Fallback
+        return (
+            f'  <file path="{_xml_attr_escape(display_path)}" context="codemap-fallback">\n'
+            f"    <content><![CDATA[\n{raw_content}\n]]></content>\n"
+            f"  </file>"
+        )
 
-    return elements
+    except (OSError, IOError):
+        return None
 
 
 def generate_file_contents_plain(
@@ -356,6 +470,8 @@ def generate_file_contents_plain(
     workspace_root: Optional[Path] = None,
     use_relative_paths: bool = False,
     codemap_paths: Optional[Set[str]] = None,
+    snapshot: Optional[ContentSnapshot] = None,
+    fragments: Optional[FragmentSession] = None,
 ) -> str:
     """
     Tao file contents theo Plain Text format.
@@ -366,6 +482,8 @@ def generate_file_contents_plain(
         workspace_root: Workspace root
         use_relative_paths: Su dung relative paths
         codemap_paths: Optional set cac file paths chi lay codemap
+        snapshot: Noi dung file da doc cua lan build (None = doc tu disk)
+        fragments: Fragment cache cua lan build (None = render tat ca)
 
     Returns:
         String chua file paths va contents dang plain text
@@ -408,59 +526,131 @@ def generate_file_contents_plain(
 
         # Full content files
         if full_paths:
-            entries = collect_files(
-                full_paths, max_file_size, workspace_root, use_relative_paths
+            full_text = _plain_file_contents(
+                full_paths,
+                max_file_size,
+                workspace_root,
+                use_relative_paths,
+                snapshot,
+                fragments,
             )
-            full_text = format_files_plain(entries)
             if full_text.strip():
                 parts.append(full_text)
 
         # Codemap files
         if codemap_only:
-            from domain.smart_context import smart_parse, is_supported
 
-            for path_str in sorted(codemap_only):
-                path = Path(path_str)
-                try:
-                    if not path.is_file() or is_binary_file(path):
-                        continue
+            def _render(path_str: str, source: SnapshotEntry) -> Optional[str]:
+                return _codemap_plain_part(
+                    path_str, source, workspace_root, use_relative_paths
+                )
 
-                    display_path = path_for_display(
-                        path, workspace_root, use_relative_paths
+            if fragments is not None:
+                variant = ("plain-codemap", str(workspace_root), use_relative_paths)
+                parts.extend(
+                    _cached_blocks(
+                        codemap_only, variant, max_file_size, fragments, _render
                     )
-                    ext = path.suffix.lstrip(".")
-                    raw_content = path.read_text(encoding="utf-8", errors="replace")
-
-                    if is_supported(ext):
-                        smart_content = smart_parse(
-                            path_str, raw_content, include_relationships=False
-                        )
-                        if smart_content is not None:
-                            # Standardize plaintext header to match format_files_plain (FILE: path)
-                            parts.append(
-                                f"FILE: {display_path} [codemap]\n"
-                                f"{'-' * (len(display_path) + 16)}\n"
-                                f"{smart_content}"
-                            )
-                            continue
-
-                    # Fallback
-                    parts.append(
-                        f"FILE: {display_path} [codemap-fallback]\n"
-                        f"{'-' * (len(display_path) + 25)}\n"
-                        f"{raw_content}"
-                    )
-
-                except (OSError, IOError):
-                    continue
+                )
+            else:
+                for path_str in sorted(codemap_only):
+                    try:
+                        source = read_entry(path_str, max_file_size, snapshot)
+                    except (OSError, IOError):
+                        continue
+                    part = _render(path_str, source)
+                    if part is not None:
+                        parts.append(part)
 
         return "\n\n".join(parts)
     else:
+        return _plain_file_contents(
+            selected_paths,
+            max_file_size,
+            workspace_root,
+            use_relative_paths,
+            snapshot,
+            fragments,
+        )
+
+
+def _plain_file_contents(
+    paths: Set[str],
+    max_file_size: int,
+    workspace_root: Optional[Path],
+    use_relative_paths: bool,
+    snapshot: Optional[ContentSnapshot],
+    fragments: Optional[FragmentSession],
+) -> str:
+    """Plain text blocks (full content) cua cac paths."""
+    if fragments is None:
         entries = collect_files(
-            selected_paths, max_file_size, workspace_root, use_relative_paths
+            paths, max_file_size, workspace_root, use_relative_paths, snapshot
         )
         return format_files_plain(entries)
 
+    def _render(path_str: str, _entry: SnapshotEntry) -> Optional[str]:
+        entries = collect_files(
+            {path_str},
+            max_file_size,
+            workspace_root,
+            use_relative_paths,
+            fragments.snapshot,
+        )
+        return format_file_plain(entries[0]) if entries else None
+
+    variant = ("plain", str(workspace_root), use_relative_paths, max_file_size)
+    blocks = _cached_blocks(paths, variant, max_file_size, fragments, _render)
+    if not blocks:
+        return "No files selected."
+    return "\n\n".join(blocks)
+
+
+def _codemap_plain_part(
+    path_str: str,
+    source: SnapshotEntry,
+    workspace_root: Optional[Path],
+    use_relative_paths: bool,
+) -> Optional[str]:
+    """Plain text codemap (hoac codemap-fallback) cua 1 file, None = skip."""
+    from domain.smart_context import smart_parse, is_supported
+
+    path = Path(path_str)
+    try:
+        if not source.is_file or source.binary:
+            return None
+        raw_content = source.content
+        if raw_content is None:
+            if source.error is not None:
+                return None
+            # Codemap plain khong gioi han kich thuoc -> doc thang
+            raw_content = path.read_text(encoding="utf-8", errors="replace")
+
+        display_path = path_for_display(path, workspace_root, use_relative_paths)
+        ext = path.suffix.lstrip(".")
+
+        if is_supported(ext):
+            smart_content = smart_parse(
+                path_str, raw_content, include_relationships=False
+            )
+            if smart_content is not None:
+                # Standardize plaintext header to match format_files_plain (FILE: path)
+                return (
+                    f"FILE: {display_path} [codemap]\n"
+                    f"{'-' * (len(display_path) + 16)}\n"
+                    f"{smart_content}"
+                )
+
+        # Fallback
+        return (
+            f"FILE: {display_path} [codemap-fallback]\n"
+            f"{'-' * (len(display_path) + 25)}\n"
+            f"{raw_content}"
+        )
+
+    except (OSError, IOError):
+        return None
+
 
 # ===========================================================================
 # Smart Context - Tree-sitter specific (giu nguyen logic rieng)
@@ -473,6 +663,8 @@ def generate_smart_context(
     include_relationships: bool = False,
     workspace_root: Optional[Path] = None,
     use_relative_paths: bool = False,
+    snapshot: Optional[ContentSnapshot] = None,
+    fragments: Optional[FragmentSession] = None,
 ) -> str:
     """
     Tao Smart Context string - chi chua code structure (signatures, docstrings).
@@ -487,6 +679,9 @@ def generate_smart_context(
         selected_paths: Set cac duong dan file duoc tick
         max_file_size: Maximum file size to include (default 1MB)
         include_relationships: Neu True, append relationships section (CodeMaps)
+        snapshot: Noi dung file da doc cua lan build (None = doc tu disk)
+        fragments: Fragment cache cua lan build. Khong dung khi
+            include_relationships (ket qua phu thuoc file khac)
 
     Returns:
         Smart context string voi code signatures
@@ -501,26 +696,34 @@ def generate_smart_context(
         Process mot file va return (path, smart_content, error).
         Helper function cho parallel processing.
         """
+        try:
+            source = read_entry(path_str, max_file_size, snapshot)
+        except (OSError, IOError) as e:
+            return (Path(path_str), None, f"Error reading file: {e}")
+        return _process_source(path_str, source)
+
+    def _process_source(
+        path_str: str, source: SnapshotEntry
+    ) -> tuple[Path, str | None, str | None]:
+        """(path, smart_content, error) tu noi dung da doc."""
         path = Path(path_str)
 
         try:
-            if not path.is_file():
+            if not source.is_file:
                 return (path, None, "Not a file")
 
             # Skip binary files (check magic bytes)
-            if is_binary_file(path):
+            if source.binary:
                 return (path, None, "Binary file")
 
             # Skip files qua lon
-            try:
-                file_size = path.stat().st_size
-                if file_size > max_file_size:
-                    return (path, None, f"File too large ({file_size // 1024}KB)")
-            except OSError:
-                pass
-
-            # Doc raw content
-            raw_content = path.read_text(encoding="utf-8", errors="replace")
+            if source.size > max_file_size:
+                return (path, None, f"File too large ({source.size // 1024}KB)")
+
+            # Raw content (doc 1 lan, hoac tu snapshot)
+            raw_content = source.content
+            if raw_content is None:
+                return (path, None, f"Error reading file: {source.error}")
 
             # Kiem tra ho tro Smart Context
             ext = path.suffix.lstrip(".")
@@ -543,6 +746,34 @@ def generate_smart_context(
         except (OSError, IOError) as e:
             return (path, None, f"Error reading file: {e}")
 
+    # Border 36 chars
+    BORDER = "────────────────────────────────────"
+
+    def _format_block(
+        path: Path, smart_content: str | None, error: str | None
+    ) -> Optional[str]:
+        path_display = path_for_display(path, workspace_root, use_relative_paths)
+        if error:
+            return (
+                f"{BORDER}\nFile: {path_display}\n{BORDER}\n*** Skipped: {error} ***\n"
+            )
+        if smart_content is not None:
+            # Opus 4.6 Format: Border -> File Path -> Border -> Content
+            # Loai bo markdown delimiters (` ``` `) de tranh AI bi roi khi nén
+            return f"{BORDER}\nFile: {path_display}\n{BORDER}\n{smart_content}\n"
+        return None
+
+    if fragments is not None and not include_relationships:
+        variant = ("smart", str(workspace_root), use_relative_paths, max_file_size)
+        blocks = _cached_blocks(
+            selected_paths,
+            variant,
+            max_file_size,
+            fragments,
+            lambda path_str, source: _format_block(*_process_source(path_str, source)),
+        )
+        return "\n".join(blocks).strip()
+
     # Phase 1: Process files (parallel neu >5 files, sequential neu it)
     file_data: list[tuple[Path, str | None, str | None]] = []
     all_contents: list[str] = []
@@ -563,22 +794,10 @@ def generate_smart_context(
 
     # Phase 2: Generate output
     contents: list[str] = []
-
-    # Border 36 chars
-    BORDER = "────────────────────────────────────"
-
     for path, smart_content, error in file_data:
-        path_display = path_for_display(path, workspace_root, use_relative_paths)
-        if error:
-            contents.append(
-                f"{BORDER}\nFile: {path_display}\n{BORDER}\n*** Skipped: {error} ***\n"
-            )
-        elif smart_content is not None:
-            # Opus 4.6 Format: Border -> File Path -> Border -> Content
-            # Loai bo markdown delimiters (` ``` `) de tranh AI bi roi khi nén
-            contents.append(
-                f"{BORDER}\nFile: {path_display}\n{BORDER}\n{smart_content}\n"
-            )
+        block = _format_block(path, smart_content, error)
+        if block is not None:
+            contents.append(block)
 
     return "\n".join(contents).strip()
 
@@ -0,0 +1,112 @@
+"""
+Prompt Sink - Dich ghi prompt theo tung fragment (streaming).
+
+Prompt cua context lon (hang tram MB) khong can ghep thanh 1 chuoi roi moi
+ghi: assembler yield tung fragment (xem assembler.iter_prompt) va sink ghi
+thang ra dich (file, clipboard...). Bo nho tam chi con co 1 fragment.
+
+- PromptSink: interface (write/close, dung duoc voi `with`)
+- StringSink: gom fragment lai khi can prompt dang str
+- FileSink: ghi utf-8 thang ra file, fragment lon ghi theo tung chunk
+- TokenCountingSink: boc 1 sink khac, dem token tung fragment khi ghi qua
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, TextIO
+
+# Fragment lon hon nguong nay ghi theo tung chunk (encode utf-8 tung phan)
+WRITE_CHUNK_CHARS = 1 << 20
+
+
+class PromptSink(ABC):
+    """Dich nhan prompt theo tung fragment, theo dung thu tu."""
+
+    @abstractmethod
+    def write(self, fragment: str) -> None:
+        """Ghi 1 fragment tiep theo cua prompt."""
+        ...
+
+    def close(self) -> None:
+        """Ket thuc prompt (flush/dong tai nguyen). Mac dinh khong lam gi."""
+
+    def __enter__(self) -> "PromptSink":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class StringSink(PromptSink):
+    """Gom cac fragment, getvalue() tra ve prompt hoan chinh."""
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+
+    def write(self, fragment: str) -> None:
+        if fragment:
+            self._parts.append(fragment)
+
+    def getvalue(self) -> str:
+        return "".join(self._parts)
+
+
+class FileSink(PromptSink):
+    """
+    Ghi prompt ra file utf-8 (newline giong Path.write_text).
+
+    File duoc mo o lan write() dau tien va dong khi close().
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.chars_written = 0
+        self._file: Optional[TextIO] = None
+
+    def write(self, fragment: str) -> None:
+        if not fragment:
+            return
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8")
+        if len(fragment) <= WRITE_CHUNK_CHARS:
+            self._file.write(fragment)
+        else:
+            # Tranh encode ca fragment lon thanh 1 khoi bytes
+            for start in range(0, len(fragment), WRITE_CHUNK_CHARS):
+                self._file.write(fragment[start : start + WRITE_CHUNK_CHARS])
+        self.chars_written += len(fragment)
+
+    def close(self) -> None:
+        if self._file is None:
+            # Prompt rong van tao file (giong write_text(""))
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._file.close()
+
+
+class TokenCountingSink(PromptSink):
+    """
+    Chuyen tiep fragment sang sink khac va cong don token cua tung fragment.
+
+    Tong theo fragment co the lech vai token moi ranh gioi so voi tokenize
+    ca prompt (giong TokenLedger.count_composite).
+    """
+
+    def __init__(self, inner: PromptSink, count_tokens: Callable[[str], int]) -> None:
+        self._inner = inner
+        self._count_tokens = count_tokens
+        self.tokens = 0
+
+    def write(self, fragment: str) -> None:
+        if not fragment:
+            return
+        self.tokens += self._count_tokens(fragment)
+        self._inner.write(fragment)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+def write_fragments(fragments: Iterable[str], sink: PromptSink) -> None:
+    """Ghi lan luot cac fragment vao sink (khong close sink)."""
+    for fragment in fragments:
+        sink.write(fragment)
@@ -0,0 +1,157 @@
+"""
+Token Ledger - Dem token cho prompt theo segment, moi segment dem 1 lan.
+
+Build prompt truoc day tokenize: ca prompt, roi tung phan cho breakdown, roi
+tung file cho per-file tokens, va lap lai sau khi trim. Ledger thay the bang:
+- count_tokens(text): memo theo content hash (cung API voi
+  ITokenizationService.count_tokens nen truyen thang vao cac helper cu)
+- count_composite(text, segments): tong token cua text lon = tong count cua
+  cac segment (tim thay trong text) + count cua phan noi giua chung (tag,
+  header, separator). Segment co the kem count da biet (vd. tu FragmentCache)
+  de khong phai hash/dem lai. Ket qua cung duoc memo.
+
+Tong cong theo segment co the lech vai token moi ranh gioi so voi tokenize
+ca prompt 1 lan (BPE merge qua ranh gioi), du cho hien thi va budget.
+Memo tu xoa khi tokenization service doi model (model_generation()).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Tuple, Union
+
+from domain.tokenization.dedup import content_hash
+
+if TYPE_CHECKING:
+    from domain.ports.tokenization_port import ITokenizationService
+
+# So entry memo toi da (LRU)
+MAX_MEMO_ENTRIES = 8192
+# Text ngan hon nguong nay dem truc tiep, khong memo (hash ton hon dem)
+MIN_MEMO_CHARS = 64
+
+
+# Segment cua count_composite: text, hoac (text, token count da biet)
+Segment = Union[str, Tuple[str, int]]
+
+
+class TokenLedger:
+    """Bo dem token co memo theo content hash, thread-safe."""
+
+    def __init__(
+        self,
+        tokenization_service: "ITokenizationService",
+        max_entries: int = MAX_MEMO_ENTRIES,
+    ) -> None:
+        self._tok = tokenization_service
+        self._max_entries = max_entries
+        self._memo: "OrderedDict[bytes, int]" = OrderedDict()
+        self._generation: Any = None
+        self._lock = threading.Lock()
+
+    def count_tokens(self, text: str) -> int:
+        """Dem token cua text, dung lai ket qua cho text da dem."""
+        if not text:
+            return 0
+        if len(text) < MIN_MEMO_CHARS:
+            return self._tok.count_tokens(text)
+        key = content_hash(text)
+        cached, generation = self._lookup(key)
+        if cached is not None:
+            return cached
+        count = self._tok.count_tokens(text)
+        self._remember(key, count, generation)
+        return count
+
+    def count_composite(
+        self,
+        text: str,
+        segments: Iterable[Segment],
+        max_gap: Optional[int] = None,
+    ) -> int:
+        """
+        Dem token cua text ghep tu cac segment da biet.
+
+        Segment khong tim thay trong text duoc bo qua; phan do duoc dem nhu
+        phan noi.
+
+        Args:
+            text: Text hoan chinh (vd. ca prompt)
+            segments: Cac doan con cua text, theo thu tu xuat hien; phan tu
+                (segment, count) dung count da biet thay vi dem lai
+            max_gap: Khoang cach toi da giua 2 segment lien tiep (gioi han
+                vung tim kiem khi co nhieu segment, vd. cac file block)
+        """
+        if not text:
+            return 0
+        key = content_hash(text) if len(text) >= MIN_MEMO_CHARS else None
+        generation = None
+        if key is not None:
+            cached, generation = self._lookup(key)
+            if cached is not None:
+                return cached
+
+        total = 0
+        cursor = 0
+        for start, end, known in self._locate(text, segments, max_gap):
+            total += self.count_tokens(text[cursor:start])
+            if known is None:
+                known = self.count_tokens(text[start:end])
+            total += known
+            cursor = end
+        total += self.count_tokens(text[cursor:])
+
+        if key is not None:
+            self._remember(key, total, generation)
+        return total
+
+    def model_generation(self) -> Any:
+        """Generation cua tokenization service (doi khi doi model)."""
+        return self._tok.model_generation()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+
+    @staticmethod
+    def _locate(
+        text: str, segments: Iterable[Segment], max_gap: Optional[int]
+    ) -> List[Tuple[int, int, Optional[int]]]:
+        """(start, end, count da biet) lien tiep, khong chong lan cua segment."""
+        spans: List[Tuple[int, int, Optional[int]]] = []
+        search_from = 0
+        for item in segments:
+            segment, known = (item, None) if isinstance(item, str) else item
+            if len(segment) < MIN_MEMO_CHARS:
+                continue
+            if max_gap is None:
+                pos = text.find(segment, search_from)
+            else:
+                limit = search_from + max_gap + len(segment)
+                pos = text.find(segment, search_from, limit)
+            if pos >= 0:
+                spans.append((pos, pos + len(segment), known))
+                search_from = pos + len(segment)
+        return spans
+
+    def _lookup(self, key: bytes) -> Tuple[Optional[int], Any]:
+        """(count da memo hoac None, model generation hien tai)."""
+        generation = self._tok.model_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._memo.clear()
+                self._generation = generation
+                return None, generation
+            count = self._memo.get(key)
+            if count is not None:
+                self._memo.move_to_end(key)
+            return count, generation
+
+    def _remember(self, key: bytes, count: int, generation: Any) -> None:
+        with self._lock:
+            if generation != self._generation:
+                # Model doi trong luc dem -> count khong con dung
+                return
+            self._memo[key] = count
+            self._memo.move_to_end(key)
+            while len(self._memo) > self._max_entries:
+                self._memo.popitem(last=False)
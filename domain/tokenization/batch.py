@@ -19,8 +19,11 @@ TASKS_PER_WORKER = 100
 # So file toi thieu de trigger parallel processing
 MIN_FILES_FOR_PARALLEL = 10
 
+# Thread toi da khi encoder giu GIL: 1 thread encode + 1 thread doc file
+GIL_BOUND_MAX_WORKERS = 2
 
-def get_worker_count(num_tasks: int) -> int:
+
+def get_worker_count(num_tasks: int, releases_gil: bool = True) -> int:
     """
     Tinh so luong workers toi uu dua tren so luong tasks va CPU cores.
 
@@ -28,13 +31,18 @@ def get_worker_count(num_tasks: int) -> int:
     - Moi worker xu ly ~100 tasks.
     - Khong vuot qua so CPU cores.
     - Toi thieu 1 worker.
+    - Thread workers voi encoder giu GIL: toi da GIL_BOUND_MAX_WORKERS
+      (process workers co GIL rieng -> releases_gil=True).
 
     Args:
         num_tasks: So luong tasks can xu ly.
+        releases_gil: Workers co chay encode song song duoc khong.
 
     Returns:
         So luong workers toi uu.
     """
     cpu_count = os.cpu_count() or 4
     calculated = (num_tasks + TASKS_PER_WORKER - 1) // TASKS_PER_WORKER
+    if not releases_gil:
+        calculated = min(calculated, GIL_BOUND_MAX_WORKERS)
     return max(1, min(cpu_count, calculated))
@@ -1,40 +1,142 @@
 """
 Token cache voi LRU eviction va mtime-based invalidation.
 
-Thread-safe OrderedDict cache:
+Sharded cache: path duoc hash vao 1 trong N shard, moi shard co lock va
+OrderedDict rieng -> nhieu workers dem song song khong tranh nhau 1 lock.
 - Key: file path string
 - Value: (mtime, token_count)
-- Eviction: Khi dat MAX_CACHE_SIZE, xoa entries cu nhat (FIFO)
+- Gioi han theo bo nho (byte budget chia deu cho cac shard) thay vi so
+  entry; budget co gian theo so file cua workspace (resize_for_entries)
+- Eviction: LRU trong tung shard
 - Invalidation: Khi file thay doi (mtime khac), cache miss
+- Dem hits/misses/evictions cho monitoring (stats())
 """
 
+import sys
 import threading
 from collections import OrderedDict
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-# Maximum so entries trong cache
+# So entries toi da mac dinh khi dung che do gioi han theo so entry
 MAX_CACHE_SIZE = 2000
+# So shard mac dinh (lock striping)
+DEFAULT_SHARDS = 16
+# Chi phi 1 entry ngoai path: node OrderedDict + tuple + float + int
+ENTRY_OVERHEAD_BYTES = 208
+# Uoc luong 1 entry (kem path ~100 ky tu) khi tinh budget theo so file
+ESTIMATED_ENTRY_BYTES = 360
+# Budget mac dinh truoc khi biet kich thuoc workspace (~45k entries)
+DEFAULT_BUDGET_BYTES = 16 * 1024 * 1024
+MIN_BUDGET_BYTES = 4 * 1024 * 1024
+MAX_BUDGET_BYTES = 256 * 1024 * 1024
+# Du phong so voi so file cua workspace (file moi, nhieu workspace)
+WORKSPACE_HEADROOM = 1.25
+
+
+def _entry_bytes(path: str) -> int:
+    return sys.getsizeof(path) + ENTRY_OVERHEAD_BYTES
+
+
+class _Shard:
+    """1 phan cua cache: OrderedDict + lock + bo dem rieng."""
+
+    __slots__ = (
+        "lock",
+        "store",
+        "bytes",
+        "max_bytes",
+        "max_entries",
+        "hits",
+        "misses",
+        "evictions",
+    )
+
+    def __init__(self, max_bytes: int, max_entries: Optional[int]) -> None:
+        self.lock = threading.Lock()
+        self.store: OrderedDict[str, Tuple[float, int]] = OrderedDict()
+        self.bytes = 0
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, path: str, mtime: float, move: bool) -> Optional[int]:
+        """Goi khi dang giu lock."""
+        cached = self.store.get(path)
+        if cached is not None and cached[0] == mtime:
+            if move:
+                self.store.move_to_end(path)
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        return None
+
+    def insert(self, path: str, mtime: float, count: int) -> None:
+        """Goi khi dang giu lock. Entry moi/cap nhat thanh MRU."""
+        if path in self.store:
+            self.store[path] = (mtime, count)
+            self.store.move_to_end(path)
+            return
+        size = _entry_bytes(path)
+        self.store[path] = (mtime, count)
+        self.bytes += size
+        self.evict()
+
+    def evict(self) -> None:
+        """Goi khi dang giu lock. Bo entry cu nhat toi khi vua gioi han."""
+        while len(self.store) > 1 and (
+            self.bytes > self.max_bytes
+            or (self.max_entries is not None and len(self.store) > self.max_entries)
+        ):
+            old_path, _ = self.store.popitem(last=False)
+            self.bytes -= _entry_bytes(old_path)
+            self.evictions += 1
+
+    def remove(self, path: str) -> None:
+        """Goi khi dang giu lock."""
+        if self.store.pop(path, None) is not None:
+            self.bytes -= _entry_bytes(path)
 
 
 class TokenCache:
     """
-    LRU cache cho token counts, thread-safe.
+    LRU cache cho token counts, thread-safe, chia shard theo path.
 
-    Su dung OrderedDict de track thu tu truy cap.
     Mtime-based invalidation: cache entry chi valid
     khi file khong bi thay doi ke tu lan cache cuoi.
     """
 
-    def __init__(self, max_size: int = MAX_CACHE_SIZE):
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        max_bytes: int = DEFAULT_BUDGET_BYTES,
+        shards: Optional[int] = None,
+    ):
         """
-        Khoi tao cache voi max size.
+        Khoi tao cache.
 
         Args:
-            max_size: So luong entries toi da truoc khi evict
+            max_size: Gioi han them theo so entries (None = chi theo bo nho).
+                Khi co max_size va khong chi dinh shards, dung 1 shard de
+                giu dung thu tu LRU toan cuc.
+            max_bytes: Byte budget cua ca cache
+            shards: So shard (None = DEFAULT_SHARDS, hoac 1 neu co max_size)
         """
-        self._store: OrderedDict[str, Tuple[float, int]] = OrderedDict()
-        self._lock = threading.Lock()
-        self._max_size = max_size
+        if shards is None:
+            shards = 1 if max_size is not None else DEFAULT_SHARDS
+        shards = max(1, shards)
+        per_shard_entries = None
+        if max_size is not None:
+            per_shard_entries = max(1, -(-max_size // shards))
+        self._shards: List[_Shard] = [
+            _Shard(max(1, max_bytes // shards), per_shard_entries)
+            for _ in range(shards)
+        ]
+        self._max_bytes = max_bytes
+
+    def _shard(self, path: str) -> _Shard:
+        return self._shards[hash(path) % len(self._shards)]
 
     def get(self, path: str, mtime: float) -> Optional[int]:
         """
@@ -49,21 +151,15 @@ class TokenCache:
         Returns:
             Token count neu cache hit, None neu miss hoac stale
         """
-        with self._lock:
-            cached = self._store.get(path)
-            if cached is not None:
-                cached_mtime, cached_count = cached
-                if cached_mtime == mtime:
-                    # LRU: move to end
-                    self._store.move_to_end(path)
-                    return cached_count
-            return None
+        shard = self._shard(path)
+        with shard.lock:
+            return shard.lookup(path, mtime, move=True)
 
     def get_no_move(self, path: str, mtime: float) -> Optional[int]:
         """
         Lay token count tu cache KHONG move (cho parallel workers).
 
-        Tranh lock contention khi nhieu workers cung doc.
+        Tranh ghi vao OrderedDict khi nhieu workers cung doc.
 
         Args:
             path: File path string
@@ -72,60 +168,89 @@ class TokenCache:
         Returns:
             Token count neu cache hit, None neu miss
         """
-        with self._lock:
-            cached = self._store.get(path)
-            if cached is not None:
-                cached_mtime, cached_count = cached
-                if cached_mtime == mtime:
-                    return cached_count
-            return None
+        shard = self._shard(path)
+        with shard.lock:
+            return shard.lookup(path, mtime, move=False)
 
     def put(self, path: str, mtime: float, count: int) -> None:
         """
         Lưu token count vào cache với LRU eviction.
 
-        Thread-safe. Tự động loại biên (evict) các phần tử cũ nhất khi đạt max_size.
+        Thread-safe. Tự động loại bỏ (evict) các phần tử cũ nhất của shard
+        khi vượt byte budget.
 
         Args:
             path: Đường dẫn file dạng string
             mtime: Thời gian sửa đổi của file
             count: Số lượng tokens
         """
-        with self._lock:
-            # Nếu key đã tồn tại trong cache, chỉ cập nhật và đưa lên MRU
-            if path in self._store:
-                self._store[path] = (mtime, count)
-                self._store.move_to_end(path)
-            else:
-                # Loại bỏ phần tử cũ nhất nếu cache đầy
-                while len(self._store) >= self._max_size:
-                    self._store.popitem(last=False)
-                self._store[path] = (mtime, count)
+        shard = self._shard(path)
+        with shard.lock:
+            shard.insert(path, mtime, count)
 
     def put_batch(self, entries: dict[str, Tuple[float, int]]) -> None:
         """
         Lưu nhiều entries cùng lúc (cho xử lý batch).
 
-        Thread-safe. Giảm lock contention so với put() từng entry.
+        Thread-safe. Mỗi shard chỉ lấy lock 1 lần cho cả batch.
 
         Args:
             entries: Dict mapping path -> (mtime, count)
         """
-        with self._lock:
-            for path, (mtime, count) in entries.items():
-                # Cập nhật thứ tự LRU cho phần tử có sẵn hoặc thêm mới
-                if path in self._store:
-                    self._store[path] = (mtime, count)
-                    self._store.move_to_end(path)
-                else:
-                    while len(self._store) >= self._max_size:
-                        self._store.popitem(last=False)
-                    self._store[path] = (mtime, count)
+        grouped: Dict[int, List[Tuple[str, float, int]]] = {}
+        n = len(self._shards)
+        for path, (mtime, count) in entries.items():
+            grouped.setdefault(hash(path) % n, []).append((path, mtime, count))
+        for index, items in grouped.items():
+            shard = self._shards[index]
+            with shard.lock:
+                for path, mtime, count in items:
+                    shard.insert(path, mtime, count)
+
+    def resize_for_entries(self, file_count: int) -> None:
+        """
+        Dat byte budget vua cho `file_count` files (goi khi catalog doi).
+
+        Budget nam trong [MIN_BUDGET_BYTES, MAX_BUDGET_BYTES]; thu nho thi
+        evict ngay entries cu nhat.
+        """
+        budget = int(file_count * ESTIMATED_ENTRY_BYTES * WORKSPACE_HEADROOM)
+        self.set_max_bytes(min(MAX_BUDGET_BYTES, max(MIN_BUDGET_BYTES, budget)))
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """Doi byte budget cua ca cache."""
+        self._max_bytes = max_bytes
+        per_shard = max(1, max_bytes // len(self._shards))
+        for shard in self._shards:
+            with shard.lock:
+                shard.max_bytes = per_shard
+                shard.evict()
+
+    def stats(self) -> Dict[str, int]:
+        """Thong ke: entries, bytes, budget_bytes, hits, misses, evictions."""
+        result = {
+            "entries": 0,
+            "bytes": 0,
+            "budget_bytes": self._max_bytes,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+        for shard in self._shards:
+            with shard.lock:
+                result["entries"] += len(shard.store)
+                result["bytes"] += shard.bytes
+                result["hits"] += shard.hits
+                result["misses"] += shard.misses
+                result["evictions"] += shard.evictions
+        return result
 
     def clear(self) -> None:
-        """Xoa toan bo cache. Thread-safe."""
-        with self._lock:
-            self._store.clear()
+        """Xoa toan bo cache (giu bo dem thong ke). Thread-safe."""
+        for shard in self._shards:
+            with shard.lock:
+                shard.store.clear()
+                shard.bytes = 0
 
     def clear_file(self, path: str) -> None:
         """
@@ -136,10 +261,14 @@ class TokenCache:
         Args:
             path: File path can xoa
         """
-        with self._lock:
-            self._store.pop(path, None)
+        shard = self._shard(path)
+        with shard.lock:
+            shard.remove(path)
 
     def __len__(self) -> int:
         """Tra ve so luong entries trong cache."""
-        with self._lock:
-            return len(self._store)
+        total = 0
+        for shard in self._shards:
+            with shard.lock:
+                total += len(shard.store)
+        return total
@@ -0,0 +1,118 @@
+"""
+Dedup token counting theo content hash.
+
+Monorepo co nhieu file giong het nhau (vendored copy, stub sinh tu dong,
+`__init__.py`, LICENSE...). Module nay cho phep dem moi noi dung 1 lan:
+- BlobCounts: memo digest -> count trong pham vi 1 batch, single-flight
+  (thread thu 2 gap cung digest se cho thread dang dem thay vi dem lai)
+- ContentHashIndex: ghi lai path -> digest (kem mtime_ns/size) de cac buoc
+  sau (dedup prompt, cache) dung lai hash ma khong doc/hash lai file
+- content_hash: digest dung chung cho count store, ledger, fragment cache
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+# So path toi da trong ContentHashIndex (~100 bytes/entry)
+MAX_INDEXED_PATHS = 200_000
+
+
+def content_hash(content: str) -> bytes:
+    """Hash noi dung da decode (chinh la text dem token) cho token count store."""
+    return hashlib.blake2b(
+        content.encode("utf-8", "surrogatepass"), digest_size=16
+    ).digest()
+
+
+class BlobCounts:
+    """
+    Memo count theo content digest cho 1 batch, thread-safe.
+
+    Tao moi cho moi batch nen khong can invalidate khi doi encoder.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[bytes, int] = {}
+        self._pending: Dict[bytes, threading.Event] = {}
+        self.unique = 0
+        self.duplicates = 0
+
+    def count(self, digest: bytes, compute: Callable[[], int]) -> Tuple[int, bool]:
+        """
+        Count cho noi dung co `digest`, goi compute() toi da 1 lan moi digest.
+
+        Returns:
+            (count, shared): shared=True neu count lay tu path khac cung noi dung
+        """
+        while True:
+            with self._lock:
+                known = self._counts.get(digest)
+                if known is not None:
+                    self.duplicates += 1
+                    return known, True
+                event = self._pending.get(digest)
+                if event is None:
+                    event = threading.Event()
+                    self._pending[digest] = event
+                    break
+            # Thread khac dang dem cung noi dung -> cho ket qua
+            event.wait()
+
+        try:
+            result = compute()
+        except BaseException:
+            with self._lock:
+                del self._pending[digest]
+            event.set()
+            raise
+        with self._lock:
+            self._counts[digest] = result
+            del self._pending[digest]
+            self.unique += 1
+        event.set()
+        return result, False
+
+
+class ContentHashIndex:
+    """
+    Path -> content digest, chi hop le khi mtime_ns va size chua doi.
+
+    LRU gioi han MAX_INDEXED_PATHS entries. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = MAX_INDEXED_PATHS) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, Tuple[int, int, bytes]] = OrderedDict()
+        self._max_entries = max_entries
+
+    def get(self, path: str, mtime_ns: int, size: int) -> Optional[bytes]:
+        """Digest da ghi cho path, None neu chua co hoac file da doi."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != mtime_ns or entry[1] != size:
+                return None
+            self._entries.move_to_end(path)
+            return entry[2]
+
+    def put(self, path: str, mtime_ns: int, size: int, digest: bytes) -> None:
+        """Ghi digest cua noi dung path tai (mtime_ns, size)."""
+        with self._lock:
+            self._entries[path] = (mtime_ns, size, digest)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
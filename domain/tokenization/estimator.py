@@ -0,0 +1,201 @@
+"""
+Token estimator - Uoc luong token tu kich thuoc file, hieu chinh online.
+
+`len(text) // 4` sai nhieu voi JS minified, text CJK, code day dac... va can
+doc noi dung. TokenEstimator uoc luong chi tu bytes:
+- Ty le tokens/byte theo (encoder, language key), language key suy ra tu
+  extension (".min.js"/".min.css" -> "minified")
+- Hieu chinh online tu cac lan dem chinh xac (trung binh/phuong sai cua
+  log ty le, trong so giam dan de theo kip thay doi)
+- Key it du lieu duoc keo ve ty le chung cua encoder roi ve prior
+  (shrinkage), nen luon co uoc luong ke ca cho extension moi gap
+- Khoang tin cay tu phuong sai log ty le (can duoi/tren ~90%)
+- Uoc luong nhieu file = gom tong bytes theo key roi nhan 1 lan/key
+
+Trang thai hieu chinh luu qua ITokenEstimatorStore (tuy chon).
+"""
+
+import math
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from domain.ports.tokenization_port import (
+    ITokenEstimator,
+    ITokenEstimatorStore,
+    TokenEstimate,
+)
+
+# Prior tokens/byte (o200k/cl100k tren code ~3.5-4 bytes/token)
+DEFAULT_TOKENS_PER_BYTE = 0.28
+PRIOR_TOKENS_PER_BYTE: Dict[str, float] = {
+    "minified": 0.45,
+    ".json": 0.33,
+    ".lock": 0.40,
+    ".svg": 0.40,
+    ".csv": 0.40,
+    ".md": 0.25,
+    ".txt": 0.25,
+    ".rst": 0.25,
+}
+# Do lech chuan cua log ty le khi chua co du lieu
+PRIOR_LOG_STD = 0.35
+# Trong so (so quan sat ao) cua prior khi ket hop voi du lieu that
+PRIOR_WEIGHT = 5.0
+
+# Trong so toi da cua du lieu da hieu chinh: quan sat moi luon chiem >= 1/N
+MAX_OBSERVATION_WEIGHT = 500
+# File nho hon nguong nay co ty le qua nhieu (header, file rong...) -> bo qua
+MIN_CALIBRATION_BYTES = 64
+# So language key toi da moi encoder (extension la, chi cap nhat ty le chung)
+MAX_KEYS_PER_ENCODER = 256
+
+# z-score cho khoang tin cay 2 phia ~90%
+CONFIDENCE_Z = 1.645
+
+# Key chua thong ke chung cua encoder
+_ALL_KEY = "*"
+_MINIFIED_SUFFIXES = (".min.js", ".min.mjs", ".min.css")
+_FORMAT_VERSION = 1
+
+# [weight, mean, variance] cua log(tokens/byte)
+_Stats = List[float]
+
+
+def language_key(name: str) -> str:
+    """Language key cua file: extension lowercase, 'minified' cho .min.js/css."""
+    lower = name.lower()
+    if lower.endswith(_MINIFIED_SUFFIXES):
+        return "minified"
+    return os.path.splitext(lower)[1]
+
+
+def group_sizes(items: Iterable[Tuple[str, int]]) -> Dict[str, int]:
+    """Gom tong bytes theo language key tu cac cap (ten file, size)."""
+    sizes: Dict[str, int] = {}
+    for name, size in items:
+        key = language_key(name)
+        sizes[key] = sizes.get(key, 0) + size
+    return sizes
+
+
+def _update(stats: _Stats, value: float) -> None:
+    """Cap nhat trung binh/phuong sai co trong so giam dan."""
+    weight = min(stats[0] + 1, MAX_OBSERVATION_WEIGHT)
+    alpha = 1.0 / weight
+    delta = value - stats[1]
+    stats[0] = weight
+    stats[1] += alpha * delta
+    stats[2] = (1 - alpha) * (stats[2] + alpha * delta * delta)
+
+
+def _blend(
+    prior_mean: float, prior_var: float, stats: Optional[_Stats]
+) -> Tuple[float, float]:
+    """Ket hop prior (trong so PRIOR_WEIGHT) voi thong ke quan sat."""
+    if stats is None:
+        return prior_mean, prior_var
+    weight = stats[0]
+    total = PRIOR_WEIGHT + weight
+    mean = (PRIOR_WEIGHT * prior_mean + weight * stats[1]) / total
+    var = (PRIOR_WEIGHT * prior_var + weight * stats[2]) / total
+    return mean, var
+
+
+class TokenEstimator(ITokenEstimator):
+    """
+    Estimator bytes -> tokens theo (encoder, language key), thread-safe.
+
+    Attributes:
+        active_encoder: Encoder id dang duoc dung de estimate/observe
+    """
+
+    def __init__(self, store: Optional[ITokenEstimatorStore] = None) -> None:
+        self._store = store
+        self._lock = threading.Lock()
+        # encoder_id -> language key -> [weight, mean, variance]
+        self._stats: Dict[str, Dict[str, _Stats]] = {}
+        self._dirty = False
+        self.active_encoder = ""
+        if store is not None:
+            self._restore(store.load())
+
+    def set_active_encoder(self, encoder_id: str) -> None:
+        self.active_encoder = encoder_id
+
+    def observe(self, name: str, size: int, tokens: int) -> None:
+        if size < MIN_CALIBRATION_BYTES or tokens <= 0:
+            return
+        value = math.log(tokens / size)
+        key = language_key(name)
+        with self._lock:
+            per_key = self._stats.setdefault(self.active_encoder, {})
+            _update(per_key.setdefault(_ALL_KEY, [0.0, 0.0, 0.0]), value)
+            stats = per_key.get(key)
+            if stats is None:
+                if len(per_key) > MAX_KEYS_PER_ENCODER:
+                    self._dirty = True
+                    return
+                stats = per_key[key] = [0.0, 0.0, 0.0]
+            _update(stats, value)
+            self._dirty = True
+
+    def estimate(self, name: str, size: int) -> TokenEstimate:
+        """Uoc luong cho 1 file."""
+        return self.estimate_sizes({language_key(name): size})
+
+    def estimate_sizes(self, sizes_by_key: Mapping[str, int]) -> TokenEstimate:
+        tokens = low = high = 0.0
+        with self._lock:
+            per_key = self._stats.get(self.active_encoder, {})
+            offset, base_var = self._encoder_offset(per_key)
+            for key, size in sizes_by_key.items():
+                if size <= 0:
+                    continue
+                prior = PRIOR_TOKENS_PER_BYTE.get(key, DEFAULT_TOKENS_PER_BYTE)
+                mean, var = _blend(math.log(prior) + offset, base_var, per_key.get(key))
+                spread = CONFIDENCE_Z * math.sqrt(max(var, 0.0))
+                tokens += size * math.exp(mean)
+                low += size * math.exp(mean - spread)
+                high += size * math.exp(mean + spread)
+        return TokenEstimate(round(tokens), math.floor(low), math.ceil(high))
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty or self._store is None:
+                return
+            data = {
+                "version": _FORMAT_VERSION,
+                "stats": {
+                    encoder: {key: list(stats) for key, stats in per_key.items()}
+                    for encoder, per_key in self._stats.items()
+                },
+            }
+            self._dirty = False
+        if not self._store.save(data):
+            with self._lock:
+                self._dirty = True
+
+    def _encoder_offset(self, per_key: Dict[str, _Stats]) -> Tuple[float, float]:
+        """Do lech log ty le chung cua encoder so voi prior, va phuong sai nen."""
+        mean, var = _blend(
+            math.log(DEFAULT_TOKENS_PER_BYTE),
+            PRIOR_LOG_STD**2,
+            per_key.get(_ALL_KEY),
+        )
+        return mean - math.log(DEFAULT_TOKENS_PER_BYTE), var
+
+    def _restore(self, data: Optional[Dict[str, Any]]) -> None:
+        if not isinstance(data, dict) or data.get("version") != _FORMAT_VERSION:
+            return
+        stats = data.get("stats")
+        if not isinstance(stats, dict):
+            return
+        for encoder, per_key in stats.items():
+            if not isinstance(per_key, dict):
+                continue
+            self._stats[encoder] = {
+                key: [float(v) for v in values]
+                for key, values in per_key.items()
+                if isinstance(values, list) and len(values) == 3
+            }
@@ -14,6 +14,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from infrastructure.filesystem.ignore_engine import IgnoreEngine
     from application.interfaces.tokenization_port import ITokenizationService
+    from domain.prompt.fragment_cache import FragmentCache
 
 from infrastructure.adapters.cache_registry import cache_registry
 
@@ -44,6 +45,11 @@ class TokenCacheAdapter:
             return len(svc._cache)
         return 0
 
+    def stats(self) -> dict[str, int]:
+        """Bo dem hit/miss/eviction cua token cache (neu service co)."""
+        cache_stats = getattr(self._service, "cache_stats", None)
+        return cache_stats() if callable(cache_stats) else {}
+
 
 class SecurityCacheAdapter:
     """Adapter cho core.security_check._security_scan_cache."""
@@ -97,6 +103,33 @@ class IgnoreCacheAdapter:
         return len(self._engine._gitignore_cache) + len(self._engine._pathspec_cache)
 
 
+class BinaryCacheAdapter:
+    """Adapter cho shared.utils.binary_cache (ket qua is_binary_file theo stat)."""
+
+    def invalidate_path(self, path: str) -> None:
+        """
+        Chuyen cho binary_classification_cache.invalidate_path.
+
+        Cache do khong xoa gi: file doi thi stat key doi theo, entry cu tu het
+        han qua LRU.
+        """
+        from shared.utils.binary_cache import binary_classification_cache
+
+        binary_classification_cache.invalidate_path(path)
+
+    def invalidate_all(self) -> None:
+        """Xoa toan bo binary classification cache."""
+        from shared.utils.binary_cache import binary_classification_cache
+
+        binary_classification_cache.invalidate_all()
+
+    def size(self) -> int:
+        """Tra ve so entries hien co."""
+        from shared.utils.binary_cache import binary_classification_cache
+
+        return binary_classification_cache.size()
+
+
 class RelationshipCacheAdapter:
     """
     Adapter cho core.smart_context.parser._RELATIONSHIPS_CACHE.
@@ -162,9 +195,37 @@ class RelationshipCacheAdapter:
         return len(_RELATIONSHIPS_CACHE)
 
 
+class FragmentCacheAdapter:
+    """Adapter cho FragmentCache cua PromptBuildService (block file da render)."""
+
+    def __init__(self, fragment_cache: "FragmentCache") -> None:
+        self._cache = fragment_cache
+
+    def invalidate_path(self, path: str) -> None:
+        """Xoa fragment cua file (ca cache neu file da xoa)."""
+        self._cache.invalidate_path(path)
+
+    def invalidate_created(self, path: str) -> None:
+        """File moi tao co the doi `<dependencies>` cua file khac: xoa het."""
+        self._cache.invalidate_path(path, created=True)
+
+    def invalidate_all(self) -> None:
+        """Xoa toan bo fragment cache."""
+        self._cache.clear()
+
+    def size(self) -> int:
+        """Tra ve so fragment hien co."""
+        return len(self._cache)
+
+    def stats(self) -> dict[str, int]:
+        """Bo dem hit/miss cua fragment cache."""
+        return {"hits": self._cache.hits, "misses": self._cache.misses}
+
+
 def register_all_caches(
     ignore_engine: "IgnoreEngine",
     tokenization_service: "ITokenizationService",
+    fragment_cache: "FragmentCache | None" = None,
 ) -> None:
     """
     Dang ky tat ca cache adapters vao CacheRegistry.
@@ -175,8 +236,12 @@ def register_all_caches(
     Args:
         ignore_engine: IgnoreEngine instance tu ServiceContainer.
         tokenization_service: ITokenizationService instance tu ServiceContainer.
+        fragment_cache: FragmentCache cua prompt builder (None = khong dang ky).
     """
     cache_registry.register("token_cache", TokenCacheAdapter(tokenization_service))
     cache_registry.register("security_cache", SecurityCacheAdapter())
     cache_registry.register("ignore_cache", IgnoreCacheAdapter(ignore_engine))
     cache_registry.register("relationship_cache", RelationshipCacheAdapter())
+    cache_registry.register("binary_cache", BinaryCacheAdapter())
+    if fragment_cache is not None:
+        cache_registry.register("fragment_cache", FragmentCacheAdapter(fragment_cache))
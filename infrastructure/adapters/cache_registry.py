@@ -80,6 +80,32 @@ class CacheRegistry(ICacheRegistry):
                     e,
                 )
 
+    def invalidate_for_created_path(self, path: str) -> None:
+        """
+        Invalidate caches khi FileWatcher phat hien file moi tao.
+
+        Cache co invalidate_created (vd. fragment cache, noi file moi co the
+        doi ket qua cua file khac) duoc goi qua method do; cache khac nhan
+        invalidate_path nhu binh thuong.
+
+        Args:
+            path: Duong dan tuyet doi cua file moi tao
+        """
+        with self._lock:
+            caches = list(self._caches.items())
+
+        for name, cache in caches:
+            try:
+                invalidate = getattr(cache, "invalidate_created", cache.invalidate_path)
+                invalidate(path)
+            except Exception as e:
+                logger.warning(
+                    "Failed to invalidate cache '%s' for created path '%s': %s",
+                    name,
+                    path,
+                    e,
+                )
+
     def invalidate_for_workspace(self) -> None:
         """
         Xoa toan bo tat ca caches.
@@ -104,8 +130,11 @@ class CacheRegistry(ICacheRegistry):
         """
         Tra ve thong ke so entries cua tung cache.
 
+        Cache co them method stats() (vd. token_cache) duoc them cac key
+        "<name>.<counter>" (hits, misses, evictions, bytes, ...).
+
         Returns:
-            Dict mapping cache_name -> so entries
+            Dict mapping cache_name -> so entries (va "<name>.<counter>")
         """
         with self._lock:
             caches = list(self._caches.items())
@@ -117,6 +146,14 @@ class CacheRegistry(ICacheRegistry):
             except Exception:
                 logger.error("CacheRegistry: eviction/cleanup failed", exc_info=True)
                 stats[name] = -1
+            counters = getattr(cache, "stats", None)
+            if not callable(counters):
+                continue
+            try:
+                for key, value in counters().items():
+                    stats[f"{name}.{key}"] = value
+            except Exception:
+                logger.debug("CacheRegistry: stats() failed for '%s'", name)
         return stats
 
     def get_registered_names(self) -> list[str]:
@@ -12,13 +12,18 @@ Config (tokenizer_repo) duoc inject tu encoder_registry.
 Functions:
 - _get_encoder(tokenizer_repo): Lay encoder singleton (thread-safe)
 - _get_hf_tokenizer(tokenizer_repo): Lay HF tokenizer singleton
+- load_encoder(tokenizer_repo): Encoder rieng theo repo, khong dung singleton
+  (dem so sanh nhieu model cung luc)
+- count_with_encoder(): Dem token voi encoder da cho (kem hieu chinh Claude)
+- configure_tokenizer_store(): Luu HF tokenizer da load de lan sau khong can hub
 - reset_encoder(): Reset khi user doi model
 - _estimate_tokens(): Uoc luong tokens khi encoder khong kha dung
+- encoder_releases_gil(): Encoder co nha GIL khi encode khong
 """
 
 import logging
 import threading
-from typing import Optional, Any, TYPE_CHECKING
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
 
 logger = logging.getLogger("synapse-desktop")
 
@@ -62,6 +67,8 @@ else:
         Tokenizer = None  # Se kiem tra HAS_TOKENIZERS truoc khi su dung
         HAS_TOKENIZERS = False
 
+if TYPE_CHECKING:
+    from infrastructure.persistence.tokenizer_store import TokenizerStore
 
 # ============================================================
 # Encoder singleton state (thread-safe)
@@ -73,6 +80,35 @@ _encoder_type: str = ""  # "rs_bpe", "tiktoken", hoac "hf"
 _claude_tokenizer: Optional[Any] = None
 _encoder_lock = threading.Lock()
 
+# Encoder theo repo cho load_encoder() (key "" = OpenAI), doc lap voi singleton
+_loaded_encoders: Dict[str, Tuple[Optional[Any], str]] = {}
+_loaded_lock = threading.Lock()
+
+# Ban luu cuc bo cua HF tokenizer (xem configure_tokenizer_store)
+_tokenizer_store: Optional["TokenizerStore"] = None
+
+# Repo dung hieu chinh whitespace cua Claude trong count_with_encoder()
+CLAUDE_TOKENIZER_REPO = "Xenova/claude-tokenizer"
+
+# Encoder nha GIL trong encode() -> nhieu thread dem song song that su.
+# rs-bpe giu GIL suot encode nen thread thu 3+ chi tranh nhau GIL.
+_GIL_RELEASING_ENCODERS = frozenset({"tiktoken", "hf"})
+
+
+def encoder_releases_gil(encoder_type: str) -> bool:
+    """True neu encoder_type ("rs_bpe", "tiktoken", "hf") nha GIL khi encode."""
+    return encoder_type in _GIL_RELEASING_ENCODERS
+
+
+def configure_tokenizer_store(store: Optional["TokenizerStore"]) -> None:
+    """
+    Dat store luu HF tokenizer da load (None = luon load tu hub).
+
+    Goi 1 lan luc khoi dong, truoc khi load tokenizer.
+    """
+    global _tokenizer_store
+    _tokenizer_store = store
+
 
 def _get_hf_tokenizer(tokenizer_repo: Optional[str] = None) -> Optional[Any]:
     """
@@ -99,18 +135,41 @@ def _get_hf_tokenizer(tokenizer_repo: Optional[str] = None) -> Optional[Any]:
     if not tokenizer_repo:
         return None
 
-    try:
-        _claude_tokenizer = Tokenizer.from_pretrained(tokenizer_repo)
-        from shared.logging_config import log_info
+    _claude_tokenizer = _load_hf_tokenizer(tokenizer_repo)
+    return _claude_tokenizer
 
-        log_info(f"[Encoders] Using {tokenizer_repo} tokenizer")
-        return _claude_tokenizer
+
+def _load_hf_tokenizer(tokenizer_repo: str) -> Optional[Any]:
+    """
+    Load HF tokenizer moi: tu tokenizer store (neu co) roi moi toi hub.
+
+    Returns:
+        HF Tokenizer instance hoac None
+    """
+    store = _tokenizer_store
+    if store is not None:
+        tokenizer = store.load(tokenizer_repo)
+        if tokenizer is not None:
+            from shared.logging_config import log_info
+
+            log_info(f"[Encoders] Using cached {tokenizer_repo} tokenizer")
+            return tokenizer
+
+    try:
+        tokenizer = Tokenizer.from_pretrained(tokenizer_repo)
     except Exception as e:
         from shared.logging_config import log_error
 
         log_error(f"[Encoders] Failed to load tokenizer from {tokenizer_repo}: {e}")
         return None
 
+    from shared.logging_config import log_info
+
+    log_info(f"[Encoders] Using {tokenizer_repo} tokenizer")
+    if store is not None:
+        store.save(tokenizer_repo, tokenizer)
+    return tokenizer
+
 
 def _get_encoder(tokenizer_repo: Optional[str] = None) -> Optional[Any]:
     """
@@ -156,57 +215,132 @@ def _get_encoder(tokenizer_repo: Optional[str] = None) -> Optional[Any]:
         if _encoder is not None and _encoder_type != "hf":
             return _encoder
 
-        # Thu rs-bpe truoc (nhanh hon ~5x)
-        if HAS_RS_BPE:
-            try:
-                _encoder = rs_bpe_openai.o200k_base()
-                _encoder_type = "rs_bpe"
-                from shared.logging_config import log_info
+        encoder, encoder_type = _create_openai_encoder()
+        if encoder is not None:
+            _encoder, _encoder_type = encoder, encoder_type
+        return encoder
 
-                log_info("[Encoders] Using rs-bpe (Rust) - 5x faster than tiktoken")
-                return _encoder
-            except Exception:
-                logger.error(
-                    "Encoders: rs-bpe o200k_base() failed, trying cl100k_base",
-                    exc_info=True,
-                )
-
-            try:
-                _encoder = rs_bpe_openai.cl100k_base()
-                _encoder_type = "rs_bpe"
-                from shared.logging_config import log_info
-
-                log_info("[Encoders] Using rs-bpe cl100k_base (Rust)")
-                return _encoder
-            except Exception:
-                logger.error(
-                    "Encoders: rs-bpe cl100k_base() failed, falling back to tiktoken",
-                    exc_info=True,
-                )
 
-        # Fallback ve tiktoken (lazy import)
+def _create_openai_encoder() -> Tuple[Optional[Any], str]:
+    """
+    Tao encoder OpenAI moi: rs-bpe (o200k, cl100k) roi tiktoken.
+
+    Returns:
+        (encoder, encoder_type), (None, "") neu khong co backend nao
+    """
+    # Thu rs-bpe truoc (nhanh hon ~5x)
+    if HAS_RS_BPE:
         try:
-            import tiktoken
-        except ImportError:
-            return None
+            encoder = rs_bpe_openai.o200k_base()
+            encoder_type = "rs_bpe"
+            from shared.logging_config import log_info
+
+            log_info("[Encoders] Using rs-bpe (Rust) - 5x faster than tiktoken")
+            return encoder, encoder_type
+        except Exception:
+            logger.error(
+                "Encoders: rs-bpe o200k_base() failed, trying cl100k_base",
+                exc_info=True,
+            )
 
-        encodings_to_try = ["o200k_base", "cl100k_base", "p50k_base", "gpt2"]
+        try:
+            encoder = rs_bpe_openai.cl100k_base()
+            encoder_type = "rs_bpe"
+            from shared.logging_config import log_info
+
+            log_info("[Encoders] Using rs-bpe cl100k_base (Rust)")
+            return encoder, encoder_type
+        except Exception:
+            logger.error(
+                "Encoders: rs-bpe cl100k_base() failed, falling back to tiktoken",
+                exc_info=True,
+            )
+
+    # Fallback ve tiktoken (lazy import)
+    try:
+        import tiktoken
+    except ImportError:
+        return None, ""
 
-        for encoding_name in encodings_to_try:
-            try:
-                _encoder = tiktoken.get_encoding(encoding_name)
-                _encoder_type = "tiktoken"
-                from shared.logging_config import log_info
+    encodings_to_try = ["o200k_base", "cl100k_base", "p50k_base", "gpt2"]
 
-                log_info(f"[Encoders] Using tiktoken {encoding_name}")
-                return _encoder
-            except Exception:
-                logger.error(
-                    f"Encoders: tiktoken '{encoding_name}' failed", exc_info=True
-                )
-                continue
+    for encoding_name in encodings_to_try:
+        try:
+            encoder = tiktoken.get_encoding(encoding_name)
+            encoder_type = "tiktoken"
+            from shared.logging_config import log_info
 
-        return None
+            log_info(f"[Encoders] Using tiktoken {encoding_name}")
+            return encoder, encoder_type
+        except Exception:
+            logger.error(f"Encoders: tiktoken '{encoding_name}' failed", exc_info=True)
+            continue
+
+    return None, ""
+
+
+def load_encoder(tokenizer_repo: Optional[str] = None) -> Tuple[Optional[Any], str]:
+    """
+    Lay encoder cho 1 tokenizer repo, giu rieng theo repo.
+
+    Khac _get_encoder(): khong dung chung singleton nen nhieu encoder co the
+    song cung luc, va reset_encoder() (doi model) khong xoa chung.
+    Repo HF load that bai -> fallback OpenAI giong _get_encoder().
+
+    Returns:
+        (encoder, encoder_type), (None, "") neu khong co backend nao
+    """
+    key = tokenizer_repo or ""
+    loaded = _loaded_encoders.get(key)
+    if loaded is not None:
+        return loaded
+
+    with _loaded_lock:
+        loaded = _loaded_encoders.get(key)
+        if loaded is not None:
+            return loaded
+
+        encoder: Optional[Any] = None
+        encoder_type = ""
+        if tokenizer_repo and HAS_TOKENIZERS:
+            encoder = _load_hf_tokenizer(tokenizer_repo)
+            encoder_type = "hf" if encoder is not None else ""
+        if encoder is None:
+            encoder, encoder_type = _create_openai_encoder()
+        if encoder is not None:
+            _loaded_encoders[key] = (encoder, encoder_type)
+        return encoder, encoder_type
+
+
+def clear_loaded_encoders() -> None:
+    """Bo cac encoder da load boi load_encoder() (giai phong RAM)."""
+    with _loaded_lock:
+        _loaded_encoders.clear()
+
+
+def count_with_encoder(
+    encoder: Any,
+    encoder_type: str,
+    text: str,
+    tokenizer_repo: Optional[str] = None,
+) -> int:
+    """
+    Dem token cua text voi encoder da cho.
+
+    Repo Claude duoc hieu chinh them do tokenizer Xenova dem thieu
+    whitespace so voi API. Encoder loi -> exception cho caller xu ly.
+    """
+    if encoder_type == "hf":
+        base_count = len(encoder.encode(text).ids)
+    else:
+        # rs-bpe va tiktoken
+        base_count = len(encoder.encode(text))
+
+    # --- DINH CHINH CLAUDE HEAVY WHITESPACE PENALTY ---
+    if tokenizer_repo == CLAUDE_TOKENIZER_REPO:
+        whitespace_count = text.count(" ") + text.count("\t") + text.count("\n")
+        return int(base_count * 1.03) + int(whitespace_count * 0.25)
+    return base_count
 
 
 def _estimate_tokens(text: str) -> int:
@@ -0,0 +1,338 @@
+"""
+Multi Encoder Counter - Dem token 1 selection cho nhieu model cung luc.
+
+Doi model qua TokenizationService.set_model_config() reset encoder va xoa
+cache, nen so sanh selection tren nhieu model phai dem lai tu dau moi lan.
+Module nay giu 1 "lane" cho moi tokenizer repo:
+- Encoder rieng (load_encoder, khong dung singleton) va TokenCache rieng
+- Moi file chi doc + decode 1 lan, content hash tinh 1 lan, roi cac lane
+  dem song song (moi lane 1 thread; HF/tiktoken nha GIL)
+- Count luu vao count store voi cung encoder id nhu TokenizationService,
+  nen 2 ben dung lai ket qua cua nhau
+
+Model dung chung tokenizer (vd. cac model Claude) chi dem 1 lan.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from domain.config.model_config import MODEL_CONFIGS, ModelConfig
+from domain.ports.tokenization_port import ITokenCountStore
+from domain.tokenization.cache import TokenCache
+from domain.tokenization.dedup import content_hash
+from infrastructure.adapters.encoders import (
+    _estimate_tokens,
+    count_with_encoder,
+    load_encoder,
+)
+from infrastructure.adapters.parallel_counter import (
+    MAX_BYTES,
+    read_file_mmap,
+)
+from infrastructure.adapters.stream_counter import count_tokens_streaming
+from infrastructure.adapters.tokenization_service import count_store_key
+from shared.utils.binary_cache import is_racy
+
+# So file doc vao RAM moi dot truoc khi chia cho cac lane
+READ_BATCH_FILES = 256
+
+
+@dataclass(frozen=True)
+class ModelTokenTotal:
+    """
+    Tong token cua selection theo 1 model.
+
+    Attributes:
+        model_id: ID model (xem MODEL_CONFIGS)
+        name: Ten hien thi
+        context_length: Context window cua model
+        tokens: Tong token cua selection theo tokenizer cua model
+    """
+
+    model_id: str
+    name: str
+    context_length: int
+    tokens: int
+
+    @property
+    def fits(self) -> bool:
+        return self.tokens <= self.context_length
+
+    @property
+    def usage_pct(self) -> float:
+        if self.context_length <= 0:
+            return 0.0
+        return round(self.tokens * 100.0 / self.context_length, 1)
+
+
+class _Lane:
+    """Encoder + cache cua 1 tokenizer repo."""
+
+    def __init__(self, tokenizer_repo: Optional[str]) -> None:
+        self.tokenizer_repo = tokenizer_repo
+        self.encoder, self.encoder_type = load_encoder(tokenizer_repo)
+        self.store_key = (
+            count_store_key(self.encoder_type, tokenizer_repo)
+            if self.encoder is not None
+            else None
+        )
+        self.cache = TokenCache()
+
+    def count(self, text: str) -> int:
+        if self.encoder is None:
+            return _estimate_tokens(text)
+        try:
+            return count_with_encoder(
+                self.encoder, self.encoder_type, text, self.tokenizer_repo
+            )
+        except Exception:
+            return _estimate_tokens(text)
+
+
+# (path_str, stat, content, content hash)
+_Item = Tuple[str, os.stat_result, str, bytes]
+
+
+class MultiEncoderCounter:
+    """Dem token cho nhieu tokenizer trong 1 lan doc file, thread-safe."""
+
+    def __init__(
+        self,
+        count_store: Optional[ITokenCountStore] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            count_store: Kho token count ben vung (dung chung voi
+                TokenizationService), None = chi cache trong bo nho
+            max_workers: So lane dem song song toi da (None = so CPU)
+        """
+        self._count_store = count_store
+        self._max_workers = max_workers
+        self._lanes: Dict[str, _Lane] = {}
+
+    def encoder_id(self, tokenizer_repo: Optional[str]) -> str:
+        """Dinh danh encoder thuc te cua repo (vd. "hf:Xenova/claude-tokenizer")."""
+        lane = self._lane(tokenizer_repo)
+        return f"{lane.encoder_type}:{tokenizer_repo or ''}"
+
+    def count_files(
+        self,
+        file_paths: Iterable[Path],
+        tokenizer_repos: Iterable[Optional[str]],
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Dict[Optional[str], Dict[str, int]]:
+        """
+        Dem token tung file theo moi tokenizer repo.
+
+        Args:
+            file_paths: Cac file can dem
+            tokenizer_repos: Repo cua cac model (None = OpenAI)
+            is_cancelled: Tra ve True de dung giua cac dot doc file
+
+        Returns:
+            {tokenizer_repo: {path_str: token_count}}. File khong doc duoc,
+            rong hoac binary co count 0. Bi huy -> chi co file da dem xong.
+        """
+        lanes = [self._lane(repo) for repo in dict.fromkeys(tokenizer_repos)]
+        results: Dict[Optional[str], Dict[str, int]] = {
+            lane.tokenizer_repo: {} for lane in lanes
+        }
+        if not lanes:
+            return results
+
+        pending: List[Tuple[Path, os.stat_result, List[_Lane]]] = []
+        for path in file_paths:
+            path_str = str(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stat = None
+            if stat is None or not os.path.isfile(path) or stat.st_size == 0:
+                for lane in lanes:
+                    results[lane.tokenizer_repo][path_str] = 0
+                continue
+            missing = []
+            for lane in lanes:
+                cached = self._cached(lane, path_str, stat)
+                if cached is None:
+                    missing.append(lane)
+                else:
+                    results[lane.tokenizer_repo][path_str] = cached
+            if missing:
+                pending.append((Path(path), stat, missing))
+
+        workers = min(len(lanes), self._max_workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for start in range(0, len(pending), READ_BATCH_FILES):
+                if is_cancelled is not None and is_cancelled():
+                    break
+                self._count_batch(
+                    pending[start : start + READ_BATCH_FILES], results, pool
+                )
+
+        if self._count_store is not None:
+            self._count_store.flush()
+        return results
+
+    def totals(
+        self,
+        file_paths: Sequence[Path],
+        tokenizer_repos: Iterable[Optional[str]],
+    ) -> Dict[Optional[str], int]:
+        """Tong token cua selection theo moi tokenizer repo."""
+        counts = self.count_files(file_paths, tokenizer_repos)
+        return {repo: sum(per_file.values()) for repo, per_file in counts.items()}
+
+    def compare_models(
+        self,
+        file_paths: Sequence[Path],
+        models: Optional[Sequence[ModelConfig]] = None,
+    ) -> List[ModelTokenTotal]:
+        """
+        Tong token cua selection cho tung model, theo thu tu `models`.
+
+        Args:
+            file_paths: Cac file dang chon
+            models: Model can so sanh (None = MODEL_CONFIGS)
+        """
+        if models is None:
+            models = MODEL_CONFIGS
+        totals = self.totals(file_paths, (m.tokenizer_repo for m in models))
+        return [
+            ModelTokenTotal(
+                model_id=model.id,
+                name=model.name,
+                context_length=model.context_length,
+                tokens=totals[model.tokenizer_repo],
+            )
+            for model in models
+        ]
+
+    def clear_cache(self) -> None:
+        """Xoa cache bo nho cua moi lane (giu encoder da load)."""
+        for lane in list(self._lanes.values()):
+            lane.cache.clear()
+
+    # ================================================================
+    # Internal
+    # ================================================================
+
+    def _lane(self, tokenizer_repo: Optional[str]) -> _Lane:
+        key = tokenizer_repo or ""
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes.setdefault(key, _Lane(tokenizer_repo))
+        return lane
+
+    def _cached(
+        self, lane: _Lane, path_str: str, stat: os.stat_result
+    ) -> Optional[int]:
+        cached = lane.cache.get(path_str, stat.st_mtime)
+        if cached is not None or self._count_store is None or not lane.store_key:
+            return cached
+        stored = self._count_store.get_by_path(
+            path_str, stat.st_mtime_ns, stat.st_size, lane.store_key
+        )
+        if stored is not None:
+            lane.cache.put(path_str, stat.st_mtime, stored)
+        return stored
+
+    def _count_batch(
+        self,
+        batch: List[Tuple[Path, os.stat_result, List[_Lane]]],
+        results: Dict[Optional[str], Dict[str, int]],
+        pool: ThreadPoolExecutor,
+    ) -> None:
+        """Doc 1 dot file (moi file 1 lan) roi cho cac lane dem song song."""
+        from shared.utils.file_utils import is_binary_file
+
+        work: Dict[str, List[_Item]] = {}
+        large: Dict[str, List[Tuple[Path, os.stat_result]]] = {}
+        lanes: Dict[str, _Lane] = {}
+        for path, stat, missing in batch:
+            path_str = str(path)
+            for lane in missing:
+                lanes[lane.tokenizer_repo or ""] = lane
+            if is_binary_file(path):
+                for lane in missing:
+                    results[lane.tokenizer_repo][path_str] = 0
+                continue
+            if stat.st_size > MAX_BYTES:
+                for lane in missing:
+                    large.setdefault(lane.tokenizer_repo or "", []).append((path, stat))
+                continue
+            content = read_file_mmap(path)
+            if content is None:
+                for lane in missing:
+                    results[lane.tokenizer_repo][path_str] = 0
+                continue
+            digest = content_hash(content)
+            for lane in missing:
+                work.setdefault(lane.tokenizer_repo or "", []).append(
+                    (path_str, stat, content, digest)
+                )
+
+        futures = [
+            pool.submit(self._count_lane, lane, work.get(key, []), large.get(key, []))
+            for key, lane in lanes.items()
+        ]
+        for future, lane in zip(futures, lanes.values()):
+            results[lane.tokenizer_repo].update(future.result())
+
+    def _count_lane(
+        self,
+        lane: _Lane,
+        items: List[_Item],
+        large: List[Tuple[Path, os.stat_result]],
+    ) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        # File cung noi dung trong batch chi encode 1 lan
+        blobs: Dict[bytes, int] = {}
+        for path_str, stat, content, digest in items:
+            count = blobs.get(digest)
+            if count is None and self._count_store is not None and lane.store_key:
+                count = self._count_store.get_by_hash(digest, lane.store_key)
+            if count is None:
+                count = lane.count(content)
+            blobs[digest] = count
+            self._remember(lane, path_str, stat, digest, count)
+            counts[path_str] = count
+
+        # File lon doc theo chunk o moi lane (khong giu ca file trong RAM)
+        for path, stat in large:
+            path_str = str(path)
+            result = count_tokens_streaming(path, lane.count)
+            if result is None:
+                counts[path_str] = 0
+                continue
+            self._remember(lane, path_str, stat, result.digest, result.count)
+            counts[path_str] = result.count
+        return counts
+
+    def _remember(
+        self,
+        lane: _Lane,
+        path_str: str,
+        stat: os.stat_result,
+        digest: bytes,
+        count: int,
+    ) -> None:
+        lane.cache.put(path_str, stat.st_mtime, count)
+        if self._count_store is None or not lane.store_key:
+            return
+        if is_racy(stat):
+            # File vua sua: chua du tin cay de gan path -> hash
+            self._count_store.put(digest, lane.store_key, count)
+        else:
+            self._count_store.put(
+                digest,
+                lane.store_key,
+                count,
+                path=path_str,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+            )
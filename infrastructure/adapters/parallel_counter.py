@@ -7,6 +7,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from shared.logging_config import log_error
 from domain.tokenization.cancellation import is_counting_tokens
+from domain.tokenization.dedup import content_hash
 
 logger = logging.getLogger("synapse-desktop")
 
@@ -177,8 +178,16 @@ def count_tokens_batch_hf(
     cache_get_no_move_func: Callable[[str, float], Optional[int]],
     cache_put_batch_func: Callable[[Dict[str, Tuple[float, int]]], None],
     fallback_parallel_func: Callable[[List[Path], int, bool], Dict[str, int]],
+    lookup_content_func: Optional[Callable[[str, bytes], Optional[int]]] = None,
+    store_content_func: Optional[Callable[[str, bytes, int], None]] = None,
 ) -> Dict[str, int]:
-    """Dem token bang HF encode_batch() (Rust multi-thread, 5-10x nhanh)."""
+    """Dem token bang HF encode_batch() (Rust multi-thread, 5-10x nhanh).
+
+    File cung noi dung (cung content_hash) chi encode 1 lan, count chia cho
+    moi path. lookup_content_func(path, digest) tra ve count da biet cho noi
+    dung (bo qua encode); store_content_func(path, digest, count) luu count
+    vua dem cho tung path.
+    """
     from infrastructure.adapters.encoders import _get_hf_tokenizer
 
     if not is_counting_tokens() or len(file_paths) == 0:
@@ -191,7 +200,8 @@ def count_tokens_batch_hf(
 
     results: Dict[str, int] = {}
     all_texts: List[str] = []
-    valid_paths: List[str] = []
+    # digest -> cac path cung noi dung (path dau tien trong all_texts)
+    groups: Dict[bytes, List[str]] = {}
 
     # Doc tat ca files
     for path in file_paths:
@@ -211,8 +221,20 @@ def count_tokens_batch_hf(
                 results[path_str] = 0
                 continue
 
+            digest = content_hash(content)
+            group = groups.get(digest)
+            if group is not None:
+                group.append(path_str)
+                continue
+
+            if lookup_content_func is not None:
+                known = lookup_content_func(path_str, digest)
+                if known is not None:
+                    results[path_str] = known
+                    continue
+
+            groups[digest] = [path_str]
             all_texts.append(content)
-            valid_paths.append(path_str)
         except Exception:
             logger.error(
                 f"parallel_counter: HF batch failed reading '{path}'", exc_info=True
@@ -225,24 +247,24 @@ def count_tokens_batch_hf(
             encodings = tokenizer.encode_batch(all_texts)
             batch_entries: Dict[str, Tuple[float, int]] = {}
 
-            for path_str, encoding in zip(valid_paths, encodings):
+            for (digest, paths), encoding in zip(groups.items(), encodings):
                 count = len(encoding.ids)
-                results[path_str] = count
-                try:
-                    path_obj = Path(path_str)
-                    if path_obj.exists():
-                        mtime_val = path_obj.stat().st_mtime
-                        batch_entries[path_str] = (mtime_val, count)
-                except OSError:
-                    pass
+                for path_str in paths:
+                    results[path_str] = count
+                    if store_content_func is not None:
+                        store_content_func(path_str, digest, count)
+                    try:
+                        batch_entries[path_str] = (os.stat(path_str).st_mtime, count)
+                    except OSError:
+                        pass
 
             if batch_entries:
                 cache_put_batch_func(batch_entries)
 
         except Exception as e:
             log_error(f"[TokenizationService] HF batch encoding failed: {e}")
-            for path_str in valid_paths:
-                if path_str not in results:
-                    results[path_str] = 0
+            for paths in groups.values():
+                for path_str in paths:
+                    results.setdefault(path_str, 0)
 
     return results
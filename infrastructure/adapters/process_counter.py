@@ -0,0 +1,213 @@
+"""
+Process Counter - Dem token bang process pool (tranh GIL).
+
+Voi rs-bpe/tiktoken, phan lon viec moi file (decode, binary check, wrap ket
+qua Python) van chay tren GIL nen them thread gan nhu khong nhanh hon. Module
+nay dem trong process workers:
+- Worker khoi tao 1 lan voi encoder da chon (init_worker) va mo count store
+  o che do read-only de bo qua noi dung da dem
+- Moi task la 1 batch (path_id, path); worker tu doc file va tra ve cac
+  array gon (path_id, count, mtime, ...) thay vi 1 object/file
+- Worker nho count theo content hash: file cung noi dung chi encode 1 lan
+  trong moi worker
+- Parent gop ket qua, cap nhat TokenCache + count store
+
+Worker functions o muc module de pickle duoc voi spawn context.
+"""
+
+import logging
+import os
+from array import array
+from concurrent.futures import Executor, Future, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from domain.tokenization.cancellation import is_counting_tokens
+from domain.tokenization.dedup import content_hash
+from infrastructure.adapters.parallel_counter import (
+    MAX_BYTES,
+    read_file_mmap,
+)
+
+logger = logging.getLogger("synapse-desktop")
+
+# So path moi task gui sang worker (du lon de bu chi phi IPC)
+PROCESS_BATCH_SIZE = 64
+
+# Hash rong cho file khong dem (binary, qua lon, loi doc)
+_NO_HASH = bytes(16)
+# So digest toi da worker nho (xoa het khi day)
+MAX_WORKER_BLOBS = 50_000
+
+# Trang thai worker process (set boi init_worker)
+_worker_encoder = None
+_worker_reader = None
+_worker_store_key = ""
+# digest -> count da dem trong worker nay (encoder co dinh theo pool)
+_worker_blobs: Dict[bytes, int] = {}
+
+
+class CountBatchResult(NamedTuple):
+    """
+    Ket qua 1 batch, cac array song song theo path_id.
+
+    mtimes = 0 nghia la file khong dem duoc (count = 0, khong cache).
+    hashes la cac digest 16 bytes noi lien nhau.
+    """
+
+    path_ids: array
+    counts: array
+    mtimes: array
+    mtime_ns: array
+    sizes: array
+    hashes: bytes
+
+
+def init_worker(
+    encoder_type: str, store_db: Optional[str], store_key: Optional[str]
+) -> None:
+    """
+    Khoi tao worker: load encoder cung loai voi parent, mo count store read-only.
+
+    Encoder khac loai (vd. parent dung rs-bpe, worker chi co tiktoken) ->
+    count_batch() raise de parent quay ve thread pool.
+    """
+    global _worker_encoder, _worker_reader, _worker_store_key
+    import infrastructure.adapters.encoders as encoders
+
+    encoder = encoders._get_encoder()
+    _worker_encoder = encoder if encoders._encoder_type == encoder_type else None
+    _worker_blobs.clear()
+
+    if store_db and store_key:
+        from infrastructure.persistence.token_count_store import TokenCountReader
+
+        _worker_reader = TokenCountReader(Path(store_db))
+        _worker_store_key = store_key
+
+
+def _encode_count(content: str) -> int:
+    """Giong TokenizationService.count_tokens() cho rs-bpe/tiktoken."""
+    from infrastructure.adapters.encoders import _estimate_tokens
+
+    try:
+        return len(_worker_encoder.encode(content))  # type: ignore[union-attr]
+    except Exception:
+        return _estimate_tokens(content)
+
+
+def _count_blob(content: str, digest: bytes) -> int:
+    """Count cho noi dung: memo cua worker, count store, roi moi encode."""
+    known = _worker_blobs.get(digest)
+    if known is None and _worker_reader is not None:
+        known = _worker_reader.get_by_hash(digest, _worker_store_key)
+    if known is None:
+        known = _encode_count(content)
+    if len(_worker_blobs) >= MAX_WORKER_BLOBS:
+        _worker_blobs.clear()
+    _worker_blobs[digest] = known
+    return known
+
+
+def count_batch(batch: Sequence[Tuple[int, str]]) -> CountBatchResult:
+    """Dem token cho 1 batch (path_id, path) trong worker process."""
+    if _worker_encoder is None:
+        raise RuntimeError("process_counter: encoder unavailable in worker")
+
+    from shared.utils.file_utils import is_binary_file
+
+    result = CountBatchResult(
+        array("I"), array("q"), array("d"), array("q"), array("q"), b""
+    )
+    hashes = bytearray()
+    for path_id, path_str in batch:
+        count, mtime, mtime_ns, size, digest = 0, 0.0, 0, 0, _NO_HASH
+        try:
+            stat = os.stat(path_str)
+            if 0 < stat.st_size <= MAX_BYTES and not is_binary_file(path_str):
+                content = read_file_mmap(Path(path_str))
+                if content is not None:
+                    digest = content_hash(content)
+                    count = _count_blob(content, digest)
+                    mtime, mtime_ns, size = (
+                        stat.st_mtime,
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                    )
+        except OSError:
+            pass
+        result.path_ids.append(path_id)
+        result.counts.append(count)
+        result.mtimes.append(mtime)
+        result.mtime_ns.append(mtime_ns)
+        result.sizes.append(size)
+        hashes += digest
+    return result._replace(hashes=bytes(hashes))
+
+
+def count_tokens_process_pool(
+    file_paths: List[Path],
+    executor: Executor,
+    cache_get_no_move_func: Callable[[str, float], Optional[int]],
+    cache_put_batch_func: Callable[[Dict[str, Tuple[float, int]]], None],
+    update_cache: bool,
+    store_result_func: Optional[Callable[[str, bytes, int, int, int], None]] = None,
+) -> Dict[str, int]:
+    """
+    Dem token bang process pool da khoi tao (init_worker).
+
+    File hit cache (cache_get_no_move_func) khong gui sang worker.
+    store_result_func(path, hash, count, mtime_ns, size) nhan moi file vua dem.
+    Loi pool (BrokenProcessPool, pickle...) duoc raise cho caller fallback.
+    """
+    results: Dict[str, int] = {}
+    pending: List[Tuple[int, str]] = []
+    path_strs = [str(p) for p in file_paths]
+
+    for path_id, path_str in enumerate(path_strs):
+        try:
+            mtime = os.stat(path_str).st_mtime
+        except OSError:
+            results[path_str] = 0
+            continue
+        cached = cache_get_no_move_func(path_str, mtime)
+        if cached is not None:
+            results[path_str] = cached
+        else:
+            pending.append((path_id, path_str))
+
+    futures: List[Future] = [
+        executor.submit(count_batch, pending[i : i + PROCESS_BATCH_SIZE])
+        for i in range(0, len(pending), PROCESS_BATCH_SIZE)
+    ]
+    batch_entries: Dict[str, Tuple[float, int]] = {}
+    not_done = set(futures)
+    try:
+        while not_done:
+            if not is_counting_tokens():
+                return results
+            done, not_done = wait(not_done, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = future.result()
+                for i, path_id in enumerate(batch.path_ids):
+                    path_str = path_strs[path_id]
+                    count = batch.counts[i]
+                    results[path_str] = count
+                    if batch.mtimes[i] <= 0:
+                        continue
+                    batch_entries[path_str] = (batch.mtimes[i], count)
+                    if store_result_func is not None:
+                        store_result_func(
+                            path_str,
+                            batch.hashes[i * 16 : i * 16 + 16],
+                            count,
+                            batch.mtime_ns[i],
+                            batch.sizes[i],
+                        )
+    finally:
+        for future in not_done:
+            future.cancel()
+
+    if update_cache and batch_entries and is_counting_tokens():
+        cache_put_batch_func(batch_entries)
+    return results
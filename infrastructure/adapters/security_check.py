@@ -17,7 +17,8 @@ import tempfile
 from detect_secrets import SecretsCollection
 from detect_secrets.settings import default_settings
 from domain.ports.security_scanner_port import SecretMatch, ISecurityScanner
-from shared.utils.file_utils import is_binary_file
+from domain.prompt.content_snapshot import ContentSnapshot
+from shared.utils.file_utils import classify_binary_batch, is_binary_file
 
 logger = logging.getLogger("synapse-desktop")
 
@@ -197,7 +198,9 @@ def scan_secrets_in_files(
 
 
 def scan_secrets_in_files_cached(
-    file_paths: set[str], max_file_size: int = 1024 * 1024
+    file_paths: set[str],
+    max_file_size: int = 1024 * 1024,
+    snapshot: Optional[ContentSnapshot] = None,
 ) -> list[SecretMatch]:
     """
     Quét secrets với mtime-based cache.
@@ -208,10 +211,15 @@ def scan_secrets_in_files_cached(
     Args:
         file_paths: Set các đường dẫn file cần quét
         max_file_size: Limit size để tránh quét file quá lớn
+        snapshot: Nội dung file đọc 1 lần cho cả lần copy (nếu có). File được
+            scan đúng phiên bản mà prompt sẽ dùng, không đọc lại từ disk.
 
     Returns:
         List các SecretMatch được tìm thấy
     """
+    if snapshot is not None and snapshot.covers(max_file_size):
+        return _scan_snapshot(sorted(file_paths), max_file_size, snapshot)
+
     global _security_scan_cache
 
     all_matches: list[SecretMatch] = []
@@ -219,12 +227,14 @@ def scan_secrets_in_files_cached(
     sorted_paths = sorted(file_paths)
 
     # Phase 1: Check cache and collect files to scan
+    # Phan loai binary 1 lan cho ca batch (song song, dung chung cache)
+    binary_flags = classify_binary_batch(sorted_paths)
     for path_str in sorted_paths:
         path = Path(path_str)
         try:
             if not path.is_file():
                 continue
-            if is_binary_file(path):
+            if binary_flags[path_str]:
                 continue
 
             try:
@@ -305,6 +315,50 @@ def scan_secrets_in_files_cached(
     return all_matches
 
 
+def _scan_snapshot(
+    sorted_paths: list[str], max_file_size: int, snapshot: ContentSnapshot
+) -> list[SecretMatch]:
+    """scan_secrets_in_files_cached() tren noi dung da co trong snapshot."""
+    snapshot.load()
+    all_matches: list[SecretMatch] = []
+    to_scan: list[tuple[str, float, str]] = []
+    for path_str in sorted_paths:
+        entry = snapshot.get(path_str)
+        if entry.binary or not entry.content or entry.size > max_file_size:
+            continue
+        cached = _security_scan_cache.get(path_str)
+        if cached is not None and cached[0] == entry.mtime:
+            all_matches.extend(cached[1])
+            continue
+        to_scan.append((path_str, entry.mtime, entry.content))
+
+    def scan_entry(item: tuple[str, float, str]) -> list[SecretMatch]:
+        path_str, mtime, content = item
+        try:
+            file_matches = scan_for_secrets(content, file_path=path_str)
+        except Exception:
+            logger.error("SecurityCheck: failed scanning file", exc_info=True)
+            return []
+        _security_scan_cache[path_str] = (mtime, file_matches)
+        return file_matches
+
+    if len(to_scan) <= 5:
+        results = [scan_entry(item) for item in to_scan]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(scan_entry, to_scan))
+    for file_matches in results:
+        all_matches.extend(file_matches)
+
+    if len(_security_scan_cache) > _MAX_CACHE_SIZE:
+        keys_to_remove = list(_security_scan_cache.keys())[: _MAX_CACHE_SIZE // 5]
+        for key in keys_to_remove:
+            del _security_scan_cache[key]
+    return all_matches
+
+
 def get_unique_secret_types(matches: list[SecretMatch]) -> list[str]:
     """
     Lấy danh sách các loại secret duy nhất từ kết quả scan.
@@ -347,9 +401,12 @@ class SecurityScannerAdapter(ISecurityScanner):
     """Concrete implementation of ISecurityScanner."""
 
     def scan_secrets_in_files_cached(
-        self, file_paths: Set[str], max_file_size: int = 1024 * 1024
+        self,
+        file_paths: Set[str],
+        max_file_size: int = 1024 * 1024,
+        snapshot: Optional[ContentSnapshot] = None,
     ) -> List[SecretMatch]:
-        return scan_secrets_in_files_cached(file_paths, max_file_size)
+        return scan_secrets_in_files_cached(file_paths, max_file_size, snapshot)
 
     def format_security_warning(self, matches: List[SecretMatch]) -> str:
         return format_security_warning(matches)
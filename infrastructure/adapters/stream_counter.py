@@ -0,0 +1,111 @@
+"""
+Stream Counter - Dem token cho file lon (> MAX_BYTES) theo tung chunk.
+
+Doc ca file lon vao 1 string (va encode 1 lan) ton RAM gap nhieu lan kich
+thuoc file. Module nay mmap file va dem theo chunk co dinh:
+- Cat chunk o ranh gioi an toan: sau newline, truoc whitespace, hoac it
+  nhat la ranh gioi ky tu UTF-8
+- Token co the bi cat doi o moi ranh gioi -> hieu chinh bang cach dem lai
+  1 cua so nho quanh ranh gioi: count(tail + head) - count(tail) - count(head)
+- Hash noi dung tinh dan theo chunk (giong content_hash() cua ca file) de
+  luu vao count store
+- Bao tien do va ho tro huy giua cac chunk
+
+RAM dinh chi phu thuoc kich thuoc chunk, khong phu thuoc kich thuoc file.
+"""
+
+import hashlib
+import mmap
+import os
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+# Kich thuoc 1 chunk (bytes) truoc khi cat ve ranh gioi an toan
+STREAM_CHUNK_BYTES = 1024 * 1024
+# So ky tu moi ben ranh gioi dung de hieu chinh token bi cat doi
+BOUNDARY_WINDOW_CHARS = 256
+# Gioi han tren (file lon hon coi nhu khong dem duoc, tranh dem log vai GB)
+MAX_STREAM_BYTES = 512 * 1024 * 1024
+
+
+class StreamCount(NamedTuple):
+    """So token va content hash (xem dedup.content_hash)."""
+
+    count: int
+    digest: bytes
+
+
+def _split_point(mm: mmap.mmap, start: int, end: int) -> int:
+    """Vi tri cat an toan trong nua sau cua [start, end)."""
+    low = start + (end - start) // 2
+    pos = mm.rfind(b"\n", low, end)
+    if pos >= 0:
+        return pos + 1
+    # Cat truoc whitespace: tokenizer gan khoang trang vao tu phia sau
+    for sep in (b" ", b"\t"):
+        pos = mm.rfind(sep, low, end)
+        if pos > start:
+            return pos
+    # 1 dong rat dai khong co whitespace: lui ve dau ky tu UTF-8
+    pos = end
+    while pos > low and (mm[pos] & 0xC0) == 0x80:
+        pos -= 1
+    return pos
+
+
+def count_tokens_streaming(
+    file_path: Path,
+    count_func: Callable[[str], int],
+    chunk_bytes: int = STREAM_CHUNK_BYTES,
+    progress: Optional[Callable[[int, int], None]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+) -> Optional[StreamCount]:
+    """
+    Dem token cho file theo chunk.
+
+    Args:
+        file_path: File can dem (caller da loai binary)
+        count_func: Ham dem token cho 1 doan text
+        chunk_bytes: Kich thuoc chunk toi da
+        progress: Goi progress(bytes_done, total_bytes) sau moi chunk
+        is_cancelled: Tra ve True de dung giua chung
+
+    Returns:
+        StreamCount, hoac None neu bi huy, file qua lon hoac loi doc
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    total = 0
+    prev_tail = ""
+    try:
+        with open(file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size > MAX_STREAM_BYTES:
+                return None
+            if size == 0:
+                return StreamCount(0, hasher.digest())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = 0
+                while start < size:
+                    if is_cancelled is not None and is_cancelled():
+                        return None
+                    end = min(start + chunk_bytes, size)
+                    if end < size:
+                        end = _split_point(mm, start, end)
+                    text = mm[start:end].decode("utf-8", errors="replace")
+                    hasher.update(text.encode("utf-8", "surrogatepass"))
+                    total += count_func(text)
+
+                    head = text[:BOUNDARY_WINDOW_CHARS]
+                    if prev_tail:
+                        total += (
+                            count_func(prev_tail + head)
+                            - count_func(prev_tail)
+                            - count_func(head)
+                        )
+                    prev_tail = text[-BOUNDARY_WINDOW_CHARS:]
+                    start = end
+                    if progress is not None:
+                        progress(start, size)
+    except (OSError, ValueError):
+        return None
+    return StreamCount(max(total, 0), hasher.digest())
@@ -4,25 +4,58 @@ TokenizationService - Concrete implementation cua ITokenizationService.
 Thay the toan bo global state trong core/tokenization/counter.py va core/encoders.py.
 Moi trang thai (encoder, tokenizer_repo, cache) duoc quan ly o instance level,
 dam bao thread-safe va loai bo race conditions.
+
+Batch lon voi rs-bpe/tiktoken duoc dem trong process pool (xem
+process_counter) vi phan lon viec moi file chay tren GIL. File lon hon
+MAX_BYTES duoc dem theo chunk (xem stream_counter), RAM khong tang theo file.
+
+Encoder load cham (HF tokenizer, bang rs-bpe) -> preload() load tren
+background thread luc khoi dong, thay vi chan lan dem dau tien.
+
+Token count duoc cache 2 tang:
+- TokenCache (bo nho, key path + mtime) cho lan hoi lai trong phien
+- ITokenCountStore (tuy chon, ben vung, key content hash + encoder id) de
+  restart/doi branch/doi encoder qua lai khong phai dem lai
+
+Moi lan dem chinh xac moi cung duoc dua vao ITokenEstimator (tuy chon) de
+hieu chinh uoc luong token tu kich thuoc file.
+
+Trong 1 batch, file cung noi dung (vendored copy, `__init__.py`, LICENSE...)
+chi duoc encode 1 lan (xem domain.tokenization.dedup). Content hash cua moi
+file vua dem duoc ghi lai (content_digest()) cho cac buoc sau dung lai.
 """
 
 import logging
+import multiprocessing
 import os
 import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
 from pathlib import Path
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from infrastructure.adapters.encoders import (
     HAS_TOKENIZERS,
     _estimate_tokens,
     _get_encoder,
+    count_with_encoder,
+    encoder_releases_gil,
     reset_encoder as _core_reset_encoder,
 )
 from shared.logging_config import log_info, log_warning
+from domain.tokenization.batch import get_worker_count
 from domain.tokenization.cache import TokenCache
 from domain.tokenization.cancellation import is_counting_tokens
-from domain.ports.tokenization_port import ITokenizationService
+from domain.tokenization.dedup import BlobCounts, ContentHashIndex, content_hash
+from domain.ports.tokenization_port import (
+    ITokenCountStore,
+    ITokenEstimator,
+    ITokenizationService,
+)
+from shared.utils.binary_cache import RACY_WINDOW_NS, is_racy
 
 from infrastructure.adapters.parallel_counter import (
     MAX_BYTES,
@@ -31,11 +64,28 @@ from infrastructure.adapters.parallel_counter import (
     count_tokens_batch_sequential,
     count_tokens_batch_hf,
 )
+from infrastructure.adapters.process_counter import (
+    count_tokens_process_pool,
+    init_worker,
+)
+from infrastructure.adapters.stream_counter import count_tokens_streaming
 
 logger = logging.getLogger("synapse-desktop")
 
-# Worker config cho batch processing
-TASKS_PER_WORKER = 100
+# So file toi thieu (chua co trong cache) de dung process pool thay vi thread
+PROCESS_POOL_MIN_FILES = 200
+# Gioi han so process workers (moi worker giu 1 encoder rieng trong RAM)
+MAX_PROCESS_WORKERS = 8
+# Encoder dem duoc trong worker (HF da co encode_batch() da luong)
+PROCESS_POOL_ENCODERS = frozenset({"rs_bpe", "tiktoken"})
+
+# Tang khi doi cong thuc dem (vd. he so hieu chinh) de bo count da luu
+COUNT_FORMAT_VERSION = 1
+
+
+def count_store_key(encoder_type: str, tokenizer_repo: Optional[str]) -> str:
+    """Encoder id trong count store cho encoder + repo."""
+    return f"v{COUNT_FORMAT_VERSION}:{encoder_type}:{tokenizer_repo or ''}"
 
 
 class TokenizationService(ITokenizationService):
@@ -46,18 +96,38 @@ class TokenizationService(ITokenizationService):
     Ho tro nhieu loai encoder: rs-bpe, tiktoken, Hugging Face tokenizers.
     """
 
-    def __init__(self, tokenizer_repo: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        tokenizer_repo: Optional[str] = None,
+        count_store: Optional[ITokenCountStore] = None,
+        process_workers: Optional[int] = None,
+        estimator: Optional[ITokenEstimator] = None,
+    ) -> None:
         """
         Khoi tao TokenizationService.
 
         Args:
             tokenizer_repo: HF repo ID (vd: "Xenova/claude-tokenizer") hoac None
+            count_store: Kho token count ben vung (None = chi cache trong bo nho)
+            process_workers: So process dem token (None = theo CPU, 0/1 = tat)
+            estimator: Estimator duoc hieu chinh tu cac lan dem chinh xac
         """
         self._tokenizer_repo: Optional[str] = tokenizer_repo
         self._encoder: Optional[Any] = None
         self._encoder_type: str = ""
         self._lock = threading.RLock()
         self._cache = TokenCache()
+        # Content hash ghi lai luc dem (khong phu thuoc encoder)
+        self._hashes = ContentHashIndex()
+        self._count_store = count_store
+        self._process_workers = process_workers
+        self._estimator = estimator
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_key: Optional[tuple] = None
+        self._model_generation = 0
+        # Future cua lan preload() encoder hien tai (None = chua preload)
+        self._ready: Optional["Future[bool]"] = None
+        self._ready_lock = threading.Lock()
         # Flag theo doi trang thai fallback (Option 2b)
         self._using_estimation = False
 
@@ -83,21 +153,9 @@ class TokenizationService(ITokenizationService):
             return _estimate_tokens(text)
 
         try:
-            # Phân tách cách lấy base token count
-            if getattr(self, "_encoder_type", "") == "hf":
-                # HF tokenizer
-                base_count = len(encoder.encode(text).ids)
-            else:
-                # rs-bpe va tiktoken
-                base_count = len(encoder.encode(text))
-
-            # --- DINH CHINH CLAUDE HEAVY WHITESPACE PENALTY ---
-            if self._tokenizer_repo == "Xenova/claude-tokenizer":
-                whitespace_count = text.count(" ") + text.count("\t") + text.count("\n")
-                claude_corrected = int(base_count * 1.03) + int(whitespace_count * 0.25)
-                return claude_corrected
-
-            return base_count
+            return count_with_encoder(
+                encoder, self._encoder_type, text, self._tokenizer_repo
+            )
         except Exception:
             logger.error("TokenizationService: background count failed", exc_info=True)
             # Fallback neu encode that bai
@@ -112,8 +170,10 @@ class TokenizationService(ITokenizationService):
                 return 0
 
             stat = file_path.stat()
-            if stat.st_size > MAX_BYTES or stat.st_size == 0:
+            if stat.st_size == 0:
                 return 0
+            if stat.st_size > MAX_BYTES:
+                return self.count_tokens_for_large_file(file_path) or 0
 
             path_str = str(file_path)
 
@@ -122,6 +182,11 @@ class TokenizationService(ITokenizationService):
             if cached is not None:
                 return cached
 
+            stored = self._stored_count(path_str, stat)
+            if stored is not None:
+                self._cache.put(path_str, stat.st_mtime, stored)
+                return stored
+
             # Check binary file
             from shared.utils.file_utils import is_binary_file
 
@@ -130,7 +195,7 @@ class TokenizationService(ITokenizationService):
 
             # Doc va dem
             content = file_path.read_text(encoding="utf-8", errors="replace")
-            token_count = self.count_tokens(content)
+            token_count = self._count_content(path_str, content)
 
             # Update cache
             self._cache.put(path_str, stat.st_mtime, token_count)
@@ -139,6 +204,60 @@ class TokenizationService(ITokenizationService):
         except (OSError, IOError):
             return 0
 
+    def count_tokens_for_large_file(
+        self,
+        file_path: Path,
+        progress: Optional[Callable[[int, int], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+        update_cache: bool = True,
+    ) -> Optional[int]:
+        """
+        Dem token cho file bat ky kich thuoc bang streaming theo chunk.
+
+        Args:
+            file_path: File can dem
+            progress: Goi progress(bytes_done, total_bytes) sau moi chunk
+            is_cancelled: Tra ve True de dung giua chung
+            update_cache: Ghi ket qua vao TokenCache
+
+        Returns:
+            So token (0 cho file rong/binary), None neu bi huy hoac khong doc duoc
+        """
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return None
+        if stat.st_size == 0:
+            return 0
+
+        path_str = str(file_path)
+        cached = self._cache.get(path_str, stat.st_mtime)
+        if cached is None:
+            cached = self._stored_count(path_str, stat)
+        if cached is not None:
+            if update_cache:
+                self._cache.put(path_str, stat.st_mtime, cached)
+            return cached
+
+        from shared.utils.file_utils import is_binary_file
+
+        if is_binary_file(file_path):
+            return 0
+
+        store_key = self._store_key()
+        result = count_tokens_streaming(
+            file_path, self.count_tokens, progress=progress, is_cancelled=is_cancelled
+        )
+        if result is None:
+            return None
+        self._record_hash(path_str, result.digest)
+        if store_key is not None and self._store_key() == store_key:
+            self._remember_count(path_str, result.digest, store_key, result.count)
+        self._observe(path_str, result.count, stat.st_size)
+        if update_cache:
+            self._cache.put(path_str, stat.st_mtime, result.count)
+        return result.count
+
     def count_tokens_batch_parallel(
         self,
         file_paths: List[Path],
@@ -147,26 +266,65 @@ class TokenizationService(ITokenizationService):
     ) -> Dict[str, int]:
         """
         Dem token song song cho nhieu files.
+
+        File lon hon MAX_BYTES duoc dem streaming sau cung, tung file mot.
         """
         if not is_counting_tokens() or len(file_paths) == 0:
             return {}
 
+        file_paths, large_files = self._split_large_files(file_paths)
+        try:
+            results = (
+                self._count_batch(file_paths, max_workers, update_cache)
+                if file_paths
+                else {}
+            )
+            for path in large_files:
+                if not is_counting_tokens():
+                    break
+                count = self.count_tokens_for_large_file(
+                    path,
+                    is_cancelled=lambda: not is_counting_tokens(),
+                    update_cache=update_cache,
+                )
+                if count is not None:
+                    results[str(path)] = count
+            return results
+        finally:
+            self.flush_count_store()
+
+    def _count_batch(
+        self, file_paths: List[Path], max_workers: int, update_cache: bool
+    ) -> Dict[str, int]:
+        """Dem batch file <= MAX_BYTES bang backend phu hop voi encoder."""
         # Auto-detect: model co tokenizer_repo -> dung batch encoding
         if self._tokenizer_repo and HAS_TOKENIZERS:
             return count_tokens_batch_hf(
                 file_paths,
                 self._tokenizer_repo,
-                self._cache.get_no_move,
+                partial(self._cached_count_no_move, batch=True),
                 self._cache.put_batch,
                 self.count_tokens_batch_parallel,
+                lookup_content_func=self._lookup_batch_content,
+                store_content_func=self._store_batch_content,
             )
 
+        if self._should_use_processes(len(file_paths)):
+            results = self._count_in_processes(file_paths, update_cache)
+            if results is not None:
+                return results
+
         # Standard parallel processing cho non-HF models
+        if not encoder_releases_gil(self._encoder_type):
+            max_workers = min(
+                max_workers,
+                get_worker_count(len(file_paths), releases_gil=False),
+            )
         return count_tokens_parallel_standard(
             file_paths,
             max_workers,
             update_cache,
-            self._count_tokens_for_file_no_cache,
+            partial(self._count_tokens_for_file_no_cache, blobs=BlobCounts()),
             self._cache.put_batch,
             self._count_tokens_batch_sequential,
         )
@@ -180,6 +338,13 @@ class TokenizationService(ITokenizationService):
             self._encoder = None
             self._encoder_type = ""
             self._using_estimation = False
+            self._model_generation += 1
+        with self._ready_lock:
+            self._ready = None
+        self.shutdown_workers()
+        # TokenCache key theo path + mtime (khong co encoder) -> count cu sai.
+        # Count cua encoder cu van con trong count store neu doi lai.
+        self._cache.clear()
         # Reset global encoder state trong core.encoders
         _core_reset_encoder()
         log_info(
@@ -195,6 +360,10 @@ class TokenizationService(ITokenizationService):
             self._encoder = None
             self._encoder_type = ""
             self._using_estimation = False
+            self._model_generation += 1
+        with self._ready_lock:
+            self._ready = None
+        self.shutdown_workers()
         _core_reset_encoder()
         log_info("[TokenizationService] Encoder reset - se reload lan goi tiep theo")
 
@@ -205,8 +374,74 @@ class TokenizationService(ITokenizationService):
     def clear_file_from_cache(self, path: str) -> None:
         """
         Xoa cache entry cho mot file cu the.
+
+        Count store khong can xoa: entry path tu het hieu luc khi mtime/size doi.
         """
         self._cache.clear_file(path)
+        self._hashes.remove(path)
+
+    def preload(self) -> "Future[bool]":
+        """
+        Load encoder tren background thread (goi ngay sau khi window hien).
+
+        Duong dem nao can encoder trong luc dang load se cho tren self._lock
+        toi khi load xong (khong load lan 2). Goi lai sau set_model_config()
+        de load encoder cua model moi.
+
+        Returns:
+            Future: True khi co encoder, False neu phai dung uoc luong
+        """
+        with self._ready_lock:
+            if self._ready is not None:
+                return self._ready
+            future: "Future[bool]" = Future()
+            self._ready = future
+        threading.Thread(
+            target=self._run_preload,
+            args=(future,),
+            name="tokenizer-preload",
+            daemon=True,
+        ).start()
+        return future
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Cho encoder load xong (tu preload neu chua). False neu het timeout."""
+        try:
+            return self.preload().result(timeout)
+        except FutureTimeoutError:
+            return False
+
+    def model_generation(self) -> int:
+        return self._model_generation
+
+    def fit_cache_to_workspace(self, file_count: int) -> None:
+        self._cache.resize_for_entries(file_count)
+
+    def content_digest(self, file_path: Path) -> Optional[bytes]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return self._hashes.get(str(file_path), stat.st_mtime_ns, stat.st_size)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Thong ke TokenCache (entries, bytes, hits, misses, evictions)."""
+        return self._cache.stats()
+
+    def flush_count_store(self) -> None:
+        """Ghi count dang buffer xuong count store va luu hieu chinh estimator."""
+        if self._count_store is not None:
+            self._count_store.flush()
+        if self._estimator is not None:
+            self._estimator.flush()
+
+    def shutdown_workers(self) -> None:
+        """Dung process pool dem token (neu dang chay). Tao lai khi can."""
+        with self._lock:
+            pool, self._process_pool = self._process_pool, None
+            self._process_pool_key = None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
 
     # ================================================================
     # Internal / Private methods
@@ -229,23 +464,301 @@ class TokenizationService(ITokenizationService):
 
                 self._encoder_type = _enc._encoder_type
                 self._using_estimation = False
+                if self._estimator is not None:
+                    self._estimator.set_active_encoder(
+                        f"{self._encoder_type}:{self._tokenizer_repo or ''}"
+                    )
 
             self._encoder = encoder
             return self._encoder
 
-    def _count_tokens_for_file_no_cache(self, file_path: Path) -> int:
-        """Dem token cho file KHONG update cache (parallel-safe)."""
+    def _run_preload(self, future: "Future[bool]") -> None:
+        start = time.perf_counter()
+        try:
+            encoder = self._get_or_create_encoder()
+        except Exception as e:
+            logger.error("TokenizationService: preload failed", exc_info=True)
+            future.set_exception(e)
+            return
+        log_info(
+            f"[TokenizationService] Encoder preloaded in "
+            f"{(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+        future.set_result(encoder is not None)
+
+    @staticmethod
+    def _split_large_files(
+        file_paths: List[Path],
+    ) -> Tuple[List[Path], List[Path]]:
+        """Tach files > MAX_BYTES (dem streaming) khoi phan con lai."""
+        small: List[Path] = []
+        large: List[Path] = []
+        for path in file_paths:
+            try:
+                is_large = os.stat(path).st_size > MAX_BYTES
+            except OSError:
+                is_large = False
+            (large if is_large else small).append(path)
+        return small, large
+
+    def _count_tokens_for_file_no_cache(
+        self, file_path: Path, blobs: Optional[BlobCounts] = None
+    ) -> int:
+        """
+        Dem token cho file KHONG update cache (parallel-safe).
+
+        blobs: memo cua batch -> file cung noi dung voi file da dem khong
+        encode lai.
+        """
+        path_str = str(file_path)
         return count_tokens_for_file_no_cache(
-            file_path, self._cache.get_no_move, self.count_tokens
+            file_path,
+            self._cached_count_no_move,
+            lambda content: self._count_content(path_str, content, blobs),
+        )
+
+    # ================================================================
+    # Count store (persistent, content-hash keyed)
+    # ================================================================
+
+    def _store_key(self, batch: bool = False) -> Optional[str]:
+        """
+        Encoder id cho count store, None neu khong dung store.
+
+        Khong luu khi dang uoc luong (encoder chua load duoc). Ket qua HF
+        encode_batch() khong qua hieu chinh cua count_tokens() nen luu rieng.
+        """
+        if self._count_store is None or self._get_or_create_encoder() is None:
+            return None
+        key = count_store_key(self._encoder_type, self._tokenizer_repo)
+        return f"{key}:batch" if batch else key
+
+    def _stored_count(
+        self, path_str: str, stat: os.stat_result, batch: bool = False
+    ) -> Optional[int]:
+        """Count da luu cho file neu file chua doi ke tu lan dem truoc."""
+        store_key = self._store_key(batch)
+        if store_key is None:
+            return None
+        assert self._count_store is not None
+        return self._count_store.get_by_path(
+            path_str, stat.st_mtime_ns, stat.st_size, store_key
+        )
+
+    def _cached_count_no_move(
+        self, path_str: str, mtime: float, batch: bool = False
+    ) -> Optional[int]:
+        """TokenCache (khong move LRU) roi toi count store."""
+        cached = self._cache.get_no_move(path_str, mtime)
+        if cached is not None or self._count_store is None:
+            return cached
+        try:
+            stat = os.stat(path_str)
+        except OSError:
+            return None
+        return self._stored_count(path_str, stat, batch)
+
+    def _count_content(
+        self, path_str: str, content: str, blobs: Optional[BlobCounts] = None
+    ) -> int:
+        """
+        Dem token cho noi dung file, dung lai count da co cho cung noi dung.
+
+        Noi dung trung voi file khac trong cung batch (blobs) lay count cua
+        file do; neu khong, dung count store roi moi encode.
+        """
+        digest = content_hash(content)
+        self._record_hash(path_str, digest)
+        if blobs is None:
+            return self._count_blob(path_str, content, digest)
+
+        count, shared = blobs.count(
+            digest, lambda: self._count_blob(path_str, content, digest)
+        )
+        if shared:
+            store_key = self._store_key()
+            if store_key is not None:
+                self._remember_count(path_str, digest, store_key, count)
+        return count
+
+    def _count_blob(self, path_str: str, content: str, digest: bytes) -> int:
+        """Dem noi dung chua biet trong batch: count store roi encoder."""
+        store_key = self._store_key()
+        if store_key is None:
+            count = self.count_tokens(content)
+            self._observe(path_str, count)
+            return count
+        assert self._count_store is not None
+
+        count = self._count_store.get_by_hash(digest, store_key)
+        if count is None:
+            count = self.count_tokens(content)
+            if self._store_key() != store_key:
+                # Model doi giua chung -> khong biet count thuoc encoder nao
+                return count
+            self._observe(path_str, count)
+        self._remember_count(path_str, digest, store_key, count)
+        return count
+
+    def _observe(self, path_str: str, count: int, size: int = -1) -> None:
+        """Dua count chinh xac vua dem vao estimator (bo qua khi dang uoc luong)."""
+        if self._estimator is None or self._encoder is None:
+            return
+        if size < 0:
+            try:
+                size = os.stat(path_str).st_size
+            except OSError:
+                return
+        self._estimator.observe(path_str, size, count)
+
+    def _record_hash(self, path_str: str, digest: bytes) -> None:
+        """Ghi content hash cua path (bo qua neu file vua sua, stat chua on)."""
+        try:
+            stat = os.stat(path_str)
+        except OSError:
+            return
+        if not is_racy(stat):
+            self._hashes.put(path_str, stat.st_mtime_ns, stat.st_size, digest)
+
+    def _lookup_batch_content(self, path_str: str, digest: bytes) -> Optional[int]:
+        """Count da luu cho noi dung (HF batch path), ghi nhan path neu hit."""
+        self._record_hash(path_str, digest)
+        store_key = self._store_key(batch=True)
+        if store_key is None:
+            return None
+        assert self._count_store is not None
+        count = self._count_store.get_by_hash(digest, store_key)
+        if count is not None:
+            self._remember_count(path_str, digest, store_key, count)
+        return count
+
+    def _store_batch_content(self, path_str: str, digest: bytes, count: int) -> None:
+        """Luu count vua dem bang HF encode_batch()."""
+        self._record_hash(path_str, digest)
+        self._observe(path_str, count)
+        store_key = self._store_key(batch=True)
+        if store_key is not None:
+            self._remember_count(path_str, digest, store_key, count)
+
+    def _remember_count(
+        self, path_str: str, digest: bytes, store_key: str, count: int
+    ) -> None:
+        """Ghi count theo content hash, kem path neu stat du on dinh de tin."""
+        assert self._count_store is not None
+        try:
+            stat = os.stat(path_str)
+        except OSError:
+            stat = None
+        if stat is None or is_racy(stat):
+            # File vua sua: mtime/size chua du tin cay de gan path -> hash
+            self._count_store.put(digest, store_key, count)
+        else:
+            self._count_store.put(
+                digest,
+                store_key,
+                count,
+                path=path_str,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+            )
+
+    # ================================================================
+    # Process pool backend
+    # ================================================================
+
+    def _process_worker_limit(self) -> int:
+        if self._process_workers is not None:
+            return self._process_workers
+        return min(os.cpu_count() or 1, MAX_PROCESS_WORKERS)
+
+    def _should_use_processes(self, num_files: int) -> bool:
+        """Batch du lon, encoder dem duoc trong worker va co >= 2 process."""
+        if num_files < PROCESS_POOL_MIN_FILES or self._tokenizer_repo:
+            # tokenizer_repo: count_tokens() co the hieu chinh theo model
+            return False
+        if self._get_or_create_encoder() is None:
+            return False
+        return (
+            self._encoder_type in PROCESS_POOL_ENCODERS
+            and self._process_worker_limit() >= 2
         )
 
+    def _get_process_pool(self, store_key: Optional[str]) -> ProcessPoolExecutor:
+        """Pool khoi tao 1 lan cho moi (encoder, store key)."""
+        with self._lock:
+            key = (self._encoder_type, store_key)
+            if self._process_pool is not None and self._process_pool_key == key:
+                return self._process_pool
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+
+            store_db = getattr(self._count_store, "db_path", None)
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self._process_worker_limit(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(
+                    self._encoder_type,
+                    str(store_db) if store_db and store_key else None,
+                    store_key,
+                ),
+            )
+            self._process_pool_key = key
+            return self._process_pool
+
+    def _count_in_processes(
+        self, file_paths: List[Path], update_cache: bool
+    ) -> Optional[Dict[str, int]]:
+        """Dem bang process pool, None neu pool loi (caller dung thread)."""
+        store_key = self._store_key()
+        # Worker doc count store tu dia -> day buffer xuong truoc
+        self.flush_count_store()
+        try:
+            return count_tokens_process_pool(
+                file_paths,
+                self._get_process_pool(store_key),
+                self._cached_count_no_move,
+                self._cache.put_batch,
+                update_cache,
+                store_result_func=partial(self._store_process_result, store_key),
+            )
+        except Exception as e:
+            log_warning(
+                f"[TokenizationService] Process pool counting failed: {e}, "
+                f"falling back to threads"
+            )
+            self.shutdown_workers()
+            return None
+
+    def _store_process_result(
+        self,
+        store_key: Optional[str],
+        path_str: str,
+        digest: bytes,
+        count: int,
+        mtime_ns: int,
+        size: int,
+    ) -> None:
+        """Luu ket qua tu worker vao count store (bo path neu file vua sua)."""
+        self._observe(path_str, count, size)
+        racy = time.time_ns() - mtime_ns < RACY_WINDOW_NS
+        if not racy:
+            self._hashes.put(path_str, mtime_ns, size, digest)
+        if store_key is None:
+            return
+        assert self._count_store is not None
+        if racy:
+            self._count_store.put(digest, store_key, count)
+        else:
+            self._count_store.put(
+                digest, store_key, count, path=path_str, mtime_ns=mtime_ns, size=size
+            )
+
     def _count_tokens_batch_sequential(self, file_paths: List[Path]) -> Dict[str, int]:
         """Dem token tuan tu."""
         return count_tokens_batch_sequential(file_paths, self.count_tokens_for_file)
 
     @staticmethod
-    def get_worker_count(num_tasks: int) -> int:
-        """Tinh so luong workers toi uu."""
-        cpu_count = os.cpu_count() or 4
-        calculated = (num_tasks + TASKS_PER_WORKER - 1) // TASKS_PER_WORKER
-        return max(1, min(cpu_count, calculated))
+    def get_worker_count(num_tasks: int, releases_gil: bool = True) -> int:
+        """Tinh so luong workers toi uu (xem domain.tokenization.batch)."""
+        return get_worker_count(num_tasks, releases_gil)
@@ -10,23 +10,40 @@ Features:
 - Global cancellation flag để stop ngay lập tức
 - Throttled progress updates (200ms interval)
 - Gitignore và default ignore patterns support
+- Workspace snapshot (optional): warm scan chi re-scan directories co mtime
+  thay doi, load_snapshot() tra ve tree tuc thi truoc khi revalidate
+- Parallel full scan (ScanConfig.max_workers > 1): nhieu worker lay directory
+  tu 1 queue chung, ket qua ghep lai thanh tree sort giong scan tuan tu
+- Ignore check qua IgnoreMatcher da compile (relative path string, khong
+  Path.relative_to cho tung entry)
+- Git index mode (ScanConfig.use_git_index): lay danh sach files tu
+  `git ls-files` thay vi walk, fallback walker neu khong phai git repo
 """
 
 import os
+import queue
 import time
 from pathlib import Path
-from typing import Callable, Optional, List, Any, Tuple
+from typing import Callable, Dict, Optional, List, Any, Tuple
 from dataclasses import dataclass
 
-import pathspec
 from collections import OrderedDict
 
 from infrastructure.filesystem.ignore_engine import IgnoreEngine
-from infrastructure.filesystem.file_utils import (
-    TreeItem,
-    is_system_path,
+from domain.ports.ignore_engine_port import IIgnoreMatcher
+from infrastructure.filesystem.scan_snapshot import (
+    DirectoryRecord,
+    ScanSnapshotStore,
+    WorkspaceSnapshot,
+    make_snapshot_key,
+)
+from infrastructure.filesystem.file_utils import TreeItem
+from infrastructure.git.git_index import list_git_files
+from shared.utils.file_utils import (
+    classify_by_extension,
+    is_binary_file,
+    is_system_path_str,
 )
-from shared.utils.file_utils import is_binary_file
 from shared.constants import DIRECTORY_QUICK_SKIP
 
 # Try import scandir_rs (Rust-based)
@@ -117,11 +134,13 @@ class ScanProgress:
         directories: Số directories đã scan
         files: Số files đã tìm thấy
         current_path: Path đang được scan
+        reused_directories: So directories dung lai tu snapshot (khong scandir)
     """
 
     directories: int = 0
     files: int = 0
     current_path: str = ""
+    reused_directories: int = 0
 
 
 @dataclass
@@ -133,11 +152,20 @@ class ScanConfig:
         excluded_patterns: List patterns để exclude
         use_gitignore: Có đọc .gitignore không
         use_default_ignores: Có dùng default ignore patterns không
+        max_workers: So worker threads cho full scan (1 = tuan tu)
+        defer_binary_check: True = chi loc binary theo extension, file co
+            extension la duoc giu lai va phan loai sau khi hien thi/chon
+            (full scan khong mo file nao)
+        use_git_index: True = voi git repository, lay files tu git index
+            (chi co hieu luc khi use_gitignore, bo qua snapshot)
     """
 
     excluded_patterns: Optional[List[str]] = None
     use_gitignore: bool = True
     use_default_ignores: bool = True
+    max_workers: int = 1
+    defer_binary_check: bool = False
+    use_git_index: bool = False
 
 
 # Type alias cho progress callback
@@ -151,7 +179,7 @@ class LRUSpecCache:
     """
 
     def __init__(self, maxsize=1000):
-        self._cache: OrderedDict[Path, list] = OrderedDict()
+        self._cache: OrderedDict[Path, IIgnoreMatcher] = OrderedDict()
         self._maxsize = maxsize
 
     def get(self, key, default=None):
@@ -176,6 +204,10 @@ class FileScanner:
     Supports two modes:
     - Full scan: Recursive scan toàn bộ tree (default)
     - Lazy scan: Chỉ scan level đầu, lazy load children khi expand
+
+    Neu co snapshot_store, full scan se:
+    - Dung lai entries cua directory co mtime + ignore rules khong doi
+    - Luu snapshot moi sau khi scan hoan tat (khong bi cancel)
     """
 
     # Constants
@@ -184,10 +216,21 @@ class FileScanner:
     # Lazy scan config
     LAZY_SCAN_THRESHOLD = 1000  # Files threshold to suggest lazy mode
 
-    def __init__(self, ignore_engine: "IgnoreEngine"):
+    def __init__(
+        self,
+        ignore_engine: "IgnoreEngine",
+        snapshot_store: Optional[ScanSnapshotStore] = None,
+    ):
         self.ignore_engine = ignore_engine
         self._last_progress_time: float = 0
         self._progress: ScanProgress = ScanProgress()
+        # Bao ve _progress khi parallel scan update tu nhieu worker
+        self._progress_lock = threading.Lock()
+        self._snapshot_store = snapshot_store
+        # Snapshot lan truoc (chi doc) va snapshot dang build (chi ghi)
+        self._previous_snapshot: Optional[WorkspaceSnapshot] = None
+        self._current_snapshot: Optional[WorkspaceSnapshot] = None
+        self._defer_binary_check = False
 
     def scan(
         self,
@@ -209,7 +252,7 @@ class FileScanner:
             TreeItem root chứa toàn bộ cây thư mục
         """
         # RACE CONDITION FIX: Sử dụng thread-safe function
-        start_scanning()
+        generation = start_scanning()
 
         if config is None:
             config = ScanConfig()
@@ -219,49 +262,269 @@ class FileScanner:
         # Reset progress
         self._progress = ScanProgress()
         self._last_progress_time = 0
+        self._defer_binary_check = config.defer_binary_check
 
-        # Build initial ignore patterns (root + default + user)
-        ignore_patterns = self._build_ignore_patterns(root_path, config)
-        root_spec = pathspec.PathSpec.from_lines("gitignore", tuple(ignore_patterns))  # type: ignore[arg-type]
+        if config.use_git_index and config.use_gitignore:
+            tree = self._scan_git_index(root_path, config, progress_callback)
+            if tree is not None:
+                return tree
 
-        spec_stack = []
-        if config.use_gitignore:
-            git_root = self.ignore_engine.find_git_root(root_path)
-            if git_root and git_root != root_path:
-                parent_spec = self.ignore_engine.build_pathspec(
-                    git_root,
-                    use_default_ignores=False,
-                    use_gitignore=True,
-                )
-                spec_stack.append((parent_spec, git_root))
+        # Compile ignore rules 1 lan (git root cha + root + default + user)
+        matcher = self.ignore_engine.compile_matcher(
+            root_path,
+            use_default_ignores=config.use_default_ignores,
+            excluded_patterns=config.excluded_patterns,
+            use_gitignore=config.use_gitignore,
+        )
 
-        spec_stack.append((root_spec, root_path))
+        # Ưu tiên dùng Rust scanner nếu có
+        if HAS_SCANDIR_RS:
+            return self._scan_with_rust(
+                root_path,
+                matcher,
+                progress_callback,
+            )
 
+        # Không reset _is_scanning sau khi scan xong
+        # để caller có thể check trạng thái
+        config_key = self._begin_snapshot(root_path, config)
         try:
-            # Ưu tiên dùng Rust scanner nếu có
-            if HAS_SCANDIR_RS:
-                return self._scan_with_rust(
+            if config.max_workers > 1:
+                tree = self._scan_parallel(
                     root_path,
-                    spec_stack,
+                    matcher,
                     progress_callback,
+                    config_key,
+                    config.max_workers,
                 )
             else:
-                # Fallback về Python scanner
-                return self._scan_directory(
-                    root_path,
+                tree = self._scan_directory(
                     root_path,
-                    spec_stack,
+                    matcher,
                     progress_callback,
+                    rules_key=config_key,
                 )
+            self._commit_snapshot(generation)
+            return tree
         finally:
-            # Không reset _is_scanning ở đây
-            # để caller có thể check trạng thái
-            pass
+            self._previous_snapshot = None
+            self._current_snapshot = None
+
+    def load_snapshot(
+        self, root_path: Path, config: Optional[ScanConfig] = None
+    ) -> Optional[TreeItem]:
+        """
+        Tra ve tree tu snapshot da luu ma KHONG scan workspace.
+
+        Dung de hien tree ngay khi mo workspace, sau do goi scan()
+        trong background de revalidate (chi re-scan directories da doi).
+
+        Returns:
+            TreeItem tu snapshot, hoac None neu khong co snapshot hop le
+            cho config hien tai
+        """
+        if self._snapshot_store is None:
+            return None
+
+        if config is None:
+            config = ScanConfig()
+        if config.use_git_index and config.use_gitignore:
+            # Git index mode khong dung snapshot (scan() khong luu)
+            return None
+        root_path = root_path.resolve()
+
+        snapshot = self._snapshot_store.load(root_path)
+        if snapshot is None:
+            return None
+
+        if snapshot.config_key != self._compute_config_key(root_path, config):
+            return None
+        return snapshot.build_tree()
+
+    def _scan_parallel(
+        self,
+        root_path: Path,
+        matcher: IIgnoreMatcher,
+        progress_callback: Optional[ProgressCallback],
+        rules_key: str,
+        max_workers: int,
+    ) -> TreeItem:
+        """
+        Full scan song song voi work-stealing queue.
+
+        Moi task chi liet ke + loc MOT directory roi day cac directory con
+        vao queue chung, nen worker ranh tu dong lay viec cua subtree lon.
+        os.scandir/os.stat nha GIL khi cho I/O -> co loi tren network
+        filesystem hoac page cache lanh.
+
+        Ket qua gom theo relative path roi dung tree 1 lan o cuoi,
+        thu tu children giong het _scan_directory.
+        """
+        results: Dict[str, DirectoryRecord] = {}
+        work: "queue.SimpleQueue[Optional[Tuple[Path, str, IIgnoreMatcher, str]]]" = (
+            queue.SimpleQueue()
+        )
+        pending_lock = threading.Lock()
+        pending = 1  # So task da put nhung chua xu ly xong
+        all_done = threading.Event()
+
+        def visit(
+            current_path: Path,
+            rel_key: str,
+            task_matcher: IIgnoreMatcher,
+            task_rules_key: str,
+        ) -> None:
+            nonlocal pending
+            with self._progress_lock:
+                self._progress.directories += 1
+                self._progress.current_path = str(current_path)
+            self._emit_progress(progress_callback)
+
+            listing = self._resolve_directory(
+                current_path, task_matcher, task_rules_key, rel_key
+            )
+            if listing is None:
+                return
+            dir_names, file_names = listing
+            results[rel_key] = DirectoryRecord(0, task_rules_key, dir_names, file_names)
+            with self._progress_lock:
+                self._progress.files += len(file_names)
+
+            children = []
+            for name in dir_names:
+                child_path = current_path / name
+                child_rel_key = f"{rel_key}/{name}" if rel_key else name
+                child_matcher, child_rules_key = self._child_matcher(
+                    child_path, child_rel_key, task_matcher, task_rules_key
+                )
+                children.append(
+                    (child_path, child_rel_key, child_matcher, child_rules_key)
+                )
+
+            # Tang pending TRUOC khi put de counter khong ve 0 som
+            with pending_lock:
+                pending += len(children)
+            for child in children:
+                work.put(child)
+
+        def worker() -> None:
+            nonlocal pending
+            while True:
+                task = work.get()
+                if task is None:
+                    return
+                try:
+                    # Scan bi cancel: van drain queue nhung bo qua I/O. Khong
+                    # dung generation: scan khac cua app (vd. tree map) chay
+                    # song song khong duoc lam thieu tree nay
+                    if is_scanning():
+                        visit(*task)
+                except Exception:
+                    logger.error(
+                        "file_scanner: parallel worker failed on %s",
+                        task[0],
+                        exc_info=True,
+                    )
+                finally:
+                    with pending_lock:
+                        pending -= 1
+                        if pending == 0:
+                            all_done.set()
+
+        work.put((root_path, "", matcher, rules_key))
+        threads = [
+            threading.Thread(target=worker, name=f"synapse-scan-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        all_done.wait()
+        for _ in threads:
+            work.put(None)
+        for thread in threads:
+            thread.join()
+
+        self._emit_progress(progress_callback, force=True)
+        return WorkspaceSnapshot(
+            root=str(root_path), config_key=rules_key, directories=results
+        ).build_tree()
+
+    def _scan_git_index(
+        self,
+        root_path: Path,
+        config: ScanConfig,
+        progress_callback: Optional[ProgressCallback],
+    ) -> Optional[TreeItem]:
+        """
+        Build tree tu `git ls-files` thay vi walk filesystem.
+
+        Git da ap dung .gitignore, chi con loc default ignores + excluded
+        patterns (matcher compile voi use_gitignore=False) va binary files.
+
+        Returns:
+            TreeItem root, hoac None neu root_path khong phai git repo
+            (caller fallback ve walker)
+        """
+        matcher = self.ignore_engine.compile_matcher(
+            root_path,
+            use_default_ignores=config.use_default_ignores,
+            excluded_patterns=config.excluded_patterns,
+            use_gitignore=False,
+        )
+        rel_paths = list_git_files(root_path, matcher)
+        if rel_paths is None:
+            return None
+
+        root_str = str(root_path)
+        root_item = TreeItem(
+            label=root_path.name or root_str, path=root_str, is_dir=True
+        )
+        dir_items: Dict[str, TreeItem] = {"": root_item}
+
+        def dir_item(rel_dir: str) -> TreeItem:
+            item = dir_items.get(rel_dir)
+            if item is None:
+                parent_rel, _, name = rel_dir.rpartition("/")
+                item = TreeItem(
+                    label=name,
+                    path=os.path.join(root_str, *rel_dir.split("/")),
+                    is_dir=True,
+                )
+                dir_item(parent_rel).children.append(item)
+                dir_items[rel_dir] = item
+                self._progress.directories += 1
+            return item
+
+        for index, rel_path in enumerate(rel_paths):
+            if index % 500 == 0:
+                if not is_scanning():
+                    break
+                self._progress.current_path = rel_path
+                self._emit_progress(progress_callback)
+
+            abs_path = os.path.join(root_str, *rel_path.split("/"))
+            if self._is_binary(abs_path):
+                continue
+            rel_dir, _, name = rel_path.rpartition("/")
+            dir_item(rel_dir).children.append(
+                TreeItem(label=name, path=abs_path, is_dir=False)
+            )
+            self._progress.files += 1
+
+        # Thu tu giong walker: directories truoc, sau do files, theo ten lowercase
+        for item in dir_items.values():
+            item.children.sort(
+                key=lambda child: (not child.is_dir, child.label.lower())
+            )
+
+        self._emit_progress(progress_callback, force=True)
+        return root_item
 
     def _scan_with_rust(
         self,
         root_path: Path,
-        spec_stack: List[Tuple[pathspec.PathSpec, Path]],
+        matcher: IIgnoreMatcher,
         progress_callback: Optional[ProgressCallback],
     ) -> TreeItem:
         """
@@ -270,9 +533,7 @@ class FileScanner:
         from shared.logging_config import log_info
 
         if not HAS_SCANDIR_RS or RustWalk is None:
-            return self._scan_directory(
-                root_path, root_path, spec_stack, progress_callback
-            )
+            return self._scan_directory(root_path, matcher, progress_callback)
 
         log_info("[FileScanner] Using scandir-rs (Rust) for fast scanning")
 
@@ -287,9 +548,9 @@ class FileScanner:
 
         # Dict để build tree structure: Path -> TreeItem
         path_to_item: dict[Path, TreeItem] = {root_path: root_item}
-        # Cache lưu trữ active_stack cho từng directory - Sử dụng LRU để tránh memory leak
-        path_to_spec_stack: LRUSpecCache = LRUSpecCache(maxsize=2000)
-        path_to_spec_stack[root_path] = spec_stack
+        # Cache lưu trữ matcher cho từng directory - Sử dụng LRU để tránh memory leak
+        path_to_matcher: LRUSpecCache = LRUSpecCache(maxsize=2000)
+        path_to_matcher[root_path] = matcher
 
         try:
             # Dùng Walk từ scandir-rs - tương tự os.walk() nhưng nhanh hơn nhiều
@@ -305,25 +566,20 @@ class FileScanner:
                 if parent_item is None:
                     continue
 
+                rel_dir = (
+                    "" if rel_dirpath in ("", ".") else Path(rel_dirpath).as_posix()
+                )
                 if current_dir != root_path:
-                    # Kế thừa spec stack từ thư mục cha
-                    parent_dir = current_dir.parent
-                    parent_stack = path_to_spec_stack.get(parent_dir, spec_stack)
-                    active_stack = (
-                        list(parent_stack) if parent_stack else spec_stack.copy()
+                    # Kế thừa matcher từ thư mục cha, thêm .gitignore ở hiện tại nếu có
+                    parent_matcher = path_to_matcher.get(current_dir.parent) or matcher
+                    active_matcher = self.ignore_engine.descend_matcher(
+                        parent_matcher, current_dir, rel_dir
                     )
 
-                    # Cập nhật nếu có thêm .gitignore ở hiện tại
-                    if (current_dir / ".gitignore").exists():
-                        pats = self.ignore_engine.read_gitignore(current_dir)
-                        if pats:
-                            s = pathspec.PathSpec.from_lines("gitignore", tuple(pats))  # type: ignore[arg-type]
-                            active_stack.append((s, current_dir))
-
                     # Cache cho các thư mục con
-                    path_to_spec_stack[current_dir] = active_stack
+                    path_to_matcher[current_dir] = active_matcher
                 else:
-                    active_stack = spec_stack
+                    active_matcher = matcher
 
                 # Process directories
                 for dir_name in sorted(dirs, key=str.lower):
@@ -332,25 +588,11 @@ class FileScanner:
                     abs_dir_path = os.path.join(abs_dirpath, dir_name)
                     dir_obj = Path(abs_dir_path)
 
-                    if is_system_path(dir_obj):
+                    if is_system_path_str(abs_dir_path):
                         continue
 
-                    # Check ignore patterns against the stack (duyệt ngược từ con lên cha để đảm bảo độ ưu tiên của luật phủ định)
-                    is_ignored = False
-                    for s, base in reversed(active_stack):
-                        try:
-                            rel_to_base = dir_obj.relative_to(base)
-                            rel_path_str = str(rel_to_base)
-                            if not rel_path_str.endswith("/"):
-                                rel_path_str += "/"
-                            res = s.check_file(rel_path_str)
-                            if res is not None:
-                                is_ignored = res.include
-                                break
-                        except ValueError:
-                            continue
-
-                    if is_ignored:
+                    rel_path = f"{rel_dir}/{dir_name}" if rel_dir else dir_name
+                    if active_matcher.is_ignored(rel_path, is_dir=True):
                         continue
 
                     child = TreeItem(label=dir_name, path=abs_dir_path, is_dir=True)
@@ -362,25 +604,14 @@ class FileScanner:
                     if not is_scanning():
                         break
                     abs_file_path = os.path.join(abs_dirpath, file_name)
-                    file_obj = Path(abs_file_path)
 
-                    if is_system_path(file_obj) or is_binary_file(file_obj):
+                    if is_system_path_str(abs_file_path) or self._is_binary(
+                        abs_file_path
+                    ):
                         continue
 
-                    # Check ignore patterns against the stack (duyệt ngược từ con lên cha để đảm bảo độ ưu tiên của luật phủ định)
-                    is_ignored = False
-                    for s, base in reversed(active_stack):
-                        try:
-                            rel_to_base = file_obj.relative_to(base)
-                            rel_path_str = str(rel_to_base)
-                            res = s.check_file(rel_path_str)
-                            if res is not None:
-                                is_ignored = res.include
-                                break
-                        except ValueError:
-                            continue
-
-                    if is_ignored:
+                    rel_path = f"{rel_dir}/{file_name}" if rel_dir else file_name
+                    if active_matcher.is_ignored(rel_path):
                         continue
 
                     self._progress.files += 1
@@ -394,12 +625,105 @@ class FileScanner:
             from shared.logging_config import log_error
 
             log_error(f"[FileScanner] Rust scanner error: {e}, falling back to Python")
-            return self._scan_directory(
-                root_path, root_path, spec_stack, progress_callback
-            )
+            return self._scan_directory(root_path, matcher, progress_callback)
 
         return root_item
 
+    # ===== Snapshot helpers =====
+
+    def _compute_config_key(self, root_path: Path, config: ScanConfig) -> str:
+        """
+        Fingerprint cho root ignore rules.
+
+        Root patterns da bao gom noi dung .gitignore o root (va global gitignore).
+        Voi git root cha (workspace nam trong repo lon hon), dung mtime cua
+        .gitignore cha vi patterns cua no khong nam trong ignore_patterns.
+        """
+        ignore_patterns = self._build_ignore_patterns(root_path, config)
+        parent_marks = []
+        if config.use_gitignore:
+            git_root = self.ignore_engine.find_git_root(root_path)
+            if git_root and git_root != root_path:
+                try:
+                    mtime_ns = os.stat(git_root / ".gitignore").st_mtime_ns
+                except OSError:
+                    mtime_ns = 0
+                parent_marks.append((str(git_root), mtime_ns))
+        parts: List[object] = [root_path, tuple(ignore_patterns), tuple(parent_marks)]
+        if config.defer_binary_check:
+            # Tree khac nhau (file chua phan loai duoc giu lai) -> key rieng
+            parts.append("defer_binary_check")
+        return make_snapshot_key(*parts)
+
+    def _begin_snapshot(self, root_path: Path, config: ScanConfig) -> str:
+        """Load snapshot cu (neu config khop) va khoi tao snapshot moi."""
+        self._previous_snapshot = None
+        self._current_snapshot = None
+        if self._snapshot_store is None:
+            return ""
+
+        config_key = self._compute_config_key(root_path, config)
+        previous = self._snapshot_store.load(root_path)
+        if previous is not None and previous.config_key == config_key:
+            self._previous_snapshot = previous
+        self._current_snapshot = WorkspaceSnapshot(
+            root=str(root_path), config_key=config_key
+        )
+        return config_key
+
+    def _commit_snapshot(self, generation: int) -> None:
+        """Luu snapshot moi - chi khi scan khong bi cancel (tranh luu cay thieu)."""
+        if self._snapshot_store is None or self._current_snapshot is None:
+            return
+        if not is_scanning_valid(generation):
+            return
+
+        from shared.logging_config import log_info
+
+        log_info(
+            f"[FileScanner] Snapshot revalidated: "
+            f"{self._progress.reused_directories}/{self._progress.directories} "
+            f"directories reused"
+        )
+        self._snapshot_store.save(self._current_snapshot)
+
+    def _lookup_snapshot(
+        self, rel_key: str, mtime_ns: int, rules_key: str
+    ) -> Optional[DirectoryRecord]:
+        """Tra ve record cu neu directory va ignore rules khong doi."""
+        if self._previous_snapshot is None:
+            return None
+        record = self._previous_snapshot.directories.get(rel_key)
+        if record is not None and record.is_valid_for(mtime_ns, rules_key):
+            return record
+        return None
+
+    def _child_matcher(
+        self,
+        entry_path: Path,
+        rel_key: str,
+        matcher: IIgnoreMatcher,
+        rules_key: str,
+    ) -> Tuple[IIgnoreMatcher, str]:
+        """
+        Them .gitignore long nhau (neu co) vao matcher cho directory con.
+
+        Returns:
+            (matcher moi, rules_key moi). rules_key chi doi khi directory
+            con co .gitignore, gom ca mtime de phat hien sua noi dung.
+        """
+        try:
+            gitignore_mtime_ns = os.stat(entry_path / ".gitignore").st_mtime_ns
+        except OSError:
+            return matcher, rules_key
+
+        child_matcher = matcher.descend(
+            rel_key, self.ignore_engine.read_gitignore(entry_path)
+        )
+        if self._current_snapshot is not None:
+            rules_key = make_snapshot_key(rules_key, rel_key, gitignore_mtime_ns)
+        return child_matcher, rules_key
+
     def _build_ignore_patterns(self, root_path: Path, config: ScanConfig) -> List[str]:
         """Build list cac ignore patterns tu config. Delegate cho ignore_engine."""
         return self.ignore_engine.build_ignore_patterns(
@@ -412,11 +736,20 @@ class FileScanner:
     def _scan_directory(
         self,
         current_path: Path,
-        root_path: Path,
-        spec_stack: List[Tuple[pathspec.PathSpec, Path]],
+        matcher: IIgnoreMatcher,
         progress_callback: Optional[ProgressCallback],
+        rules_key: str = "",
+        rel_key: str = "",
     ) -> TreeItem:
-        """Scan một directory recursively với progress - optimized version."""
+        """
+        Scan một directory recursively với progress - optimized version.
+
+        Khi co snapshot cu, directory co mtime + rules_key khong doi se dung lai
+        danh sach entries da loc (bo qua scandir, ignore check, binary check).
+
+        Args:
+            rel_key: Relative posix path tu workspace root ("" = root)
+        """
         # Check global cancellation flag
         if not is_scanning():
             return TreeItem(
@@ -439,6 +772,98 @@ class FileScanner:
         self._progress.current_path = str(current_path)
         self._emit_progress(progress_callback)
 
+        listing = self._resolve_directory(current_path, matcher, rules_key, rel_key)
+        if listing is None:
+            return item
+        dir_names, file_names = listing
+
+        # Process directories
+        for name in dir_names:
+            if not is_scanning():
+                break
+
+            entry_path = current_path / name
+            child_rel_key = f"{rel_key}/{name}" if rel_key else name
+
+            # Check for nested .gitignore
+            child_matcher, child_rules_key = self._child_matcher(
+                entry_path, child_rel_key, matcher, rules_key
+            )
+
+            child = self._scan_directory(
+                entry_path,
+                child_matcher,
+                progress_callback,
+                rules_key=child_rules_key,
+                rel_key=child_rel_key,
+            )
+            item.children.append(child)
+
+        for name in file_names:
+            self._progress.files += 1
+            item.children.append(
+                TreeItem(label=name, path=str(current_path / name), is_dir=False)
+            )
+
+        # Emit final progress
+        self._emit_progress(progress_callback, force=True)
+
+        return item
+
+    def _resolve_directory(
+        self,
+        current_path: Path,
+        matcher: IIgnoreMatcher,
+        rules_key: str,
+        rel_key: str,
+    ) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        Lay entries da loc cua 1 directory: tu snapshot neu con hop le,
+        nguoc lai scandir + filter. Ghi record vao snapshot dang build.
+
+        Thread-safe: duoc goi dong thoi tu cac worker cua parallel scan.
+
+        Returns:
+            (ten dirs, ten files), hoac None neu loi / bi cancel
+        """
+        if self._current_snapshot is None:
+            return self._list_directory(current_path, matcher, rel_key)
+
+        try:
+            mtime_ns = os.stat(current_path).st_mtime_ns
+        except OSError:
+            return None
+
+        record = self._lookup_snapshot(rel_key, mtime_ns, rules_key)
+        if record is not None:
+            self._current_snapshot.directories[rel_key] = record
+            with self._progress_lock:
+                self._progress.reused_directories += 1
+            return record.dirs, record.files
+
+        listing = self._list_directory(current_path, matcher, rel_key)
+        # Chi ghi record khi directory duoc liet ke day du (khong bi cancel)
+        if listing is not None and is_scanning():
+            self._current_snapshot.directories[rel_key] = DirectoryRecord(
+                mtime_ns=mtime_ns,
+                rules_key=rules_key,
+                dirs=list(listing[0]),
+                files=list(listing[1]),
+            )
+        return listing
+
+    def _list_directory(
+        self,
+        current_path: Path,
+        matcher: IIgnoreMatcher,
+        rel_key: str,
+    ) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        Liet ke 1 directory va loc entries (system path, ignore, binary).
+
+        Returns:
+            (ten dirs, ten files) da sort, hoac None neu loi / bi cancel
+        """
         try:
             # Use scandir for better performance than iterdir
             with os.scandir(current_path) as entries_iter:
@@ -458,116 +883,59 @@ class FileScanner:
                         continue
 
         except (PermissionError, OSError):
-            return item
+            return None
 
         if not is_scanning():
-            return item
+            return None
 
         # Sort: alphabetically (is_dir separation already done)
         directories.sort(key=lambda e: e.name.lower())
         files.sort(key=lambda e: e.name.lower())
 
-        # Process directories
+        rel_prefix = f"{rel_key}/" if rel_key else ""
+
+        dir_names: List[str] = []
         for entry in directories:
             if not is_scanning():
-                break
+                return None
 
-            entry_path = Path(entry.path)
-
-            if is_system_path(entry_path) or entry.name in DIRECTORY_QUICK_SKIP:
+            if entry.name in DIRECTORY_QUICK_SKIP or is_system_path_str(entry.path):
                 continue
 
-            try:
-                rel_path = entry_path.relative_to(root_path)
-            except ValueError:
+            # Matcher da gop rules tu con len cha (last-match-wins)
+            if matcher.is_ignored(rel_prefix + entry.name, is_dir=True):
                 continue
 
-            rel_path_str = str(rel_path) + "/"
-
-            # ========= FIX: Kiểm tra directory có bị ignore không (duyệt ngược từ con lên cha) =========
-            is_ignored = False
-            for s, base in reversed(spec_stack):
-                try:
-                    rel_to_base = entry_path.relative_to(base)
-                    rel_to_base_str = str(rel_to_base)
-                    if not rel_to_base_str.endswith("/"):
-                        rel_to_base_str += "/"
-                    res = s.check_file(rel_to_base_str)
-                    if res is not None:
-                        is_ignored = res.include
-                        break
-                except ValueError:
-                    continue
-
-            if is_ignored:
-                continue
-            # ===============================================================
-
-            # Check for nested .gitignore
-            new_spec_stack = spec_stack.copy()
-            if (entry_path / ".gitignore").exists():
-                nested_patterns = self.ignore_engine.read_gitignore(entry_path)
-                if nested_patterns:
-                    nested_spec = pathspec.PathSpec.from_lines(  # type: ignore
-                        "gitignore",
-                        nested_patterns,
-                    )
-                    new_spec_stack.append((nested_spec, entry_path))
-
-            child = self._scan_directory(
-                entry_path, root_path, new_spec_stack, progress_callback
-            )
-            item.children.append(child)
+            dir_names.append(entry.name)
 
         # Process files in batches for better cancellation responsiveness
         BATCH_SIZE = 50
-        file_count = 0
+        file_names: List[str] = []
 
         for entry in files:
-            if file_count % BATCH_SIZE == 0 and not is_scanning():
-                break
+            if len(file_names) % BATCH_SIZE == 0 and not is_scanning():
+                return None
 
-            entry_path = Path(entry.path)
-
-            if is_system_path(entry_path):
+            if is_system_path_str(entry.path):
                 continue
 
-            # Skip binary files (check magic bytes)
-            if is_binary_file(entry_path):
+            # Ignore check (chi string) truoc binary check (doc file)
+            if matcher.is_ignored(rel_prefix + entry.name):
                 continue
 
-            try:
-                rel_path = entry_path.relative_to(root_path)
-            except ValueError:
+            # Skip binary files (check magic bytes, hoac chi extension khi defer)
+            if self._is_binary(entry.path):
                 continue
 
-            # Check ignore patterns against the stack (duyệt ngược từ con lên cha để đảm bảo độ ưu tiên của luật phủ định)
-            is_ignored = False
-            for s, base in reversed(spec_stack):
-                try:
-                    rel_to_base = entry_path.relative_to(base)
-                    rel_path_str = str(rel_to_base)
-                    res = s.check_file(rel_path_str)
-                    if res is not None:
-                        is_ignored = res.include
-                        break
-                except ValueError:
-                    continue
-
-            if is_ignored:
-                continue
+            file_names.append(entry.name)
 
-            self._progress.files += 1
-            file_count += 1
+        return dir_names, file_names
 
-            item.children.append(
-                TreeItem(label=entry.name, path=str(entry_path), is_dir=False)
-            )
-
-        # Emit final progress
-        self._emit_progress(progress_callback, force=True)
-
-        return item
+    def _is_binary(self, path: str) -> bool:
+        """Binary check cua scan hien tai (chi extension khi defer_binary_check)."""
+        if self._defer_binary_check:
+            return classify_by_extension(path) is True
+        return is_binary_file(path)
 
     def _emit_progress(
         self,
@@ -584,30 +952,31 @@ class FileScanner:
         if not callback:
             return
 
-        current_time = time.time() * 1000  # Convert to ms
-        time_since_last = current_time - self._last_progress_time
+        with self._progress_lock:
+            current_time = time.time() * 1000  # Convert to ms
+            time_since_last = current_time - self._last_progress_time
+            if not force and time_since_last < self.THROTTLE_INTERVAL_MS:
+                return
 
-        if force or time_since_last >= self.THROTTLE_INTERVAL_MS:
             self._last_progress_time = current_time
             # Copy progress để an toàn
             progress_copy = ScanProgress(
                 directories=self._progress.directories,
                 files=self._progress.files,
                 current_path=self._progress.current_path,
+                reused_directories=self._progress.reused_directories,
             )
 
-            try:
-                callback(progress_copy)
-            except Exception:
-                logger.error(
-                    "file_scanner: failed scanning directory entry", exc_info=True
-                )
+        try:
+            callback(progress_copy)
+        except Exception:
+            logger.error("file_scanner: failed scanning directory entry", exc_info=True)
 
 
 def scan_single_level(
     directory_path: Path,
     root_path: Path,
-    spec_stack: List[Tuple[pathspec.PathSpec, Path]],
+    matcher: IIgnoreMatcher,
 ) -> TreeItem:
     """
     Scan chỉ một level của directory (không recursive).
@@ -617,7 +986,7 @@ def scan_single_level(
     Args:
         directory_path: Directory cần scan
         root_path: Root workspace path (để match ignore patterns)
-        spec_stack: PathSpec stack cho ignore matching
+        matcher: IIgnoreMatcher da ap dung cho directory_path
     """
     if not is_scanning():
         return TreeItem(
@@ -633,7 +1002,13 @@ def scan_single_level(
     )
 
     try:
-        entries = list(directory_path.iterdir())
+        rel_dir = directory_path.relative_to(root_path).as_posix()
+    except ValueError:
+        return item
+    rel_prefix = "" if rel_dir == "." else f"{rel_dir}/"
+
+    try:
+        entries = list(os.scandir(directory_path))
     except (PermissionError, OSError):
         return item
 
@@ -643,36 +1018,18 @@ def scan_single_level(
         if not is_scanning():
             break
 
-        if is_system_path(entry):
+        if is_system_path_str(entry.path):
             continue
 
-        try:
-            entry.relative_to(root_path)
-        except ValueError:
+        is_dir = entry.is_dir()
+        if matcher.is_ignored(rel_prefix + entry.name, is_dir=is_dir):
             continue
 
-        # Check ignore patterns against the stack
-        is_ignored = False
-        for s, base in spec_stack:
-            try:
-                rel_to_base = entry.relative_to(base)
-                rel_path_str = str(rel_to_base)
-                if entry.is_dir():
-                    rel_path_str += "/"
-                if s.match_file(rel_path_str):
-                    is_ignored = True
-                    break
-            except ValueError:
-                continue
-
-        if is_ignored:
-            continue
-
-        if entry.is_dir():
+        if is_dir:
             # Tạo placeholder - sẽ load children khi expand
             child = TreeItem(
                 label=entry.name,
-                path=str(entry),
+                path=entry.path,
                 is_dir=True,
                 children=[],  # Empty - will lazy load
             )
@@ -681,7 +1038,7 @@ def scan_single_level(
         else:
             child = TreeItem(
                 label=entry.name,
-                path=str(entry),
+                path=entry.path,
                 is_dir=False,
             )
 
@@ -712,24 +1069,21 @@ def scan_directory_lazy(
     Returns:
         TreeItem với immediate children only
     """
-    config = ScanConfig(
+    ignore_engine = (
+        IgnoreEngine()
+    )  # NOTE: Should pass in ignore_engine instance from caller
+
+    matcher = ignore_engine.matcher_for_directory(
+        root_path,
+        directory_path,
+        use_default_ignores=use_default_ignores,
         excluded_patterns=excluded_patterns,
         use_gitignore=use_gitignore,
-        use_default_ignores=use_default_ignores,
     )
 
-    scanner = FileScanner(
-        ignore_engine=IgnoreEngine()
-    )  # NOTE: Should pass in ignore_engine instance from caller
-
-    # Build initial ignore spec
-    ignore_patterns = scanner._build_ignore_patterns(root_path, config)
-    root_spec = pathspec.PathSpec.from_lines("gitignore", tuple(ignore_patterns))  # type: ignore[arg-type]
-    spec_stack = [(root_spec, root_path)]
-
     start_scanning()
     try:
-        return scan_single_level(directory_path, root_path, spec_stack)
+        return scan_single_level(directory_path, root_path, matcher)
     finally:
         pass  # Don't stop scanning - caller manages this
 
@@ -742,6 +1096,7 @@ def scan_directory(
     use_gitignore: bool = True,
     use_default_ignores: bool = True,
     progress_callback: Optional[ProgressCallback] = None,
+    snapshot_store: Optional[ScanSnapshotStore] = None,
 ) -> TreeItem:
     """
     Scan directory với progress callbacks.
@@ -754,6 +1109,7 @@ def scan_directory(
         use_gitignore: Có đọc .gitignore không
         use_default_ignores: Có dùng default ignore patterns không
         progress_callback: Callback được gọi khi có progress update
+        snapshot_store: Neu co, dung lai/luu workspace snapshot (warm scan)
 
     Returns:
         TreeItem root chứa toàn bộ cây thư mục
@@ -764,7 +1120,7 @@ def scan_directory(
         use_default_ignores=use_default_ignores,
     )
 
-    scanner = FileScanner(ignore_engine=ignore_engine)
+    scanner = FileScanner(ignore_engine=ignore_engine, snapshot_store=snapshot_store)
     return scanner.scan(
         root_path,
         config=config,
@@ -7,18 +7,24 @@ Ignore/gitignore logic duoc delegate cho core.ignore_engine (single source of tr
 
 import os
 from pathlib import Path
-from typing import Optional, List, Tuple
-import pathspec
+from typing import TYPE_CHECKING, Optional, List
 
 from infrastructure.filesystem.ignore_engine import IgnoreEngine
 from domain.smart_context.tree_item import TreeItem
 from domain.ports.directory_scanner import IDirectoryScanner
-from domain.ports.ignore_engine_port import IIgnoreEngine
+from domain.ports.ignore_engine_port import IIgnoreEngine, IIgnoreMatcher
 from shared.utils.file_utils import (
     is_system_path,
     is_system_path_str,
 )  # noqa: F401
 
+if TYPE_CHECKING:
+    from infrastructure.filesystem.file_scanner import FileScanner, ScanConfig
+    from infrastructure.filesystem.scan_snapshot import ScanSnapshotStore
+
+# So worker cho full scan cua app (FileScanner parallel mode, 1 = tuan tu)
+DEFAULT_SCAN_WORKERS = min(4, os.cpu_count() or 1)
+
 HAS_SCANDIR_RS = False
 try:
     # import scandir_rs
@@ -107,30 +113,16 @@ def scan_directory(
     """
     root_path = root_path.resolve()
 
-    spec_stack = []
-    # Nếu dùng gitignore và workspace nằm sâu trong một repository cha, kế thừa gitignore cha
-    if use_gitignore:
-        git_root = ignore_engine.find_git_root(root_path)
-        if git_root and git_root != root_path:
-            parent_spec = ignore_engine.build_pathspec(
-                git_root,
-                use_default_ignores=False,
-                use_gitignore=True,
-            )
-            spec_stack.append((parent_spec, git_root))
-
-    # Xây dựng pathspec cho bản thân workspace root
-    spec = ignore_engine.build_pathspec(
+    # Matcher da gom .gitignore cua repository cha (neu workspace nam sau trong repo)
+    matcher = ignore_engine.compile_matcher(
         root_path,
         use_default_ignores=use_default_ignores,
         excluded_patterns=excluded_patterns,
         use_gitignore=use_gitignore,
     )
 
-    spec_stack.append((spec, root_path))
-
     # Build tree recursively
-    return _build_tree(root_path, root_path, spec_stack, ignore_engine, visited=set())
+    return _build_tree(root_path, "", matcher, ignore_engine, visited=set())
 
 
 def scan_directory_shallow(
@@ -148,31 +140,18 @@ def scan_directory_shallow(
     """
     root_path = root_path.resolve()
 
-    spec_stack = []
-    if use_gitignore:
-        git_root = ignore_engine.find_git_root(root_path)
-        if git_root and git_root != root_path:
-            parent_spec = ignore_engine.build_pathspec(
-                git_root,
-                use_default_ignores=False,
-                use_gitignore=True,
-            )
-            spec_stack.append((parent_spec, git_root))
-
-    spec = ignore_engine.build_pathspec(
+    matcher = ignore_engine.compile_matcher(
         root_path,
         use_default_ignores=use_default_ignores,
         excluded_patterns=excluded_patterns,
         use_gitignore=use_gitignore,
     )
 
-    spec_stack.append((spec, root_path))
-
     # Build tree với depth limit
     return _build_tree_shallow(
         root_path,
-        root_path,
-        spec_stack,
+        "",
+        matcher,
         current_depth=1,
         max_depth=depth,
         engine=ignore_engine,
@@ -182,11 +161,11 @@ def scan_directory_shallow(
 
 def _build_tree_shallow(
     current_path: Path,
-    root_path: Path,
-    spec_stack: List[Tuple[pathspec.PathSpec, Path]],
+    rel_dir: str,
+    matcher: IIgnoreMatcher,
     current_depth: int,
     max_depth: int,
-    engine: IgnoreEngine,
+    engine: IIgnoreEngine,
     visited: Optional[set[str]] = None,
 ) -> TreeItem:
     """Build tree structure với depth limit (cho lazy loading). Bảo vệ chống circular symlink bằng visited set."""
@@ -228,13 +207,7 @@ def _build_tree_shallow(
     # DirEntry don't have is_dir method in older versions, use is_dir() - it's cached from scandir.
     entries.sort(key=lambda e: (not e.is_dir(), e.name.lower()))
 
-    # Optimization: Pre-calculate base strings
-    spec_stack_with_strs = []
-    for s, base in spec_stack:
-        base_str = str(base)
-        if not base_str.endswith(os.path.sep):
-            base_str += os.path.sep
-        spec_stack_with_strs.append((s, base_str))
+    rel_prefix = f"{rel_dir}/" if rel_dir else ""
 
     for entry in entries:
         # DirEntry behavior
@@ -246,51 +219,24 @@ def _build_tree_shallow(
         if is_system_path_str(entry_path_str):
             continue
 
-        # Kiểm tra với spec stack (duyệt ngược từ con lên cha để đảm bảo độ ưu tiên của luật phủ định)
-        is_ignored = False
-        for s, base_str in reversed(spec_stack_with_strs):
-            if entry_path_str.startswith(base_str):
-                # Trích xuất đường dẫn tương đối
-                rel_path = entry_path_str[len(base_str) :]
-                if is_dir and not rel_path.endswith("/"):
-                    rel_path += "/"
-
-                res = s.check_file(rel_path)
-                if res is not None:
-                    is_ignored = res.include
-                    break
-
-        if is_ignored:
+        # Matcher da gop rules tu con len cha (last-match-wins), chi can relative string
+        entry_rel = rel_prefix + entry_name
+        if matcher.is_ignored(entry_rel, is_dir=is_dir):
             continue
 
-        # Convert to Path object only once if needed for downstream tools
-        # For small project root, this overhead is negligible compared to stat() calls.
-        p_obj = Path(entry_path_str)
-
         # optimization: Only lookup .gitignore if we are planning to recurse
         if is_dir and current_depth < max_depth:
+            # Convert to Path object only once if needed for downstream tools
+            p_obj = Path(entry_path_str)
+
             # Check for nested .gitignore
-            gitignore_path = os.path.join(entry_path_str, ".gitignore")
-            if os.path.exists(gitignore_path):
-                pats = engine.read_gitignore(p_obj)
-                if pats:
-                    new_spec = engine.build_pathspec(
-                        p_obj,
-                        use_default_ignores=False,
-                        excluded_patterns=pats,
-                        use_gitignore=False,
-                    )
-                    next_spec_stack = spec_stack + [(new_spec, p_obj)]
-                else:
-                    next_spec_stack = spec_stack
-            else:
-                next_spec_stack = spec_stack
+            next_matcher = engine.descend_matcher(matcher, p_obj, entry_rel)
 
             # recurse
             child = _build_tree_shallow(
                 p_obj,
-                root_path,
-                next_spec_stack,
+                entry_rel,
+                next_matcher,
                 current_depth + 1,
                 max_depth,
                 engine,
@@ -322,9 +268,9 @@ def _build_tree_shallow(
 
 def _build_tree(
     current_path: Path,
-    root_path: Path,
-    spec_stack: List[Tuple[pathspec.PathSpec, Path]],
-    engine: IgnoreEngine,
+    rel_dir: str,
+    matcher: IIgnoreMatcher,
+    engine: IIgnoreEngine,
     visited: Optional[set[str]] = None,
 ) -> TreeItem:
     """Build tree structure recursively. Bảo vệ chống circular symlink bằng visited set."""
@@ -361,47 +307,26 @@ def _build_tree(
     # Sort: directories first, then alphabetically
     entries.sort(key=lambda e: (not e.is_dir(), e.name.lower()))
 
+    rel_prefix = f"{rel_dir}/" if rel_dir else ""
+
     for entry in entries:
         # Check system path first (fast exclude)
         if is_system_path(entry):
             continue
 
-        # Kiểm tra với spec stack (duyệt ngược từ con lên cha để đảm bảo độ ưu tiên của luật phủ định)
-        is_ignored = False
-        for s, base in reversed(spec_stack):
-            try:
-                rel_to_base = entry.relative_to(base)
-                rel_to_base_str = str(rel_to_base)
-                if entry.is_dir() and not rel_to_base_str.endswith("/"):
-                    rel_to_base_str += "/"
-
-                res = s.check_file(rel_to_base_str)
-                if res is not None:
-                    is_ignored = res.include
-                    break
-            except ValueError:
-                continue
-
-        if is_ignored:
+        # Matcher da gop rules tu con len cha (last-match-wins)
+        entry_rel = rel_prefix + entry.name
+        is_dir = entry.is_dir()
+        if matcher.is_ignored(entry_rel, is_dir=is_dir):
             continue
 
         # Recurse for directories
-        if entry.is_dir():
+        if is_dir:
             # Check for nested .gitignore
-            new_spec_stack = spec_stack.copy()
-            if (entry / ".gitignore").exists():
-                pats = engine.read_gitignore(entry)
-                if pats:
-                    new_spec = engine.build_pathspec(
-                        entry,
-                        use_default_ignores=False,
-                        excluded_patterns=pats,
-                        use_gitignore=False,
-                    )
-                    new_spec_stack.append((new_spec, entry))
+            child_matcher = engine.descend_matcher(matcher, entry, entry_rel)
 
             child = _build_tree(
-                entry, root_path, new_spec_stack, engine, visited
+                entry, entry_rel, child_matcher, engine, visited
             )  # Truyền visited set
             item.children.append(child)
         else:
@@ -510,29 +435,19 @@ def load_folder_children(
         )
     root_path = workspace_root.resolve()
 
-    # Initial spec
-    spec = ignore_engine.build_pathspec(
+    # Matcher gom root rules + .gitignore cua cac folder tren duong xuong folder_path
+    matcher = ignore_engine.matcher_for_directory(
         root_path,
+        folder_path,
         use_default_ignores=use_default_ignores,
         excluded_patterns=excluded_patterns,
         use_gitignore=use_gitignore,
     )
-    spec_stack = [(spec, root_path)]
-
-    # Build spec stack by looking up path
-    if folder_path != root_path:
-        try:
-            rel_parts = folder_path.relative_to(root_path).parts
-            check_path = root_path
-            for part in rel_parts:
-                check_path = check_path / part
-                if (check_path / ".gitignore").exists() and check_path != root_path:
-                    pats = ignore_engine.read_gitignore(check_path)
-                    if pats:
-                        s = pathspec.PathSpec.from_lines("gitignore", tuple(pats))  # type: ignore
-                        spec_stack.append((s, check_path))
-        except ValueError:
-            pass
+    try:
+        rel_dir = folder_path.relative_to(root_path).as_posix()
+    except ValueError:
+        rel_dir = ""
+    rel_prefix = "" if rel_dir in ("", ".") else f"{rel_dir}/"
 
     # Scan children
     try:
@@ -549,25 +464,13 @@ def load_folder_children(
         if is_system_path(entry):
             continue
 
-        # Check against spec stack
-        is_ignored = False
-        for s, base in spec_stack:
-            try:
-                rel_to_base = entry.relative_to(base)
-                rel_to_base_str = str(rel_to_base)
-                if entry.is_dir():
-                    rel_to_base_str += "/"
-                if s.match_file(rel_to_base_str):
-                    is_ignored = True
-                    break
-            except ValueError:
-                continue
-
-        if is_ignored:
+        # Check against matcher
+        is_dir = entry.is_dir()
+        if matcher.is_ignored(rel_prefix + entry.name, is_dir=is_dir):
             continue
 
         # Add child
-        if entry.is_dir():
+        if is_dir:
             child = TreeItem(
                 label=entry.name,
                 path=str(entry),
@@ -589,25 +492,96 @@ def load_folder_children(
     folder_item.is_loaded = True
 
 
+def _use_git_index() -> bool:
+    """Setting use_git_index (False neu chua co settings service)."""
+    try:
+        from application.services.workspace_config import get_use_git_index
+
+        return get_use_git_index()
+    except Exception:
+        return False
+
+
 class ConcreteDirectoryScanner(IDirectoryScanner):
     """
-    Concrete implementation of IDirectoryScanner that wraps scan_directory.
+    Concrete implementation of IDirectoryScanner.
+
+    Full scan chay qua FileScanner. Scan cua tree hien thi (use_snapshot=True)
+    dung snapshot_store: chi re-scan cac directory da doi va luu snapshot cho
+    lan mo workspace sau (load_snapshot). Scan cho prompt (tree map, copy) khong
+    doc/ghi snapshot.
+    max_workers > 1 -> full scan song song (work-stealing queue).
+    Setting use_git_index: git repository lay files tu git index (khong dung
+    snapshot), giong workspace catalog.
+    defer_binary_check=True (tree hien thi): binary chi loc theo extension,
+    file con lai duoc phan loai khi chon (classify_binary_batch), full scan
+    khong mo file nao.
     """
 
-    def __init__(self, ignore_engine: IIgnoreEngine) -> None:
+    def __init__(
+        self,
+        ignore_engine: IIgnoreEngine,
+        snapshot_store: Optional["ScanSnapshotStore"] = None,
+        max_workers: int = DEFAULT_SCAN_WORKERS,
+    ) -> None:
         self._ignore_engine = ignore_engine
+        self._snapshot_store = snapshot_store
+        self._max_workers = max_workers
+
+    def _file_scanner(self, use_snapshot: bool) -> "FileScanner":
+        from infrastructure.filesystem.file_scanner import FileScanner
+
+        # FileScanner giu state cua 1 lan scan -> moi lan scan 1 instance
+        return FileScanner(
+            self._ignore_engine,
+            snapshot_store=self._snapshot_store if use_snapshot else None,
+        )
+
+    def _scan_config(
+        self,
+        excluded_patterns: Optional[List[str]],
+        use_gitignore: bool,
+        defer_binary_check: bool = False,
+    ) -> "ScanConfig":
+        from infrastructure.filesystem.file_scanner import ScanConfig
+
+        return ScanConfig(
+            excluded_patterns=excluded_patterns,
+            use_gitignore=use_gitignore,
+            max_workers=self._max_workers,
+            defer_binary_check=defer_binary_check,
+            use_git_index=_use_git_index(),
+        )
 
     def scan_directory(
         self,
         root_path: Path,
         excluded_patterns: Optional[List[str]] = None,
         use_gitignore: bool = True,
+        *,
+        use_snapshot: bool = False,
+        defer_binary_check: bool = False,
     ) -> TreeItem:
-        return scan_directory(
+        return self._file_scanner(use_snapshot).scan(
             root_path,
-            self._ignore_engine,
-            excluded_patterns=excluded_patterns,
-            use_gitignore=use_gitignore,
+            config=self._scan_config(
+                excluded_patterns, use_gitignore, defer_binary_check
+            ),
+        )
+
+    def load_snapshot(
+        self,
+        root_path: Path,
+        excluded_patterns: Optional[List[str]] = None,
+        use_gitignore: bool = True,
+        *,
+        defer_binary_check: bool = False,
+    ) -> Optional[TreeItem]:
+        return self._file_scanner(True).load_snapshot(
+            root_path,
+            config=self._scan_config(
+                excluded_patterns, use_gitignore, defer_binary_check
+            ),
         )
 
     def scan_directory_shallow(
@@ -14,6 +14,12 @@ from application.interfaces.file_watcher_port import (
     IEventDebouncer,
     WatcherCallbacks,
 )
+from infrastructure.filesystem.file_watcher.tree_deltas import build_tree_deltas
+
+# Batch lon hon nguong nay (git checkout, npm install, ...) -> full refresh
+# re hon patch tung node. Watchdog khong bao queue overflow, nen day cung la
+# luoi an toan khi events bi don dong.
+MAX_INCREMENTAL_EVENTS = 1000
 
 
 class TimerEventDebouncer(IEventDebouncer):
@@ -24,9 +30,10 @@ class TimerEventDebouncer(IEventDebouncer):
     truoc khi trigger callback. Neu co event moi trong khoang thoi gian do,
     timer duoc reset.
 
-    Ho tro 2 che do:
+    Ho tro 3 che do:
     - Incremental: Goi on_file_modified/created/deleted cho tung event
-    - Batch: Goi on_batch_change khi co thay doi bat ky
+    - Tree deltas: Gom batch thanh TreeDelta va goi on_tree_deltas
+    - Batch: Goi on_batch_change (khi khong co on_tree_deltas hoac overflow)
 
     Attributes:
         _callbacks: Tap hop callbacks se duoc goi
@@ -92,7 +99,8 @@ class TimerEventDebouncer(IEventDebouncer):
         Process flow:
         1. Copy va clear pending events
         2. Neu co incremental callbacks, xu ly tung event rieng
-        3. Luon goi batch callback (de refresh tree)
+        3. Neu co on_tree_deltas va batch khong overflow -> gui TreeDelta
+           de patch tree; nguoc lai goi batch callback (full refresh)
         """
         if not self._is_active:
             return
@@ -137,9 +145,24 @@ class TimerEventDebouncer(IEventDebouncer):
                         and self._callbacks.on_file_deleted
                     ):
                         self._callbacks.on_file_deleted(event.path)
-
-            # Luon goi batch callback neu co (de refresh tree)
-            if self._callbacks.on_batch_change:
+                    elif event.event_type == "moved":
+                        # Path cu khong con, path moi can doc lai
+                        if self._callbacks.on_file_deleted:
+                            self._callbacks.on_file_deleted(event.path)
+                        if event.dest_path and self._callbacks.on_file_modified:
+                            self._callbacks.on_file_modified(event.dest_path)
+
+            overflow = len(events) > MAX_INCREMENTAL_EVENTS
+            if self._callbacks.on_tree_deltas and not overflow:
+                deltas = build_tree_deltas(events)
+                if deltas:
+                    self._callbacks.on_tree_deltas(deltas)
+            elif self._callbacks.on_batch_change:
+                if overflow:
+                    log_debug(
+                        f"[FileWatcher] {len(events)} events exceed incremental "
+                        "limit, falling back to full refresh"
+                    )
                 self._callbacks.on_batch_change()
 
         except Exception as e:
@@ -8,6 +8,8 @@ Class nay chi lam 1 viec: chuyen doi watchdog events
 thanh FileChangeEvent va chuyen tiep cho debouncer.
 """
 
+from typing import Optional
+
 from watchdog.events import (
     FileSystemEventHandler,
     FileCreatedEvent,
@@ -64,7 +66,7 @@ class WorkspaceEventHandler(FileSystemEventHandler):
         Xu ly event chung cho tat ca loai su kien.
 
         Flow:
-        1. Kiem tra ignore strategy
+        1. Kiem tra ignore strategy (voi 'moved' kiem tra ca 2 dau)
         2. Tao FileChangeEvent
         3. Gui cho debouncer
 
@@ -74,9 +76,22 @@ class WorkspaceEventHandler(FileSystemEventHandler):
         """
         src_path: str = getattr(event, "src_path", "")
         is_directory: bool = getattr(event, "is_directory", False)
-
-        # Kiem tra ignore strategy
-        if self._ignore_strategy.should_ignore(src_path):
+        dest_path: Optional[str] = None
+
+        if event_type == "moved":
+            # Move qua ranh gioi ignore -> chi con 1 dau hien thi trong tree
+            dest_path = getattr(event, "dest_path", "") or None
+            src_ignored = self._ignore_strategy.should_ignore(src_path)
+            dest_ignored = dest_path is None or self._ignore_strategy.should_ignore(
+                dest_path
+            )
+            if src_ignored and dest_ignored:
+                return
+            if src_ignored:
+                event_type, src_path, dest_path = "created", dest_path or "", None
+            elif dest_ignored:
+                event_type, dest_path = "deleted", None
+        elif self._ignore_strategy.should_ignore(src_path):
             return
 
         # Tao FileChangeEvent va gui cho debouncer
@@ -84,6 +99,7 @@ class WorkspaceEventHandler(FileSystemEventHandler):
             event_type=event_type,
             path=src_path,
             is_directory=is_directory,
+            dest_path=dest_path,
         )
 
         log_debug(f"[FileWatcher] Event: {event_type} - {src_path}")
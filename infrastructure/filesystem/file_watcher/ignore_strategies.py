@@ -3,17 +3,18 @@ Ignore Strategies cho File Watcher.
 
 Chua cac implementation cua IIgnoreStrategy:
 - DefaultIgnoreStrategy: Bo qua cac thu muc pho bien (.git, node_modules, ...)
-
-Mo rong trong tuong lai:
-- GitIgnoreStrategy: Doc .gitignore de xac dinh bo qua
+- GitIgnoreStrategy: Dung IgnoreMatcher (cung luat voi scanner) de bo qua
+  event cua file bi ignore boi .gitignore / excluded patterns
 - CompositeIgnoreStrategy: Ket hop nhieu strategies
 """
 
+import os
 import platform
 from pathlib import Path
-from typing import Set
+from typing import Dict, List, Optional, Sequence, Set
 
 from application.interfaces.file_watcher_port import IIgnoreStrategy
+from domain.ports.ignore_engine_port import IIgnoreEngine, IIgnoreMatcher
 
 
 class DefaultIgnoreStrategy(IIgnoreStrategy):
@@ -67,3 +68,105 @@ class DefaultIgnoreStrategy(IIgnoreStrategy):
             if part_to_check in self.IGNORED_PATTERNS:
                 return True
         return False
+
+
+class GitIgnoreStrategy(IIgnoreStrategy):
+    """
+    Ignore strategy theo .gitignore - dung chung IgnoreMatcher voi scanner.
+
+    Event cua path nam trong directory bi ignore (hoac chinh file bi ignore)
+    se bi bo qua, nen watcher khong trigger refresh cho build output, log...
+    Matcher cua tung directory duoc cache; event tren file .gitignore
+    xoa cache (va KHONG bi ignore) de luat moi co hieu luc ngay. .gitignore
+    o root thi compile lai ca root matcher.
+    """
+
+    GITIGNORE_NAME = ".gitignore"
+
+    def __init__(
+        self,
+        root_path: Path,
+        matcher: IIgnoreMatcher,
+        ignore_engine: IIgnoreEngine,
+        *,
+        use_default_ignores: bool = True,
+        excluded_patterns: Optional[List[str]] = None,
+        use_gitignore: bool = True,
+    ):
+        """
+        Args:
+            root_path: Workspace root dang duoc watch
+            matcher: Matcher da compile cho workspace root
+            ignore_engine: Engine de doc .gitignore long nhau
+            use_default_ignores, excluded_patterns, use_gitignore: Options da
+                dung de compile matcher (compile lai khi .gitignore root doi)
+        """
+        self._root_path = root_path
+        self._root_prefix = str(root_path).rstrip(os.sep) + os.sep
+        self._root_matcher = matcher
+        self._ignore_engine = ignore_engine
+        self._use_default_ignores = use_default_ignores
+        self._excluded_patterns = excluded_patterns
+        self._use_gitignore = use_gitignore
+        # rel_dir (posix) -> matcher ap dung cho children cua directory do
+        self._dir_matchers: Dict[str, IIgnoreMatcher] = {"": matcher}
+
+    def should_ignore(self, path: str) -> bool:
+        """
+        Kiem tra path co bi ignore theo luat cua workspace khong.
+
+        Args:
+            path: Duong dan tuyet doi tu watchdog event
+
+        Returns:
+            True neu path hoac 1 directory cha cua no bi ignore
+        """
+        if not path.startswith(self._root_prefix):
+            return False
+
+        rel_path = path[len(self._root_prefix) :].replace(os.sep, "/")
+        parts = rel_path.split("/")
+        if parts[-1] == self.GITIGNORE_NAME:
+            # Luat thay doi -> matcher cu khong con dung
+            if rel_path == self.GITIGNORE_NAME:
+                self._root_matcher = self._ignore_engine.compile_matcher(
+                    self._root_path,
+                    use_default_ignores=self._use_default_ignores,
+                    excluded_patterns=self._excluded_patterns,
+                    use_gitignore=self._use_gitignore,
+                )
+            self._dir_matchers = {"": self._root_matcher}
+            return False
+
+        matcher = self._root_matcher
+        rel_dir = ""
+        for part in parts[:-1]:
+            rel_dir = f"{rel_dir}/{part}" if rel_dir else part
+            if matcher.is_ignored(rel_dir, is_dir=True):
+                return True
+            matcher = self._matcher_for(rel_dir, matcher)
+        return matcher.is_ignored(rel_path)
+
+    def _matcher_for(self, rel_dir: str, parent: IIgnoreMatcher) -> IIgnoreMatcher:
+        """Matcher cho children cua rel_dir (co cache)."""
+        cached = self._dir_matchers.get(rel_dir)
+        if cached is None:
+            cached = self._ignore_engine.descend_matcher(
+                parent, self._root_path / rel_dir, rel_dir
+            )
+            self._dir_matchers[rel_dir] = cached
+        return cached
+
+
+class CompositeIgnoreStrategy(IIgnoreStrategy):
+    """
+    Ket hop nhieu strategies: path bi ignore neu BAT KY strategy nao ignore.
+
+    Strategies duoc kiem tra theo thu tu, nen dat strategy re nhat truoc.
+    """
+
+    def __init__(self, strategies: Sequence[IIgnoreStrategy]):
+        self._strategies = tuple(strategies)
+
+    def should_ignore(self, path: str) -> bool:
+        return any(strategy.should_ignore(path) for strategy in self._strategies)
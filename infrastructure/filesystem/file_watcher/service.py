@@ -19,10 +19,13 @@ from application.interfaces.file_watcher_port import (
     IIgnoreStrategy,
     WatcherCallbacks,
 )
+from domain.ports.ignore_engine_port import IIgnoreEngine
 from infrastructure.filesystem.file_watcher.debouncer import TimerEventDebouncer
 from infrastructure.filesystem.file_watcher.handler import WorkspaceEventHandler
 from infrastructure.filesystem.file_watcher.ignore_strategies import (
+    CompositeIgnoreStrategy,
     DefaultIgnoreStrategy,
+    GitIgnoreStrategy,
 )
 
 
@@ -31,7 +34,8 @@ class FileWatcher(IFileWatcherService):
     Service theo doi thay doi file trong workspace.
 
     Wiring dependencies:
-    - IIgnoreStrategy -> DefaultIgnoreStrategy (co the thay doi qua constructor)
+    - IIgnoreStrategy -> DefaultIgnoreStrategy (co the thay doi qua constructor),
+      ket hop GitIgnoreStrategy khi co ignore_engine
     - IEventDebouncer -> TimerEventDebouncer (tao moi moi lan start)
     - WorkspaceEventHandler cau noi giua watchdog va debouncer
 
@@ -51,6 +55,7 @@ class FileWatcher(IFileWatcherService):
     def __init__(
         self,
         ignore_strategy: Optional[IIgnoreStrategy] = None,
+        ignore_engine: Optional[IIgnoreEngine] = None,
     ):
         """
         Khoi tao FileWatcher voi optional custom ignore strategy.
@@ -58,6 +63,8 @@ class FileWatcher(IFileWatcherService):
         Args:
             ignore_strategy: Strategy xac dinh path nao can bo qua.
                              Mac dinh su dung DefaultIgnoreStrategy.
+            ignore_engine: Neu co (va khong truyen ignore_strategy), moi lan
+                           start() se ket hop them GitIgnoreStrategy cho workspace.
         """
         # Su dung Any de tranh Pyrefly false positive voi Observer type
         self._observer: Optional[Any] = None
@@ -67,6 +74,8 @@ class FileWatcher(IFileWatcherService):
         self._ignore_strategy: IIgnoreStrategy = (
             ignore_strategy or DefaultIgnoreStrategy()
         )
+        self._custom_strategy = ignore_strategy is not None
+        self._ignore_engine = ignore_engine
 
     def start(
         self,
@@ -107,7 +116,7 @@ class FileWatcher(IFileWatcherService):
             )
 
             self._handler = WorkspaceEventHandler(
-                ignore_strategy=self._ignore_strategy,
+                ignore_strategy=self._build_ignore_strategy(path),
                 debouncer=self._debouncer,
             )
 
@@ -125,6 +134,42 @@ class FileWatcher(IFileWatcherService):
             log_error(f"[FileWatcher] Failed to start: {e}")
             self.stop()
 
+    def _build_ignore_strategy(self, path: Path) -> IIgnoreStrategy:
+        """Ket hop strategy mac dinh voi GitIgnoreStrategy cua workspace (neu co)."""
+        if self._custom_strategy or self._ignore_engine is None:
+            return self._ignore_strategy
+
+        try:
+            from application.services.workspace_config import (
+                get_excluded_patterns,
+                get_use_gitignore,
+            )
+
+            excluded = get_excluded_patterns() or None
+            use_gitignore = get_use_gitignore()
+            matcher = self._ignore_engine.compile_matcher(
+                path,
+                use_default_ignores=True,
+                excluded_patterns=excluded,
+                use_gitignore=use_gitignore,
+            )
+        except Exception as e:
+            log_error(f"[FileWatcher] Gitignore rules unavailable: {e}")
+            return self._ignore_strategy
+
+        return CompositeIgnoreStrategy(
+            [
+                self._ignore_strategy,
+                GitIgnoreStrategy(
+                    path,
+                    matcher,
+                    self._ignore_engine,
+                    excluded_patterns=excluded,
+                    use_gitignore=use_gitignore,
+                ),
+            ]
+        )
+
     def _start_observer_bg(self, path_str: str) -> None:
         """Thuc thi schedule va start observer tren background thread."""
         try:
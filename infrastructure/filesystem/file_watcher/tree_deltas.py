@@ -0,0 +1,110 @@
+"""
+Tree Deltas - Gom batch watcher events thanh thay doi cau truc tree.
+
+Events trong 1 batch debounce thuong chong cheo nhau (tao roi xoa file tam,
+editor atomic save = ghi file tam + rename, xoa folder = xoa tung file con
+roi xoa folder). Module nay rut gon chung thanh tap TreeDelta toi thieu:
+- created + deleted cung path -> khong doi gi
+- deleted folder -> bo moi delta cua path con ben trong
+- moved -> 'rename' (giu selection/cache) neu ca 2 dau deu thuc su doi
+- 'modified' khong anh huong cau truc (cache da duoc invalidate rieng)
+
+Thu tu output: remove -> rename -> insert (parent truoc child).
+"""
+
+import os
+from typing import Dict, List, Sequence, Tuple
+
+from application.interfaces.file_watcher_port import FileChangeEvent, TreeDelta
+
+_INSERT = "insert"
+_REMOVE = "remove"
+
+
+class _DeltaAccumulator:
+    """Trang thai rut gon theo path trong luc duyet events."""
+
+    def __init__(self) -> None:
+        # path -> (op, is_directory)
+        self.ops: Dict[str, Tuple[str, bool]] = {}
+        # dest -> path goc (truoc chuoi moved)
+        self.moved_from: Dict[str, str] = {}
+
+    def created(self, path: str, is_dir: bool) -> None:
+        previous = self.ops.get(path)
+        if previous == (_REMOVE, is_dir):
+            # Xoa roi tao lai cung loai -> cau truc khong doi
+            del self.ops[path]
+        else:
+            self.ops[path] = (_INSERT, is_dir)
+
+    def deleted(self, path: str, is_dir: bool) -> None:
+        prefix = path + os.sep
+        for other in [p for p in self.ops if p.startswith(prefix)]:
+            del self.ops[other]
+        for dest in [d for d in self.moved_from if d == path or d.startswith(prefix)]:
+            del self.moved_from[dest]
+
+        previous = self.ops.get(path)
+        if previous is not None and previous[0] == _INSERT:
+            # Tao roi xoa trong cung batch -> chua tung co trong tree
+            del self.ops[path]
+        else:
+            self.ops[path] = (_REMOVE, is_dir)
+
+    def moved(self, src: str, dest: str, is_dir: bool) -> None:
+        origin = self.moved_from.pop(src, None)
+        if origin is None and src not in self.ops:
+            origin = src
+
+        self.deleted(src, is_dir)
+        self.created(dest, is_dir)
+
+        if (
+            origin is not None
+            and self.ops.get(origin) == (_REMOVE, is_dir)
+            and self.ops.get(dest) == (_INSERT, is_dir)
+        ):
+            self.moved_from[dest] = origin
+
+    def to_deltas(self) -> List[TreeDelta]:
+        renames: List[TreeDelta] = []
+        for dest, origin in self.moved_from.items():
+            is_dir = self.ops[dest][1]
+            del self.ops[dest]
+            del self.ops[origin]
+            renames.append(TreeDelta("rename", origin, is_dir, new_path=dest))
+
+        removes = [
+            TreeDelta(_REMOVE, path, is_dir)
+            for path, (op, is_dir) in self.ops.items()
+            if op == _REMOVE
+        ]
+        inserts = [
+            TreeDelta(_INSERT, path, is_dir)
+            for path, (op, is_dir) in self.ops.items()
+            if op == _INSERT
+        ]
+        inserts.sort(key=lambda delta: (delta.path.count(os.sep), delta.path))
+        return removes + renames + inserts
+
+
+def build_tree_deltas(events: Sequence[FileChangeEvent]) -> List[TreeDelta]:
+    """
+    Rut gon 1 batch events thanh danh sach TreeDelta.
+
+    Args:
+        events: Events theo thu tu xay ra
+
+    Returns:
+        Deltas can ap dung len tree (co the rong)
+    """
+    accumulator = _DeltaAccumulator()
+    for event in events:
+        if event.event_type == "created":
+            accumulator.created(event.path, event.is_directory)
+        elif event.event_type == "deleted":
+            accumulator.deleted(event.path, event.is_directory)
+        elif event.event_type == "moved" and event.dest_path:
+            accumulator.moved(event.path, event.dest_path, event.is_directory)
+    return accumulator.to_deltas()
@@ -9,6 +9,9 @@ Thay the cac doan code bi trung lap o:
 Cung cap:
 - build_ignore_patterns(): Tap hop patterns tu VCS + default + user + gitignore
 - build_pathspec(): Tao pathspec.PathSpec tu patterns (co cache)
+- compile_matcher(): IgnoreMatcher da compile cho hot loop scan (co cache)
+- descend_matcher(): Them .gitignore long nhau cua 1 directory vao matcher
+- matcher_for_directory(): Matcher cho 1 folder bat ky (lazy loading)
 - read_gitignore(): Doc .gitignore, .git/info/exclude, global gitignore (co cache)
 - find_git_root(): Tim git root directory tu mot path bat ky
 - clear_cache(): Xoa tat ca cache
@@ -16,6 +19,8 @@ Cung cap:
 SOLID: Single Responsibility - chi lo viec quyet dinh "file/folder nay co bi ignore khong"
 """
 
+import os
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import threading
@@ -23,7 +28,12 @@ import threading
 import pathspec
 
 from shared.constants import EXTENDED_IGNORE_PATTERNS
-from domain.ports.ignore_engine_port import IIgnoreEngine
+from domain.ports.ignore_engine_port import IIgnoreEngine, IIgnoreMatcher
+from infrastructure.filesystem.ignore_matcher import IgnoreMatcher
+
+# So compiled matcher giu lai (moi workspace/bo excluded patterns 1 entry,
+# sua .gitignore tao key moi)
+MAX_MATCHER_CACHE = 64
 
 
 class IgnoreEngine(IIgnoreEngine):
@@ -33,6 +43,9 @@ class IgnoreEngine(IIgnoreEngine):
     Cung cap:
     - build_ignore_patterns(): Tap hop patterns tu VCS + default + user + gitignore
     - build_pathspec(): Tao pathspec.PathSpec tu patterns (co cache)
+    - compile_matcher(): IgnoreMatcher da compile cho hot loop scan (co cache)
+    - descend_matcher(): Them .gitignore long nhau cua 1 directory vao matcher
+    - matcher_for_directory(): Matcher cho 1 folder bat ky (lazy loading)
     - read_gitignore(): Doc .gitignore, .git/info/exclude, global gitignore (co cache)
     - find_git_root(): Tim git root directory tu mot path bat ky
     - clear_cache(): Xoa tat ca cache
@@ -50,6 +63,9 @@ class IgnoreEngine(IIgnoreEngine):
         self._global_gitignore_cache: Optional[List[str]] = None
         # Cache cho git root: path -> git_root_path
         self._git_root_cache: Dict[str, Path] = {}
+        # Cache cho compiled matchers: (root, prefix, patterns, parent patterns) -> matcher
+        # LRU, toi da MAX_MATCHER_CACHE entries
+        self._matcher_cache: "OrderedDict[Tuple, IgnoreMatcher]" = OrderedDict()
         # Thread safety lock
         self._lock = threading.Lock()
 
@@ -126,6 +142,108 @@ class IgnoreEngine(IIgnoreEngine):
             self._pathspec_cache[cache_key] = (gitignore_mtime, spec)
         return spec
 
+    def compile_matcher(
+        self,
+        root_path: Path,
+        *,
+        use_default_ignores: bool = True,
+        excluded_patterns: Optional[List[str]] = None,
+        use_gitignore: bool = True,
+    ) -> IgnoreMatcher:
+        """
+        Compile matcher cho workspace root (gom ca .gitignore cua git root cha).
+
+        Cache theo noi dung patterns: sua .gitignore -> patterns doi -> key doi.
+        """
+        root_patterns = self.build_ignore_patterns(
+            root_path,
+            use_default_ignores=use_default_ignores,
+            excluded_patterns=excluded_patterns,
+            use_gitignore=use_gitignore,
+        )
+        parent_patterns: List[str] = []
+        prefix = ""
+        if use_gitignore:
+            git_root = self.find_git_root(root_path)
+            if git_root and git_root != root_path:
+                try:
+                    prefix = root_path.relative_to(git_root).as_posix() + "/"
+                    parent_patterns = self.build_ignore_patterns(
+                        git_root, use_default_ignores=False, use_gitignore=True
+                    )
+                except ValueError:
+                    prefix = ""
+
+        cache_key = (
+            str(root_path),
+            prefix,
+            tuple(root_patterns),
+            tuple(parent_patterns),
+        )
+        with self._lock:
+            cached = self._matcher_cache.get(cache_key)
+            if cached is not None:
+                self._matcher_cache.move_to_end(cache_key)
+                return cached
+
+        # Compile ngoai lock (expensive operation)
+        matcher = IgnoreMatcher.for_workspace(root_patterns, parent_patterns, prefix)
+        with self._lock:
+            self._matcher_cache[cache_key] = matcher
+            self._matcher_cache.move_to_end(cache_key)
+            while len(self._matcher_cache) > MAX_MATCHER_CACHE:
+                self._matcher_cache.popitem(last=False)
+        return matcher
+
+    def descend_matcher(
+        self, matcher: IIgnoreMatcher, directory: Path, rel_dir: str
+    ) -> IIgnoreMatcher:
+        """
+        Matcher cho subtree cua directory: them .gitignore cua no neu co.
+
+        Args:
+            matcher: Matcher dang ap dung cho directory cha
+            directory: Duong dan tuyet doi cua directory
+            rel_dir: Directory relative tu workspace root (posix)
+        """
+        if not os.path.isfile(os.path.join(directory, ".gitignore")):
+            return matcher
+        return matcher.descend(rel_dir, self.read_gitignore(Path(directory)))
+
+    def matcher_for_directory(
+        self,
+        root_path: Path,
+        directory: Path,
+        *,
+        use_default_ignores: bool = True,
+        excluded_patterns: Optional[List[str]] = None,
+        use_gitignore: bool = True,
+    ) -> IIgnoreMatcher:
+        """
+        Matcher ap dung cho children cua `directory` (lazy load 1 folder).
+
+        Gom root rules va .gitignore cua moi thu muc tren duong tu root
+        xuong directory (khong gom .gitignore cua root - da nam trong root rules).
+        """
+        matcher = self.compile_matcher(
+            root_path,
+            use_default_ignores=use_default_ignores,
+            excluded_patterns=excluded_patterns,
+            use_gitignore=use_gitignore,
+        )
+        try:
+            rel_parts = directory.relative_to(root_path).parts
+        except ValueError:
+            return matcher
+
+        current = root_path
+        rel_dir = ""
+        for part in rel_parts:
+            current = current / part
+            rel_dir = f"{rel_dir}/{part}" if rel_dir else part
+            matcher = self.descend_matcher(matcher, current, rel_dir)
+        return matcher
+
     def read_gitignore(self, root_path: Path) -> List[str]:
         """Doc .gitignore va .git/info/exclude cho mot directory cu the."""
         gitignore_path = root_path / ".gitignore"
@@ -232,6 +350,7 @@ class IgnoreEngine(IIgnoreEngine):
         with self._lock:
             self._gitignore_cache.clear()
             self._pathspec_cache.clear()
+            self._matcher_cache.clear()
 
     def _get_gitignore_mtime(self, root_path: Path) -> float:
         gitignore_file = root_path / ".gitignore"
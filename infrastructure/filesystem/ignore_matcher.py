@@ -0,0 +1,158 @@
+"""
+Ignore Matcher - Bo luat ignore da compile san cho hot loop khi scan.
+
+Thay the viec duyet spec_stack cho MOI entry (Path.relative_to + str +
+PathSpec.check_file lap lai cho tung level .gitignore):
+- Tat ca rules (git root cha + workspace root + .gitignore long nhau)
+  gop vao MOT danh sach, last-match-wins giong git va giong thu tu
+  duyet reversed(spec_stack) truoc day
+- Rule cua .gitignore long nhau duoc neo vao thu muc chua no bang cach
+  them prefix vao regex -> caller chi can truyen relative path string
+  tinh tu workspace root, khong tao Path object nao
+- Moi rule co 1 literal bat buoc (vd "node_modules", ".log"): kiem tra
+  substring truoc khi chay regex, bo qua phan lon rules ma khong can regex
+
+Matcher la immutable: descend() tra ve matcher moi cho directory con
+co .gitignore, moi level chi compile rules cua chinh no 1 lan.
+"""
+
+import os
+import re
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import pathspec.util
+
+# Cung loai pattern voi PathSpec.from_lines("gitignore", ...) dung o khap noi
+_PATTERN_FACTORY = pathspec.util.lookup_pattern("gitignore")
+
+# Separator native can doi sang "/" (None tren POSIX)
+_NATIVE_SEP: Optional[str] = os.sep if os.sep != "/" else None
+
+_CHAR_CLASS_RE = re.compile(r"\[[^\]]*\]")
+_GLOB_SPLIT_RE = re.compile(r"[*?/\[\]]")
+
+# (literal bat buoc, regex.match, include)
+_Rule = Tuple[str, Callable[[str], Optional[re.Match]], bool]
+
+
+def _required_literal(line: str) -> str:
+    """
+    Doan ky tu dai nhat chac chan xuat hien trong moi path match voi pattern.
+
+    Tra ve "" (luon chay regex) khi pattern co escape, vi khi do khong
+    tach duoc literal an toan.
+    """
+    body = line[1:] if line.startswith("!") else line
+    body = body.rstrip()
+    if "\\" in body:
+        return ""
+    body = _CHAR_CLASS_RE.sub("/", body)
+    segments = [segment for segment in _GLOB_SPLIT_RE.split(body) if segment]
+    return max(segments, key=len) if segments else ""
+
+
+def _compile_rules(patterns: Iterable[str], base: str) -> List[_Rule]:
+    """
+    Compile patterns cua 1 level thanh rules, neo vao thu muc `base`.
+
+    Args:
+        patterns: Cac dong gitignore cua level nay
+        base: Prefix (co "/" o cuoi) cua thu muc chua .gitignore,
+              tinh tu goc toa do cua matcher ("" = goc)
+    """
+    rules: List[_Rule] = []
+    escaped_base = re.escape(base)
+    for line in patterns:
+        pattern = _PATTERN_FACTORY(line)
+        regex = getattr(pattern, "regex", None)
+        if pattern.include is None or regex is None:
+            continue
+        if base:
+            # Regex cua gitignore pattern luon bat dau bang "^"
+            source = (
+                regex.pattern[1:] if regex.pattern.startswith("^") else regex.pattern
+            )
+            regex = re.compile(f"^{escaped_base}{source}", regex.flags)
+        rules.append((_required_literal(line), regex.match, bool(pattern.include)))
+    return rules
+
+
+class IgnoreMatcher:
+    """
+    Bo luat ignore da compile, match bang relative path string.
+
+    Toa do: moi path truyen vao la relative (posix) tu workspace root.
+    Neu workspace nam trong git repo cha, `prefix` la duong dan tu git root
+    toi workspace root de rules cua .gitignore cha match dung nhu truoc.
+    """
+
+    __slots__ = ("_rules", "_prefix")
+
+    def __init__(self, rules: Sequence[_Rule] = (), prefix: str = "") -> None:
+        # Rules luu theo thu tu NGUOC (rule khai bao sau cung dung dau)
+        # de dung ngay o rule dau tien match (last-match-wins)
+        self._rules: Tuple[_Rule, ...] = tuple(rules)
+        self._prefix = prefix
+
+    @classmethod
+    def for_workspace(
+        cls,
+        root_patterns: Sequence[str],
+        parent_patterns: Sequence[str] = (),
+        prefix: str = "",
+    ) -> "IgnoreMatcher":
+        """
+        Tao matcher cho workspace root.
+
+        Args:
+            root_patterns: Patterns cua workspace root (VCS + default + user + gitignore)
+            parent_patterns: Patterns cua git root cha (neu workspace nam trong repo cha)
+            prefix: Duong dan tu git root cha toi workspace root, co "/" o cuoi
+        """
+        rules = _compile_rules(parent_patterns, "") if parent_patterns else []
+        rules.extend(_compile_rules(root_patterns, prefix))
+        rules.reverse()
+        return cls(rules, prefix)
+
+    @property
+    def rule_count(self) -> int:
+        """So rules hieu luc (phuc vu debug/benchmark)."""
+        return len(self._rules)
+
+    def descend(self, rel_dir: str, patterns: Sequence[str]) -> "IgnoreMatcher":
+        """
+        Matcher cho subtree cua directory co .gitignore rieng.
+
+        Args:
+            rel_dir: Directory chua .gitignore, relative tu workspace root
+            patterns: Noi dung .gitignore cua directory do
+
+        Returns:
+            Matcher moi (hoac chinh no neu patterns rong)
+        """
+        if not patterns:
+            return self
+        base = f"{self._prefix}{rel_dir}/" if rel_dir else self._prefix
+        new_rules = _compile_rules(patterns, base)
+        if not new_rules:
+            return self
+        new_rules.reverse()
+        return IgnoreMatcher(tuple(new_rules) + self._rules, self._prefix)
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Kiem tra path co bi ignore khong.
+
+        Args:
+            rel_path: Relative path tu workspace root (chap nhan ca os.sep)
+            is_dir: True neu path la directory (de match pattern "dir/")
+        """
+        if _NATIVE_SEP is not None and _NATIVE_SEP in rel_path:
+            rel_path = rel_path.replace(_NATIVE_SEP, "/")
+        path = self._prefix + rel_path
+        if is_dir and not path.endswith("/"):
+            path += "/"
+        for literal, match, include in self._rules:
+            if literal in path and match(path) is not None:
+                return include
+        return False
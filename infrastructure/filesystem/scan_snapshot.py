@@ -0,0 +1,277 @@
+"""
+Scan Snapshot - Luu workspace snapshot xuong dia de warm startup tuc thi.
+
+Snapshot cua mot lan FileScanner.scan() gom:
+- Danh sach entries da qua ignore/binary filter cua TUNG directory
+- mtime_ns cua directory tai thoi diem scan
+- rules_key: fingerprint cua bo luat ignore ap dung cho directory do
+  (root patterns + cac .gitignore long nhau tren duong di)
+
+Khi mo lai workspace:
+- WorkspaceSnapshot.build_tree(): Dung TreeItem tu snapshot ngay lap tuc,
+  khong cham vao workspace (UI hien tree truoc khi revalidate xong)
+- FileScanner.scan(): Chi re-scan cac directory co mtime hoac rules_key
+  thay doi, cac directory con lai dung lai ket qua tu snapshot
+
+Luu y: Sua noi dung 1 file KHONG doi mtime cua directory chua no.
+Snapshot chi cache cau truc cay (ten entries), khong cache noi dung file,
+nen dieu nay khong anh huong tinh dung dan.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from domain.smart_context.tree_item import TreeItem
+
+logger = logging.getLogger("synapse-desktop")
+
+# Tang version khi doi format hoac doi logic filter cua scanner
+SNAPSHOT_VERSION = 1
+
+
+def make_snapshot_key(*parts: object) -> str:
+    """
+    Tao fingerprint on dinh giua cac lan chay app.
+
+    Khong dung hash() built-in vi Python salt hash cua str moi process.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(str(part).encode("utf-8", errors="surrogatepass"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+@dataclass
+class DirectoryRecord:
+    """
+    Ket qua scan cua mot directory.
+
+    Attributes:
+        mtime_ns: mtime cua directory luc scan (doi khi them/xoa/rename entry)
+        rules_key: Fingerprint cua bo luat ignore dung de loc entries
+        dirs: Ten cac thu muc con duoc giu lai (da sort)
+        files: Ten cac file duoc giu lai (da sort)
+    """
+
+    mtime_ns: int
+    rules_key: str
+    dirs: List[str] = field(default_factory=list)
+    files: List[str] = field(default_factory=list)
+
+    def is_valid_for(self, mtime_ns: int, rules_key: str) -> bool:
+        """Record con dung duoc neu ca directory lan bo luat ignore khong doi."""
+        return self.mtime_ns == mtime_ns and self.rules_key == rules_key
+
+
+@dataclass
+class WorkspaceSnapshot:
+    """
+    Snapshot cua toan bo workspace tree.
+
+    Attributes:
+        root: Duong dan tuyet doi cua workspace (da resolve)
+        config_key: Fingerprint cua ScanConfig + root ignore patterns
+        directories: relative posix path ("" = root) -> DirectoryRecord
+        created_at: Thoi diem tao snapshot (epoch seconds)
+    """
+
+    root: str
+    config_key: str
+    directories: Dict[str, DirectoryRecord] = field(default_factory=dict)
+    created_at: float = 0.0
+
+    def file_count(self) -> int:
+        """Tong so files trong snapshot."""
+        return sum(len(record.files) for record in self.directories.values())
+
+    def build_tree(self) -> TreeItem:
+        """
+        Dung TreeItem tu snapshot - KHONG co I/O tren workspace.
+
+        Directory khong co record (scan bi cancel giua chung) duoc tra ve
+        rong de caller van co cay hop le.
+        """
+        root_path = Path(self.root)
+        root_item = TreeItem(
+            label=root_path.name or self.root,
+            path=self.root,
+            is_dir=True,
+        )
+        # Iterative de tranh RecursionError voi cay rat sau
+        stack = [(root_item, "")]
+        while stack:
+            item, rel = stack.pop()
+            record = self.directories.get(rel)
+            if record is None:
+                continue
+            for name in record.dirs:
+                child_rel = f"{rel}/{name}" if rel else name
+                child = TreeItem(
+                    label=name,
+                    path=os.path.join(item.path, name),
+                    is_dir=True,
+                )
+                item.children.append(child)
+                stack.append((child, child_rel))
+            for name in record.files:
+                item.children.append(
+                    TreeItem(
+                        label=name,
+                        path=os.path.join(item.path, name),
+                        is_dir=False,
+                    )
+                )
+        return root_item
+
+    def to_dict(self) -> dict:
+        """Serialize sang dict gon (list thay vi dict cho moi record)."""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "root": self.root,
+            "config_key": self.config_key,
+            "created_at": self.created_at,
+            "directories": {
+                rel: [rec.mtime_ns, rec.rules_key, rec.dirs, rec.files]
+                for rel, rec in self.directories.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Optional["WorkspaceSnapshot"]:
+        """Deserialize, tra ve None neu version khong khop hoac data hong."""
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return None
+        try:
+            directories = {
+                rel: DirectoryRecord(
+                    mtime_ns=int(values[0]),
+                    rules_key=str(values[1]),
+                    dirs=list(values[2]),
+                    files=list(values[3]),
+                )
+                for rel, values in data["directories"].items()
+            }
+            return cls(
+                root=str(data["root"]),
+                config_key=str(data["config_key"]),
+                directories=directories,
+                created_at=float(data.get("created_at", 0.0)),
+            )
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+
+
+class ScanSnapshotStore:
+    """
+    Doc/ghi WorkspaceSnapshot duoi app data dir.
+
+    Moi workspace mot file gzip JSON, ten file la hash cua root path.
+    Ghi atomic (temp file + os.replace) de khong de lai snapshot hong
+    neu app bi kill giua chung.
+    """
+
+    FILE_SUFFIX = ".json.gz"
+
+    def __init__(self, base_dir: Optional[Path] = None) -> None:
+        """
+        Args:
+            base_dir: Thu muc luu snapshots. Mac dinh WORKSPACE_SNAPSHOT_DIR.
+        """
+        if base_dir is None:
+            from shared.config.paths import WORKSPACE_SNAPSHOT_DIR
+
+            base_dir = WORKSPACE_SNAPSHOT_DIR
+        self._base_dir = base_dir
+        self._lock = threading.Lock()
+
+    def snapshot_path(self, root_path: Path) -> Path:
+        """Duong dan file snapshot cho workspace."""
+        return self._base_dir / f"{make_snapshot_key(root_path)}{self.FILE_SUFFIX}"
+
+    def load(self, root_path: Path) -> Optional[WorkspaceSnapshot]:
+        """
+        Load snapshot cua workspace.
+
+        Returns:
+            WorkspaceSnapshot hoac None neu chua co / hong / khac version
+        """
+        path = self.snapshot_path(root_path)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            logger.warning("scan_snapshot: failed to read %s: %s", path, e)
+            return None
+
+        snapshot = WorkspaceSnapshot.from_dict(data)
+        if snapshot is None or snapshot.root != str(root_path):
+            return None
+        return snapshot
+
+    def save(self, snapshot: WorkspaceSnapshot) -> bool:
+        """
+        Ghi snapshot xuong dia (atomic).
+
+        Returns:
+            True neu ghi thanh cong
+        """
+        path = self.snapshot_path(Path(snapshot.root))
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        if not snapshot.created_at:
+            snapshot.created_at = time.time()
+
+        with self._lock:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                payload = json.dumps(snapshot.to_dict(), separators=(",", ":"))
+                # compresslevel thap: snapshot ghi moi lan scan, uu tien toc do
+                with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=3) as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+                return True
+            except OSError as e:
+                logger.warning("scan_snapshot: failed to write %s: %s", path, e)
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                return False
+
+    def delete(self, root_path: Path) -> None:
+        """Xoa snapshot cua mot workspace (vd: user bam Reload cung)."""
+        try:
+            self.snapshot_path(root_path).unlink()
+        except OSError:
+            pass
+
+    def clear(self) -> int:
+        """
+        Xoa tat ca snapshots.
+
+        Returns:
+            So file da xoa
+        """
+        removed = 0
+        for path in self._iter_snapshot_files():
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _iter_snapshot_files(self) -> Iterable[Path]:
+        if not self._base_dir.exists():
+            return []
+        return list(self._base_dir.glob(f"*{self.FILE_SUFFIX}"))
@@ -19,6 +19,8 @@ from shared.utils.path_utils import path_for_display
 from shared.types.git_types import DiffOnlyResult
 from shared.types.git_types import GitDiffResult, GitCommit, GitLogResult
 from domain.ports.git_port import IGitService
+from domain.ports.ignore_engine_port import IIgnoreMatcher
+from infrastructure.git.git_index import list_git_files
 
 
 # Diff Only - file_summary mo ta context la git changes
@@ -167,6 +169,11 @@ class GitService(IGitService):
             output_format,
         )
 
+    def list_workspace_files(
+        self, root_path: Path, matcher: Optional[IIgnoreMatcher] = None
+    ) -> Optional[list[str]]:
+        return list_git_files(root_path, matcher)
+
 
 def is_git_installed() -> bool:
     """Check if git is installed and available in PATH."""
@@ -0,0 +1,81 @@
+"""
+Content Index Store - Luu trigram content index xuong app cache dir.
+
+Moi workspace mot file gzip JSON, ten file la hash cua root path (giong
+ScanSnapshotStore). Ghi atomic (temp file + os.replace) de khong de lai
+file hong neu app bi kill giua chung. Cache co the xoa bat ky luc nao,
+index se duoc build lai tu dau.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from domain.ports.content_index_port import IContentIndexStore
+from infrastructure.filesystem.scan_snapshot import make_snapshot_key
+
+logger = logging.getLogger("synapse-desktop")
+
+
+class ContentIndexStore(IContentIndexStore):
+    """Doc/ghi du lieu content index theo workspace."""
+
+    FILE_SUFFIX = ".json.gz"
+
+    def __init__(self, base_dir: Optional[Path] = None) -> None:
+        """
+        Args:
+            base_dir: Thu muc luu index. Mac dinh CONTENT_INDEX_DIR.
+        """
+        if base_dir is None:
+            from shared.config.paths import CONTENT_INDEX_DIR
+
+            base_dir = CONTENT_INDEX_DIR
+        self._base_dir = base_dir
+        self._lock = threading.Lock()
+
+    def index_path(self, workspace_root: Path) -> Path:
+        """Duong dan file index cho workspace."""
+        return self._base_dir / f"{make_snapshot_key(workspace_root)}{self.FILE_SUFFIX}"
+
+    def load(self, workspace_root: Path) -> Optional[Dict[str, Any]]:
+        path = self.index_path(workspace_root)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            logger.warning("content_index_store: failed to read %s: %s", path, e)
+            return None
+
+        if not isinstance(data, dict) or data.get("root") != str(workspace_root):
+            return None
+        return data.get("index")
+
+    def save(self, workspace_root: Path, data: Dict[str, Any]) -> bool:
+        path = self.index_path(workspace_root)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+        with self._lock:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                payload = json.dumps(
+                    {"root": str(workspace_root), "index": data},
+                    separators=(",", ":"),
+                )
+                with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=3) as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+                return True
+            except (OSError, ValueError) as e:
+                logger.warning("content_index_store: failed to write %s: %s", path, e)
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                return False
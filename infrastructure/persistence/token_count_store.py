@@ -0,0 +1,301 @@
+"""
+Token Count Store - Luu token count theo content hash xuong SQLite.
+
+TokenCache trong bo nho mat het khi restart, va key (path, mtime) nen moi lan
+`git checkout`/`touch` la dem lai ca repo. Store nay luu:
+- token_counts: (hash, encoder) -> count. Noi dung giong nhau giua cac
+  branch/worktree chi dem 1 lan; doi encoder qua lai khong mat ket qua cu.
+- file_hashes: path -> (mtime_ns, size, hash). Mo lai workspace -> co count
+  ngay ma khong doc file.
+
+Ghi duoc buffer trong bo nho va flush theo lo (1 transaction) de khong lam
+cham vong dem token. Loi SQLite (disk day, file hong) chi log va tat store,
+khong bao gio lam hong viec dem token. Cache co the xoa bat ky luc nao.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from domain.ports.tokenization_port import ITokenCountStore
+
+logger = logging.getLogger("synapse-desktop")
+
+# So entry buffer toi da truoc khi flush
+FLUSH_BATCH_SIZE = 500
+# Flush buffer cu hon khoang nay o lan ghi tiep theo
+FLUSH_INTERVAL_SECONDS = 2.0
+
+# Gioi han so dong moi bang, prune dong lau khong ghi nhat khi mo store
+MAX_COUNT_ROWS = 1_000_000
+MAX_PATH_ROWS = 500_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_counts (
+    hash BLOB NOT NULL,
+    encoder TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (hash, encoder)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS token_counts_used ON token_counts (used);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash BLOB NOT NULL,
+    used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS file_hashes_used ON file_hashes (used);
+"""
+
+
+class TokenCountStore(ITokenCountStore):
+    """SQLite token count store, 1 connection dung chung duoi 1 lock."""
+
+    FILE_NAME = "token_counts.sqlite3"
+
+    def __init__(
+        self,
+        base_dir: Optional[Path] = None,
+        max_count_rows: int = MAX_COUNT_ROWS,
+        max_path_rows: int = MAX_PATH_ROWS,
+    ) -> None:
+        """
+        Args:
+            base_dir: Thu muc chua database. Mac dinh CACHE_DIR.
+            max_count_rows: So dong toi da bang token_counts
+            max_path_rows: So dong toi da bang file_hashes
+        """
+        if base_dir is None:
+            from shared.config.paths import CACHE_DIR
+
+            base_dir = CACHE_DIR
+        self._db_path = base_dir / self.FILE_NAME
+        self._max_count_rows = max_count_rows
+        self._max_path_rows = max_path_rows
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._opened = False
+        # Buffer chua flush: cung duoc doc boi get_* (read-your-writes)
+        self._pending_counts: Dict[Tuple[bytes, str], int] = {}
+        self._pending_paths: Dict[str, Tuple[int, int, bytes]] = {}
+        self._pending_since = 0.0
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    def get_by_path(
+        self, path: str, mtime_ns: int, size: int, encoder_id: str
+    ) -> Optional[int]:
+        with self._lock:
+            pending = self._pending_paths.get(path)
+            if pending is not None:
+                if pending[:2] != (mtime_ns, size):
+                    return None
+                return self._get_count_locked(pending[2], encoder_id)
+
+            conn = self._connect_locked()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT f.mtime_ns, f.size, f.hash, c.count FROM file_hashes f "
+                    "LEFT JOIN token_counts c ON c.hash = f.hash AND c.encoder = ? "
+                    "WHERE f.path = ?",
+                    (encoder_id, path),
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._disable_locked(e)
+                return None
+
+            if row is None or (row[0], row[1]) != (mtime_ns, size):
+                return None
+            if row[3] is not None:
+                return row[3]
+            return self._pending_counts.get((bytes(row[2]), encoder_id))
+
+    def get_by_hash(self, content_hash: bytes, encoder_id: str) -> Optional[int]:
+        with self._lock:
+            return self._get_count_locked(content_hash, encoder_id)
+
+    def put(
+        self,
+        content_hash: bytes,
+        encoder_id: str,
+        count: int,
+        path: Optional[str] = None,
+        mtime_ns: int = 0,
+        size: int = 0,
+    ) -> None:
+        with self._lock:
+            if self._opened and self._conn is None:
+                return
+            if not self._pending_counts and not self._pending_paths:
+                self._pending_since = time.monotonic()
+            self._pending_counts[(content_hash, encoder_id)] = count
+            if path is not None:
+                self._pending_paths[path] = (mtime_ns, size, content_hash)
+
+            pending = len(self._pending_counts) + len(self._pending_paths)
+            if (
+                pending >= FLUSH_BATCH_SIZE
+                or time.monotonic() - self._pending_since >= FLUSH_INTERVAL_SECONDS
+            ):
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Flush roi dong connection."""
+        with self._lock:
+            self._flush_locked()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ================================================================
+    # Internal - goi khi da giu self._lock
+    # ================================================================
+
+    def _get_count_locked(self, content_hash: bytes, encoder_id: str) -> Optional[int]:
+        pending = self._pending_counts.get((content_hash, encoder_id))
+        if pending is not None:
+            return pending
+        conn = self._connect_locked()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT count FROM token_counts WHERE hash = ? AND encoder = ?",
+                (content_hash, encoder_id),
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._disable_locked(e)
+            return None
+        return row[0] if row is not None else None
+
+    def _flush_locked(self) -> None:
+        if not self._pending_counts and not self._pending_paths:
+            return
+        counts, self._pending_counts = self._pending_counts, {}
+        paths, self._pending_paths = self._pending_paths, {}
+        conn = self._connect_locked()
+        if conn is None:
+            return
+
+        now = int(time.time())
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO token_counts VALUES (?, ?, ?, ?)",
+                    [(h, enc, count, now) for (h, enc), count in counts.items()],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (path, mtime_ns, size, h, now)
+                        for path, (mtime_ns, size, h) in paths.items()
+                    ],
+                )
+        except sqlite3.Error as e:
+            self._disable_locked(e)
+
+    def _connect_locked(self) -> Optional[sqlite3.Connection]:
+        """Mo database lan dau (lazy). Database hong -> xoa va tao lai 1 lan."""
+        if self._opened:
+            return self._conn
+        self._opened = True
+        for attempt in range(2):
+            try:
+                self._db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(
+                    str(self._db_path), timeout=5.0, check_same_thread=False
+                )
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(_SCHEMA)
+                self._prune(conn)
+                self._conn = conn
+                return conn
+            except (OSError, sqlite3.Error) as e:
+                if attempt == 0 and isinstance(e, sqlite3.DatabaseError):
+                    logger.warning(
+                        "token_count_store: rebuilding unreadable %s: %s",
+                        self._db_path,
+                        e,
+                    )
+                    try:
+                        self._db_path.unlink()
+                    except OSError:
+                        break
+                    continue
+                logger.warning(
+                    "token_count_store: failed to open %s: %s", self._db_path, e
+                )
+                break
+        return None
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Xoa dong lau khong ghi nhat khi bang vuot gioi han."""
+        for table, limit in (
+            ("token_counts", self._max_count_rows),
+            ("file_hashes", self._max_path_rows),
+        ):
+            (rows,) = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+            if rows <= limit:
+                continue
+            with conn:
+                conn.execute(
+                    f"DELETE FROM {table} WHERE used <= "
+                    f"(SELECT used FROM {table} ORDER BY used DESC LIMIT 1 OFFSET ?)",
+                    (limit,),
+                )
+
+    def _disable_locked(self, error: Exception) -> None:
+        logger.warning("token_count_store: disabled after error: %s", error)
+        self._pending_counts.clear()
+        self._pending_paths.clear()
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+        self._conn = None
+        self._opened = True
+
+
+class TokenCountReader:
+    """
+    Doc-only view cua token_counts, dung trong process worker dem token.
+
+    Mo database o che do read-only (khong tao schema, khong prune); database
+    chua ton tai hoac loi -> moi lookup tra ve None.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            self._conn = sqlite3.connect(
+                f"{db_path.as_uri()}?mode=ro", uri=True, timeout=5.0
+            )
+        except (sqlite3.Error, ValueError) as e:
+            logger.debug("token_count_store: reader unavailable for %s: %s", db_path, e)
+
+    def get_by_hash(self, content_hash: bytes, encoder_id: str) -> Optional[int]:
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT count FROM token_counts WHERE hash = ? AND encoder = ?",
+                (content_hash, encoder_id),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row is not None else None
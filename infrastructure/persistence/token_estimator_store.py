@@ -0,0 +1,73 @@
+"""
+Token Estimator Store - Luu trang thai hieu chinh cua TokenEstimator.
+
+Mot file JSON nho trong app cache dir. Ghi atomic (temp file + os.replace)
+giong ContentIndexStore. Mat file -> estimator quay ve prior va tu hieu
+chinh lai sau vai lan dem.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from domain.ports.tokenization_port import ITokenEstimatorStore
+
+logger = logging.getLogger("synapse-desktop")
+
+
+class TokenEstimatorStore(ITokenEstimatorStore):
+    """Doc/ghi trang thai estimator xuong 1 file JSON."""
+
+    FILE_NAME = "token_estimator.json"
+
+    def __init__(self, base_dir: Optional[Path] = None) -> None:
+        """
+        Args:
+            base_dir: Thu muc luu file. Mac dinh CACHE_DIR.
+        """
+        if base_dir is None:
+            from shared.config.paths import CACHE_DIR
+
+            base_dir = CACHE_DIR
+        self._path = base_dir / self.FILE_NAME
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(
+                "token_estimator_store: failed to read %s: %s", self._path, e
+            )
+            return None
+        return data if isinstance(data, dict) else None
+
+    def save(self, data: Dict[str, Any]) -> bool:
+        tmp_path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+
+        with self._lock:
+            try:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_path, self._path)
+                return True
+            except (OSError, ValueError) as e:
+                logger.warning(
+                    "token_estimator_store: failed to write %s: %s", self._path, e
+                )
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                return False
@@ -0,0 +1,71 @@
+"""
+Tokenizer Store - Ban luu cuc bo cua HF tokenizer da load.
+
+Tokenizer.from_pretrained() phai resolve repo qua Hugging Face hub (request
+mang de kiem tra revision, roi doc tokenizer.json tu HF cache). Store nay
+ghi trang thai tokenizer da dung xong (Tokenizer.to_str()) vao app cache
+dir; lan chay sau load bang Tokenizer.from_file(), khong can hub hay mang.
+
+Ghi atomic (temp file + os.replace) giong TokenEstimatorStore. File hong
+-> bo qua va load lai tu hub.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger("synapse-desktop")
+
+
+class TokenizerStore:
+    """Doc/ghi HF tokenizer da serialize, moi repo 1 file JSON."""
+
+    def __init__(self, base_dir: Optional[Path] = None) -> None:
+        """
+        Args:
+            base_dir: Thu muc luu file. Mac dinh TOKENIZER_CACHE_DIR.
+        """
+        if base_dir is None:
+            from shared.config.paths import TOKENIZER_CACHE_DIR
+
+            base_dir = TOKENIZER_CACHE_DIR
+        self._base_dir = base_dir
+        self._lock = threading.Lock()
+
+    def path_for(self, tokenizer_repo: str) -> Path:
+        # Quy uoc ten cua HF cache: "org/name" -> "org--name"
+        return self._base_dir / f"{tokenizer_repo.replace('/', '--')}.json"
+
+    def load(self, tokenizer_repo: str) -> Optional[Any]:
+        """Tokenizer da luu cho repo, None neu chua co hoac file hong."""
+        path = self.path_for(tokenizer_repo)
+        if not path.is_file():
+            return None
+        try:
+            from tokenizers import Tokenizer
+
+            return Tokenizer.from_file(str(path))
+        except Exception as e:
+            logger.warning("tokenizer_store: failed to read %s: %s", path, e)
+            return None
+
+    def save(self, tokenizer_repo: str, tokenizer: Any) -> bool:
+        path = self.path_for(tokenizer_repo)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+        with self._lock:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(tokenizer.to_str())
+                os.replace(tmp_path, path)
+                return True
+            except Exception as e:
+                logger.warning("tokenizer_store: failed to write %s: %s", path, e)
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                return False
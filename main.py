@@ -10,6 +10,7 @@ os.environ["HF_HUB_DISABLE_TELEMETRY"] = "1"
 
 logging.getLogger("huggingface_hub").setLevel(logging.ERROR)
 
+from PySide6.QtCore import QTimer  # noqa: E402
 from PySide6.QtWidgets import QApplication  # noqa: E402
 from PySide6.QtGui import QIcon  # noqa: E402
 
@@ -42,13 +43,9 @@ def main() -> None:
     set_app_user_model_id(get_default_app_user_model_id())
 
     from shared.config.paths import ensure_app_directories
-    from infrastructure.adapters.encoder_registry import initialize_encoder
 
     ensure_app_directories()
 
-    # Khởi tạo encoder config
-    initialize_encoder()
-
     # Register all cache adapters into CacheRegistry
     from infrastructure.adapters.cache_adapters import register_all_caches
 
@@ -56,6 +53,7 @@ def main() -> None:
     register_all_caches(
         ignore_engine=_boot_container.ignore_engine,
         tokenization_service=_boot_container.tokenization,
+        fragment_cache=_boot_container.fragment_cache,
     )
 
     app = QApplication(sys.argv)
@@ -90,6 +88,9 @@ def main() -> None:
     window = SynapseMainWindow()
     window.show()
 
+    # Tokenizer load o background sau khi window da hien (xem preload_tokenizer)
+    QTimer.singleShot(0, _boot_container.preload_tokenizer)
+
     sys.exit(app.exec())
 
 
@@ -319,6 +319,9 @@ class FileTreeDelegate(QStyledItemDelegate):
         CODE_PREFIX = "code:"
         if stripped.lower().startswith(CODE_PREFIX):
             self._search_query = stripped[len(CODE_PREFIX) :].strip().lower()
+        elif stripped.lower().startswith("sym:"):
+            # Symbol search khop ten symbol, khong phai ten file -> khong highlight
+            self._search_query = ""
         else:
             self._search_query = stripped.lower()
 
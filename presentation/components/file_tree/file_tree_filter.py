@@ -4,12 +4,14 @@ File Tree Filter Proxy - QSortFilterProxyModel cho search/filter.
 Keeps parent folders visible nếu bất kỳ child nào match query.
 Hiệu quả hơn so với manually tracking matched_paths.
 
-Hỗ trợ 2 chế độ filter:
+Hỗ trợ 3 chế độ filter:
 - Tên file (mặc định): filter theo label/path chứa query
 - Nội dung file (prefix "code:"): filter theo danh sách file đã match content
+- Symbol (prefix "sym:"): filter theo danh sách file chứa symbol match
 """
 
-from typing import Optional, Set
+import os
+from typing import Iterable, Optional, Set
 
 from PySide6.QtCore import QSortFilterProxyModel, QModelIndex, QPersistentModelIndex, Qt
 from PySide6.QtWidgets import QWidget
@@ -18,6 +20,8 @@ from presentation.components.file_tree.file_tree_model import FileTreeRoles
 
 # Prefix dùng để kích hoạt chế độ tìm kiếm nội dung file
 CODE_SEARCH_PREFIX = "code:"
+# Prefix tìm file theo symbol definition (class, function, ...)
+SYMBOL_SEARCH_PREFIX = "sym:"
 
 
 class FileTreeFilterProxy(QSortFilterProxyModel):
@@ -35,6 +39,8 @@ class FileTreeFilterProxy(QSortFilterProxyModel):
         super().__init__(parent)
         self._search_query: str = ""
         self._is_content_search: bool = False
+        # code:/sym: chi dua vao match set, khong so khop label/path voi query
+        self._match_paths_only: bool = False
 
         # Tập đường dẫn các file đã được flat index match (áp dụng cho CẢ mảng content lẫn file name)
         self._matched_paths: Optional[Set[str]] = None
@@ -53,32 +59,53 @@ class FileTreeFilterProxy(QSortFilterProxyModel):
             matched_paths: Set tất cả file paths từ flat search.
         """
         stripped = query.strip()
+        self._is_content_search = False
+        self._match_paths_only = False
         if stripped.lower().startswith(CODE_SEARCH_PREFIX):
             self._search_query = stripped[len(CODE_SEARCH_PREFIX) :].strip().lower()
             self._is_content_search = True
+            self._match_paths_only = True
+        elif stripped.lower().startswith(SYMBOL_SEARCH_PREFIX):
+            self._search_query = stripped[len(SYMBOL_SEARCH_PREFIX) :].strip().lower()
+            self._match_paths_only = True
         else:
             self._search_query = stripped.lower()
-            self._is_content_search = False
 
         self._matched_paths = matched_paths
         self._matched_ancestors = set()
 
         if matched_paths is not None:
-            import os
-
-            for p in matched_paths:
-                # Build all valid ancestor prefixes for fast O(1) folder checking
-                curr = os.path.dirname(p)
-                # Keep climbing up until root
-                while curr and curr != "/" and curr not in self._matched_ancestors:
-                    self._matched_ancestors.add(curr)
-                    next_curr = os.path.dirname(curr)
-                    if next_curr == curr:  # Reached root (e.g. '/' or 'C:\')
-                        break
-                    curr = next_curr
+            self._add_ancestors(matched_paths)
 
         self.invalidate()
 
+    def add_matched_paths(self, paths: Iterable[str]) -> None:
+        """
+        Thêm các file vừa được xác nhận match (kết quả content search stream về).
+
+        Giữ nguyên query hiện tại, chỉ mở rộng match set và re-filter.
+        """
+        if self._matched_paths is None:
+            self._matched_paths = set()
+        new_paths = [p for p in paths if p not in self._matched_paths]
+        if not new_paths:
+            return
+        self._matched_paths.update(new_paths)
+        self._add_ancestors(new_paths)
+        self.invalidateFilter()
+
+    def _add_ancestors(self, paths: Iterable[str]) -> None:
+        """Build all valid ancestor prefixes for fast O(1) folder checking."""
+        for p in paths:
+            curr = os.path.dirname(p)
+            # Keep climbing up until root
+            while curr and curr != "/" and curr not in self._matched_ancestors:
+                self._matched_ancestors.add(curr)
+                next_curr = os.path.dirname(curr)
+                if next_curr == curr:  # Reached root (e.g. '/' or 'C:\')
+                    break
+                curr = next_curr
+
     def filterAcceptsRow(
         self, source_row: int, source_parent: QModelIndex | QPersistentModelIndex
     ) -> bool:
@@ -105,8 +132,8 @@ class FileTreeFilterProxy(QSortFilterProxyModel):
             if self._matched_ancestors and file_path in self._matched_ancestors:
                 return True
 
-            # Nếu ko phải content search, folder name có thể đang được trực tiếp search bằng string matching
-            if not self._is_content_search:
+            # Nếu ko phải content/symbol search, folder name có thể đang được trực tiếp search bằng string matching
+            if not self._match_paths_only:
                 label = index.data(Qt.ItemDataRole.DisplayRole)
                 if label and self._search_query in label.lower():
                     return True
@@ -122,7 +149,7 @@ class FileTreeFilterProxy(QSortFilterProxyModel):
             return False
 
         # Mode mặc định cực phụ fallback khi chưa set map string-matching
-        if not self._is_content_search:
+        if not self._match_paths_only:
             label = index.data(Qt.ItemDataRole.DisplayRole)
             if label and self._search_query in label.lower():
                 return True
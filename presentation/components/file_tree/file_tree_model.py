@@ -9,14 +9,17 @@ KEY OPTIMIZATIONS:
 5. O(1) path lookup thông qua _path_to_index dictionary
 """
 
+import bisect
 import logging
 import threading
 import os
 from pathlib import Path
-from typing import Optional, Set, Dict, List, Any, TYPE_CHECKING
+from typing import Callable, Optional, Set, Dict, List, Tuple, Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from application.interfaces.file_watcher_port import TreeDelta
     from application.interfaces.tokenization_port import ITokenizationService
+    from domain.ports.tokenization_port import ITokenEstimator
 
 from PySide6.QtCore import (
     QAbstractItemModel,
@@ -29,14 +32,46 @@ from PySide6.QtCore import (
     Slot,
 )
 
+from application.services.fuzzy_path_index import FuzzyPathIndex
 from domain.smart_context.tree_item import TreeItem
-from shared.utils.file_utils import is_binary_file
+from domain.tokenization.cancellation import start_token_counting
+from shared.utils.file_utils import (
+    classify_binary_batch,
+    classify_by_extension,
+    is_binary_file,
+)
 from domain.ports.ignore_engine_port import IIgnoreEngine
 from domain.selection.manager import SelectionManager
 
 logger = logging.getLogger(__name__)
 
 
+def _tree_deltas(old: TreeItem, new: TreeItem) -> List["TreeDelta"]:
+    """
+    TreeDelta bien old thanh new: remove truoc, insert sau, parent truoc child.
+
+    Entry doi giua file/folder duoc xem la remove + insert.
+    """
+    from domain.ports.file_watcher_port import TreeDelta
+
+    def entries(root: TreeItem) -> Dict[str, bool]:
+        result: Dict[str, bool] = {}
+        stack = list(root.children)
+        while stack:
+            item = stack.pop()
+            result[item.path] = item.is_dir
+            stack.extend(item.children)
+        return result
+
+    old_entries = entries(old)
+    new_entries = entries(new)
+    removed = sorted(p for p, d in old_entries.items() if new_entries.get(p) != d)
+    inserted = sorted(p for p, d in new_entries.items() if old_entries.get(p) != d)
+    return [TreeDelta("remove", p, old_entries[p]) for p in removed] + [
+        TreeDelta("insert", p, new_entries[p]) for p in inserted
+    ]
+
+
 class TreeNode:
     """
     Internal node cho file tree model.
@@ -204,6 +239,9 @@ class FileTreeModel(QAbstractItemModel):
         # === TOKEN COUNTING CACHE & GENERATION ===
         # Token cache: path -> token count (persist qua cac selection changes)
         self._token_cache: Dict[str, int] = {}
+        # Uoc luong tu kich thuoc cho files dang cho dem (thay bang count that
+        # khi co ket qua)
+        self._token_estimates: Dict[str, int] = {}
 
         # Line count cache
         self._line_cache: Dict[str, int] = {}
@@ -220,6 +258,10 @@ class FileTreeModel(QAbstractItemModel):
         # Original TreeItem root (for tree map generation)
         self._root_tree_item: Optional[TreeItem] = None
 
+        # Folder path -> TreeItem cua snapshot dang hien thi (fetchMore lay
+        # children tu day thay vi disk). Xoa khi revalidate xong.
+        self._snapshot_items: Dict[str, TreeItem] = {}
+
         # Generation counter — incremented on load_tree() to invalidate stale workers
         self._generation: int = 0
         self._generation_lock = threading.Lock()
@@ -228,6 +270,9 @@ class FileTreeModel(QAbstractItemModel):
         # Built via os.walk in background, independent of lazy tree loading
         self._search_index: Dict[str, List[str]] = {}
         self._search_index_ready = False
+        # Fuzzy filename search tren cung tap paths (precompute + thu hep tang dan)
+        self._fuzzy_index: Optional[FuzzyPathIndex] = None
+        self._last_search_match_count = 0
 
     # === Properties delegating to SelectionManager ===
     # Dam bao luon doc/ghi qua SelectionManager, tranh shared-ref breakage
@@ -361,7 +406,8 @@ class FileTreeModel(QAbstractItemModel):
         elif role == FileTreeRoles.TOKEN_COUNT_ROLE:
             if node.is_dir:
                 return self._get_folder_token_total(node)
-            return self._token_cache.get(node.path)
+            count = self._token_cache.get(node.path)
+            return count if count is not None else self._token_estimates.get(node.path)
 
         elif role == FileTreeRoles.LINE_COUNT_ROLE:
             return self._line_cache.get(node.path)
@@ -487,33 +533,15 @@ class FileTreeModel(QAbstractItemModel):
             node.is_loaded = True
             return
 
-        try:
-            from domain.ports.registry import DomainRegistry
-            from application.services.workspace_config import (
-                get_excluded_patterns,
-                get_use_gitignore,
-            )
-
-            # Build a temporary TreeItem to use with load_folder_children
-            temp_item = TreeItem(
-                label=node.label,
-                path=node.path,
-                is_dir=True,
-                is_loaded=False,
-                children=[],
-            )
-            DomainRegistry.directory_scanner().load_folder_children(
-                temp_item,
-                ignore_engine=self._ignore_engine,
-                excluded_patterns=get_excluded_patterns(),
-                use_gitignore=get_use_gitignore(),
-                workspace_root=self._workspace_path,
-            )
-            children_items = temp_item.children
-        except Exception as e:
-            logger.error(f"Error loading children for {node.path}: {e}")
-            node.is_loaded = True
-            return
+        snapshot_item = self._snapshot_items.get(node.path)
+        if snapshot_item is not None:
+            # Tree dang hien thi tu snapshot -> children cung lay tu snapshot
+            children_items = snapshot_item.children
+        else:
+            children_items = self._load_children_from_disk(node)
+            if children_items is None:
+                node.is_loaded = True
+                return
 
         if not children_items:
             node.is_loaded = True
@@ -548,6 +576,35 @@ class FileTreeModel(QAbstractItemModel):
             self._emit_tree_checkstate_changed()
             self.selection_changed.emit(self._selection_mgr.selected_paths)
 
+    def _load_children_from_disk(self, node: TreeNode) -> Optional[List[TreeItem]]:
+        """Doc children cua folder tu disk; None neu loi."""
+        try:
+            from domain.ports.registry import DomainRegistry
+            from application.services.workspace_config import (
+                get_excluded_patterns,
+                get_use_gitignore,
+            )
+
+            # Build a temporary TreeItem to use with load_folder_children
+            temp_item = TreeItem(
+                label=node.label,
+                path=node.path,
+                is_dir=True,
+                is_loaded=False,
+                children=[],
+            )
+            DomainRegistry.directory_scanner().load_folder_children(
+                temp_item,
+                ignore_engine=self._ignore_engine,
+                excluded_patterns=get_excluded_patterns(),
+                use_gitignore=get_use_gitignore(),
+                workspace_root=self._workspace_path,
+            )
+            return temp_item.children
+        except Exception as e:
+            logger.error(f"Error loading children for {node.path}: {e}")
+            return None
+
     def hasChildren(
         self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()
     ) -> bool:
@@ -569,8 +626,10 @@ class FileTreeModel(QAbstractItemModel):
         """
         Load file tree cho workspace mới.
 
-        Dùng scan_directory_shallow(depth=1) để load nhanh.
-        Children sâu hơn sẽ được lazy-load khi expand.
+        Co snapshot tu lan scan truoc -> hien tree do ngay (khong doc disk)
+        va full scan trong background de revalidate (patch tree qua TreeDelta),
+        nguoc lai dung scan_directory_shallow(depth=1). Children sâu hơn sẽ
+        được lazy-load khi expand.
         """
         self._workspace_path = workspace_path
 
@@ -583,27 +642,43 @@ class FileTreeModel(QAbstractItemModel):
         # Reset selection state qua SelectionManager (clear paths, resolved files, generation)
         self._selection_mgr.reset()
         self._token_cache.clear()
+        self._token_estimates.clear()
         self._line_cache.clear()
         self._path_to_node.clear()
         self._folder_state_cache.clear()
         self._search_index.clear()
         self._search_index_ready = False
+        self._fuzzy_index = None
+        self._snapshot_items.clear()
+        stored_tree: Optional[TreeItem] = None
+        excluded: Optional[List[str]] = None
+        use_gitignore = True
 
         if workspace_path is not None:
             try:
                 # Get excluded patterns from settings
-                from application.services.workspace_config import get_excluded_patterns
+                from application.services.workspace_config import (
+                    get_excluded_patterns,
+                    get_use_gitignore,
+                )
 
-                excluded = get_excluded_patterns()
+                excluded = get_excluded_patterns() or None
+                use_gitignore = get_use_gitignore()
 
                 from domain.ports.registry import DomainRegistry
 
-                tree_item = DomainRegistry.directory_scanner().scan_directory_shallow(
-                    workspace_path,
-                    ignore_engine=self._ignore_engine,
-                    depth=1,
-                    excluded_patterns=excluded if excluded else None,
+                stored_tree = self._load_snapshot_tree(
+                    workspace_path, excluded, use_gitignore
                 )
+                tree_item = stored_tree
+                if tree_item is None:
+                    scanner = DomainRegistry.directory_scanner()
+                    tree_item = scanner.scan_directory_shallow(
+                        workspace_path,
+                        ignore_engine=self._ignore_engine,
+                        depth=1,
+                        excluded_patterns=excluded,
+                    )
                 if tree_item:
                     self._root_tree_item = tree_item
                     # Consolidate build + index vao 1 recursion duy nhat de tiet kiem thoi gian
@@ -632,7 +707,17 @@ class FileTreeModel(QAbstractItemModel):
 
         # Build flat search index in background (independent of lazy loading)
         if workspace_path is not None and workspace_path.exists():
-            self._build_search_index_async(workspace_path)
+            if stored_tree is None:
+                # Tree vua scan tu disk -> khong revalidate; luu snapshot 1 lan
+                # sau khi catalog walk xong (khong walk song song)
+                self._build_search_index_async(
+                    workspace_path, snapshot_scan=(excluded, use_gitignore)
+                )
+            else:
+                self._build_search_index_async(workspace_path)
+                self._revalidate_tree_async(
+                    workspace_path, stored_tree, excluded, use_gitignore
+                )
 
     def get_selected_paths(self) -> List[str]:
         """
@@ -697,13 +782,12 @@ class FileTreeModel(QAbstractItemModel):
             for paths in self._search_index.values():
                 for file_path in paths:
                     if file_path.startswith(folder_tuple):
-                        # Filter out binary files before adding to selection
-                        if not is_binary_file(file_path):
-                            result.add(file_path)
+                        result.add(file_path)
 
-        # Final filter to ensure no manually added binary files remain
-        final_list = [p for p in result if not is_binary_file(p)]
-        return sorted(final_list)
+        # Files tu index da duoc catalog loc binary (background). Khong doc file
+        # tren main thread: chi loai binary theo extension, file chua ro do
+        # TokenCountWorker phan loai (count 0) va prompt build bo qua
+        return sorted(p for p in result if classify_by_extension(p) is not True)
 
     def _get_selected_paths_legacy(self) -> List[str]:
         """Partial resolution — chỉ trả về files đã loaded, không scan disk để tránh block UI."""
@@ -743,7 +827,7 @@ class FileTreeModel(QAbstractItemModel):
     ) -> None:
         """
         Collect TAT CA files tu node (recursive). Neu subfolder chua loaded,
-        delegate cho workspace_index.collect_files_from_disk().
+        lay tu workspace catalog (hoac collect_files_from_disk khi chua co).
         Skip binary/image files.
 
         CANH BAO: Method nay KHONG kiem tra _selected_paths cho children.
@@ -759,8 +843,6 @@ class FileTreeModel(QAbstractItemModel):
         if self._workspace_path is None:
             return
 
-        from application.services.workspace_index import collect_files_from_disk
-
         for child in node.children:
             if child.path in seen:
                 continue
@@ -772,12 +854,8 @@ class FileTreeModel(QAbstractItemModel):
                 if child.is_loaded:
                     self._collect_files_deep(child, result, seen)
                 else:
-                    # Chua loaded — delegate cho workspace_index scan disk
-                    disk_files = collect_files_from_disk(
-                        Path(child.path),
-                        self._workspace_path,
-                        ignore_engine=self._ignore_engine,
-                    )
+                    # Chua loaded — lay tu catalog hoac scan disk
+                    disk_files = self._collect_unloaded_folder(child.path)
                     for f in disk_files:
                         if f not in seen:
                             result.append(f)
@@ -785,16 +863,28 @@ class FileTreeModel(QAbstractItemModel):
 
         # Neu folder chua loaded va ko co children
         if node.is_dir and not node.is_loaded and not node.children:
-            disk_files = collect_files_from_disk(
-                Path(node.path),
-                self._workspace_path,
-                ignore_engine=self._ignore_engine,
-            )
+            disk_files = self._collect_unloaded_folder(node.path)
             for f in disk_files:
                 if f not in seen:
                     result.append(f)
                     seen.add(f)
 
+    def _collect_unloaded_folder(self, folder: str) -> List[str]:
+        """Files (khong binary) trong folder chua load: tu catalog neu da build, nguoc lai scan disk."""
+        from domain.ports.registry import DomainRegistry
+
+        if self._workspace_path is None:
+            return []
+        catalog = DomainRegistry.workspace_catalog().peek_catalog(self._workspace_path)
+        if catalog is not None:
+            return catalog.files(Path(folder))
+
+        from application.services.workspace_index import collect_files_from_disk
+
+        return collect_files_from_disk(
+            Path(folder), self._workspace_path, ignore_engine=self._ignore_engine
+        )
+
     def get_root_tree_item(self) -> Optional[TreeItem]:
         """Get root TreeItem (for tree map generation)."""
         return self._root_tree_item
@@ -865,6 +955,7 @@ class FileTreeModel(QAbstractItemModel):
         self._selection_mgr.clear()
         self._selection_mgr.bump_generation()
         self._token_cache.clear()
+        self._token_estimates.clear()
         self._clear_folder_state_cache()
         self._emit_tree_checkstate_changed()
         self.selection_changed.emit(self._selection_mgr.selected_paths)
@@ -890,6 +981,8 @@ class FileTreeModel(QAbstractItemModel):
         # Update cache neu co du lieu moi
         if counts:
             self._token_cache.update(counts)
+            for path in counts:
+                self._token_estimates.pop(path, None)
 
         # Luon invalidate folder stats cache de tinh lai tu cache moi (hoac do selection thay doi)
         self._clear_folder_state_cache()
@@ -928,6 +1021,34 @@ class FileTreeModel(QAbstractItemModel):
         for path, count in counts.items():
             self.token_count_updated.emit(path, count)
 
+    def update_token_estimates(self, estimates: Dict[str, int]) -> None:
+        """
+        Uoc luong cho files cua lan dem hien tai (thay uoc luong cu).
+
+        Files da co count chinh xac bo qua; tong selection/folder cong them
+        uoc luong cho den khi count that ve.
+        """
+        self._token_estimates = {
+            path: tokens
+            for path, tokens in estimates.items()
+            if path not in self._token_cache
+        }
+        self.update_token_counts_batch({})
+
+    def clear_token_estimates(self, notify: bool = True) -> None:
+        """Bo uoc luong con lai (dem xong hoac khong con files can dem).
+
+        notify=False khi caller tu goi update_token_counts_batch ngay sau do.
+        """
+        if self._token_estimates:
+            self._token_estimates.clear()
+            if notify:
+                self.update_token_counts_batch({})
+
+    def has_token_estimates(self) -> bool:
+        """True neu tong tokens hien tai con chua uoc luong."""
+        return bool(self._token_estimates)
+
     def update_line_count(self, path: str, count: int) -> None:
         """Cập nhật line count cho 1 file."""
         self._line_cache[path] = count
@@ -956,9 +1077,12 @@ class FileTreeModel(QAbstractItemModel):
             if resolved_is_fresh
             else self._selection_mgr.iterate_paths()
         )
+        estimates = self._token_estimates
         for path in path_iter:
             if path in self._token_cache:
                 total += self._token_cache[path]
+            elif path in estimates:
+                total += estimates[path]
         return total
 
     def get_selected_file_count(self) -> int:
@@ -986,31 +1110,39 @@ class FileTreeModel(QAbstractItemModel):
         with self._generation_lock:
             return self._generation
 
-    def _build_search_index_async(self, workspace_path: Path) -> None:
+    def _build_search_index_async(
+        self,
+        workspace_path: Path,
+        snapshot_scan: Optional[Tuple[Optional[List[str]], bool]] = None,
+    ) -> None:
         """Build flat search index trong background thread.
 
-        Delegate cho workspace_index.build_search_index() (pure data, no Qt).
+        Lay tu workspace catalog dung chung (1 lan walk cho moi consumer).
         Giu lai generation check de tranh race condition khi doi workspace.
+
+        Args:
+            snapshot_scan: (excluded, use_gitignore) neu workspace chua co
+                snapshot - full scan luu snapshot sau khi index xong
         """
         generation = self.generation  # Snapshot
 
         def _build():
-            from application.services.workspace_index import build_search_index
-
-            # Generation check callback -- tra ve False neu da stale
-            def _is_fresh() -> bool:
-                return self.generation == generation
+            from domain.ports.registry import DomainRegistry
 
-            index = build_search_index(
-                workspace_path,
-                generation_check=_is_fresh,
-                ignore_engine=self._ignore_engine,
+            catalog = DomainRegistry.workspace_catalog().get_catalog(workspace_path)
+            if self.generation != generation:
+                return
+            index = catalog.search_index()
+            fuzzy_index = FuzzyPathIndex(
+                (path for paths in index.values() for path in paths),
+                root=str(catalog.root),
             )
 
             # Atomic check + write de tranh race condition
             with self._generation_lock:
                 if self._generation == generation:
                     self._search_index = index
+                    self._fuzzy_index = fuzzy_index
                     self._search_index_ready = True
                     # FIX: Khi index xong, can re-resolve selection de count tokens cac files o vung chua load
                     if self._selection_mgr.count() > 0:
@@ -1021,21 +1153,403 @@ class FileTreeModel(QAbstractItemModel):
                                 self._selection_mgr.selected_paths
                             )
                         )
+                else:
+                    return
+
+            # Token cache co gian theo so file cua workspace
+            try:
+                DomainRegistry.tokenization_service().fit_cache_to_workspace(
+                    len(catalog)
+                )
+            except Exception as e:
+                logger.debug(f"Token cache resize failed: {e}")
+
+            # Build/dong bo content index (`code:`) va symbol index (`sym:`)
+            # sau khi catalog san sang
+            try:
+                DomainRegistry.content_index().warm(workspace_path)
+            except Exception as e:
+                logger.debug(f"Content index warm failed: {e}")
+            try:
+                DomainRegistry.symbol_index().warm(workspace_path)
+            except Exception as e:
+                logger.debug(f"Symbol index warm failed: {e}")
+
+            if snapshot_scan is not None and self.generation == generation:
+                self._scan_for_snapshot(workspace_path, *snapshot_scan)
 
         thread = threading.Thread(target=_build, daemon=True)
         thread.start()
 
-    def search_files(self, query: str) -> List[str]:
-        """Search files by query. Delegate cho workspace_index.search_in_index()."""
+    def _load_snapshot_tree(
+        self,
+        workspace_path: Path,
+        excluded: Optional[List[str]],
+        use_gitignore: bool,
+    ) -> Optional[TreeItem]:
+        """Tree tu snapshot cua lan scan truoc (None neu khong co/khong dung duoc)."""
+        from domain.ports.registry import DomainRegistry
+
+        try:
+            tree = DomainRegistry.directory_scanner().load_snapshot(
+                workspace_path,
+                excluded_patterns=excluded,
+                use_gitignore=use_gitignore,
+                defer_binary_check=True,
+            )
+        except Exception as e:
+            logger.debug(f"Load workspace snapshot failed: {e}")
+            return None
+        # Snapshot luu path da resolve -> chi dung khi trung path cua workspace
+        if tree is None or tree.path != str(workspace_path):
+            return None
+
+        stack = [tree]
+        while stack:
+            item = stack.pop()
+            if item.is_dir:
+                self._snapshot_items[item.path] = item
+                stack.extend(item.children)
+        return tree
+
+    def _scan_for_snapshot(
+        self,
+        workspace_path: Path,
+        excluded: Optional[List[str]],
+        use_gitignore: bool,
+    ) -> Optional[TreeItem]:
+        """
+        Full scan cua tree hien thi (background thread), luu snapshot moi.
+
+        Binary chi loc theo extension: file chua phan loai duoc classify khi
+        chon (get_selected_paths), scan khong mo file nao.
+        """
+        from domain.ports.registry import DomainRegistry
+
+        try:
+            return DomainRegistry.directory_scanner().scan_directory(
+                workspace_path,
+                excluded_patterns=excluded,
+                use_gitignore=use_gitignore,
+                use_snapshot=True,
+                defer_binary_check=True,
+            )
+        except Exception as e:
+            logger.debug(f"Snapshot scan failed: {e}")
+            return None
+
+    def _revalidate_tree_async(
+        self,
+        workspace_path: Path,
+        stored_tree: TreeItem,
+        excluded: Optional[List[str]],
+        use_gitignore: bool,
+    ) -> None:
+        """
+        Tree dang hien thi tu snapshot: full scan trong background (luu snapshot
+        moi cho lan mo sau) va patch phan da doi qua apply_tree_deltas.
+        """
+        generation = self.generation  # Snapshot
+
+        def _scan():
+            fresh_tree = self._scan_for_snapshot(
+                workspace_path, excluded, use_gitignore
+            )
+            if fresh_tree is None or self.generation != generation:
+                return
+
+            deltas = _tree_deltas(stored_tree, fresh_tree)
+            from presentation.utils.qt_utils import run_on_main_thread
+
+            run_on_main_thread(lambda: self._apply_revalidation(generation, deltas))
+
+        thread = threading.Thread(target=_scan, daemon=True)
+        thread.start()
+
+    def _apply_revalidation(self, generation: int, deltas: List["TreeDelta"]) -> None:
+        """Main thread: bo snapshot index, patch tree theo ket qua revalidate."""
+        if self.generation != generation:
+            return
+        # Folder chua expand tu gio doc tu disk (snapshot co the da cu)
+        self._snapshot_items.clear()
+        if deltas and not self.apply_tree_deltas(deltas):
+            logger.debug("Tree revalidation: khong patch duoc tree tu snapshot")
+
+    def search_files(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Search files by query, ket qua diem cao truoc.
+
+        Filename query di qua FuzzyPathIndex giu san (thu hep tang dan theo
+        tung phim go); "code:"/"sym:" delegate cho workspace_index.search_in_index().
+
+        Args:
+            limit: Chi lay top `limit` ket qua (None = tat ca)
+        """
+        self._last_search_match_count = 0
         if not self._search_index_ready:
             return []
+        prefixed = query.strip().lower().startswith(("code:", "sym:"))
+        if self._fuzzy_index is not None and not prefixed:
+            results = self._fuzzy_index.search(query, limit)
+            self._last_search_match_count = self._fuzzy_index.last_match_count
+            return results
         from application.services.workspace_index import search_in_index
 
-        return search_in_index(self._search_index, query)
+        results = search_in_index(self._search_index, query, self._workspace_path)
+        self._last_search_match_count = len(results)
+        return results[:limit] if limit is not None else results
+
+    @property
+    def last_search_match_count(self) -> int:
+        """Tong so file match query gan nhat cua search_files (truoc khi cat top-K)."""
+        return self._last_search_match_count
+
+    def search_content(
+        self,
+        query: str,
+        on_match: Optional[Callable[[str], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> List[str]:
+        """Search files theo noi dung qua content index. Blocking - goi tu background thread."""
+        if self._workspace_path is None:
+            return []
+        from domain.ports.registry import DomainRegistry
+
+        return DomainRegistry.content_index().search(
+            self._workspace_path, query, on_match=on_match, is_cancelled=is_cancelled
+        )
 
     def clear_token_cache(self) -> None:
         """Clear token cache."""
         self._token_cache.clear()
+        self._token_estimates.clear()
+
+    # ===== Incremental Patching (File Watcher) =====
+
+    def apply_tree_deltas(self, deltas: List["TreeDelta"]) -> bool:
+        """
+        Patch tree tu TreeDelta cua file watcher thay vi load_tree() lai.
+
+        Chi cac nodes bi anh huong duoc them/xoa qua beginInsertRows/
+        beginRemoveRows, nen selection, expansion va token/line cache cua
+        phan con lai giu nguyen. Rename doi key cache/selection sang path moi.
+
+        Args:
+            deltas: Deltas da gom tu 1 batch events (remove -> rename -> insert)
+
+        Returns:
+            False neu khong the patch (chua load tree, root bi xoa/doi ten)
+            -> caller nen full refresh
+        """
+        if self._root_node is None or self._workspace_path is None:
+            return False
+
+        root_path = self._root_node.path
+        if any(root_path in (delta.path, delta.new_path) for delta in deltas):
+            return False
+
+        selection_changed = False
+        for delta in deltas:
+            if delta.kind == "remove":
+                selection_changed |= self._patch_remove(delta.path, delta.is_directory)
+            elif delta.kind == "rename" and delta.new_path:
+                selection_changed |= self._patch_rename(
+                    delta.path, delta.new_path, delta.is_directory
+                )
+            elif delta.kind == "insert":
+                selection_changed |= self._patch_insert(delta.path, delta.is_directory)
+
+        self._clear_folder_state_cache()
+        if selection_changed:
+            self._selection_mgr.bump_generation()
+            self.selection_changed.emit(self._selection_mgr.selected_paths)
+        self._emit_tree_checkstate_changed()
+        return True
+
+    def _patch_remove(self, path: str, is_dir: bool) -> bool:
+        """Xoa node (neu da load) va moi state gan voi path. Tra ve True neu selection doi."""
+        node = self._path_to_node.get(path)
+        if node is not None:
+            self._detach_node(node)
+        self._patch_search_index(path, None, is_dir)
+        return self._drop_path_state(path, is_dir)
+
+    def _patch_insert(self, path: str, is_dir: bool) -> bool:
+        """Them node moi duoi parent da load. Tra ve True neu selection doi."""
+        if not is_dir:
+            self._patch_search_index(None, path, is_dir)
+        if path in self._path_to_node:
+            return False
+
+        parent = self._path_to_node.get(os.path.dirname(path))
+        if parent is None or not parent.is_dir or not parent.is_loaded:
+            # Parent chua load -> fetchMore se doc tu disk khi expand
+            return False
+
+        node = TreeNode(
+            label=os.path.basename(path),
+            path=path,
+            is_dir=is_dir,
+            is_loaded=not is_dir,
+        )
+        return self._attach_node(parent, node)
+
+    def _patch_rename(self, old_path: str, new_path: str, is_dir: bool) -> bool:
+        """Doi ten/di chuyen node, giu children da load, selection va cache."""
+        existing = self._path_to_node.get(new_path)
+        if existing is not None:
+            # Rename de len path da co (vd: atomic save) -> giu node dich
+            self._detach_node(existing)
+        selection_changed = self._remap_path_state(old_path, new_path, is_dir)
+        self._patch_search_index(old_path, new_path, is_dir)
+
+        node = self._path_to_node.get(old_path)
+        if node is not None:
+            self._detach_node(node)
+        else:
+            node = TreeNode(
+                label="", path=old_path, is_dir=is_dir, is_loaded=not is_dir
+            )
+
+        parent = self._path_to_node.get(os.path.dirname(new_path))
+        if parent is None or not parent.is_dir or not parent.is_loaded:
+            return selection_changed
+
+        self._retarget_subtree(node, old_path, new_path)
+        node.label = os.path.basename(new_path)
+        return self._attach_node(parent, node) or selection_changed
+
+    def _attach_node(self, parent: TreeNode, node: TreeNode) -> bool:
+        """Chen node vao dung vi tri sort (folder truoc, theo ten). True neu auto-select."""
+        sort_key = (not node.is_dir, node.label.lower())
+        row = bisect.bisect_left(
+            [(not child.is_dir, child.label.lower()) for child in parent.children],
+            sort_key,
+        )
+
+        self.beginInsertRows(self._node_to_index(parent), row, row)
+        node.parent = parent
+        parent.children.insert(row, node)
+        for i in range(row, len(parent.children)):
+            parent.children[i].row = i
+        self.endInsertRows()
+        self._build_path_index(node)
+
+        # Giong fetchMore: parent dang selected -> child moi cung duoc select
+        if self._selection_mgr.is_selected(parent.path):
+            self._selection_mgr.add(node.path)
+            return True
+        return False
+
+    def _detach_node(self, node: TreeNode) -> None:
+        """Go node (va subtree) khoi parent va path index."""
+        parent = node.parent
+        if parent is None:
+            return
+
+        row = node.row
+        self.beginRemoveRows(self._node_to_index(parent), row, row)
+        parent.children.pop(row)
+        for i in range(row, len(parent.children)):
+            parent.children[i].row = i
+        self.endRemoveRows()
+
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if self._path_to_node.get(current.path) is current:
+                del self._path_to_node[current.path]
+            stack.extend(current.children)
+
+    def _retarget_subtree(self, node: TreeNode, old_path: str, new_path: str) -> None:
+        """Doi prefix path cua node va moi descendant da load."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            current.path = new_path + current.path[len(old_path) :]
+            stack.extend(current.children)
+
+    def _drop_path_state(self, path: str, is_dir: bool) -> bool:
+        """Xoa token/line cache va selection cua path (ca subtree neu la folder)."""
+        prefix = path + os.sep
+
+        def _affected(p: str) -> bool:
+            return p == path or (is_dir and p.startswith(prefix))
+
+        for cache in (self._token_cache, self._line_cache):
+            for key in [k for k in cache if _affected(k)] if is_dir else [path]:
+                cache.pop(key, None)
+
+        stale = {p for p in self._selection_mgr.iterate_paths() if _affected(p)}
+        return self._selection_mgr.remove_many(stale) > 0
+
+    def _remap_path_state(self, old_path: str, new_path: str, is_dir: bool) -> bool:
+        """Chuyen token/line cache va selection tu old_path sang new_path."""
+        prefix = old_path + os.sep
+
+        def _affected(p: str) -> bool:
+            return p == old_path or (is_dir and p.startswith(prefix))
+
+        def _remap(p: str) -> str:
+            return new_path + p[len(old_path) :]
+
+        for cache in (self._token_cache, self._line_cache):
+            # Path dich bi ghi de -> so lieu cu cua no khong con dung
+            cache.pop(new_path, None)
+            moved = {k: cache.pop(k) for k in [k for k in cache if _affected(k)]}
+            cache.update({_remap(k): v for k, v in moved.items()})
+
+        selected = {p for p in self._selection_mgr.iterate_paths() if _affected(p)}
+        if not selected:
+            return False
+        self._selection_mgr.remove_many(selected)
+        self._selection_mgr.add_many({_remap(p) for p in selected})
+        return True
+
+    def _patch_search_index(
+        self, old_path: Optional[str], new_path: Optional[str], is_dir: bool
+    ) -> None:
+        """Cap nhat flat search index (filename -> paths) theo delta."""
+        index = self._search_index
+        removed: List[str] = []
+
+        if old_path is not None:
+            prefix = old_path + os.sep
+            keys = list(index) if is_dir else [os.path.basename(old_path).lower()]
+            for key in keys:
+                paths = index.get(key)
+                if not paths:
+                    continue
+                kept = [
+                    p
+                    for p in paths
+                    if not (p.startswith(prefix) if is_dir else p == old_path)
+                ]
+                if len(kept) == len(paths):
+                    continue
+                removed.extend(p for p in paths if p not in kept)
+                if kept:
+                    index[key] = kept
+                else:
+                    del index[key]
+
+        fuzzy_index = self._fuzzy_index
+        if fuzzy_index is not None:
+            for file_path in removed:
+                fuzzy_index.remove(file_path)
+
+        if new_path is None:
+            return
+        if is_dir:
+            added = [new_path + p[len(old_path) :] for p in removed] if old_path else []
+        else:
+            added = [new_path]
+        for file_path in added:
+            bucket = index.setdefault(os.path.basename(file_path).lower(), [])
+            if file_path not in bucket:
+                bucket.append(file_path)
+            if fuzzy_index is not None:
+                fuzzy_index.add(file_path)
 
     # ===== Private Helpers =====
 
@@ -1232,15 +1746,16 @@ class FileTreeModel(QAbstractItemModel):
         sep = os.path.sep
         folder_prefix = node.path if node.path.endswith(sep) else node.path + sep
 
-        # O(N) fallback nhưng được cached
-        for file_path, count in self._token_cache.items():
-            if file_path.startswith(folder_prefix) and count > 0:
-                # Chỉ tính files đang selected
-                if self._selection_mgr.is_selected(
-                    file_path
-                ) or self._selection_mgr.is_resolved(file_path):
-                    total += count
-                    has_any = True
+        # O(N) fallback nhưng được cached; files chua dem xong dung uoc luong
+        for counts in (self._token_cache, self._token_estimates):
+            for file_path, count in counts.items():
+                if file_path.startswith(folder_prefix) and count > 0:
+                    # Chỉ tính files đang selected
+                    if self._selection_mgr.is_selected(
+                        file_path
+                    ) or self._selection_mgr.is_resolved(file_path):
+                        total += count
+                        has_any = True
 
         result = total if has_any else None
         self._folder_token_sum_cache[cache_key] = result
@@ -1268,11 +1783,19 @@ class TokenCountWorker(QRunnable):
 
     Emit kết quả từng file qua signals - model receive và update từng row.
     Uses generation counter to detect workspace changes and abort early.
+    Dem theo batch qua count_tokens_batch_parallel: TokenCache, count store
+    (path + mtime + size, content hash), process pool va dedup noi dung deu
+    ap dung cho token badges; service tu hieu chinh estimator tu count chinh xac.
+    File > 5MB duoc dem streaming sau cung (count_tokens_for_large_file),
+    bao tien do qua large_file_progress va dung ngay khi worker bi cancel.
+    Co estimator: truoc khi dem emit uoc luong tu kich thuoc cho moi file.
     """
 
     class Signals(QObject):
         token_counted = Signal(str, int)  # (file_path, token_count)
         token_counts_batch = Signal(dict)  # Dict[str, int]
+        token_estimates = Signal(dict)  # Dict[str, int]
+        large_file_progress = Signal(str, int)  # (file_path, percent)
         finished = Signal()
         error = Signal(str)
 
@@ -1281,10 +1804,12 @@ class TokenCountWorker(QRunnable):
         file_paths: List[str],
         tokenization_service: "ITokenizationService",
         generation: int = 0,
+        estimator: Optional["ITokenEstimator"] = None,
     ):
         super().__init__()
         self.file_paths = file_paths
         self._tokenization = tokenization_service
+        self._estimator = estimator
         self.signals = self.Signals()
         self.setAutoDelete(True)
         self._cancelled = False
@@ -1304,46 +1829,94 @@ class TokenCountWorker(QRunnable):
     def run(self) -> None:
         """Đếm tokens cho tất cả files. Skip binary/image files."""
 
-        # Max file size for token counting (5MB) - prevents OOM on large binaries
+        # File lon hon 5MB dem streaming theo chunk - RAM khong tang theo file
         MAX_TOKEN_FILE_SIZE = 5 * 1024 * 1024
 
         try:
+            if self._estimator is not None:
+                self._emit_estimates()
+
+            # Phan loai binary 1 lan cho ca selection (doc song song, dung
+            # chung cache) - get_selected_paths khong doc file tren main thread
+            is_binary = classify_binary_batch(self.file_paths)
+
             batch: Dict[str, int] = {}
+            countable: List[Path] = []
+            large_files: List[Path] = []
             for file_path in self.file_paths:
                 if self._cancelled:
                     break
 
                 try:
                     path = Path(file_path)
-                    if not path.exists() or not path.is_file():
+                    if not path.is_file():
                         continue
 
                     # Skip binary/image files (check magic bytes, not just extension)
-                    if is_binary_file(path):
+                    if is_binary.get(file_path, False):
                         batch[file_path] = 0
                         continue
 
-                    # Skip files too large for token counting
-                    try:
-                        if path.stat().st_size > MAX_TOKEN_FILE_SIZE:
-                            batch[file_path] = 0
-                            continue
-                    except OSError:
-                        continue
-
-                    content = path.read_text(encoding="utf-8", errors="replace")
-                    tokens = self._tokenization.count_tokens(content)
-                    batch[file_path] = tokens
-
-                    if len(batch) >= self._batch_size:
-                        self.signals.token_counts_batch.emit(dict(batch))
-                        batch.clear()
-                except Exception as e:
+                    if path.stat().st_size > MAX_TOKEN_FILE_SIZE:
+                        large_files.append(path)
+                    else:
+                        countable.append(path)
+                except OSError as e:
                     logger.debug(f"Error counting tokens for {file_path}: {e}")
 
-            if not self._cancelled and batch:
+            if batch and not self._cancelled:
                 self.signals.token_counts_batch.emit(dict(batch))
+
+            # Batch nho de cancel nhanh va cap nhat UI dan dan
+            start_token_counting()
+            for start in range(0, len(countable), self._batch_size):
+                if self._cancelled:
+                    break
+                counts = self._tokenization.count_tokens_batch_parallel(
+                    countable[start : start + self._batch_size]
+                )
+                if counts and not self._cancelled:
+                    self.signals.token_counts_batch.emit(counts)
+
+            for path in large_files:
+                if self._cancelled:
+                    break
+                count = self._count_large_file(path)
+                if count is not None and not self._cancelled:
+                    self.signals.token_counts_batch.emit({str(path): count})
         except Exception as e:
             self.signals.error.emit(str(e))
         finally:
             self.signals.finished.emit()
+
+    def _count_large_file(self, path: Path) -> Optional[int]:
+        """Dem file lon bang streaming, emit % sau moi chunk."""
+        file_path = str(path)
+
+        def progress(done: int, total: int) -> None:
+            percent = done * 100 // total if total else 100
+            self.signals.large_file_progress.emit(file_path, percent)
+
+        return self._tokenization.count_tokens_for_large_file(
+            path, progress=progress, is_cancelled=lambda: self._cancelled
+        )
+
+    def _emit_estimates(self) -> None:
+        """Uoc luong tokens tu kich thuoc (chi stat, khong doc file)."""
+        from domain.tokenization.estimator import language_key
+
+        estimator = self._estimator
+        if estimator is None:
+            return
+        estimates: Dict[str, int] = {}
+        for file_path in self.file_paths:
+            if self._cancelled:
+                return
+            try:
+                size = os.stat(file_path).st_size
+            except OSError:
+                continue
+            if size > 0:
+                estimate = estimator.estimate_sizes({language_key(file_path): size})
+                estimates[file_path] = estimate.tokens
+        self.signals.token_estimates.emit(estimates)
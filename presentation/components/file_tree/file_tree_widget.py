@@ -11,11 +11,15 @@ Composite widget bao gồm:
 import os
 import json
 import logging
+import threading
+import time
 from pathlib import Path
 from typing import Optional, Set, List, Dict, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from application.interfaces.file_watcher_port import TreeDelta
     from application.interfaces.tokenization_port import ITokenizationService
+    from domain.ports.tokenization_port import ITokenEstimator
 
 from PySide6.QtWidgets import (
     QWidget,
@@ -51,10 +55,20 @@ from presentation.components.file_tree.file_tree_model import (
     FileTreeRoles,
 )
 from presentation.components.file_tree.file_tree_delegate import FileTreeDelegate
-from presentation.components.file_tree.file_tree_filter import FileTreeFilterProxy
+from presentation.components.file_tree.file_tree_filter import (
+    CODE_SEARCH_PREFIX,
+    SYMBOL_SEARCH_PREFIX,
+    FileTreeFilterProxy,
+)
 
 logger = logging.getLogger(__name__)
 
+# Gom ket qua content search stream ve roi moi day len main thread
+CONTENT_SEARCH_FLUSH_INTERVAL = 0.1
+
+# Filename search chi lay top-K ket qua (xep hang) de filter van muot tren workspace lon
+SEARCH_RESULT_LIMIT = 2000
+
 
 class FileTreeWidget(QWidget):
     """
@@ -69,6 +83,7 @@ class FileTreeWidget(QWidget):
     selection_changed = Signal(set)
     file_preview_requested = Signal(str)
     token_counting_done = Signal()  # Emitted khi batch token counting hoan thanh
+    token_counting_progress = Signal(str, int)  # (file_path, percent) file lon
     search_results_changed = Signal(int)  # Emitted voi so ket qua search
     exclude_patterns_changed = (
         Signal()
@@ -109,6 +124,8 @@ class FileTreeWidget(QWidget):
         # State
         self._pending_search: str = ""
         self._last_search_results: List[str] = []  # Full paths from flat index search
+        # Tang moi lan query `code:` moi/bi huy -> background search cu tu dung
+        self._content_search_generation: int = 0
 
         # Build UI
         self._build_ui()
@@ -308,6 +325,7 @@ class FileTreeWidget(QWidget):
         # Stop debounce timers to prevent stale callbacks
         self._token_debounce.stop()
         self._search_debounce.stop()
+        self._content_search_generation += 1
 
         self._search_field.clear()
         self._match_count_label.setText("")
@@ -334,6 +352,10 @@ class FileTreeWidget(QWidget):
             if root_idx.isValid():
                 self._tree_view.expand(root_idx)
 
+    def apply_tree_deltas(self, deltas: List["TreeDelta"]) -> bool:
+        """Patch tree tu watcher deltas (giu selection/expansion). False -> can reload."""
+        return self._model.apply_tree_deltas(deltas)
+
     def get_selected_paths(self) -> List[str]:
         """Get danh sách selected file paths."""
         return self._model.get_selected_paths()
@@ -397,6 +419,7 @@ class FileTreeWidget(QWidget):
             self._current_token_worker.cancel()
         self._token_debounce.stop()
         self._search_debounce.stop()
+        self._content_search_generation += 1
         self._selection_poll_timer.stop()
 
     # ===== Slots =====
@@ -442,55 +465,39 @@ class FileTreeWidget(QWidget):
         """
         query = self._pending_search
 
-        # Nếu đang gõ "code:" nhưng chưa nhập từ khóa, restore tree về nguyên trạng,
-        # không trigger tìm kiếm.
+        # Nếu đang gõ "code:"/"sym:" nhưng chưa nhập từ khóa, restore tree về
+        # nguyên trạng, không trigger tìm kiếm.
         stripped = query.strip().lower()
-        if stripped == "code:" or (
-            stripped.startswith("code:") and not stripped[5:].strip()
-        ):
-            query = ""
+        for prefix in (CODE_SEARCH_PREFIX, SYMBOL_SEARCH_PREFIX):
+            if stripped.startswith(prefix) and not stripped[len(prefix) :].strip():
+                query = ""
 
         self._delegate.set_search_query(query)
+        # Query moi thay the moi content search dang chay
+        self._content_search_generation += 1
 
-        if query:
-            # Use flat index for accurate full-tree search
-            self._last_search_results = self._model.search_files(query)
-            match_count = len(self._last_search_results)
+        if query and query.strip().lower().startswith(CODE_SEARCH_PREFIX):
+            # Content search chay background, ket qua stream vao filter proxy
+            self._last_search_results = []
+            self._filter_proxy.set_search_state(query, set())
+            self._match_count_label.setText("Searching...")
+            self._select_results_btn.hide()
+            self._start_content_search(query.strip()[len(CODE_SEARCH_PREFIX) :].strip())
+            if not skip_expand:
+                self._expand_all_with_wait_cursor()
+        elif query:
+            # Use flat index for accurate full-tree search (ranked, top-K)
+            self._last_search_results = self._model.search_files(
+                query, limit=SEARCH_RESULT_LIMIT
+            )
             self._filter_proxy.set_search_state(query, set(self._last_search_results))
 
             # Expand visible tree để filter có đủ nodes để match. Hiển thị wait cursor
             # khi expandAll chạy lâu trên project lớn. Skip nếu đã expand (returnPressed).
             if not skip_expand:
-                try:
-                    QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-                    QApplication.processEvents()
-                    self._tree_view.expandAll()
-                finally:
-                    QApplication.restoreOverrideCursor()
-
-            # Show match count from flat index (accurate)
-            if match_count > 0:
-                self._match_count_label.setText(f"{match_count} files found")
-                self._select_results_btn.setText(f"Select All Results ({match_count})")
-                self._select_results_btn.setStyleSheet(
-                    f"QPushButton {{ "
-                    f"  background-color: {ThemeColors.PRIMARY}; color: white; "
-                    f"  border: none; border-radius: 4px; padding: 2px 10px; "
-                    f"  font-size: 11px; font-weight: 600; "
-                    f"}} "
-                    f"QPushButton:hover {{ background-color: {ThemeColors.PRIMARY_HOVER}; }}"
-                )
-                self._select_results_btn.show()
-            else:
-                # Fallback to filter proxy count (for loaded nodes)
-                proxy_count = self._filter_proxy.get_match_count()
-                self._match_count_label.setText(
-                    f"{proxy_count} matches" if proxy_count > 0 else "No matches"
-                )
-                self._last_search_results = []
-                self._select_results_btn.hide()
+                self._expand_all_with_wait_cursor()
 
-            self.search_results_changed.emit(match_count)
+            self._show_search_result_count(self._model.last_search_match_count)
         else:
             self._last_search_results = []
             self._match_count_label.setText("")
@@ -501,6 +508,114 @@ class FileTreeWidget(QWidget):
         # Trigger repaint
         self._tree_view.viewport().update()
 
+    def _expand_all_with_wait_cursor(self) -> None:
+        try:
+            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+            QApplication.processEvents()
+            self._tree_view.expandAll()
+        finally:
+            QApplication.restoreOverrideCursor()
+
+    def _show_search_result_count(self, total_count: int = 0) -> None:
+        """
+        Update match label/Select All Results button tu _last_search_results.
+
+        Args:
+            total_count: Tong so match truoc khi cat top-K (0 = khong bi cat)
+        """
+        match_count = len(self._last_search_results)
+
+        # Show match count from flat index (accurate)
+        if match_count > 0:
+            if total_count > match_count:
+                self._match_count_label.setText(
+                    f"Top {match_count} of {total_count} files"
+                )
+            else:
+                self._match_count_label.setText(f"{match_count} files found")
+            self._select_results_btn.setText(f"Select All Results ({match_count})")
+            self._select_results_btn.setStyleSheet(
+                f"QPushButton {{ "
+                f"  background-color: {ThemeColors.PRIMARY}; color: white; "
+                f"  border: none; border-radius: 4px; padding: 2px 10px; "
+                f"  font-size: 11px; font-weight: 600; "
+                f"}} "
+                f"QPushButton:hover {{ background-color: {ThemeColors.PRIMARY_HOVER}; }}"
+            )
+            self._select_results_btn.show()
+        else:
+            # Fallback to filter proxy count (for loaded nodes)
+            proxy_count = self._filter_proxy.get_match_count()
+            self._match_count_label.setText(
+                f"{proxy_count} matches" if proxy_count > 0 else "No matches"
+            )
+            self._last_search_results = []
+            self._select_results_btn.hide()
+
+        self.search_results_changed.emit(match_count)
+
+    def _start_content_search(self, content_query: str) -> None:
+        """
+        Chay `code:` search qua content index trong background thread.
+
+        Files duoc xac nhan match gom lai va day vao filter proxy moi
+        CONTENT_SEARCH_FLUSH_INTERVAL giay; query moi (generation doi) huy search cu.
+        """
+        from presentation.utils.qt_utils import run_on_main_thread
+
+        generation = self._content_search_generation
+        pending: List[str] = []
+        pending_lock = threading.Lock()
+        last_flush = [time.monotonic()]
+
+        def is_cancelled() -> bool:
+            return self._content_search_generation != generation
+
+        def apply_batch(batch: List[str]) -> None:
+            if is_cancelled():
+                return
+            self._last_search_results.extend(batch)
+            self._filter_proxy.add_matched_paths(batch)
+            self._match_count_label.setText(
+                f"{len(self._last_search_results)} files found..."
+            )
+
+        def flush() -> None:
+            with pending_lock:
+                batch = pending[:]
+                pending.clear()
+            last_flush[0] = time.monotonic()
+            if batch:
+                run_on_main_thread(lambda: apply_batch(batch))
+
+        def on_match(path: str) -> None:
+            with pending_lock:
+                pending.append(path)
+            if time.monotonic() - last_flush[0] >= CONTENT_SEARCH_FLUSH_INTERVAL:
+                flush()
+
+        def finish(results: List[str]) -> None:
+            if is_cancelled():
+                return
+            # Danh sach cuoi (sorted) thay cho thu tu stream
+            self._last_search_results = results
+            self._filter_proxy.add_matched_paths(results)
+            self._show_search_result_count()
+            self._tree_view.viewport().update()
+
+        def _run() -> None:
+            try:
+                results = self._model.search_content(
+                    content_query, on_match=on_match, is_cancelled=is_cancelled
+                )
+            except Exception as e:
+                logger.warning(f"Content search failed: {e}")
+                results = []
+            flush()
+            run_on_main_thread(lambda: finish(results))
+
+        threading.Thread(target=_run, daemon=True).start()
+
     @Slot()
     def _on_select_all(self) -> None:
         self._model.select_all()
@@ -685,6 +800,7 @@ class FileTreeWidget(QWidget):
 
         if not selected_files:
             self._model._selection_mgr.set_resolved_files(set(), -1)
+            self._model.clear_token_estimates()
             self.token_counting_done.emit()
             return
 
@@ -697,6 +813,7 @@ class FileTreeWidget(QWidget):
         if not uncached:
             # All cached — STILL trigger update_token_counts_batch so folder aggregate cache is cleared
             # and ancestors are notified (important when resolving newly discovered files).
+            self._model.clear_token_estimates(notify=False)
             self._model.update_token_counts_batch({})
             self.token_counting_done.emit()
             return
@@ -707,13 +824,45 @@ class FileTreeWidget(QWidget):
             uncached,
             tokenization_service=self._tokenization_service,
             generation=current_gen,
+            estimator=self._token_estimator(),
         )
+        worker.signals.token_estimates.connect(self._on_token_estimates)
         worker.signals.token_counts_batch.connect(self._on_token_counts_batch)
+        worker.signals.large_file_progress.connect(self._on_large_file_progress)
         worker.signals.finished.connect(self._on_token_counting_finished)
         self._current_token_worker = worker
 
         QThreadPool.globalInstance().start(worker)
 
+    @staticmethod
+    def _token_estimator() -> Optional["ITokenEstimator"]:
+        """Estimator cua app (None neu chua dang ky, vd. trong tests)."""
+        from domain.ports.registry import DomainRegistry
+
+        try:
+            return DomainRegistry.token_estimator()
+        except RuntimeError:
+            return None
+
+    def _is_current_count(self) -> bool:
+        """Ket qua cua worker hien tai con dung workspace va selection."""
+        worker = self._current_token_worker
+        # Guard 1: Workspace switch — discard stale workspace results
+        if worker is not None and worker.generation != self._model.generation:
+            return False
+        # Guard 2: Selection change — discard results tu selection cu
+        # Neu _resolved_for_generation != _selection_generation,
+        # nghia la user da check/uncheck SAU khi worker bat dau
+        return self._model._resolved_for_generation == self._model._selection_generation
+
+    @Slot(dict)
+    def _on_token_estimates(self, estimates: Dict[str, int]) -> None:
+        """Hien uoc luong tu kich thuoc trong luc cho count chinh xac."""
+        if not self._is_current_count():
+            return
+        self._model.update_token_estimates(estimates)
+        self.token_counting_done.emit()
+
     @Slot(dict)
     def _on_token_counts_batch(self, counts: Dict[str, int]) -> None:
         """Handle token count batch results (main thread via signal).
@@ -722,24 +871,25 @@ class FileTreeWidget(QWidget):
         1. Workspace da thay doi (generation check)
         2. Selection da thay doi sau khi worker bat dau (selection generation check)
         """
-        worker = self._current_token_worker
-        if worker is not None and hasattr(worker, "generation"):
-            # Guard 1: Workspace switch — discard stale workspace results
-            if worker.generation != self._model.generation:
-                return
-
-        # Guard 2: Selection change — discard results tu selection cu
-        # Neu _resolved_for_generation != _selection_generation,
-        # nghia la user da check/uncheck SAU khi worker bat dau
-        if self._model._resolved_for_generation != self._model._selection_generation:
+        if not self._is_current_count():
             return
 
         self._model.update_token_counts_batch(counts)
         self.token_counting_done.emit()
 
+    @Slot(str, int)
+    def _on_large_file_progress(self, file_path: str, percent: int) -> None:
+        """Chuyen tien do dem file lon ra ngoai (vd. status bar)."""
+        if self._is_current_count():
+            self.token_counting_progress.emit(file_path, percent)
+
     @Slot()
     def _on_token_counting_finished(self) -> None:
         """Handle token counting completion."""
+        worker = self._current_token_worker
+        if worker is not None and self.sender() is worker.signals:
+            # File khong dem duoc (vd. bi xoa) khong giu so uoc luong
+            self._model.clear_token_estimates()
         self._current_token_worker = None
         self.token_counting_done.emit()
 
@@ -102,8 +102,12 @@ class TokenUsageBar(QWidget):
         files: int,
         smart_tokens: Optional[int] = None,
         savings_pct: Optional[float] = None,
+        estimated: bool = False,
     ) -> None:
-        """Cập nhật token counter hiện có với Full và Smart comparison."""
+        """Cập nhật token counter hiện có với Full và Smart comparison.
+
+        estimated=True: tokens con gom uoc luong (dang dem) -> hien "~".
+        """
         self._tokens = tokens
         self._limit = max(1, limit)
         self._selected_files = files
@@ -111,7 +115,7 @@ class TokenUsageBar(QWidget):
         self._files_label.setText(
             f"{files} {'file' if files == 1 else 'files'} selected"
         )
-        self._token_label.setText(f"Full: {tokens:,}")
+        self._token_label.setText(f"Full: {'~' if estimated else ''}{tokens:,}")
         self._update_smart_label(files, smart_tokens, savings_pct)
 
         self._progress.setRange(0, self._limit)
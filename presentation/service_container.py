@@ -20,7 +20,8 @@ Design decisions:
 """
 
 import logging
-from typing import Any
+import threading
+from typing import TYPE_CHECKING, Any
 
 from application.services.prompt_build_service import PromptBuildService
 from infrastructure.adapters.clipboard_service import QtClipboardService
@@ -30,6 +31,9 @@ from application.services.service_interfaces import IPromptBuilder, IClipboardSe
 from application.interfaces.tokenization_port import ITokenizationService
 from infrastructure.filesystem.ignore_engine import IgnoreEngine
 
+if TYPE_CHECKING:
+    from infrastructure.adapters.multi_encoder_counter import MultiEncoderCounter
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,16 +58,39 @@ class ServiceContainer:
         # Lay tokenizer_repo tu settings hien tai
         from infrastructure.adapters.encoder_registry import get_tokenizer_repo
 
+        from domain.tokenization.estimator import TokenEstimator
+        from infrastructure.persistence.token_count_store import TokenCountStore
+        from infrastructure.persistence.token_estimator_store import (
+            TokenEstimatorStore,
+        )
+
+        from infrastructure.adapters.encoders import configure_tokenizer_store
+        from infrastructure.persistence.tokenizer_store import TokenizerStore
+
         _repo = get_tokenizer_repo()
+        # HF tokenizer da load duoc luu cuc bo, lan sau khong can hub/mang
+        configure_tokenizer_store(TokenizerStore())
+        # Token count ben vung theo content hash - mo lai workspace co count ngay
+        self._token_count_store = TokenCountStore()
+        # Uoc luong token tu size file, hieu chinh tu cac lan dem chinh xac
+        self.token_estimator = TokenEstimator(TokenEstimatorStore())
         self._tokenization_service: TokenizationService = TokenizationService(
-            tokenizer_repo=_repo
+            tokenizer_repo=_repo,
+            count_store=self._token_count_store,
+            estimator=self.token_estimator,
         )
+        # So sanh token nhieu model: tao khi can (xem multi_encoder_counter)
+        self._multi_encoder_counter: "MultiEncoderCounter | None" = None
+        self._multi_encoder_lock = threading.Lock()
 
         # Services do container so huu truc tiep (inject dependencies)
-        self.prompt_builder: IPromptBuilder = PromptBuildService(
+        prompt_build_service = PromptBuildService(
             tokenization_service=self._tokenization_service,
             # graph_service removed
         )
+        self.prompt_builder: IPromptBuilder = prompt_build_service
+        # Fragment cache cua prompt builder (dang ky vao CacheRegistry luc boot)
+        self.fragment_cache = prompt_build_service.fragment_cache
         self.clipboard: IClipboardService = QtClipboardService()
 
         # CacheRegistry - tam thoi giu lai module singleton o day cho den khi Phase 2 migration
@@ -74,8 +101,12 @@ class ServiceContainer:
         self.cache_registry: CacheRegistry = _module_registry
 
         from domain.ports.registry import DomainRegistry
+        from application.services.workspace_catalog import WorkspaceCatalogService
+        from application.services.content_index import ContentIndexService
+        from application.services.symbol_index import SymbolIndexService
         from application.services.workspace_index import WorkspaceScanner
         from infrastructure.filesystem.file_utils import ConcreteDirectoryScanner
+        from infrastructure.filesystem.scan_snapshot import ScanSnapshotStore
         from infrastructure.git.git_utils import GitService
         from infrastructure.adapters.ast_parser import AstParser
         from infrastructure.persistence.settings_manager import (
@@ -91,14 +122,26 @@ class ServiceContainer:
         from infrastructure.ai.openai_provider import OpenAICompatibleProvider
         from infrastructure.mcp.config_installer import MCPInstallerService
         from infrastructure.persistence.preset_store import PresetStoreFactory
+        from infrastructure.persistence.content_index_store import ContentIndexStore
         from infrastructure.persistence.history_service import HistoryService
         from infrastructure.adapters.threading_utils import AppLifecycleService
         from infrastructure.adapters.memory_monitor import get_memory_monitor
 
         DomainRegistry.register_tokenization_service(self._tokenization_service)
-        DomainRegistry.register_workspace_scanner(WorkspaceScanner())
+        DomainRegistry.register_token_estimator(self.token_estimator)
+        self.workspace_catalog = WorkspaceCatalogService(self.ignore_engine)
+        DomainRegistry.register_workspace_catalog(self.workspace_catalog)
+        DomainRegistry.register_content_index(
+            ContentIndexService(self.workspace_catalog, ContentIndexStore())
+        )
+        DomainRegistry.register_symbol_index(SymbolIndexService(self.workspace_catalog))
+        DomainRegistry.register_workspace_scanner(
+            WorkspaceScanner(catalog=self.workspace_catalog)
+        )
         DomainRegistry.register_directory_scanner(
-            ConcreteDirectoryScanner(self.ignore_engine)
+            ConcreteDirectoryScanner(
+                self.ignore_engine, snapshot_store=ScanSnapshotStore()
+            )
         )
         DomainRegistry.register_git_service(GitService())
         DomainRegistry.register_ast_parser(AstParser())
@@ -112,7 +155,9 @@ class ServiceContainer:
         DomainRegistry.register_session_state(SessionStateService())
         DomainRegistry.register_cache_registry(self.cache_registry)
         DomainRegistry.register_file_actions_service(FileActionsService())
-        DomainRegistry.register_file_watcher_service(FileWatcher())
+        DomainRegistry.register_file_watcher_service(
+            FileWatcher(ignore_engine=self.ignore_engine)
+        )
         DomainRegistry.register_clipboard_service(self.clipboard)
         DomainRegistry.register_ignore_engine(self.ignore_engine)
         DomainRegistry.register_ai_provider_factory(OpenAICompatibleProvider)
@@ -141,6 +186,34 @@ class ServiceContainer:
         """
         return self._tokenization_service
 
+    @property
+    def multi_encoder_counter(self) -> "MultiEncoderCounter":
+        """
+        Bo dem so sanh token cua selection tren nhieu model.
+
+        Tao lan dau duoc goi (dung chung TokenCountStore voi
+        TokenizationService) - app khong so sanh model thi khong ton gi.
+        """
+        with self._multi_encoder_lock:
+            if self._multi_encoder_counter is None:
+                from infrastructure.adapters.multi_encoder_counter import (
+                    MultiEncoderCounter,
+                )
+
+                self._multi_encoder_counter = MultiEncoderCounter(
+                    count_store=self._token_count_store
+                )
+            return self._multi_encoder_counter
+
+    def preload_tokenizer(self) -> None:
+        """
+        Load tokenizer tren background thread.
+
+        Goi sau khi main window da hien: first paint khong phu thuoc tokenizer,
+        lan dem dau tien cho encoder load xong thay vi tu load.
+        """
+        self._tokenization_service.preload()
+
     def reset_for_model_change(self) -> None:
         """
         Re-initialize TokenizationService khi user doi model.
@@ -150,6 +223,7 @@ class ServiceContainer:
         """
         repo = self._resolve_tokenizer_repo()
         self._tokenization_service.set_model_config(tokenizer_repo=repo)
+        self._tokenization_service.preload()
         logger.info("ServiceContainer: model change reset completed (repo=%s)", repo)
 
     def shutdown(self) -> None:
@@ -164,6 +238,11 @@ class ServiceContainer:
         except Exception as e:
             logger.warning("Failed to invalidate caches during shutdown: %s", e)
 
+        # Dung process workers dem token, ghi not token count dang buffer
+        self._tokenization_service.shutdown_workers()
+        self._token_count_store.close()
+        self.token_estimator.flush()
+
         logger.info("ServiceContainer shut down")
 
     def get_health_report(self) -> dict[str, Any]:
@@ -25,7 +25,7 @@ from presentation.config.theme import ThemeColors
 
 
 from domain.smart_context.tree_item import TreeItem
-from domain.ports.file_watcher_port import WatcherCallbacks
+from domain.ports.file_watcher_port import TreeDelta, WatcherCallbacks
 from domain.ports.registry import DomainRegistry
 from domain.config.output_format import (
     OutputStyle,
@@ -259,6 +259,7 @@ class ContextViewQt(
         # 3. Clear all caches for old workspace via CacheRegistry
         DomainRegistry.cache_registry().invalidate_for_workspace()
         self._copy_controller._prompt_cache.invalidate_all()
+        self._copy_controller.cancel_prebuild()
 
         # 4. Reset preset controller BEFORE loading tree to avoid race condition
         if self._preset_controller:
@@ -297,6 +298,7 @@ class ContextViewQt(
                     on_file_created=self._tree_controller.on_file_created,
                     on_file_deleted=self._tree_controller.on_file_deleted,
                     on_batch_change=self._tree_controller.on_file_system_changed,
+                    on_tree_deltas=self._tree_controller.on_tree_deltas,
                 ),
                 debounce_seconds=0.5,
             )
@@ -371,6 +373,10 @@ class ContextViewQt(
         """Adapter: reload file tree widget."""
         self.file_tree_widget.load_tree(workspace)
 
+    def apply_tree_deltas(self, deltas: List[TreeDelta]) -> bool:
+        """Adapter: patch file tree widget tu watcher deltas."""
+        return self.file_tree_widget.apply_tree_deltas(deltas)
+
     def scan_full_tree(self, workspace: Path):
         """
         Adapter: Scan full workspace tree de build file index day du.
@@ -625,6 +631,16 @@ class ContextViewQt(
         if sb:
             sb.showMessage(f"✅ Context copied! Processed {token_count:,} tokens", 5000)
 
+    def _show_token_counting_progress(self, file_path: str, percent: int) -> None:
+        """Hien tien do dem token cua file lon tren StatusBar."""
+        sb = self._get_status_bar()
+        if sb is None:
+            return
+        if percent >= 100:
+            sb.clearMessage()
+        else:
+            sb.showMessage(f"Counting tokens: {Path(file_path).name} ({percent}%)")
+
     def _get_status_bar(self):
         """Lay statusBar tu QMainWindow cha."""
         from PySide6.QtWidgets import QMainWindow
@@ -676,13 +692,14 @@ class ContextViewQt(
     def invalidate_prompt_cache(self) -> None:
         """Adapter: Invalidate prompt-level cache (duoc goi boi TreeManagementController)."""
         if self._copy_controller:
-            self._copy_controller._prompt_cache.invalidate_all()
+            self._copy_controller.on_inputs_changed()
 
     def cleanup(self) -> None:
         """Cleanup resources."""
         # Invalidate all pending workers — their callbacks will be ignored
         if self._copy_controller:
             self._copy_controller._begin_copy_operation()
+            self._copy_controller.cancel_prebuild()
 
         self._improve_instructions_generation += 1
         self._cancel_improve_instructions_worker()
@@ -786,7 +803,7 @@ class ContextViewQt(
             return
 
         self._token_generation += 1
-        self._copy_controller._prompt_cache.invalidate_all()
+        self._copy_controller.on_inputs_changed()
         self._update_token_display()
 
         # Update empty state hint visibility
@@ -804,6 +821,8 @@ class ContextViewQt(
         word_count = len(text.split()) if text.strip() else 0
         self._word_count_label.setText(f"{word_count} words")
         QTimer.singleShot(150, self, self._update_token_display)
+        if self._copy_controller:
+            self._copy_controller.schedule_prebuild()
 
     @Slot(str)
     def _on_format_changed(self, format_id: str) -> None:
@@ -821,7 +840,7 @@ class ContextViewQt(
                 self._format_btn.setText(config.name)
 
             if self._copy_controller:
-                self._copy_controller._prompt_cache.invalidate_all()
+                self._copy_controller.on_inputs_changed()
         except ValueError:
             pass
 
@@ -1081,6 +1100,7 @@ class ContextViewQt(
                 files=file_count,
                 smart_tokens=comparison.smart_tokens if comparison else None,
                 savings_pct=comparison.savings_pct if comparison else None,
+                estimated=model.has_token_estimates(),
             )
             self._request_token_comparison(selected_paths, total, limit, file_count)
 
@@ -1182,7 +1202,7 @@ class ContextViewQt(
 
         # Invalidate prompt cache (token counts will differ with new tokenizer)
         if self._copy_controller:
-            self._copy_controller._prompt_cache.invalidate_all()
+            self._copy_controller.on_inputs_changed()
 
         # Clear token cache (since tokenizer has changed)
         model = self.file_tree_widget.get_model()
@@ -38,6 +38,8 @@ from PySide6.QtWidgets import QDialog, QHBoxLayout, QLabel, QPushButton, QVBoxLa
 
 
 from domain.codemap.tree_map_generator import generate_tree_map_only
+from domain.prompt.content_snapshot import ContentSnapshot
+from domain.prompt.prompt_sink import FileSink, PromptSink
 from domain.smart_context.tree_item import TreeItem
 from application.services.workspace_index import WorkspaceScanService
 from domain.ports.registry import DomainRegistry
@@ -48,15 +50,29 @@ from application.services.workspace_config import (
 )
 from domain.config.output_format import OutputStyle  # Re-touching for index
 from presentation.config.theme import ThemeColors
+from presentation.views.context.prompt_prebuilder import (
+    PrebuildRequest,
+    PrebuildStale,
+    PromptPrebuilder,
+)
 
 
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
-    pass
+    from domain.prompt.copy_mode import CopyMode
+
 
+# Chỉ dẫn Search/Replace nối vào instructions khi copy ở mode APPLY
+OPX_DIRECTIVE = (
+    "\n\n[DIRECTIVE: USE SEARCH/REPLACE BLOCKS]\n"
+    "You are provided with a full/partial code context and instructions. "
+    "For any code changes, YOU MUST respond using Search/Replace (Aider-style) blocks "
+    "as specified in the <search_replace_instructions> block at the end of this prompt."
+)
 
 PromptBreakdown: TypeAlias = dict[str, Any]
+# (prompt, token_count, breakdown); dich "file": prompt la duong dan file da ghi
 PromptResult: TypeAlias = tuple[str, int, PromptBreakdown]
 PromptCacheEntry: TypeAlias = tuple[str, str, int, PromptBreakdown]
 PromptCacheKey: TypeAlias = tuple[str, set[str], str, bool]
@@ -94,11 +110,59 @@ StaleRef: TypeAlias = QObject | QRunnable
 # ============================================================
 
 
-def copy_as_file_to_clipboard(
-    content: str, filename: str = "paste.txt"
-) -> tuple[bool, str]:
+# Copy "as file": prompt duoc ghi thang ra file qua FileSink luc build (khong
+# giu ca prompt trong RAM). Moi lan build co thu muc rieng trong temp dir de
+# build truoc va copy that khong ghi de file cua nhau; ten file user thay khi
+# paste van la PROMPT_FILE_NAME.
+PROMPT_FILE_NAME = "paste.txt"
+
+
+def _clipboard_temp_dir() -> Path:
+    """Thu muc temp chua cac file dat len clipboard."""
+    import tempfile
+
+    return Path(tempfile.gettempdir()) / "synapse_clipboard"
+
+
+def new_prompt_file(filename: str = PROMPT_FILE_NAME) -> Path:
+    """Duong dan file moi (trong thu muc rieng) cho 1 lan build dich "file"."""
+    import tempfile
+
+    temp_dir = _clipboard_temp_dir()
+    temp_dir.mkdir(exist_ok=True)
+    return Path(tempfile.mkdtemp(dir=temp_dir)) / filename
+
+
+def remove_prompt_file(path: str) -> None:
+    """Xoa file tao boi new_prompt_file() cung thu muc rieng cua no."""
+    import shutil
+
+    file_path = Path(path)
+    if file_path.parent.parent != _clipboard_temp_dir():
+        return  # Khong phai file cua new_prompt_file -> khong dong vao
+    shutil.rmtree(file_path.parent, ignore_errors=True)
+
+
+def write_prompt_file(build: Callable[[PromptSink], PromptResult]) -> PromptResult:
     """
-    Lưu content vào temp file và đặt file URI vào clipboard.
+    Chay build(sink) voi FileSink tren 1 file prompt moi.
+
+    Returns:
+        (duong dan file, token_count, breakdown) - prompt nam trong file
+    """
+    path = new_prompt_file()
+    try:
+        with FileSink(path) as sink:
+            _, token_count, breakdown = build(sink)
+    except BaseException:
+        remove_prompt_file(str(path))
+        raise
+    return str(path), token_count, breakdown
+
+
+def put_file_on_clipboard(path: Path | str) -> tuple[bool, str]:
+    """
+    Đặt file URI vào clipboard.
 
     Khi user Ctrl+V vào web chat (ChatGPT, Claude, Gemini…), trình duyệt sẽ
     nhận ra đây là file attachment thay vì plain text — tránh lag khi paste
@@ -108,46 +172,74 @@ def copy_as_file_to_clipboard(
         (True, file_path) nếu thành công
         (False, error_msg) nếu thất bại
     """
-    import tempfile
-    from pathlib import Path as _Path
     from PySide6.QtCore import QMimeData, QUrl
     from PySide6.QtWidgets import QApplication
 
     try:
-        temp_dir = _Path(tempfile.gettempdir()) / "synapse_clipboard"
-        temp_dir.mkdir(exist_ok=True)
-
-        temp_path = temp_dir / filename
-        temp_path.write_text(content, encoding="utf-8")
-
         mime = QMimeData()
-        mime.setUrls([QUrl.fromLocalFile(str(temp_path))])
+        mime.setUrls([QUrl.fromLocalFile(str(path))])
 
         clipboard = QApplication.clipboard()
         clipboard.setMimeData(mime)
-        return True, str(temp_path)
+        return True, str(path)
 
     except Exception as exc:
         return False, str(exc)
 
 
+def copy_as_file_to_clipboard(
+    content: str, filename: str = PROMPT_FILE_NAME
+) -> tuple[bool, str]:
+    """
+    Lưu content vào temp file và đặt file URI vào clipboard.
+
+    Returns:
+        (True, file_path) nếu thành công
+        (False, error_msg) nếu thất bại
+    """
+    try:
+        temp_dir = _clipboard_temp_dir()
+        temp_dir.mkdir(exist_ok=True)
+
+        temp_path = temp_dir / filename
+        temp_path.write_text(content, encoding="utf-8")
+    except Exception as exc:
+        return False, str(exc)
+    return put_file_on_clipboard(temp_path)
+
+
+def _is_file_mode(mode: str) -> bool:
+    """Cache mode co dich "file": ket qua la duong dan file prompt."""
+    return mode.endswith(":file") or mode == "copy_as_file"
+
+
 class PromptCache:
     """Single-entry-per-mode cache for generated prompts.
 
     Thread-safe for reads from main thread (all cache access is on main thread
     since it happens before/instead of dispatching to background).
+
+    File modes (_is_file_mode) store the path of the written prompt file
+    instead of the text. The cache owns those files: a file is removed when
+    its entry is replaced or invalidated, unless it is still on the clipboard.
     """
 
     def __init__(self) -> None:
-        # mode_key -> (fingerprint, prompt, token_count, breakdown)
+        # mode_key -> (fingerprint, prompt or file path, token_count, breakdown)
         self._entries: dict[str, PromptCacheEntry] = {}
+        # File prompt dang nam tren clipboard (khong xoa khi entry bi thay)
+        self._clipboard_file: Optional[str] = None
 
     def get(self, mode: str, fingerprint: str) -> PromptResult | None:
         """Return (prompt, token_count, breakdown) if fingerprint matches, else None."""
         entry = self._entries.get(mode)
-        if entry is not None and entry[0] == fingerprint:
-            return (entry[1], entry[2], entry[3])
-        return None
+        if entry is None or entry[0] != fingerprint:
+            return None
+        if _is_file_mode(mode) and not Path(entry[1]).is_file():
+            # File prompt bi xoa ngoai app (vd. don temp) -> build lai
+            self._entries.pop(mode, None)
+            return None
+        return (entry[1], entry[2], entry[3])
 
     def put(
         self,
@@ -158,18 +250,47 @@ class PromptCache:
         breakdown: PromptBreakdown,
     ) -> None:
         """Store result for a copy mode."""
+        old = self._entries.get(mode)
         self._entries[mode] = (fingerprint, prompt, token_count, breakdown)
+        if old is not None and _is_file_mode(mode) and old[1] != prompt:
+            self.release_file(old[1])
 
     def invalidate(self, mode: Optional[str] = None) -> None:
         """Invalidate one mode or all modes."""
         if mode is None:
+            removed = list(self._entries.items())
             self._entries.clear()
         else:
-            self._entries.pop(mode, None)
+            entry = self._entries.pop(mode, None)
+            removed = [(mode, entry)] if entry is not None else []
+        for removed_mode, entry in removed:
+            if _is_file_mode(removed_mode):
+                self.release_file(entry[1])
 
     def invalidate_all(self) -> None:
         """Clear entire cache."""
-        self._entries.clear()
+        self.invalidate()
+
+    def set_clipboard_file(self, path: Optional[str]) -> None:
+        """Ghi nhan file prompt vua dat len clipboard (None = vua copy text)."""
+        previous = self._clipboard_file
+        self._clipboard_file = path
+        if previous is not None and previous != path:
+            self.release_file(previous)
+
+    def release_file(self, path: str) -> None:
+        """Xoa file prompt neu khong con entry nao hay clipboard dung den."""
+        if path == self._clipboard_file:
+            return
+        for mode, entry in self._entries.items():
+            if _is_file_mode(mode) and entry[1] == path:
+                return
+        remove_prompt_file(path)
+
+
+def _never_stale() -> bool:
+    """is_stale mac dinh cua task: copy that khong bao gio bo giua chung."""
+    return False
 
 
 def _build_fingerprint(
@@ -282,13 +403,22 @@ class SecurityCheckWorker(QRunnable):
     """Background worker for security scanning.
 
     Same pattern as CopyTaskWorker — no cancel, no auto-delete.
+    Neu co snapshot: file duoc doc vao snapshot o day (background) va
+    build prompt sau do dung lai dung noi dung da scan.
     """
 
-    def __init__(self, paths: set[str], signals: SecurityCheckSignals, generation: int):
+    def __init__(
+        self,
+        paths: set[str],
+        signals: SecurityCheckSignals,
+        generation: int,
+        snapshot: Optional[ContentSnapshot] = None,
+    ):
         super().__init__()
         self.paths = paths
         self.signals = signals
         self.generation = generation
+        self.snapshot = snapshot
         self.setAutoDelete(False)
 
     @Slot()
@@ -297,7 +427,12 @@ class SecurityCheckWorker(QRunnable):
             from domain.ports.registry import DomainRegistry
 
             scanner = DomainRegistry.security_scanner()
-            matches = scanner.scan_secrets_in_files_cached(self.paths)
+            if self.snapshot is not None:
+                matches = scanner.scan_secrets_in_files_cached(
+                    self.paths, snapshot=self.snapshot.load()
+                )
+            else:
+                matches = scanner.scan_secrets_in_files_cached(self.paths)
             try:
                 self.signals.finished.emit(matches)
             except RuntimeError:
@@ -354,6 +489,12 @@ class CopyActionController(QObject):
         self._current_copy_signals = None
         self._current_security_worker = None
         self._current_security_signals = None
+        self._prebuilder = PromptPrebuilder(
+            self._prebuild_request,
+            self._store_prebuilt,
+            self._discard_prebuilt,
+            parent=self,
+        )
 
         import threading
 
@@ -374,6 +515,136 @@ class CopyActionController(QObject):
 
     # Prompt-level cache — one entry per copy mode
     _prompt_cache: PromptCache
+    # Build truoc prompt cho copy mode dang chon (dien vao _prompt_cache)
+    _prebuilder: PromptPrebuilder
+
+    def on_inputs_changed(self) -> None:
+        """Input anh huong prompt doi (selection, mode, settings, file tren disk)."""
+        self._prompt_cache.invalidate_all()
+        self._prebuilder.schedule()
+
+    def schedule_prebuild(self) -> None:
+        """Hen build truoc cho input hien tai (vd. instructions vua doi)."""
+        self._prebuilder.schedule()
+
+    def cancel_prebuild(self) -> None:
+        """Bo build truoc dang chay/dang hen (doi workspace, dong view)."""
+        self._prebuilder.cancel()
+
+    def _prebuild_request(self) -> Optional[PrebuildRequest]:
+        """
+        Request build truoc cho copy mode dang chon, giong on_copy_requested().
+
+        None khi copy that dang chay (khong tranh CPU voi no) hoac chua co gi
+        de copy. Mode FULL/APPLY co security check: job scan truoc tren cung
+        snapshot va khong cache neu thay secret, de Copy van hien dialog.
+        """
+        from domain.prompt.copy_mode import CopyMode
+
+        if self._current_copy_worker is not None or (
+            self._current_security_worker is not None
+        ):
+            return None
+        workspace = self._view.get_workspace()
+        if not workspace:
+            return None
+
+        config = self._view.get_copy_config()
+        destination = "file" if self._view.get_copy_as_file() else "text"
+        instructions = self._view.get_instructions_text()
+        selected_files = self._view.get_selected_paths()
+
+        if config.tree_map_only:
+            mode = f"copy_treemap:{destination}"
+            fingerprint = self._fingerprint(
+                mode, set(selected_files) if selected_files else set(), instructions
+            )
+            tree_task = self._tree_map_task(workspace, instructions, destination)
+            return PrebuildRequest(mode, fingerprint, tree_task)
+
+        if not selected_files and not config.include_git_diff:
+            return None
+        selected = {str(Path(p)) for p in selected_files if Path(p).is_file()}
+        at_top = destination == "file"
+
+        if config.mode == CopyMode.SMART:
+            mode = f"copy_smart:{destination}"
+            fingerprint = self._fingerprint(
+                mode, selected, instructions, instructions_at_top=at_top
+            )
+            smart_task = self._prompt_task(
+                workspace, selected, instructions, CopyMode.SMART, destination
+            )
+            return PrebuildRequest(mode, fingerprint, smart_task)
+
+        include_xml = config.mode == CopyMode.APPLY
+        if include_xml:
+            instructions += OPX_DIRECTIVE
+        mode = f"{'copy_opx' if include_xml else 'copy_context'}:{destination}"
+        fingerprint = self._fingerprint(
+            mode, selected, instructions, include_xml, at_top
+        )
+        scan = DomainRegistry.settings().enable_security_check
+        # Scan va build dung chung 1 snapshot, giong _run_security_check_then_copy
+        snapshot = ContentSnapshot(selected) if scan else None
+        task = self._prompt_task(
+            workspace,
+            selected,
+            instructions,
+            CopyMode.APPLY if include_xml else CopyMode.FULL,
+            destination,
+            snapshot,
+        )
+
+        def build(is_stale: Callable[[], bool]) -> Optional[PromptResult]:
+            if snapshot is not None:
+                scanner = DomainRegistry.security_scanner()
+                if scanner.scan_secrets_in_files_cached(
+                    selected, snapshot=snapshot.load()
+                ):
+                    return None
+                if is_stale():
+                    return None
+            return task(is_stale)
+
+        return PrebuildRequest(mode, fingerprint, build)
+
+    def _store_prebuilt(
+        self, mode: str, fingerprint: str, result: PromptResult
+    ) -> None:
+        """Ket qua build truoc -> PromptCache (fingerprint tinh luc tao request)."""
+        prompt, token_count, breakdown = result
+        self._prompt_cache.put(mode, fingerprint, prompt, token_count, breakdown)
+
+    def _discard_prebuilt(self, mode: str, result: PromptResult) -> None:
+        """Ket qua build truoc bi bo: xoa file prompt da ghi (dich "file")."""
+        if _is_file_mode(mode):
+            self._prompt_cache.release_file(result[0])
+
+    def _attach_prebuild(
+        self,
+        task_fn: Callable[[], PromptResult],
+        cache_key: PromptCacheKey,
+        instructions_at_top: bool,
+    ) -> Callable[[], PromptResult]:
+        """
+        Build truoc cung input dang chay -> task doi ket qua do thay vi build
+        lai; job bi bo hoac loi thi build nhu binh thuong.
+        """
+        mode, paths, instructions, include_xml = cache_key
+        job = self._prebuilder.pending(mode)
+        if job is None or job.request.fingerprint != self._fingerprint(
+            mode, paths, instructions, include_xml, instructions_at_top
+        ):
+            return task_fn
+        job.claimed = True
+        wait = job.wait
+
+        def task() -> PromptResult:
+            result = wait()
+            return result if result is not None else task_fn()
+
+        return task
 
     def _try_cache_hit(
         self,
@@ -388,21 +659,8 @@ class CopyActionController(QObject):
         This is called on the main thread BEFORE starting any background work.
         If cache hits, we skip all heavy work entirely.
         """
-        output_style_id = self._view.get_output_style().value
-        include_git = DomainRegistry.settings().include_git_changes
-        use_rel = get_use_relative_paths()
-        workspace = self._view.get_workspace_path()
-
-        fingerprint = _build_fingerprint(
-            selected_paths=selected_paths,
-            instructions=instructions,
-            output_style_id=output_style_id,
-            copy_mode=copy_mode,
-            include_git=include_git,
-            use_relative_paths=use_rel,
-            include_xml=include_xml,
-            workspace=workspace,
-            instructions_at_top=instructions_at_top,
+        fingerprint = self._fingerprint(
+            copy_mode, selected_paths, instructions, include_xml, instructions_at_top
         )
 
         cached = self._prompt_cache.get(copy_mode, fingerprint)
@@ -422,23 +680,43 @@ class CopyActionController(QObject):
         instructions_at_top: bool = False,
     ) -> None:
         """Store generated prompt in cache for future hits."""
-        output_style_id = self._view.get_output_style().value
-        include_git = DomainRegistry.settings().include_git_changes
-        use_rel = get_use_relative_paths()
-        workspace = self._view.get_workspace_path()
+        fingerprint = self._fingerprint(
+            copy_mode, selected_paths, instructions, include_xml, instructions_at_top
+        )
+        self._prompt_cache.put(copy_mode, fingerprint, prompt, token_count, breakdown)
 
-        fingerprint = _build_fingerprint(
+    def _put_on_clipboard(self, prompt: str, copy_destination: str) -> tuple[bool, str]:
+        """Dat ket qua len clipboard: text, hoac file prompt khi dich la "file"."""
+        if copy_destination == "file":
+            success, result = put_file_on_clipboard(prompt)
+            if success:
+                self._prompt_cache.set_clipboard_file(prompt)
+            return success, result
+        success, result = self._view.get_clipboard_service().copy_to_clipboard(prompt)
+        if success:
+            self._prompt_cache.set_clipboard_file(None)
+        return success, result
+
+    def _fingerprint(
+        self,
+        copy_mode: str,
+        selected_paths: Set[str],
+        instructions: str,
+        include_xml: bool = False,
+        instructions_at_top: bool = False,
+    ) -> str:
+        """Fingerprint cua input hien tai (settings + view) cho copy mode."""
+        return _build_fingerprint(
             selected_paths=selected_paths,
             instructions=instructions,
-            output_style_id=output_style_id,
+            output_style_id=self._view.get_output_style().value,
             copy_mode=copy_mode,
-            include_git=include_git,
-            use_relative_paths=use_rel,
+            include_git=DomainRegistry.settings().include_git_changes,
+            use_relative_paths=get_use_relative_paths(),
             include_xml=include_xml,
-            workspace=workspace,
+            workspace=self._view.get_workspace_path(),
             instructions_at_top=instructions_at_top,
         )
-        self._prompt_cache.put(copy_mode, fingerprint, prompt, token_count, breakdown)
 
     def _begin_copy_operation(self) -> int:
         """Prepare for a new copy operation.
@@ -716,13 +994,7 @@ class CopyActionController(QObject):
 
         # Thêm chỉ dẫn định dạng Search/Replace nếu được yêu cầu
         if include_xml:
-            opx_directive = (
-                "\n\n[DIRECTIVE: USE SEARCH/REPLACE BLOCKS]\n"
-                "You are provided with a full/partial code context and instructions. "
-                "For any code changes, YOU MUST respond using Search/Replace (Aider-style) blocks "
-                "as specified in the <search_replace_instructions> block at the end of this prompt."
-            )
-            instructions += opx_directive
+            instructions += OPX_DIRECTIVE
 
         self._save_instruction_to_history(instructions)
         copy_mode_base = "copy_opx" if include_xml else "copy_context"
@@ -740,12 +1012,7 @@ class CopyActionController(QObject):
         )
         if cached is not None:
             prompt, token_count, breakdown = cached
-            if copy_destination == "file":
-                success, err_msg = copy_as_file_to_clipboard(prompt)
-            else:
-                success, err_msg = self._view.get_clipboard_service().copy_to_clipboard(
-                    prompt
-                )
+            success, err_msg = self._put_on_clipboard(prompt, copy_destination)
             if success:
                 mode_text = "Copy + Search/Replace" if include_xml else "Copy Context"
                 breakdown["copy_mode"] = (
@@ -800,9 +1067,14 @@ class CopyActionController(QObject):
             return
 
         file_path_strs = {str(p) for p in file_paths}
+        # Scan va build dung chung 1 snapshot: moi file doc 1 lan, va prompt
+        # chua dung phien ban file da duoc scan
+        content_snapshot = ContentSnapshot(file_path_strs)
 
         signals = SecurityCheckSignals()
-        worker = SecurityCheckWorker(file_path_strs, signals, generation=gen)
+        worker = SecurityCheckWorker(
+            file_path_strs, signals, generation=gen, snapshot=content_snapshot
+        )
 
         self._current_security_signals = signals
         self._current_security_worker = worker
@@ -834,6 +1106,7 @@ class CopyActionController(QObject):
                             instructions,
                             include_xml,
                             copy_destination,
+                            content_snapshot,
                         )
                     except Exception as e:
                         self._view.show_status(f"Error: {e}", is_error=True)
@@ -861,6 +1134,7 @@ class CopyActionController(QObject):
                         instructions,
                         include_xml,
                         copy_destination,
+                        content_snapshot,
                     )
                 except Exception as e:
                     self._view.show_status(f"Error: {e}", is_error=True)
@@ -922,6 +1196,9 @@ class CopyActionController(QObject):
 
         self._view.show_status("Preparing context...")
 
+        if cache_key is not None:
+            task_fn = self._attach_prebuild(task_fn, cache_key, instructions_at_top)
+
         signals = CopyTaskSignals()
         worker = CopyTaskWorker(task_fn, signals, generation=gen)
 
@@ -942,6 +1219,8 @@ class CopyActionController(QObject):
             if not self._is_current_generation(gen):
                 # Stale — ignore result, do NOT re-enable buttons
                 # (current generation's worker will handle that)
+                if copy_destination == "file":
+                    self._prompt_cache.release_file(prompt)
                 return
 
             try:
@@ -966,12 +1245,7 @@ class CopyActionController(QObject):
                     except Exception:
                         pass  # intentionally silent — Cache storage failure is non-critical
 
-                if copy_destination == "file":
-                    success, err_msg = copy_as_file_to_clipboard(prompt)
-                else:
-                    success, err_msg = (
-                        self._view.get_clipboard_service().copy_to_clipboard(prompt)
-                    )
+                success, err_msg = self._put_on_clipboard(prompt, copy_destination)
 
                 if not success:
                     self._view.show_status(f"Copy failed: {err_msg}", is_error=True)
@@ -1032,17 +1306,19 @@ class CopyActionController(QObject):
         instructions: str,
         include_xml: bool,
         copy_destination: str = "text",
+        content_snapshot: Optional[ContentSnapshot] = None,
     ) -> None:
         """
         Execute copy context tren background thread.
 
         Heavy work (scan tree, doc files, generate prompt, count tokens)
-        chay background de UI khong bi freeze.
+        chay background de UI khong bi freeze. content_snapshot: noi dung
+        file da doc luc security scan (None = build tu doc file).
         """
         try:
+            from domain.prompt.copy_mode import CopyMode
+
             selected_path_strs = {str(p) for p in file_paths}
-            use_rel = get_use_relative_paths()
-            ui_config = self._view.get_copy_config()
 
             copy_mode_base = "copy_opx" if include_xml else "copy_context"
             copy_mode = f"{copy_mode_base}:{copy_destination}"
@@ -1053,32 +1329,14 @@ class CopyActionController(QObject):
             _cache_mode = copy_mode
             instructions_at_top = copy_destination == "file"
 
-            def task() -> PromptResult:
-                """Heavy work - chay tren background thread."""
-                tree_item = self._view.scan_full_tree(workspace)
-                from domain.prompt.copy_mode import CopyConfig, CopyMode
-
-                config = CopyConfig(
-                    mode=CopyMode.APPLY if include_xml else CopyMode.FULL,
-                    include_git_diff=ui_config.include_git_diff,
-                    tree_map_only=False,
-                    output_style=ui_config.output_style,
-                    git_commit_depth=ui_config.git_commit_depth,
-                )
-
-                return self._view.get_prompt_builder().build_prompt(
-                    file_paths=[Path(p) for p in selected_path_strs],
-                    workspace=workspace,
-                    instructions=instructions,
-                    output_format=config,
-                    include_git_changes=ui_config.include_git_diff,
-                    use_relative_paths=use_rel,
-                    tree_item=tree_item,
-                    selected_paths=selected_path_strs,
-                    include_xml_formatting=include_xml,
-                    instructions_at_top=instructions_at_top,
-                    full_tree=self._view.get_full_tree(),
-                )
+            task = self._prompt_task(
+                workspace,
+                selected_path_strs,
+                instructions,
+                CopyMode.APPLY if include_xml else CopyMode.FULL,
+                copy_destination,
+                content_snapshot,
+            )
 
             snapshot = {
                 "copy_mode": "Copy + Search/Replace" if include_xml else "Copy Context"
@@ -1134,12 +1392,7 @@ class CopyActionController(QObject):
         )
         if cached is not None:
             prompt, token_count, breakdown = cached
-            if copy_destination == "file":
-                success, err_msg = copy_as_file_to_clipboard(prompt)
-            else:
-                success, err_msg = self._view.get_clipboard_service().copy_to_clipboard(
-                    prompt
-                )
+            success, err_msg = self._put_on_clipboard(prompt, copy_destination)
             if success:
                 breakdown["copy_mode"] = (
                     "Copy Smart (File)" if copy_destination == "file" else "Copy Smart"
@@ -1149,37 +1402,16 @@ class CopyActionController(QObject):
                 self._view.show_status(f"Copy failed: {err_msg}", is_error=True)
             return
 
-        gen = self._begin_copy_operation()
-        use_rel = get_use_relative_paths()
-        include_git = DomainRegistry.settings().include_git_changes
-        ui_config = self._view.get_copy_config()
-
-        def task() -> PromptResult:
-            """Heavy work - chay tren background thread."""
-            assert workspace is not None
-            tree_item = self._view.scan_full_tree(workspace)
-            from domain.prompt.copy_mode import CopyConfig, CopyMode
-
-            config = CopyConfig(
-                mode=CopyMode.SMART,
-                include_git_diff=ui_config.include_git_diff,
-                tree_map_only=False,
-                output_style=ui_config.output_style,
-                git_commit_depth=ui_config.git_commit_depth,
-            )
-            return self._view.get_prompt_builder().build_prompt(
-                file_paths=[Path(p) for p in selected_path_strs],
-                workspace=workspace,
-                instructions=instructions,
-                output_format=config,
-                include_git_changes=ui_config.include_git_diff,
-                use_relative_paths=use_rel,
-                tree_item=tree_item,
-                selected_paths=selected_path_strs,
-                full_tree=self._view.get_full_tree(),
-            )
+        from domain.prompt.copy_mode import CopyMode
 
-        # snapshot is now passed directly as pre_snapshot argument in run_copy
+        gen = self._begin_copy_operation()
+        task = self._prompt_task(
+            workspace,
+            selected_path_strs,
+            instructions,
+            CopyMode.SMART,
+            copy_destination,
+        )
 
         self._run_copy_in_background(
             gen,
@@ -1212,12 +1444,7 @@ class CopyActionController(QObject):
         cached = self._try_cache_hit(cache_mode, selected_strs, instructions)
         if cached is not None:
             prompt, token_count, breakdown = cached
-            if copy_destination == "file":
-                success, err_msg = copy_as_file_to_clipboard(prompt)
-            else:
-                success, err_msg = self._view.get_clipboard_service().copy_to_clipboard(
-                    prompt
-                )
+            success, err_msg = self._put_on_clipboard(prompt, copy_destination)
             if success:
                 breakdown["copy_mode"] = (
                     "Copy Tree Map (File)"
@@ -1230,14 +1457,100 @@ class CopyActionController(QObject):
             return
 
         gen = self._begin_copy_operation()
+        task = self._tree_map_task(workspace, instructions, copy_destination)
+
+        self._run_copy_in_background(
+            gen,
+            task,
+            copy_destination,
+            "Tree map copied! ({token_count:,} tokens)",
+            pre_snapshot={
+                "copy_mode": (
+                    "Copy Tree Map (File)"
+                    if copy_destination == "file"
+                    else "Copy Tree Map"
+                )
+            },
+            cache_key=(cache_mode, selected_strs, instructions, False),
+        )
+
+    def _prompt_task(
+        self,
+        workspace: Path,
+        selected_path_strs: Set[str],
+        instructions: str,
+        mode: "CopyMode",
+        copy_destination: str = "text",
+        content_snapshot: Optional[ContentSnapshot] = None,
+    ) -> Callable[..., PromptResult]:
+        """
+        Task build prompt cho FULL / APPLY / SMART.
+
+        Doc config tu view tren main thread; task tra ve chay tren background
+        thread (scan tree, doc files, generate prompt, count tokens). Build
+        truoc goi task(is_stale): input doi giua cac stage -> PrebuildStale.
+        """
+        from domain.prompt.copy_mode import CopyConfig, CopyMode
+
+        ui_config = self._view.get_copy_config()
         use_rel = get_use_relative_paths()
+        full_tree = self._view.get_full_tree()
+        config = CopyConfig(
+            mode=mode,
+            include_git_diff=ui_config.include_git_diff,
+            tree_map_only=False,
+            output_style=ui_config.output_style,
+            git_commit_depth=ui_config.git_commit_depth,
+        )
+        extra: dict[str, Any] = {}
+        if mode != CopyMode.SMART:
+            extra = {
+                "include_xml_formatting": mode == CopyMode.APPLY,
+                "instructions_at_top": copy_destination == "file",
+                "snapshot": content_snapshot,
+            }
 
-        def task() -> PromptResult:
+        def task(is_stale: Callable[[], bool] = _never_stale) -> PromptResult:
+            """Heavy work - chay tren background thread."""
+            tree_item = self._view.scan_full_tree(workspace)
+            if is_stale():
+                raise PrebuildStale()
+
+            def build(sink: Optional[PromptSink] = None) -> PromptResult:
+                return self._view.get_prompt_builder().build_prompt(
+                    file_paths=[Path(p) for p in selected_path_strs],
+                    workspace=workspace,
+                    instructions=instructions,
+                    output_format=config,
+                    include_git_changes=ui_config.include_git_diff,
+                    use_relative_paths=use_rel,
+                    tree_item=tree_item,
+                    selected_paths=selected_path_strs,
+                    full_tree=full_tree,
+                    sink=sink,
+                    **extra,
+                )
+
+            # Dich "file": prompt ghi thang ra file, khong giu trong RAM
+            if copy_destination == "file":
+                return write_prompt_file(build)
+            return build()
+
+        return task
+
+    def _tree_map_task(
+        self, workspace: Path, instructions: str, copy_destination: str = "text"
+    ) -> Callable[..., PromptResult]:
+        """Task build tree map only (chay tren background thread)."""
+        use_rel = get_use_relative_paths()
+
+        def task(is_stale: Callable[[], bool] = _never_stale) -> PromptResult:
             """Heavy work - chay tren background thread."""
-            assert workspace is not None
             tree_item = self._view.scan_full_tree(workspace)
             if not tree_item:
                 raise ValueError("No file tree loaded")
+            if is_stale():
+                raise PrebuildStale()
 
             valid_paths = self._collect_all_tree_paths(tree_item)
             # Use full tree paths as requested: "copy tree thì ko cần checkbox luôn"
@@ -1250,6 +1563,8 @@ class CopyActionController(QObject):
                 workspace_root=workspace,
                 use_relative_paths=use_rel,
             )
+            if is_stale():
+                raise PrebuildStale()
             # Thong nhat token counting path qua PromptBuildService
             # de dam bao cung tokenizer instance nhu cac copy operations khac
             count = self._view.get_prompt_builder().count_tokens(prompt)
@@ -1270,24 +1585,16 @@ class CopyActionController(QObject):
                 "structure_tokens": max(0, count - tree_tokens - instr_tokens),
             }
 
-            return prompt, count, breakdown
+            if copy_destination == "file":
 
-        # snapshot is handled in run_copy call
+                def write(sink: PromptSink) -> PromptResult:
+                    sink.write(prompt)
+                    return "", count, breakdown
 
-        self._run_copy_in_background(
-            gen,
-            task,
-            copy_destination,
-            "Tree map copied! ({token_count:,} tokens)",
-            pre_snapshot={
-                "copy_mode": (
-                    "Copy Tree Map (File)"
-                    if copy_destination == "file"
-                    else "Copy Tree Map"
-                )
-            },
-            cache_key=(cache_mode, selected_strs, instructions, False),
-        )
+                return write_prompt_file(write)
+            return prompt, count, breakdown
+
+        return task
 
     def _copy_as_file(self) -> None:
         """
@@ -1318,7 +1625,7 @@ class CopyActionController(QObject):
         cached = self._try_cache_hit("copy_as_file", selected_path_strs, instructions)
         if cached is not None:
             prompt, token_count, breakdown = cached
-            success, result = copy_as_file_to_clipboard(prompt)
+            success, result = self._put_on_clipboard(prompt, "file")
             if success:
                 breakdown["copy_mode"] = "Copy as File"
                 self._view.show_copy_breakdown(token_count, breakdown)
@@ -1345,16 +1652,19 @@ class CopyActionController(QObject):
                 git_commit_depth=ui_config.git_commit_depth,
             )
 
-            return self._view.get_prompt_builder().build_prompt(
-                file_paths=[Path(p) for p in selected_path_strs],
-                workspace=workspace_path,
-                instructions=instructions,
-                output_format=config,
-                include_git_changes=ui_config.include_git_diff,
-                use_relative_paths=use_rel,
-                tree_item=tree_item,
-                selected_paths=selected_path_strs,
-                full_tree=self._view.get_full_tree(),
+            return write_prompt_file(
+                lambda sink: self._view.get_prompt_builder().build_prompt(
+                    file_paths=[Path(p) for p in selected_path_strs],
+                    workspace=workspace_path,
+                    instructions=instructions,
+                    output_format=config,
+                    include_git_changes=ui_config.include_git_diff,
+                    use_relative_paths=use_rel,
+                    tree_item=tree_item,
+                    selected_paths=selected_path_strs,
+                    full_tree=self._view.get_full_tree(),
+                    sink=sink,
+                )
             )
 
         # Custom background run: same worker pattern but uses file clipboard
@@ -1376,6 +1686,7 @@ class CopyActionController(QObject):
         ) -> None:
             self._cleanup_stale_refs(gen)
             if not self._is_current_generation(gen):
+                self._prompt_cache.release_file(prompt)
                 return
 
             try:
@@ -1399,7 +1710,7 @@ class CopyActionController(QObject):
                         exc_info=True,
                     )
 
-                success, result = copy_as_file_to_clipboard(prompt)
+                success, result = self._put_on_clipboard(prompt, "file")
                 if success:
                     breakdown["copy_mode"] = "Copy as File"
                     self._view.show_copy_breakdown(token_count, breakdown)
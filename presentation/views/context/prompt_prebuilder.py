@@ -0,0 +1,256 @@
+"""
+Prompt Prebuilder - Build truoc prompt cho copy mode dang chon khi user thay
+doi selection / instructions / mode, de luc nhan Copy ket qua thuong da san
+trong PromptCache.
+
+- Debounce: moi thay doi restart timer PREBUILD_DEBOUNCE_MS; chi build khi
+  user ngung thao tac.
+- CPU co gioi han: QThreadPool rieng PREBUILD_MAX_THREADS thread, uu tien
+  thap nhat; toi da 1 job dang chay, cac thay doi trong luc do gop lai thanh
+  1 job tiep theo.
+- Generation Guard (giong CopyActionController): moi lan schedule tang
+  _generation. Job cu khong bi huy giua chung nhung tu dung o cac diem kiem
+  tra va ket qua bi bo qua.
+- Tam dung khi tat setting speculative_prebuild hoac may dang chay pin.
+
+Ket qua duoc luu theo fingerprint tinh luc tao request: file doi sau do thi
+fingerprint luc Copy khac, khong bao gio hit nham. Nhan Copy khi job cung
+fingerprint dang chay thi copy doi job do (pending()) thay vi build lai.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThread, QThreadPool, QTimer, Qt
+from PySide6.QtCore import Signal, Slot
+
+from domain.ports.registry import DomainRegistry
+from shared.utils.power_state import on_battery_power
+
+logger = logging.getLogger(__name__)
+
+# Thoi gian khong co thay doi truoc khi bat dau build truoc
+PREBUILD_DEBOUNCE_MS = 700
+# So thread toi da danh cho build truoc
+PREBUILD_MAX_THREADS = 1
+
+# (prompt, token_count, breakdown) - giong PromptResult cua copy_action_controller
+PrebuildResult = tuple[str, int, dict]
+
+_pool: Optional[QThreadPool] = None
+
+
+class PrebuildStale(Exception):
+    """Build dung giua chung vi input da doi (is_stale() tra ve True)."""
+
+
+def _prebuild_pool() -> QThreadPool:
+    """
+    Pool rieng cho build truoc (tao lazy, song den het app).
+
+    Khong gan parent: QThreadPool bi huy se doi job dang chay xong, lam dong
+    view bi treo theo thoi gian build.
+    """
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(PREBUILD_MAX_THREADS)
+        _pool.setThreadPriority(QThread.Priority.LowestPriority)
+    return _pool
+
+
+@dataclass(frozen=True)
+class PrebuildRequest:
+    """
+    Input cua 1 lan build truoc.
+
+    Attributes:
+        mode: Cache mode cua PromptCache (vd. "copy_context:text")
+        fingerprint: Fingerprint cua input (_build_fingerprint)
+        build: Ham build tren background thread, nhan is_stale(); tra ve
+            None neu khong nen cache (vd. security scan thay secret), raise
+            PrebuildStale de dung giua cac stage khi input da doi
+    """
+
+    mode: str
+    fingerprint: str
+    build: Callable[[Callable[[], bool]], Optional[PrebuildResult]]
+
+
+class PrebuildJob:
+    """1 lan build truoc; copy that co the doi ket qua qua wait()."""
+
+    def __init__(self, request: PrebuildRequest, is_stale: Callable[[], bool]):
+        self.request = request
+        self._is_stale = is_stale
+        self._done = threading.Event()
+        self._result: Optional[PrebuildResult] = None
+        # Copy that dang doi ket qua (attach): job stale khong discard ket qua
+        self.claimed = False
+
+    @property
+    def stale(self) -> bool:
+        return self._is_stale()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def run(self) -> None:
+        """Chay build (background thread). Loi chi log - copy that se build lai."""
+        try:
+            if not self._is_stale():
+                self._result = self.request.build(self._is_stale)
+        except PrebuildStale:
+            self._result = None
+        except Exception:
+            logger.debug("prompt_prebuilder: build truoc that bai", exc_info=True)
+            self._result = None
+        finally:
+            self._done.set()
+
+    def wait(self) -> Optional[PrebuildResult]:
+        """Doi job xong; None neu job bi bo hoac loi."""
+        self._done.wait()
+        return self._result
+
+
+class PrebuildSignals(QObject):
+    """Signals cho PrebuildWorker - phai song lau hon QRunnable."""
+
+    finished = Signal(object)  # PrebuildJob
+
+
+class PrebuildWorker(QRunnable):
+    """
+    Chay PrebuildJob tren prebuild pool.
+
+    Cung pattern voi CopyTaskWorker: setAutoDelete(False), caller giu strong
+    reference den khi signal finished duoc xu ly.
+    """
+
+    def __init__(self, job: PrebuildJob, signals: PrebuildSignals):
+        super().__init__()
+        self.job = job
+        self.signals = signals
+        self.setAutoDelete(False)
+
+    @Slot()
+    def run(self) -> None:
+        self.job.run()
+        try:
+            self.signals.finished.emit(self.job)
+        except RuntimeError:
+            pass  # intentionally silent — signals deleted during app shutdown
+
+
+class PromptPrebuilder(QObject):
+    """
+    Lap lich build truoc cho copy mode dang chon.
+
+    make_request() (main thread) tra ve PrebuildRequest cho input hien tai,
+    None neu khong nen build (vd. chua co workspace, copy that dang chay).
+    store(mode, fingerprint, result) dua ket qua vao PromptCache.
+    discard(mode, result) don ket qua bi bo (vd. xoa file prompt da ghi).
+    """
+
+    def __init__(
+        self,
+        make_request: Callable[[], Optional[PrebuildRequest]],
+        store: Callable[[str, str, PrebuildResult], None],
+        discard: Optional[Callable[[str, PrebuildResult], None]] = None,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self._make_request = make_request
+        self._store = store
+        self._discard = discard
+        self._generation = 0
+        self._job: Optional[PrebuildJob] = None
+        self._worker: Optional[PrebuildWorker] = None
+        self._signals: Optional[PrebuildSignals] = None
+        # Input doi trong luc job dang chay -> chay job moi khi job nay xong
+        self._dirty = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(PREBUILD_DEBOUNCE_MS)
+        self._timer.timeout.connect(self._start)
+
+    def schedule(self) -> None:
+        """Input doi: job hien tai thanh stale, hen build lai sau debounce."""
+        self._generation += 1
+        self._timer.start()
+
+    def cancel(self) -> None:
+        """Bo job dang chay/dang hen (vd. doi workspace, dong view)."""
+        self._generation += 1
+        self._dirty = False
+        self._timer.stop()
+
+    def pending(self, mode: str) -> Optional[PrebuildJob]:
+        """Job chua stale cua mode (dang chay hoac vua xong), neu co."""
+        job = self._job
+        if job is None or job.request.mode != mode or job.stale:
+            return None
+        return job
+
+    def _should_speculate(self) -> bool:
+        try:
+            if not DomainRegistry.settings().speculative_prebuild:
+                return False
+        except Exception:
+            return False
+        return not on_battery_power()
+
+    @Slot()
+    def _start(self) -> None:
+        if self._job is not None and not self._job.done:
+            self._dirty = True
+            return
+        if not self._should_speculate():
+            return
+        try:
+            request = self._make_request()
+        except Exception:
+            logger.debug("prompt_prebuilder: khong tao duoc request", exc_info=True)
+            return
+        if request is None:
+            return
+
+        generation = self._generation
+        job = PrebuildJob(request, lambda: self._generation != generation)
+        signals = PrebuildSignals()
+        worker = PrebuildWorker(job, signals)
+        signals.finished.connect(self._on_finished, Qt.ConnectionType.QueuedConnection)
+
+        self._job = job
+        self._worker = worker
+        self._signals = signals
+        _prebuild_pool().start(worker)
+
+    @Slot(object)
+    def _on_finished(self, job: PrebuildJob) -> None:
+        if job is self._job:
+            if self._signals is not None:
+                self._signals.deleteLater()
+            self._worker = None
+            self._signals = None
+
+        result = job.wait()
+        if result is not None and not job.stale:
+            try:
+                self._store(job.request.mode, job.request.fingerprint, result)
+            except Exception:
+                logger.debug("prompt_prebuilder: luu cache that bai", exc_info=True)
+        elif result is not None and not job.claimed and self._discard is not None:
+            try:
+                self._discard(job.request.mode, result)
+            except Exception:
+                logger.debug("prompt_prebuilder: don ket qua that bai", exc_info=True)
+
+        if self._dirty:
+            self._dirty = False
+            self._start()
@@ -9,7 +9,7 @@ Pattern: Controller (logic) <-> View (UI) noi chuyen qua Protocol interface.
 """
 
 from pathlib import Path
-from typing import Any, Protocol, Set, runtime_checkable, Optional
+from typing import Protocol, Set, runtime_checkable, Optional
 from PySide6.QtCore import QObject
 
 from application.services.workspace_index import get_related_files_for_paths
@@ -40,10 +40,6 @@ class RelatedFilesViewProtocol(Protocol):
         """Xoa paths khoi selection. Tra ve so luong xoa thanh cong."""
         ...
 
-    def scan_full_tree(self, workspace: Path) -> Any:
-        """Scan full workspace tree de build file index."""
-        ...
-
     def show_status(self, message: str, is_error: bool = False) -> None:
         """Hien thi status message."""
         ...
@@ -229,10 +225,9 @@ class RelatedFilesController(QObject):
             try:
                 related_strs: Set[str] = set()
 
-                # Sử dụng application wrapper
-                full_tree = self._view.scan_full_tree(workspace_path)
+                # Sử dụng application wrapper (file index lấy từ workspace catalog)
                 related_strs = get_related_files_for_paths(
-                    workspace_path, full_tree, user_selected, depth
+                    workspace_path, None, user_selected, depth
                 )
 
                 # Loại bỏ những file user đã chọn trực tiếp
@@ -6,7 +6,7 @@ Controller nhan ViewProtocol thay vi ke thua truc tiep, giup tach biet logic
 khoi UI va de dang test hon.
 
 Xu ly:
-- Refresh file tree
+- Refresh file tree (full) / patch tree tu watcher deltas (incremental)
 - Them/xoa ignore patterns
 - File watcher callbacks (invalidate cache khi file thay doi)
 - Remote repo clone dialog
@@ -14,12 +14,15 @@ Xu ly:
 """
 
 from pathlib import Path
-from typing import Protocol, List, Optional, Set, runtime_checkable
+from typing import TYPE_CHECKING, Protocol, List, Optional, Set, runtime_checkable
 
 from PySide6.QtCore import QObject
 
 from presentation.utils.qt_utils import run_on_main_thread
 
+if TYPE_CHECKING:
+    from application.interfaces.file_watcher_port import TreeDelta
+
 
 @runtime_checkable
 class TreeManagementViewProtocol(Protocol):
@@ -51,6 +54,10 @@ class TreeManagementViewProtocol(Protocol):
         """Restore selection va expanded state sau khi reload tree."""
         ...
 
+    def apply_tree_deltas(self, deltas: List["TreeDelta"]) -> bool:
+        """Patch tree tai cho, tra ve False neu can full refresh."""
+        ...
+
     def on_workspace_changed(self, workspace_path: Path) -> None:
         """Xu ly khi workspace thay doi (vi du: sau khi clone)."""
         ...
@@ -220,6 +227,8 @@ class TreeManagementController(QObject):
         from domain.ports.registry import DomainRegistry
 
         DomainRegistry.cache_registry().invalidate_for_path(path)
+        DomainRegistry.workspace_catalog().refresh_path(path)
+        DomainRegistry.symbol_index().refresh_path(path)
         # Prompt cache la instance-level (khong nam trong registry)
         self._view.invalidate_prompt_cache()
 
@@ -231,11 +240,19 @@ class TreeManagementController(QObject):
         """
         Xu ly khi file moi duoc tao.
 
-        Khong can invalidate cache cho files moi.
+        Cache theo file khong co entry cho file moi; cache registry van duoc
+        bao vi file moi co the doi ket qua resolve import cua file khac
+        (fragment cache).
         """
         if ".synapse" in path:
             return
 
+        from domain.ports.registry import DomainRegistry
+
+        DomainRegistry.cache_registry().invalidate_for_created_path(path)
+        DomainRegistry.workspace_catalog().refresh_path(path)
+        DomainRegistry.symbol_index().refresh_path(path)
+
         # Notify graph service de them file moi vao graph
         if hasattr(self._view, "_graph_provider") and self._view._graph_provider:
             self._view._graph_provider.on_files_changed([path])
@@ -259,8 +276,34 @@ class TreeManagementController(QObject):
         """
         Xu ly khi co batch file system changes.
 
-        Refresh tree tren main thread.
+        Batch qua lon de cap nhat tung path -> bo workspace catalog
+        (build lai lan sau) va refresh tree tren main thread.
         """
         workspace = self._view.get_workspace()
         if workspace:
+            from domain.ports.registry import DomainRegistry
+
+            DomainRegistry.workspace_catalog().invalidate(workspace)
+            # Catalog build lai khi refresh tree; symbol index dong bo lai theo sau
+            DomainRegistry.symbol_index().refresh_path(str(workspace))
             run_on_main_thread(self.refresh_tree)
+
+    def on_tree_deltas(self, deltas: List["TreeDelta"]) -> None:
+        """
+        Xu ly batch thay doi cau truc tu file watcher.
+
+        Patch tree tren main thread thay vi rebuild toan bo workspace.
+        """
+        if self._view.get_workspace():
+            run_on_main_thread(lambda: self._apply_tree_deltas(deltas))
+
+    def _apply_tree_deltas(self, deltas: List["TreeDelta"]) -> None:
+        """Ap dung deltas, fallback full refresh neu patch that bai."""
+        try:
+            if self._view.apply_tree_deltas(deltas):
+                return
+        except Exception as e:
+            from shared.logging_config import log_error
+
+            log_error(f"[TreeManagement] Incremental tree patch failed: {e}")
+        self.refresh_tree()
@@ -575,6 +575,9 @@ class UIBuilderMixin:
         self.file_tree_widget.selection_changed.connect(self._on_selection_changed)
         self.file_tree_widget.file_preview_requested.connect(self._preview_file)
         self.file_tree_widget.token_counting_done.connect(self._update_token_display)
+        self.file_tree_widget.token_counting_progress.connect(
+            self._show_token_counting_progress
+        )
         # Khi user exclude tu context menu, refresh tree ngay lap tuc
         self.file_tree_widget.exclude_patterns_changed.connect(
             self._tree_controller.refresh_tree
@@ -1096,7 +1099,7 @@ class UIBuilderMixin:
                 mode_str = "apply"
             update_app_setting(copy_mode=mode_str)
             if self._copy_controller:
-                self._copy_controller._prompt_cache.invalidate_all()
+                self._copy_controller.on_inputs_changed()
             self._update_token_display()
 
         self._mode_group.buttonClicked.connect(on_mode_changed)
@@ -1213,7 +1216,7 @@ class UIBuilderMixin:
             update_app_setting(include_git_changes=checked)
             self._commit_depth_spin.setEnabled(checked)
             if self._copy_controller:
-                self._copy_controller._prompt_cache.invalidate_all()
+                self._copy_controller.on_inputs_changed()
             self._update_token_display()
 
         self._git_diff_cb.toggled.connect(on_git_diff_toggled)
@@ -1221,7 +1224,7 @@ class UIBuilderMixin:
         def on_commit_depth_changed(val):
             update_app_setting(git_commit_depth=val)
             if self._copy_controller:
-                self._copy_controller._prompt_cache.invalidate_all()
+                self._copy_controller.on_inputs_changed()
             self._update_token_display()
 
         self._commit_depth_spin.valueChanged.connect(on_commit_depth_changed)
@@ -1242,7 +1245,7 @@ class UIBuilderMixin:
             update_app_setting(tree_map_only=checked)
             apply_tree_map_only_state(checked)
             if self._copy_controller:
-                self._copy_controller._prompt_cache.invalidate_all()
+                self._copy_controller.on_inputs_changed()
             self._update_token_display()
 
         self._tree_map_only_cb.toggled.connect(on_tree_map_only_toggled)
@@ -1311,6 +1314,9 @@ class UIBuilderMixin:
             "Copy as file",
             "Save context to a temporary file instead of copying to clipboard (useful for extremely large contexts).",
         )
+        self._copy_as_file_toggle.toggled.connect(
+            lambda _checked: self._copy_controller.schedule_prebuild()
+        )
         opt_wrap.addLayout(_file_row)
 
         _tree_row, self._full_tree_toggle = create_toggle_row(
@@ -1321,7 +1327,7 @@ class UIBuilderMixin:
         self._full_tree_toggle.toggled.connect(
             lambda checked: (
                 update_app_setting(include_full_tree=checked),
-                self._copy_controller._prompt_cache.invalidate_all(),
+                self._copy_controller.on_inputs_changed(),
                 self._update_token_display(),
             )
         )
@@ -463,6 +463,19 @@ class SettingsViewQt(QWidget):
         self._gitignore_toggle.toggled.connect(self._mark_changed)
         card1_layout.addWidget(self._gitignore_toggle)
 
+        card1_layout.addSpacing(16)
+        card1_layout.addWidget(_make_separator())
+        card1_layout.addSpacing(16)
+
+        self._git_index_toggle = _ToggleRow(
+            label="Use Git Index",
+            description="List files with git ls-files in git repositories",
+            tip="Faster on large repos; requires Respect .gitignore",
+            checked=settings.get("use_git_index", False),
+        )
+        self._git_index_toggle.toggled.connect(self._mark_changed)
+        card1_layout.addWidget(self._git_index_toggle)
+
         col1_layout.addWidget(card1)
 
         # ─────────────────────────────
@@ -1055,6 +1068,7 @@ class SettingsViewQt(QWidget):
         settings_data = {
             "excluded_folders": excluded_text,
             "use_gitignore": self._gitignore_toggle.isChecked(),
+            "use_git_index": self._git_index_toggle.isChecked(),
             "enable_security_check": self._security_toggle.isChecked(),
             "include_git_changes": self._git_toggle.isChecked(),
             "use_relative_paths": self._relative_toggle.isChecked(),
@@ -1137,6 +1151,7 @@ class SettingsViewQt(QWidget):
         ]
         self._tag_chips.set_patterns(default_patterns)
         self._gitignore_toggle.setChecked(True)
+        self._git_index_toggle.setChecked(False)
         self._security_toggle.setChecked(True)
         self._git_toggle.setChecked(True)
         self._relative_toggle.setChecked(True)
@@ -1500,6 +1515,7 @@ class SettingsViewQt(QWidget):
         self._tag_chips.set_patterns(patterns)
 
         self._gitignore_toggle.setChecked(imported.get("use_gitignore", True))
+        self._git_index_toggle.setChecked(imported.get("use_git_index", False))
         self._git_toggle.setChecked(imported.get("include_git_changes", True))
         self._relative_toggle.setChecked(imported.get("use_relative_paths", True))
         self._security_toggle.setChecked(imported.get("enable_security_check", True))
@@ -11,6 +11,7 @@ App data được lưu tại (theo thứ tự ưu tiên):
 
 - logs/      : Log files
 - backups/   : Backup files trước khi modify
+- cache/     : Du lieu cache tai tao duoc (workspace snapshots, ...)
 - settings.json, session.json, history.json, recent_folders.json
 """
 
@@ -89,6 +90,11 @@ APP_DIR = _get_app_dir()
 # =============================================================================
 BACKUP_DIR = APP_DIR / "backups"
 LOG_DIR = APP_DIR / "logs"
+# Cache co the xoa bat ky luc nao - app se tu build lai
+CACHE_DIR = APP_DIR / "cache"
+WORKSPACE_SNAPSHOT_DIR = CACHE_DIR / "workspace_snapshots"
+CONTENT_INDEX_DIR = CACHE_DIR / "content_index"
+TOKENIZER_CACHE_DIR = CACHE_DIR / "tokenizers"
 
 # =============================================================================
 # Các file cấu hình và dữ liệu
@@ -117,6 +123,7 @@ def ensure_app_directories() -> None:
     APP_DIR.mkdir(parents=True, exist_ok=True)
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
     LOG_DIR.mkdir(parents=True, exist_ok=True)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def get_app_dir() -> Path:
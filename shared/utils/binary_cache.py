@@ -0,0 +1,115 @@
+"""
+Binary Classification Cache - Ket qua is_binary_file() dung chung toan process.
+
+Cung 1 file duoc phan loai lai o nhieu noi (scanner, collect_files, token
+counters, security scan, smart context). Cache nay giu ket qua theo stat
+identity (st_dev, st_ino, st_size, st_mtime_ns):
+- File bi sua -> size/mtime doi -> key moi, khong can invalidate theo path
+- Rename/hard link -> cung inode -> van hit cache
+- Bounded LRU de khong phinh bo nho tren monorepo lon
+- File vua sua (racy, giong "racily clean" cua git) khong duoc cache: mtime
+  co do phan giai tho, inode cua file vua xoa co the duoc tai su dung ngay
+  cho file moi cung size -> trung key voi ket qua cu
+
+Thread-safe (token counters goi tu nhieu worker threads).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+
+# (st_dev, st_ino, st_size, st_mtime_ns) hoac (path, st_size, st_mtime_ns)
+# khi filesystem khong co inode (st_ino == 0, vd mot so network share)
+StatKey = Tuple[Union[int, str], int, int, int]
+
+DEFAULT_MAX_ENTRIES = 50_000
+
+# File co mtime trong khoang nay so voi hien tai -> chua on dinh, khong cache
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def make_stat_key(path_str: str, stat_result: os.stat_result) -> StatKey:
+    """Tao cache key tu ket qua lstat cua file."""
+    if stat_result.st_ino:
+        return (
+            stat_result.st_dev,
+            stat_result.st_ino,
+            stat_result.st_size,
+            stat_result.st_mtime_ns,
+        )
+    return (path_str, 0, stat_result.st_size, stat_result.st_mtime_ns)
+
+
+def is_racy(stat_result: os.stat_result) -> bool:
+    """True neu file vua duoc sua, stat identity chua du tin cay de cache."""
+    return time.time_ns() - stat_result.st_mtime_ns < RACY_WINDOW_NS
+
+
+class BinaryClassificationCache:
+    """
+    LRU cache: stat identity -> is_binary.
+
+    Attributes:
+        max_entries: So entries toi da truoc khi evict entry cu nhat
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[StatKey, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: StatKey) -> Optional[bool]:
+        """Tra ve ket qua da cache hoac None neu chua phan loai."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return result
+
+    def put(self, key: StatKey, is_binary: bool) -> None:
+        """Luu ket qua phan loai, evict entry cu nhat khi day."""
+        with self._lock:
+            self._entries[key] = is_binary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_path(self, path: str) -> None:
+        """
+        No-op: file thay doi thi stat identity doi theo.
+
+        Giu method de implement ICacheable cho CacheRegistry.
+        """
+
+    def invalidate_all(self) -> None:
+        """Xoa toan bo cache va reset thong ke."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def size(self) -> int:
+        """So entries hien co."""
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Thong ke hits/misses (phuc vu debug/benchmark)."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+# Module-level singleton - dung chung cho moi caller cua is_binary_file()
+binary_classification_cache = BinaryClassificationCache()
@@ -2,8 +2,16 @@ import os
 import stat
 import platform
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
 from shared.constants import BINARY_EXTENSIONS
+from shared.utils.binary_cache import (
+    binary_classification_cache,
+    is_racy,
+    make_stat_key,
+)
 
 # Optimization: Module-level constants (tạo 1 lần duy nhất)
 _TEXT_EXTENSIONS = frozenset(
@@ -49,12 +57,32 @@ _TEXT_EXTENSIONS = frozenset(
     }
 )
 
+# Batch nho hon nguong nay thi doc tuan tu (chi phi tao thread pool lon hon I/O)
+_BATCH_PARALLEL_THRESHOLD = 32
+
 # Pre-compile regex for is_system_path (module-level optimization)
 _WINDOWS_RESERVED_PATTERN = re.compile(
     r"^(CON|PRN|AUX|NUL|COM[1-9]|LPT[1-9])$", re.IGNORECASE
 )
 
 
+def classify_by_extension(path_str: str) -> Optional[bool]:
+    """
+    Phan loai binary chi dua vao extension (khong I/O).
+
+    Returns:
+        True/False neu extension da biet, None neu can doc noi dung de xac dinh
+    """
+    _, ext = os.path.splitext(path_str)
+    ext = ext.lower()
+    if ext in BINARY_EXTENSIONS:
+        return True
+    # Whitelist các extension text phổ biến để skip I/O
+    if ext in _TEXT_EXTENSIONS:
+        return False
+    return None
+
+
 def is_binary_file(path_or_str: Path | str) -> bool:
     """
     Check xem một file có phải là binary không.
@@ -62,20 +90,17 @@ def is_binary_file(path_or_str: Path | str) -> bool:
 
     Optimization:
     1. Kiểm tra extension trước (fast whitelist/blacklist)
-    2. Chỉ đọc nội dung nếu extension không xác định.
+    2. Chỉ đọc nội dung nếu extension không xác định, kết quả được cache
+       theo stat identity (dev, inode, size, mtime) cho toàn process
+       (trừ file vừa sửa - xem binary_cache.is_racy).
     """
     # Convert to string for suffix check
     path_str = str(path_or_str)
-    _, ext = os.path.splitext(path_str)
-    ext = ext.lower()
 
     # 1. Fast check by extension
-    if ext in BINARY_EXTENSIONS:
-        return True
-
-    # Whitelist các extension text phổ biến để skip I/O
-    if ext in _TEXT_EXTENSIONS:
-        return False
+    by_extension = classify_by_extension(path_str)
+    if by_extension is not None:
+        return by_extension
 
     # 2. Fallback to magic bytes check
     try:
@@ -89,14 +114,60 @@ def is_binary_file(path_or_str: Path | str) -> bool:
         if stat_result.st_size > 5 * 1024 * 1024:
             return True
 
+        key = make_stat_key(path_str, stat_result)
+        cached = binary_classification_cache.get(key)
+        if cached is not None:
+            return cached
+
         with open(path_str, "rb") as f:
             chunk = f.read(1024)
-            # Nếu chứa null byte thì khả năng cao là binary
-            return b"\x00" in chunk
+        # Nếu chứa null byte thì khả năng cao là binary
+        result = b"\x00" in chunk
+        if not is_racy(stat_result):
+            binary_classification_cache.put(key, result)
+        return result
     except (PermissionError, OSError):
         return False
 
 
+def classify_binary_batch(
+    paths: Iterable[Path | str], max_workers: Optional[int] = None
+) -> Dict[str, bool]:
+    """
+    Phân loại binary cho nhiều file cùng lúc.
+
+    Extension đã biết được xử lý ngay; các file còn lại (cần đọc 1KB)
+    được đọc song song bằng thread pool vì open/read nhả GIL.
+
+    Args:
+        paths: Danh sách file paths
+        max_workers: Số threads (mặc định theo CPU, tối đa 16)
+
+    Returns:
+        Dict str(path) -> is_binary
+    """
+    results: Dict[str, bool] = {}
+    pending: List[str] = []
+    for path in paths:
+        path_str = str(path)
+        by_extension = classify_by_extension(path_str)
+        if by_extension is None:
+            pending.append(path_str)
+        else:
+            results[path_str] = by_extension
+
+    if len(pending) < _BATCH_PARALLEL_THRESHOLD:
+        for path_str in pending:
+            results[path_str] = is_binary_file(path_str)
+        return results
+
+    workers = max_workers or min(16, (os.cpu_count() or 4) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path_str, is_binary in zip(pending, executor.map(is_binary_file, pending)):
+            results[path_str] = is_binary
+    return results
+
+
 def is_binary_by_extension(file_path: Path) -> bool:
     """
     Check if file is binary based on extension (legacy function).
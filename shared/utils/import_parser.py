@@ -7,6 +7,7 @@ No AST parsing; chi dung regex va filesystem checks.
 
 import re
 from pathlib import Path
+from typing import Optional
 
 
 _PY_FROM_IMPORT_RE = re.compile(r"^\s*from\s+([.\w]+)\s+import\s+(.+)$")
@@ -195,7 +196,9 @@ def _resolve_java_import(import_str: str, workspace_root: Path) -> list[str]:
     return resolved
 
 
-def extract_local_imports(file_path: Path, workspace_root: Path) -> list[str]:
+def extract_local_imports(
+    file_path: Path, workspace_root: Path, content: Optional[str] = None
+) -> list[str]:
     """
     Extract local import file paths from a source file.
 
@@ -210,17 +213,19 @@ def extract_local_imports(file_path: Path, workspace_root: Path) -> list[str]:
     Args:
         file_path: Absolute path of source file
         workspace_root: Workspace root for resolving relative paths
+        content: Source text already read by the caller (skips reading the file)
 
     Returns:
         Relative file paths resolved from workspace root
     """
-    if not file_path.exists() or not file_path.is_file():
-        return []
+    if content is None:
+        if not file_path.exists() or not file_path.is_file():
+            return []
 
-    try:
-        content = file_path.read_text(encoding="utf-8", errors="replace")
-    except OSError:
-        return []
+        try:
+            content = file_path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return []
 
     suffix = file_path.suffix.lower()
     found: list[str] = []
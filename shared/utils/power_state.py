@@ -0,0 +1,27 @@
+"""
+Power State - Goi y nguon dien cho cac tac vu nen khong bat buoc.
+
+Cong viec speculative (vd. build truoc prompt) nen tam dung khi may chay pin
+de khong ton CPU/pin cho ket qua co the khong dung den.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def on_battery_power() -> bool:
+    """
+    True neu may dang chay pin (khong cam sac).
+
+    May khong co pin, psutil khong ho tro nen tang, hoac loi doc sensor
+    -> False (coi nhu cam dien).
+    """
+    try:
+        import psutil
+
+        battery = psutil.sensors_battery()
+    except Exception:
+        logger.debug("power_state: khong doc duoc trang thai pin", exc_info=True)
+        return False
+    return battery is not None and battery.power_plugged is False
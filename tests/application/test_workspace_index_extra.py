@@ -75,7 +75,7 @@ class TestWorkspaceIndexExtra:
         mock_entry4.path = "/other/dir/other.py"  # Does not start with root_path_str
 
         mock_entry5 = MagicMock()
-        mock_entry5.path = str(tmp_path / "ignored.py")  # skipped by spec
+        mock_entry5.path = str(tmp_path / "ignored.py")  # skipped by matcher
 
         # Setup mock_scandir.Walk().collect()
         self.mock_scandir.Walk.return_value.collect.return_value = [
@@ -89,12 +89,12 @@ class TestWorkspaceIndexExtra:
         # Setup mock_is_binary side effect
         self.mock_is_binary.side_effect = lambda p: "bin.png" in p
 
-        mock_spec = MagicMock()
-        mock_spec.match_file.side_effect = lambda p: "ignored.py" in p
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.side_effect = lambda p, is_dir=False: "ignored.py" in p
 
         with patch(
-            "application.services.workspace_index._get_ignore_spec",
-            return_value=mock_spec,
+            "application.services.workspace_index._get_ignore_matcher",
+            return_value=mock_matcher,
         ):
             index = build_search_index(tmp_path)
             print("DEBUG INDEX:", index)
@@ -176,7 +176,7 @@ class TestWorkspaceIndexExtra:
         mock_entry4 = MagicMock()
         mock_entry4.path = str(tmp_path / "bin.png")  # skipped because binary
         mock_entry5 = MagicMock()
-        mock_entry5.path = str(tmp_path / "ignored.py")  # skipped by spec
+        mock_entry5.path = str(tmp_path / "ignored.py")  # skipped by matcher
 
         self.mock_scandir.Walk.return_value.collect.return_value = [
             mock_entry1,
@@ -189,12 +189,12 @@ class TestWorkspaceIndexExtra:
         # Setup mock_is_binary side effect
         self.mock_is_binary.side_effect = lambda p: "bin.png" in p
 
-        mock_spec = MagicMock()
-        mock_spec.match_file.side_effect = lambda p: "ignored.py" in p
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.side_effect = lambda p, is_dir=False: "ignored.py" in p
 
         with patch(
-            "application.services.workspace_index._get_ignore_spec",
-            return_value=mock_spec,
+            "application.services.workspace_index._get_ignore_matcher",
+            return_value=mock_matcher,
         ):
             res = collect_files_from_disk(tmp_path, workspace_path=tmp_path)
             assert str(tmp_path / "src" / "main.py") in res
@@ -229,16 +229,16 @@ class TestWorkspaceIndexExtra:
     def test_collect_files_from_disk_os_walk_branches(self, tmp_path):
         # 10. rel_path fallback when path doesn't start with root_path_str (line 316)
         # 11. skip directory match (line 321)
-        # 12. spec.match_file is True (line 328)
-        # We mock spec.match_file to return True for ignored.py
-        mock_spec = MagicMock()
-        mock_spec.match_file.side_effect = lambda p: "ignored.py" in p
+        # 12. matcher.is_ignored is True (line 328)
+        # We mock matcher.is_ignored to return True for ignored.py
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.side_effect = lambda p, is_dir=False: "ignored.py" in p
 
         with (
             patch("application.services.workspace_index.HAS_SCANDIR_RS", False),
             patch(
-                "application.services.workspace_index._get_ignore_spec",
-                return_value=mock_spec,
+                "application.services.workspace_index._get_ignore_matcher",
+                return_value=mock_matcher,
             ),
             patch("os.walk") as mock_walk,
         ):
@@ -258,7 +258,7 @@ class TestWorkspaceIndexExtra:
             res_normalized = [os.path.normpath(r) for r in res]
             # other.py is collected
             assert os.path.normpath("/other/dir/other.py") in res_normalized
-            # ignored.py is skipped (match_file is True)
+            # ignored.py is skipped (is_ignored is True)
             assert os.path.normpath("/other/dir/ignored.py") not in res_normalized
             # node_modules/pkg.py is skipped (directory check contains sep + node_modules + sep)
             assert (
@@ -27,6 +27,7 @@ from domain.ports.preset_store_port import (
 )
 from domain.ports.memory_port import IMemoryMonitor, MemoryStats
 from domain.ports.recent_folders_port import IRecentFoldersService
+from infrastructure.filesystem.ignore_matcher import IgnoreMatcher
 
 
 class DummyDirectoryScanner(IDirectoryScanner):
@@ -98,6 +99,9 @@ class DummyGitService(IGitService):
     ) -> str:
         return ""
 
+    def list_workspace_files(self, root_path, matcher=None):
+        return None
+
 
 class DummyFileWatcher(IFileWatcherService):
     def start(self, path, on_change=None, callbacks=None, debounce_seconds=0.5):
@@ -142,6 +146,28 @@ class DummyIgnoreEngine(IIgnoreEngine):
     ) -> pathspec.PathSpec:
         return pathspec.PathSpec([])
 
+    def compile_matcher(
+        self,
+        root_path,
+        use_default_ignores: bool = True,
+        excluded_patterns=None,
+        use_gitignore: bool = True,
+    ) -> IgnoreMatcher:
+        return IgnoreMatcher()
+
+    def descend_matcher(self, matcher, directory, rel_dir) -> IgnoreMatcher:
+        return matcher
+
+    def matcher_for_directory(
+        self,
+        root_path,
+        directory,
+        use_default_ignores: bool = True,
+        excluded_patterns=None,
+        use_gitignore: bool = True,
+    ) -> IgnoreMatcher:
+        return IgnoreMatcher()
+
     def clear_cache(self):
         pass
 
@@ -267,6 +293,9 @@ class DummyCacheRegistry(ICacheRegistry):
     def invalidate_for_path(self, path: str) -> None:
         pass
 
+    def invalidate_for_created_path(self, path: str) -> None:
+        pass
+
 
 class DummyMCPInstaller(IMCPInstaller):
     def get_mcp_targets(self) -> dict:
@@ -469,6 +498,13 @@ def setup_dummy_domain_ports():
     except RuntimeError:
         DomainRegistry.register_tokenization_service(DummyTokenizationService())
 
+    try:
+        DomainRegistry.token_estimator()
+    except RuntimeError:
+        from domain.tokenization.estimator import TokenEstimator
+
+        DomainRegistry.register_token_estimator(TokenEstimator())
+
     try:
         DomainRegistry.cache_registry()
     except RuntimeError:
@@ -481,6 +517,27 @@ def setup_dummy_domain_ports():
 
         DomainRegistry.register_workspace_scanner(WorkspaceScanner())
 
+    try:
+        DomainRegistry.workspace_catalog()
+    except RuntimeError:
+        from application.services.workspace_catalog import WorkspaceCatalogService
+
+        DomainRegistry.register_workspace_catalog(WorkspaceCatalogService())
+
+    try:
+        DomainRegistry.content_index()
+    except RuntimeError:
+        from application.services.content_index import ContentIndexService
+
+        DomainRegistry.register_content_index(ContentIndexService())
+
+    try:
+        DomainRegistry.symbol_index()
+    except RuntimeError:
+        from application.services.symbol_index import SymbolIndexService
+
+        DomainRegistry.register_symbol_index(SymbolIndexService(max_workers=0))
+
     try:
         DomainRegistry.mcp_installer()
     except RuntimeError:
@@ -0,0 +1,166 @@
+"""
+Tests cho budget_planner va plan trim cua ContextTrimmer.
+
+Kiem tra:
+- plan_budget: vua budget, gan toi uu so voi vet can, khong kha thi
+- ContextTrimmer: moi thanh phan/bieu dien dem 1 lan, giu dependency o dang
+  smart khi vua budget thay vi bo, ghi plan va thoi gian tung stage
+"""
+
+import itertools
+import random
+from unittest.mock import patch
+
+import pytest
+
+from domain.prompt.budget_planner import Choice, plan_budget
+from domain.prompt.context_trimmer import (
+    GIT_DIFFS_ITEM,
+    ContextTrimmer,
+    PromptComponents,
+)
+
+
+class _CharTokenizer:
+    def __init__(self):
+        self.texts = []
+
+    def count_tokens(self, text):
+        self.texts.append(text)
+        return max(1, len(text) // 4) if text else 0
+
+
+def _brute_force(items, budget):
+    best = None
+    for picks in itertools.product(*(range(len(options)) for options in items)):
+        tokens = sum(items[i][p].tokens for i, p in enumerate(picks))
+        value = sum(items[i][p].value for i, p in enumerate(picks))
+        if tokens <= budget and (best is None or value > best):
+            best = value
+    return best
+
+
+class TestPlanBudget:
+    def test_chon_to_hop_vua_budget(self):
+        items = [
+            [Choice("full", 60, 4.0), Choice("smart", 20, 2.4)],
+            [Choice("full", 50, 1.0), Choice("omitted", 0, 0.0)],
+        ]
+
+        plan = plan_budget(items, 100)
+
+        assert plan.feasible
+        assert plan.tokens == 60
+        assert [items[i][p].name for i, p in enumerate(plan.picks)] == [
+            "full",
+            "omitted",
+        ]
+
+    def test_lua_chon_bi_troi_bi_bo_qua(self):
+        # "head" dat hon "smart" ma gia tri thap hon -> khong bao gio duoc chon
+        items = [
+            [
+                Choice("full", 100, 1.0),
+                Choice("head", 60, 0.4),
+                Choice("smart", 30, 0.6),
+            ]
+        ]
+
+        plan = plan_budget(items, 70)
+
+        assert items[0][plan.picks[0]].name == "smart"
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_gan_toi_uu_so_voi_vet_can(self, seed):
+        rng = random.Random(seed)
+        items = []
+        for _ in range(5):
+            full = rng.randint(20, 200)
+            weight = rng.choice([1.0, 4.0])
+            items.append(
+                [
+                    Choice("full", full, weight),
+                    Choice("smart", full // 5, weight * 0.6),
+                    Choice("head", full // 3, weight * 0.4),
+                    Choice("omitted", 0, 0.0),
+                ]
+            )
+        budget = rng.randint(50, 400)
+
+        plan = plan_budget(items, budget)
+        best = _brute_force(items, budget)
+
+        assert plan.feasible and plan.tokens <= budget
+        # Lech toi uu khong qua 1 lan nang cap (gia tri lon nhat 1 muc)
+        assert plan.value >= best - 4.0
+
+    def test_khong_kha_thi_chon_re_nhat(self):
+        items = [[Choice("full", 100, 1.0), Choice("head", 40, 0.4)]]
+
+        plan = plan_budget(items, 10)
+
+        assert not plan.feasible
+        assert items[0][plan.picks[0]].name == "head"
+        assert plan.tokens == 40
+
+
+class TestTrimPlan:
+    def test_moi_bieu_dien_dem_1_lan(self):
+        tok = _CharTokenizer()
+        comp = PromptComponents(
+            instructions="Analyze",
+            file_map="src/",
+            file_contents={
+                "src/a.txt": "a" * 4000,
+                "src/b.txt": "b" * 4000,
+                "dep/c.txt": "c" * 4000,
+            },
+            dependency_paths={"dep/c.txt"},
+            git_diffs_text="diff --git a b\n" * 50,
+            structure_overhead=5,
+        )
+
+        ContextTrimmer(tok, 900).trim(comp)
+
+        counted = [text for text in tok.texts if text]
+        assert len(counted) == len(set(counted))
+
+    @patch("domain.smart_context.is_supported", return_value=True)
+    @patch("domain.smart_context.smart_parse", return_value="def dep(): ...")
+    def test_dependency_giu_dang_smart_khi_vua(self, _parse, _supported):
+        comp = PromptComponents(
+            instructions="Analyze",
+            file_contents={
+                "src/main.py": "print('hello')\n" * 20,
+                "dep/lib.py": "def dep():\n    return 1\n" * 100,
+            },
+            dependency_paths={"dep/lib.py"},
+            protected_paths={"src/main.py"},
+            structure_overhead=5,
+        )
+
+        result = ContextTrimmer(_CharTokenizer(), 150).trim(comp)
+
+        plan = {choice.item: choice.representation for choice in result.plan}
+        assert plan == {"src/main.py": "full", "dep/lib.py": "smart"}
+        assert "Converted to Smart Context" in comp.file_contents["dep/lib.py"]
+        assert result.actual_tokens <= 150
+        assert result.levels_applied == 2
+
+    def test_ghi_plan_va_thoi_gian_stage(self):
+        comp = PromptComponents(
+            instructions="Analyze",
+            file_contents={"src/readme.txt": "text " * 400},
+            git_diffs_text="diff --git a b\n" * 100,
+            protected_paths={"src/readme.txt"},
+            structure_overhead=5,
+        )
+
+        result = ContextTrimmer(_CharTokenizer(), 600).trim(comp)
+
+        assert [(c.item, c.representation) for c in result.plan] == [
+            ("src/readme.txt", "full"),
+            (GIT_DIFFS_ITEM, "omitted"),
+        ]
+        assert set(result.stage_ms) == {"measure", "represent", "solve", "apply"}
+        assert result.notes == ["Removed git diffs to fit budget."]
@@ -226,25 +226,6 @@ class TestContextTrimmerExtra(unittest.TestCase):
         self.assertIn("Severely truncated src/a.txt to fit budget.", result.notes)
         self.assertNotIn("Severely truncated src/b.txt to fit budget.", result.notes)
 
-    def test_estimate_total_no_cache(self):
-        comp = PromptComponents(
-            instructions="Inst",
-            project_rules="Rules",
-            file_map="map",
-            file_contents={"a.py": "print(1)", "b.py": "print(2)"},
-        )
-        trimmer = ContextTrimmer(tokenization_service=self.tok, max_tokens=100)
-        # Calling estimate_total directly without cache
-        total = trimmer._estimate_total(comp, file_token_cache=None)
-        expected = (
-            trimmer._count("Inst")
-            + trimmer._count("Rules")
-            + trimmer._count("map")
-            + trimmer._count("print(1)")
-            + trimmer._count("print(2)")
-        )
-        self.assertEqual(total, expected)
-
     @patch("domain.smart_context.is_supported")
     @patch("domain.smart_context.smart_parse")
     def test_trim_early_exit_loops(self, mock_smart_parse, mock_is_supported):
@@ -323,7 +323,7 @@ class TestPromptGeneratorExtra:
             assert "seq.py" in context
             assert "def mock_seq(): pass" in context
 
-    @patch("domain.prompt.generator.is_binary_file")
+    @patch("domain.prompt.content_snapshot.is_binary_file")
     @patch.object(PATH_CLASS, "is_file")
     def test_exceptions_coverage(self, mock_is_file, mock_is_binary, tmp_path):
         mock_is_file.return_value = True
@@ -348,7 +348,18 @@ class TestPromptGeneratorExtra:
                 raise OSError("Permission denied")
             return orig_stat(self_obj, *args, **kwargs)
 
+        # File duoc doc qua content_snapshot (os.stat)
+        import domain.prompt.content_snapshot as content_snapshot
+
+        orig_os_stat = content_snapshot.os.stat
+
+        def mock_os_stat(path, *args, **kwargs):
+            if "error_file.py" in str(path):
+                raise OSError("Permission denied")
+            return orig_os_stat(path, *args, **kwargs)
+
         def apply_mock():
+            content_snapshot.os.stat = mock_os_stat
             pathlib.Path.stat = mock_stat_func
             if hasattr(pathlib, "PosixPath"):
                 pathlib.PosixPath.stat = mock_stat_func
@@ -356,6 +367,7 @@ class TestPromptGeneratorExtra:
                 pathlib.WindowsPath.stat = mock_stat_func
 
         def restore_mock():
+            content_snapshot.os.stat = orig_os_stat
             pathlib.Path.stat = orig_stat
             if orig_posix_stat_stat:
                 pathlib.PosixPath.stat = orig_posix_stat_stat
@@ -373,14 +385,18 @@ class TestPromptGeneratorExtra:
             restore_mock()
 
         # 2. OSError in read_text inside _generate_codemap_xml_elements (line 347-348)
-        with patch.object(PATH_CLASS, "read_text", side_effect=OSError("Read error")):
+        with patch.object(
+            content_snapshot, "_read_bytes", side_effect=OSError("Read error")
+        ):
             xml = generate_file_contents_xml(
                 selected, workspace_root=tmp_path, codemap_paths=selected
             )
             assert "error_file.py" not in xml
 
         # 3. OSError in read_text inside generate_file_contents_plain (line 454-455)
-        with patch.object(PATH_CLASS, "read_text", side_effect=OSError("Read error")):
+        with patch.object(
+            content_snapshot, "_read_bytes", side_effect=OSError("Read error")
+        ):
             plain = generate_file_contents_plain(
                 selected, workspace_root=tmp_path, codemap_paths=selected
             )
@@ -395,7 +411,9 @@ class TestPromptGeneratorExtra:
             restore_mock()
 
         # 5. OSError in read_text inside _process_single_file (line 543-544)
-        with patch.object(PATH_CLASS, "read_text", side_effect=OSError("Read error")):
+        with patch.object(
+            content_snapshot, "_read_bytes", side_effect=OSError("Read error")
+        ):
             context = generate_smart_context(selected, workspace_root=tmp_path)
             assert "Skipped: Error reading file:" in context
 
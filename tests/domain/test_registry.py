@@ -73,6 +73,9 @@ class DummyGitService(IGitService):
     ) -> str:
         return ""
 
+    def list_workspace_files(self, root_path, matcher=None):
+        return None
+
 
 class DummyAstParser(IAstParser):
     def parse_file(self, file_path):
@@ -381,12 +381,12 @@ class TestFileHandlingEdgeCases:
         f.write_bytes(bytes([0xFF, 0xD8, 0xFF, 0xE0] + [0] * 100))
         assert service.count_tokens_for_file(f) == 0
 
-    def test_large_file_skipped(self, tmp_path):
-        """File > 5MB -> return 0, khong doc."""
+    def test_large_file_streamed(self, tmp_path):
+        """File > 5MB -> dem streaming theo chunk."""
         service = TokenizationService()
         f = tmp_path / "large.txt"
         f.write_text("x" * (6 * 1024 * 1024))
-        assert service.count_tokens_for_file(f) == 0
+        assert service.count_tokens_for_file(f) > 0
 
     def test_utf8_file(self, tmp_path):
         """File voi Vietnamese text -> dem dung."""
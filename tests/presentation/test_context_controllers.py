@@ -11,6 +11,7 @@ from typing import Set, List, Optional, Any
 from PySide6.QtCore import QThreadPool
 from PySide6.QtWidgets import QWidget, QMessageBox, QDialog
 
+from domain.ports.file_watcher_port import TreeDelta
 from domain.ports.registry import DomainRegistry
 from presentation.views.context.tree_management_controller import (
     TreeManagementController,
@@ -77,6 +78,8 @@ class MockTreeManagementView(TreeManagementViewProtocol):
         self.changed_workspace = None
         self.statuses = []
         self.prompt_cache_invalidated = False
+        self.applied_deltas = []
+        self.apply_result = True
 
     def get_workspace(self) -> Optional[Path]:
         return self.workspace
@@ -104,6 +107,10 @@ class MockTreeManagementView(TreeManagementViewProtocol):
     def invalidate_prompt_cache(self) -> None:
         self.prompt_cache_invalidated = True
 
+    def apply_tree_deltas(self, deltas) -> bool:
+        self.applied_deltas.append(deltas)
+        return self.apply_result
+
 
 def test_tree_management_refresh_tree(qtbot):
     """Test refresh_tree lưu và khôi phục trạng thái."""
@@ -240,6 +247,9 @@ def test_tree_management_file_watcher_callbacks(qtbot):
     # 2. File created
     view._graph_provider.on_files_changed.reset_mock()
     controller.on_file_created("/mock/workspace/new.py")
+    mock_cache.invalidate_for_created_path.assert_called_once_with(
+        "/mock/workspace/new.py"
+    )
     view._graph_provider.on_files_changed.assert_called_once_with(
         ["/mock/workspace/new.py"]
     )
@@ -256,6 +266,28 @@ def test_tree_management_file_watcher_callbacks(qtbot):
         mock_refresh.assert_called_once()
 
 
+def test_tree_management_tree_deltas_fallback_refresh(qtbot):
+    """Patch thanh cong -> khong refresh; that bai -> full refresh."""
+    view = MockTreeManagementView()
+    controller = TreeManagementController(view)
+    deltas = [TreeDelta("insert", "/mock/workspace/new.py", False)]
+
+    with (
+        patch(
+            "presentation.views.context.tree_management_controller.run_on_main_thread",
+            side_effect=lambda fn: fn(),
+        ),
+        patch.object(controller, "refresh_tree") as mock_refresh,
+    ):
+        controller.on_tree_deltas(deltas)
+        assert view.applied_deltas == [deltas]
+        mock_refresh.assert_not_called()
+
+        view.apply_result = False
+        controller.on_tree_deltas(deltas)
+        mock_refresh.assert_called_once()
+
+
 # ===========================================================================
 # 2. RelatedFilesController Tests
 # ===========================================================================
@@ -1,6 +1,6 @@
 """
 Tests for copy_action_controller.py:
-- PromptCache: get, put, invalidate, invalidate_all
+- PromptCache: get, put, invalidate, invalidate_all, file prompt ownership
 - copy_as_file_to_clipboard
 - CopyTaskWorker: run() success and error
 - SecurityCheckWorker: run() success and error
@@ -24,6 +24,7 @@ from presentation.views.context.copy_action_controller import (
     SecurityCheckSignals,
     CopyActionController,
     copy_as_file_to_clipboard,
+    new_prompt_file,
     _build_fingerprint,
 )
 
@@ -186,6 +187,47 @@ class TestPromptCache:
         assert result[0] == "new prompt"
 
 
+class TestPromptCacheFiles:
+    @pytest.fixture
+    def prompt_file(self, tmp_path):
+        with patch("tempfile.gettempdir", return_value=str(tmp_path)):
+            yield lambda: str(new_prompt_file())
+
+    def _write(self, path):
+        Path(path).write_text("prompt", encoding="utf-8")
+        return path
+
+    def test_file_bi_thay_bi_xoa(self, prompt_file):
+        cache = PromptCache()
+        old = self._write(prompt_file())
+        cache.put("copy_context:file", "fp1", old, 1, {})
+
+        cache.put("copy_context:file", "fp2", self._write(prompt_file()), 1, {})
+
+        assert not Path(old).exists()
+
+    def test_file_tren_clipboard_duoc_giu(self, prompt_file):
+        cache = PromptCache()
+        old = self._write(prompt_file())
+        cache.put("copy_context:file", "fp1", old, 1, {})
+        cache.set_clipboard_file(old)
+
+        cache.invalidate_all()
+        assert Path(old).exists()
+
+        # Copy text sau do -> file khong con ai dung
+        cache.set_clipboard_file(None)
+        assert not Path(old).exists()
+
+    def test_file_mat_thi_miss(self, prompt_file):
+        cache = PromptCache()
+        path = self._write(prompt_file())
+        cache.put("copy_smart:file", "fp", path, 1, {})
+        Path(path).unlink()
+
+        assert cache.get("copy_smart:file", "fp") is None
+
+
 # ===========================================================================
 # copy_as_file_to_clipboard Tests
 # ===========================================================================
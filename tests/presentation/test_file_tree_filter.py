@@ -202,3 +202,17 @@ def test_filter_proxy_accepts_row_no_query(filter_proxy, tmp_path):
     # With no query, all rows accepted - check via rowCount on proxy
     # Root item should be visible
     assert proxy.rowCount(QModelIndex()) >= 0
+
+
+def test_filter_proxy_add_matched_paths_streaming(filter_proxy):
+    """Content search stream ket qua ve -> match set va ancestors mo rong dan."""
+    proxy, model = filter_proxy
+    proxy.set_search_state("code:def run", set())
+
+    proxy.add_matched_paths(["/workspace/src/main.py"])
+    proxy.add_matched_paths(["/workspace/lib/util.py", "/workspace/src/main.py"])
+
+    assert proxy._matched_paths == {"/workspace/src/main.py", "/workspace/lib/util.py"}
+    assert "/workspace/src" in proxy._matched_ancestors
+    assert "/workspace/lib" in proxy._matched_ancestors
+    assert proxy.search_query == "def run"
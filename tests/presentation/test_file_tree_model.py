@@ -2,12 +2,16 @@
 Tests cho FileTreeModel - QAbstractItemModel với lazy loading và selection.
 """
 
+import threading
+
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from PySide6.QtCore import Qt, QModelIndex
 
 from domain.ports.registry import DomainRegistry
+from domain.ports.file_watcher_port import TreeDelta
 from domain.config.app_settings import AppSettings
+from domain.smart_context.tree_item import TreeItem
 from presentation.components.file_tree.file_tree_model import (
     FileTreeModel,
     TreeNode,
@@ -431,6 +435,27 @@ def test_model_update_token_counts_batch(model_with_tree):
     assert model._token_cache.get(f) == 42
 
 
+def test_model_token_estimates_cho_den_khi_co_count(model_with_tree):
+    model, tmp_path = model_with_tree
+    main_py = str(tmp_path / "main.py")
+    helper = str(tmp_path / "subdir" / "helper.py")
+    model.set_selected_paths({main_py, helper})
+    model._token_cache[main_py] = 10
+
+    model.update_token_estimates({main_py: 99, helper: 7})
+
+    # File da co count chinh xac khong dung uoc luong
+    assert model.has_token_estimates()
+    assert model.get_total_tokens() == 17
+    root_index = model._node_to_index(model._root_node)
+    assert model.data(root_index, FileTreeRoles.TOKEN_COUNT_ROLE) == 17
+
+    model.update_token_counts_batch({helper: 5})
+
+    assert not model.has_token_estimates()
+    assert model.get_total_tokens() == 15
+
+
 # ===========================================================================
 # TokenCountWorker Tests
 # ===========================================================================
@@ -438,7 +463,9 @@ def test_model_update_token_counts_batch(model_with_tree):
 
 def test_token_count_worker_success(tmp_path):
     tokenization_service = MagicMock()
-    tokenization_service.count_tokens.return_value = 50
+    tokenization_service.count_tokens_batch_parallel.side_effect = lambda paths, **_: {
+        str(p): 50 for p in paths
+    }
 
     # Create a real file
     f = tmp_path / "test.py"
@@ -450,11 +477,13 @@ def test_token_count_worker_success(tmp_path):
         generation=1,
     )
 
-    finished_calls = []
+    finished_calls, batches = [], []
     worker.signals.finished.connect(lambda: finished_calls.append(True))
+    worker.signals.token_counts_batch.connect(batches.append)
     worker.run()
 
     assert len(finished_calls) == 1
+    assert batches == [{str(f): 50}]
 
 
 def test_token_count_worker_no_auto_delete():
@@ -480,3 +509,200 @@ def test_model_get_root_tree_item(model_with_tree):
     root = model.get_root_tree_item()
     # Should be a TreeItem or None
     assert root is not None or root is None  # Just ensure no exception
+
+
+# ===========================================================================
+# Incremental patching (apply_tree_deltas) Tests
+# ===========================================================================
+
+
+@pytest.fixture()
+def patchable_model(model, tmp_path):
+    """Model voi tree dung tay: root/{src/{a.py}, main.py}, src da load."""
+    root = str(tmp_path)
+    src = str(tmp_path / "src")
+    tree = TreeItem(
+        label="root",
+        path=root,
+        is_dir=True,
+        children=[
+            TreeItem(
+                label="src",
+                path=src,
+                is_dir=True,
+                children=[TreeItem(label="a.py", path=src + "/a.py", is_dir=False)],
+            ),
+            TreeItem(label="main.py", path=root + "/main.py", is_dir=False),
+        ],
+    )
+    model._workspace_path = tmp_path
+    model.beginResetModel()
+    model._root_node = TreeNode.from_tree_item(
+        tree,
+        parent=model._invisible_root,
+        max_depth=2,
+        path_index=model._path_to_node,
+    )
+    model._invisible_root.children = [model._root_node]
+    model.endResetModel()
+    return model, root
+
+
+def _labels(node):
+    return [child.label for child in node.children]
+
+
+class TestApplyTreeDeltas:
+    """Test FileTreeModel.apply_tree_deltas giu selection/cache."""
+
+    def test_insert_dung_vi_tri_sort(self, patchable_model):
+        model, root = patchable_model
+        inserted = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append(first))
+
+        assert model.apply_tree_deltas(
+            [
+                TreeDelta("insert", root + "/lib", True),
+                TreeDelta("insert", root + "/b.py", False),
+            ]
+        )
+
+        assert _labels(model._root_node) == ["lib", "src", "b.py", "main.py"]
+        assert [c.row for c in model._root_node.children] == [0, 1, 2, 3]
+        assert inserted == [0, 2]
+        assert root + "/b.py" in model._path_to_node
+        assert model._search_index["b.py"] == [root + "/b.py"]
+
+    def test_remove_giu_selection_va_cache_con_lai(self, patchable_model):
+        model, root = patchable_model
+        a_py = root + "/src/a.py"
+        main_py = root + "/main.py"
+        model.set_selected_paths({a_py, main_py})
+        model._token_cache.update({a_py: 10, main_py: 20})
+        emitted = []
+        model.selection_changed.connect(emitted.append)
+
+        assert model.apply_tree_deltas([TreeDelta("remove", root + "/src", True)])
+
+        assert _labels(model._root_node) == ["main.py"]
+        assert a_py not in model._path_to_node
+        assert model.get_all_selected_paths() == {main_py}
+        assert model._token_cache == {main_py: 20}
+        assert emitted == [{main_py}]
+
+    def test_rename_chuyen_selection_va_cache(self, patchable_model):
+        model, root = patchable_model
+        model.set_selected_paths({root + "/src", root + "/src/a.py"})
+        model._token_cache[root + "/src/a.py"] = 7
+
+        assert model.apply_tree_deltas(
+            [TreeDelta("rename", root + "/src", True, new_path=root + "/app")]
+        )
+
+        node = model._path_to_node[root + "/app"]
+        assert node.is_loaded and _labels(node) == ["a.py"]
+        assert node.children[0].path == root + "/app/a.py"
+        assert root + "/src" not in model._path_to_node
+        assert model.get_all_selected_paths() == {root + "/app", root + "/app/a.py"}
+        assert model._token_cache == {root + "/app/a.py": 7}
+
+    def test_insert_duoi_folder_selected_tu_dong_select(self, patchable_model):
+        model, root = patchable_model
+        model.set_selected_paths({root + "/src", root + "/src/a.py"})
+
+        model.apply_tree_deltas([TreeDelta("insert", root + "/src/b.py", False)])
+
+        assert root + "/src/b.py" in model.get_all_selected_paths()
+
+    def test_root_bi_xoa_can_full_refresh(self, patchable_model):
+        model, root = patchable_model
+        assert not model.apply_tree_deltas([TreeDelta("remove", root, True)])
+        assert not FileTreeModel(MagicMock()).apply_tree_deltas([])
+
+
+class TestSnapshotTree:
+    """load_tree hien tree tu snapshot roi revalidate trong background."""
+
+    def _scanner(self, stored, fresh):
+        scanner = MagicMock()
+        scanner.load_snapshot.return_value = stored
+        scanner.scan_directory.return_value = fresh
+        return scanner
+
+    def _tree(self, root, src_files, root_files):
+        src = root + "/src"
+        return TreeItem(
+            label="root",
+            path=root,
+            is_dir=True,
+            children=[
+                TreeItem(
+                    label="src",
+                    path=src,
+                    is_dir=True,
+                    children=[
+                        TreeItem(label=name, path=src + "/" + name)
+                        for name in src_files
+                    ],
+                )
+            ]
+            + [TreeItem(label=name, path=root + "/" + name) for name in root_files],
+        )
+
+    def test_hien_snapshot_roi_patch_phan_da_doi(self, qtbot, model, tmp_path):
+        (tmp_path / "src").mkdir()
+        root = str(tmp_path)
+        stored = self._tree(root, ["a.py"], ["old.py"])
+        fresh = self._tree(root, ["a.py", "b.py"], ["new.py"])
+        scanner = self._scanner(stored, fresh)
+        release = threading.Event()
+        scanner.scan_directory.side_effect = lambda *a, **k: release.wait(5) and fresh
+        original = DomainRegistry.directory_scanner()
+        DomainRegistry.register_directory_scanner(scanner)
+        try:
+            model.load_tree(tmp_path)
+
+            # Tree tu snapshot, khong scan shallow tu disk
+            scanner.scan_directory_shallow.assert_not_called()
+            assert _labels(model._root_node) == ["src", "old.py"]
+
+            # Expand src truoc khi revalidate xong -> children tu snapshot
+            src_index = model.index(0, 0, model.index(0, 0))
+            model.fetchMore(src_index)
+            scanner.load_folder_children.assert_not_called()
+
+            # Ket qua revalidate chay lai tren main thread
+            callbacks = []
+            with patch(
+                "presentation.utils.qt_utils.run_on_main_thread", callbacks.append
+            ):
+                release.set()
+                qtbot.waitUntil(lambda: bool(callbacks), timeout=3000)
+            callbacks[0]()
+        finally:
+            DomainRegistry.register_directory_scanner(original)
+
+        assert scanner.scan_directory.call_args.kwargs["use_snapshot"] is True
+        assert not model._snapshot_items
+        assert _labels(model._root_node) == ["src", "new.py"]
+        assert _labels(model._root_node.children[0]) == ["a.py", "b.py"]
+
+    def test_khong_co_snapshot_luu_sau_catalog(self, qtbot, model, tmp_path):
+        scanner = self._scanner(None, TreeItem("root", str(tmp_path), is_dir=True))
+        scanner.scan_directory_shallow.return_value = TreeItem(
+            "root", str(tmp_path), is_dir=True
+        )
+        original = DomainRegistry.directory_scanner()
+        DomainRegistry.register_directory_scanner(scanner)
+        try:
+            with patch.object(model, "_revalidate_tree_async") as revalidate:
+                model.load_tree(tmp_path)
+                qtbot.waitUntil(lambda: scanner.scan_directory.called, timeout=3000)
+        finally:
+            DomainRegistry.register_directory_scanner(original)
+
+        # Tree vua scan tu disk: khong revalidate, chi 1 full scan luu snapshot
+        revalidate.assert_not_called()
+        scanner.scan_directory_shallow.assert_called_once()
+        scanner.scan_directory.assert_called_once()
+        assert scanner.scan_directory.call_args.kwargs["use_snapshot"] is True
@@ -0,0 +1,254 @@
+"""
+Tests cho prompt_prebuilder.py va phan build truoc cua CopyActionController.
+
+Kiem tra:
+- Debounce gop nhieu thay doi thanh 1 build, ket qua vao store()
+- Job stale khong luu ket qua; thay doi trong luc build -> build lai 1 lan
+- Tam dung khi chay pin hoac tat setting
+- Controller: request theo copy mode, security scan chan cache, Copy doi
+  job dang chay cung fingerprint
+"""
+
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from domain.config.app_settings import AppSettings
+from domain.ports.registry import DomainRegistry
+from domain.prompt.copy_mode import CopyMode
+from presentation.views.context.copy_action_controller import (
+    OPX_DIRECTIVE,
+    CopyActionController,
+)
+from presentation.views.context.prompt_prebuilder import (
+    PrebuildJob,
+    PrebuildRequest,
+    PrebuildStale,
+    PromptPrebuilder,
+)
+from shared.utils.power_state import on_battery_power
+from tests.presentation.test_copy_action_controller_extra import make_mock_view
+
+_RESULT = ("prompt", 10, {"file_tokens": 8})
+
+
+@pytest.fixture
+def settings():
+    settings = AppSettings(enable_security_check=False, include_git_changes=False)
+    with patch.object(DomainRegistry, "settings", return_value=settings):
+        yield settings
+
+
+@pytest.fixture(autouse=True)
+def _plugged_in():
+    with patch(
+        "presentation.views.context.prompt_prebuilder.on_battery_power",
+        return_value=False,
+    ):
+        yield
+
+
+def _prebuilder(make_request, store):
+    prebuilder = PromptPrebuilder(make_request, store)
+    prebuilder._timer.setInterval(10)
+    return prebuilder
+
+
+class TestPromptPrebuilder:
+    def test_debounce_gop_thay_doi(self, qtbot, settings):
+        requests = []
+        stored = []
+
+        def make_request():
+            requests.append(1)
+            return PrebuildRequest("copy_context:text", "fp", lambda s: _RESULT)
+
+        prebuilder = _prebuilder(make_request, lambda *a: stored.append(a))
+        for _ in range(5):
+            prebuilder.schedule()
+
+        qtbot.waitUntil(lambda: bool(stored), timeout=3000)
+        assert requests == [1]
+        assert stored == [("copy_context:text", "fp", _RESULT)]
+
+    def test_job_stale_khong_luu_va_build_lai(self, qtbot, settings):
+        release = threading.Event()
+        started = threading.Event()
+        fingerprints = iter(["old", "new"])
+        stored = []
+
+        def build(is_stale):
+            started.set()
+            release.wait(5)
+            return _RESULT
+
+        def make_request():
+            return PrebuildRequest("copy_context:text", next(fingerprints), build)
+
+        prebuilder = _prebuilder(make_request, lambda *a: stored.append(a[1]))
+        prebuilder.schedule()
+        qtbot.waitUntil(started.is_set, timeout=3000)
+        old_job = prebuilder.pending("copy_context:text")
+
+        prebuilder.schedule()  # input doi trong luc dang build
+        assert old_job.stale
+        assert prebuilder.pending("copy_context:text") is None
+        qtbot.wait(50)  # timer het han khi job cu con chay -> danh dau dirty
+        release.set()
+
+        qtbot.waitUntil(lambda: bool(stored), timeout=3000)
+        assert stored == ["new"]
+
+    @pytest.mark.parametrize("battery, enabled", [(True, True), (False, False)])
+    def test_tam_dung(self, qtbot, settings, battery, enabled):
+        settings.speculative_prebuild = enabled
+        make_request = MagicMock()
+        prebuilder = _prebuilder(make_request, MagicMock())
+
+        with patch(
+            "presentation.views.context.prompt_prebuilder.on_battery_power",
+            return_value=battery,
+        ):
+            prebuilder.schedule()
+            qtbot.wait(60)
+
+        make_request.assert_not_called()
+
+    def test_job_loi_tra_ve_none(self):
+        def build(is_stale):
+            raise OSError("disk")
+
+        job = PrebuildJob(PrebuildRequest("m", "fp", build), lambda: False)
+        job.run()
+
+        assert job.done and job.wait() is None
+
+    def test_job_stale_giua_stage_tra_ve_none(self):
+        def build(is_stale):
+            raise PrebuildStale()
+
+        job = PrebuildJob(PrebuildRequest("m", "fp", build), lambda: False)
+        job.run()
+
+        assert job.done and job.wait() is None
+
+
+def test_on_battery_power():
+    battery = MagicMock(power_plugged=False)
+    with patch("psutil.sensors_battery", return_value=battery):
+        assert on_battery_power()
+    with patch("psutil.sensors_battery", return_value=None):
+        assert not on_battery_power()
+
+
+class TestControllerPrebuild:
+    def _controller(self, tmp_path, mode=CopyMode.FULL, **kwargs):
+        source = tmp_path / "main.py"
+        source.write_text("print('hi')\n")
+        view = make_mock_view(
+            workspace=tmp_path,
+            selected_paths={str(source)},
+            instructions="Review",
+            **kwargs,
+        )
+        view.get_copy_config.return_value.mode = mode
+        view.get_prompt_builder.return_value.build_prompt.return_value = _RESULT
+        return CopyActionController(view), view
+
+    def test_request_theo_copy_mode(self, qtbot, tmp_path, settings):
+        controller, view = self._controller(tmp_path, CopyMode.APPLY)
+
+        request = controller._prebuild_request()
+
+        assert request.mode == "copy_opx:text"
+        assert request.build(lambda: False) == _RESULT
+        kwargs = view.get_prompt_builder.return_value.build_prompt.call_args.kwargs
+        assert kwargs["instructions"] == "Review" + OPX_DIRECTIVE
+        assert kwargs["include_xml_formatting"] is True
+
+    @pytest.mark.parametrize("tree_map_only", [False, True])
+    def test_smart_va_tree_map_dung_khi_stale(
+        self, qtbot, tmp_path, settings, tree_map_only
+    ):
+        controller, view = self._controller(tmp_path, CopyMode.SMART)
+        view.get_copy_config.return_value.tree_map_only = tree_map_only
+        request = controller._prebuild_request()
+
+        with pytest.raises(PrebuildStale):
+            request.build(lambda: True)
+
+        view.scan_full_tree.assert_called_once()
+        builder = view.get_prompt_builder.return_value
+        builder.build_prompt.assert_not_called()
+        builder.count_tokens.assert_not_called()
+
+    def test_ket_qua_hit_cache_khi_copy(self, qtbot, tmp_path, settings):
+        controller, view = self._controller(tmp_path, CopyMode.SMART, copy_as_file=True)
+        request = controller._prebuild_request()
+
+        with patch("tempfile.gettempdir", return_value=str(tmp_path)):
+            result = request.build(lambda: False)
+        controller._store_prebuilt(request.mode, request.fingerprint, result)
+
+        # Dich "file": prompt ghi qua sink, cache giu duong dan file
+        kwargs = view.get_prompt_builder.return_value.build_prompt.call_args.kwargs
+        assert kwargs["sink"] is not None
+        assert Path(result[0]).is_file() and result[1:] == _RESULT[1:]
+        selected = {str(tmp_path / "main.py")}
+        assert (
+            controller._try_cache_hit(
+                "copy_smart:file", selected, "Review", instructions_at_top=True
+            )
+            == result
+        )
+
+    def test_file_cua_ket_qua_bi_bo_bi_xoa(self, qtbot, tmp_path, settings):
+        controller, _ = self._controller(tmp_path, copy_as_file=True)
+        request = controller._prebuild_request()
+        with patch("tempfile.gettempdir", return_value=str(tmp_path)):
+            result = request.build(lambda: False)
+            controller._discard_prebuilt(request.mode, result)
+
+        assert not Path(result[0]).exists()
+
+    def test_khong_speculate_khi_copy_dang_chay(self, qtbot, tmp_path, settings):
+        controller, _ = self._controller(tmp_path)
+        controller._current_copy_worker = MagicMock()
+
+        assert controller._prebuild_request() is None
+
+    def test_secret_khong_cache(self, qtbot, tmp_path, settings):
+        settings.enable_security_check = True
+        controller, view = self._controller(tmp_path)
+        scanner = MagicMock()
+        scanner.scan_secrets_in_files_cached.return_value = [MagicMock()]
+
+        with patch.object(DomainRegistry, "security_scanner", return_value=scanner):
+            request = controller._prebuild_request()
+            assert request.build(lambda: False) is None
+
+        view.get_prompt_builder.return_value.build_prompt.assert_not_called()
+
+    def test_copy_doi_job_cung_fingerprint(self, qtbot, tmp_path, settings):
+        controller, _ = self._controller(tmp_path)
+        request = controller._prebuild_request()
+        job = PrebuildJob(request, lambda: False)
+        controller._prebuilder._job = job
+        fallback = MagicMock(return_value=("rebuilt", 1, {}))
+        selected = {str(Path(tmp_path / "main.py"))}
+
+        task = controller._attach_prebuild(
+            fallback, ("copy_context:text", selected, "Review", False), False
+        )
+        job.run()
+
+        assert task() == _RESULT
+        fallback.assert_not_called()
+
+        # Input khac (instructions doi) -> khong attach
+        other = controller._attach_prebuild(
+            fallback, ("copy_context:text", selected, "Other", False), False
+        )
+        assert other is fallback
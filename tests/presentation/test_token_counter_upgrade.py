@@ -23,6 +23,9 @@ class _FakeModel:
     def get_selected_file_count(self) -> int:
         return self.file_count
 
+    def has_token_estimates(self) -> bool:
+        return False
+
 
 class _FakeFileTree:
     def __init__(self, paths: list[str], total_tokens: int):
@@ -101,6 +101,7 @@ class TestAppSettings:
         expected_keys = {
             "excluded_folders",
             "use_gitignore",
+            "use_git_index",
             "model_id",
             "output_format",
             "include_git_changes",
@@ -119,6 +120,7 @@ class TestAppSettings:
             "copy_mode",
             "tree_map_only",
             "git_commit_depth",
+            "speculative_prebuild",
         }
         assert set(d.keys()) == expected_keys
 
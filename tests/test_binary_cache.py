@@ -0,0 +1,212 @@
+"""
+Tests cho shared.utils.binary_cache va cac API binary dung chung.
+
+Kiem tra cac truong hop:
+- is_binary_file() chi doc file 1 lan cho cung stat identity
+- Sua file (size/mtime doi) -> phan loai lai
+- File vua sua (racy) khong duoc cache
+- LRU bounded
+- classify_binary_batch() cho ket qua giong is_binary_file()
+- FileScanner voi defer_binary_check khong mo file nao
+- Resolve selection khong doc file tren main thread, TokenCountWorker phan loai
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+import shared.utils.file_utils as file_utils_module
+from infrastructure.filesystem.file_scanner import FileScanner, ScanConfig
+from infrastructure.filesystem.ignore_engine import IgnoreEngine
+from shared.utils.binary_cache import (
+    BinaryClassificationCache,
+    binary_classification_cache,
+)
+from shared.utils.file_utils import classify_binary_batch, is_binary_file
+
+
+@pytest.fixture(autouse=True)
+def clear_binary_cache():
+    binary_classification_cache.invalidate_all()
+    yield
+    binary_classification_cache.invalidate_all()
+
+
+def _age(path: Path, seconds: int = 60) -> None:
+    """Dat mtime ve qua khu de file khong con 'racy'."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+@pytest.fixture
+def open_counter(monkeypatch):
+    """Dem so lan is_binary_file mo file de doc magic bytes."""
+    calls = []
+    real_open = open
+
+    def counting_open(path, *args, **kwargs):
+        calls.append(str(path))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(file_utils_module, "open", counting_open, raising=False)
+    return calls
+
+
+class TestBinaryClassificationCache:
+    """Test suite cho BinaryClassificationCache."""
+
+    def test_lan_hai_khong_doc_file(self, tmp_path: Path, open_counter):
+        """Cung file, khong doi -> chi doc magic bytes 1 lan."""
+        binary = tmp_path / "tool"
+        binary.write_bytes(b"\x7fELF" + b"\x00" * 100)
+        _age(binary)
+
+        assert is_binary_file(binary) is True
+        assert is_binary_file(str(binary)) is True
+        assert open_counter == [str(binary)]
+        assert binary_classification_cache.get_stats()["hits"] == 1
+
+    def test_sua_file_phan_loai_lai(self, tmp_path: Path, open_counter):
+        """Noi dung doi (size + mtime doi) -> key moi, doc lai file."""
+        target = tmp_path / "data"
+        target.write_text("plain text\n")
+        _age(target, 120)
+        assert is_binary_file(target) is False
+
+        target.write_bytes(b"\x00\x01\x02" * 50)
+        _age(target)
+        assert is_binary_file(target) is True
+        assert len(open_counter) == 2
+
+    def test_file_vua_sua_khong_cache(self, tmp_path: Path, open_counter):
+        """Inode cua file vua xoa co the bi tai su dung -> khong tin stat key."""
+        fresh = tmp_path / "fresh"
+        fresh.write_bytes(b"\x00" * 10)
+
+        assert is_binary_file(fresh) is True
+        assert is_binary_file(fresh) is True
+        assert len(open_counter) == 2
+        assert binary_classification_cache.size() == 0
+
+    def test_extension_da_biet_khong_vao_cache(self, tmp_path: Path, open_counter):
+        """Extension trong whitelist/blacklist khong can I/O."""
+        assert is_binary_file(tmp_path / "missing.py") is False
+        assert is_binary_file(tmp_path / "missing.png") is True
+        assert open_counter == []
+        assert binary_classification_cache.size() == 0
+
+    def test_lru_gioi_han_so_entries(self):
+        """Vuot max_entries -> evict entry it dung nhat."""
+        cache = BinaryClassificationCache(max_entries=2)
+        cache.put((1, 1, 1, 1), True)
+        cache.put((1, 2, 1, 1), False)
+        assert cache.get((1, 1, 1, 1)) is True
+        cache.put((1, 3, 1, 1), False)
+
+        assert cache.size() == 2
+        assert cache.get((1, 2, 1, 1)) is None
+        assert cache.get((1, 1, 1, 1)) is True
+
+
+class TestClassifyBinaryBatch:
+    """Test suite cho classify_binary_batch."""
+
+    def test_ket_qua_giong_is_binary_file(self, tmp_path: Path):
+        """Batch lon (chay song song) cho ket qua giong tung file."""
+        paths = []
+        for i in range(40):
+            text = tmp_path / f"text_{i}"
+            text.write_text(f"line {i}\n")
+            binary = tmp_path / f"bin_{i}"
+            binary.write_bytes(b"\x00" * (i + 1))
+            paths.extend([text, binary])
+        paths.append(tmp_path / "main.py")
+        paths.append(tmp_path / "logo.png")
+
+        result = classify_binary_batch(paths, max_workers=4)
+
+        assert len(result) == len(paths)
+        for path in paths:
+            assert result[str(path)] == is_binary_file(path), path
+
+
+class TestScannerDeferBinaryCheck:
+    """Test FileScanner voi ScanConfig.defer_binary_check."""
+
+    def test_full_scan_khong_mo_file(self, tmp_path: Path, open_counter):
+        """Defer -> chi loc theo extension, file khong ro extension duoc giu lai."""
+        (tmp_path / "main.py").write_text("x = 1\n")
+        (tmp_path / "logo.png").write_bytes(b"\x89PNG\r\n")
+        (tmp_path / "tool").write_bytes(b"\x7fELF" + b"\x00" * 100)
+
+        scanner = FileScanner(IgnoreEngine())
+        tree = scanner.scan(tmp_path, ScanConfig(defer_binary_check=True))
+        labels = {child.label for child in tree.children}
+
+        assert open_counter == []
+        assert labels == {"main.py", "tool"}
+
+        tree = scanner.scan(tmp_path)
+        assert {child.label for child in tree.children} == {"main.py"}
+
+    def test_scan_cua_tree_khong_mo_file(self, tmp_path: Path, open_counter):
+        """Chi scan cua tree hien thi (defer_binary_check=True) hoan phan loai."""
+        from infrastructure.filesystem.file_utils import ConcreteDirectoryScanner
+
+        (tmp_path / "main.py").write_text("x = 1\n")
+        (tmp_path / "logo.png").write_bytes(b"\x89PNG\r\n")
+        (tmp_path / "tool").write_bytes(b"\x7fELF" + b"\x00" * 100)
+        scanner = ConcreteDirectoryScanner(IgnoreEngine())
+
+        tree = scanner.scan_directory(tmp_path, defer_binary_check=True)
+
+        assert open_counter == []
+        assert {child.label for child in tree.children} == {"main.py", "tool"}
+        # Scan cho prompt (tree map, copy) van loai binary khong ro extension
+        prompt_tree = scanner.scan_directory(tmp_path)
+        assert {child.label for child in prompt_tree.children} == {"main.py"}
+        # Binary khong ro extension bi loai luc chon
+        assert classify_binary_batch([str(tmp_path / "tool")]) == {
+            str(tmp_path / "tool"): True
+        }
+
+
+class _CharTokenizer:
+    def count_tokens_batch_parallel(self, file_paths, **_):
+        return {str(p): len(p.read_text(encoding="utf-8")) for p in file_paths}
+
+
+class TestSelectionPhanLoaiTrongWorker:
+    """Binary khong ro extension duoc phan loai trong TokenCountWorker."""
+
+    def test_resolve_selection_khong_mo_file(self, tmp_path: Path, open_counter):
+        from presentation.components.file_tree.file_tree_model import (
+            FileTreeModel,
+            TokenCountWorker,
+        )
+
+        main = tmp_path / "main.py"
+        main.write_text("x = 1\n")
+        tool = tmp_path / "tool"
+        tool.write_bytes(b"\x7fELF" + b"\x00" * 100)
+        (tmp_path / "logo.png").write_bytes(b"\x89PNG\r\n")
+        model = FileTreeModel(ignore_engine=IgnoreEngine())
+        model._workspace_path = tmp_path
+        model._search_index = {"main.py": [str(main)]}
+        model._search_index_ready = True
+        model._selection_mgr.add_many(
+            {str(main), str(tool), str(tmp_path / "logo.png")}
+        )
+
+        selected = model.get_selected_paths()
+
+        assert open_counter == []
+        assert selected == [str(main), str(tool)]
+
+        counts = {}
+        worker = TokenCountWorker(selected, _CharTokenizer())
+        worker.signals.token_counts_batch.connect(counts.update)
+        worker.run()
+
+        assert counts == {str(main): 6, str(tool): 0}
@@ -11,6 +11,7 @@ Files binary không có extension (ELF, Mach-O) bypass extension check
 import struct
 import pytest
 from pathlib import Path
+from unittest.mock import patch
 
 
 class TestIsBinaryFile:
@@ -139,30 +140,54 @@ class TestTokenCountWorkerSkipsBinary:
         # Text file should have > 0 tokens
         assert results.get(str(text_file), 0) > 0
 
-    def test_skip_large_file(self, tmp_path):
-        """TokenCountWorker phải skip files > 5MB"""
+    def test_large_file_dem_streaming(self, tmp_path):
+        """File > 5MB duoc dem streaming va bao tien do thay vi tra 0"""
         from presentation.components.file_tree.file_tree_model import TokenCountWorker
         from infrastructure.adapters.tokenization_service import TokenizationService
 
         # Create large text file (> 5MB)
         large_file = tmp_path / "huge.txt"
-        large_file.write_text("x" * (6 * 1024 * 1024))  # 6MB
+        large_file.write_text("word " * (6 * 1024 * 1024 // 5 + 1))  # ~6MB
 
-        worker = TokenCountWorker(
-            [str(large_file)],
-            tokenization_service=TokenizationService(),
+        service = TokenizationService()
+        worker = TokenCountWorker([str(large_file)], tokenization_service=service)
+
+        results, progress = {}, []
+        worker.signals.token_counts_batch.connect(results.update)
+        worker.signals.large_file_progress.connect(
+            lambda path, percent: progress.append((path, percent))
         )
+        with patch.object(service, "count_tokens", side_effect=lambda t: len(t) // 5):
+            worker.run()
 
-        results = {}
+        assert results.get(str(large_file), 0) > 1_000_000
+        assert progress[-1] == (str(large_file), 100)
+        assert [p for _, p in progress] == sorted(p for _, p in progress)
 
-        def capture_batch(batch):
-            results.update(batch)
+    def test_large_file_dung_khi_cancel(self, tmp_path):
+        """Cancel worker giua chung dung dem file lon, khong emit ket qua"""
+        from presentation.components.file_tree.file_tree_model import TokenCountWorker
+        from infrastructure.adapters.tokenization_service import TokenizationService
 
-        worker.signals.token_counts_batch.connect(capture_batch)
-        worker.run()
+        large_file = tmp_path / "huge.txt"
+        large_file.write_text("word " * (6 * 1024 * 1024 // 5 + 1))
+
+        service = TokenizationService()
+        worker = TokenCountWorker([str(large_file)], tokenization_service=service)
+
+        results, progress = {}, []
+        worker.signals.token_counts_batch.connect(results.update)
+
+        def on_progress(path, percent):
+            progress.append(percent)
+            worker.cancel()
+
+        worker.signals.large_file_progress.connect(on_progress)
+        with patch.object(service, "count_tokens", side_effect=lambda t: len(t) // 5):
+            worker.run()
 
-        # Large file should have 0 tokens (skipped)
-        assert results.get(str(large_file)) == 0
+        assert len(progress) == 1 and progress[0] < 100
+        assert str(large_file) not in results
 
 
 class TestGetSelectedPathsSkipsBinary:
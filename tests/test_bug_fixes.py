@@ -150,7 +150,7 @@ class TestBug4WorkspaceIndexIgnoreEngine:
         # Both should have same results
         assert index1 == index2
         # Cache should have entries
-        assert len(engine._pathspec_cache) > 0
+        assert len(engine._matcher_cache) > 0
 
 
 class TestBug5IgnoreEngineThreadSafety:
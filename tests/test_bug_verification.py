@@ -97,6 +97,18 @@ class TestBug2OSErrorBypassSizeCheck:
         if hasattr(pathlib, "PosixPath"):
             monkeypatch.setattr(pathlib.PosixPath, "stat", mock_stat)
 
+        # File duoc doc qua content_snapshot (os.stat)
+        import domain.prompt.content_snapshot as content_snapshot
+
+        original_os_stat = content_snapshot.os.stat
+
+        def mock_os_stat(path, *args, **kwargs):
+            if Path(path).name == "test.py":
+                raise OSError("Permission denied")
+            return original_os_stat(path, *args, **kwargs)
+
+        monkeypatch.setattr(content_snapshot.os, "stat", mock_os_stat)
+
         # Should skip the file instead of processing it
         result = "\n".join(
             _generate_codemap_xml_elements(
@@ -123,15 +135,17 @@ class TestBug3DoubleFileRead:
         test_file = tmp_path / "test.py"
         test_file.write_text("print('hello')\n")
 
+        import domain.prompt.content_snapshot as content_snapshot
+
         read_count = {"count": 0}
-        original_read_text = Path.read_text
+        original_read_bytes = content_snapshot._read_bytes
 
-        def mock_read_text(self, *args, **kwargs):
-            if self.name == "test.py":
+        def mock_read_bytes(path_str, *args, **kwargs):
+            if Path(path_str).name == "test.py":
                 read_count["count"] += 1
-            return original_read_text(self, *args, **kwargs)
+            return original_read_bytes(path_str, *args, **kwargs)
 
-        monkeypatch.setattr(Path, "read_text", mock_read_text)
+        monkeypatch.setattr(content_snapshot, "_read_bytes", mock_read_bytes)
 
         # Mock smart_parse to return None (failure)
         def mock_smart_parse(*args, **kwargs):
@@ -121,6 +121,21 @@ class TestCacheRegistry:
         assert "/some/file.py" in c1.invalidated_paths
         assert "/some/file.py" in c2.invalidated_paths
 
+    def test_invalidate_for_created_path(self):
+        """File moi tao: goi invalidate_created neu cache co, con lai invalidate_path."""
+        plain = FakeCache()
+        aware = FakeCache()
+        aware.created_paths = []
+        aware.invalidate_created = aware.created_paths.append
+        self.registry.register("plain", plain)
+        self.registry.register("aware", aware)
+
+        self.registry.invalidate_for_created_path("/new.py")
+
+        assert plain.invalidated_paths == ["/new.py"]
+        assert aware.created_paths == ["/new.py"]
+        assert aware.invalidated_paths == []
+
     def test_invalidate_for_workspace(self):
         """invalidate_for_workspace goi invalidate_all tren tat ca caches."""
         c1, c2 = FakeCache(), FakeCache()
@@ -307,7 +322,7 @@ class TestRegisterAllCaches:
     def teardown_method(self):
         cache_registry._reset_for_testing()
 
-    def test_registers_all_four_caches(self):
+    def test_registers_all_caches(self):
         from infrastructure.filesystem.ignore_engine import IgnoreEngine
         from infrastructure.adapters.tokenization_service import TokenizationService
 
@@ -320,6 +335,7 @@ class TestRegisterAllCaches:
         assert "security_cache" in names
         assert "ignore_cache" in names
         assert "relationship_cache" in names
+        assert "binary_cache" in names
 
     def test_idempotent(self):
         from infrastructure.filesystem.ignore_engine import IgnoreEngine
@@ -331,7 +347,7 @@ class TestRegisterAllCaches:
         )
         register_all_caches(**kwargs)
         register_all_caches(**kwargs)  # Goi lai khong loi
-        assert len(cache_registry.get_registered_names()) == 4
+        assert len(cache_registry.get_registered_names()) == 5
 
 
 if __name__ == "__main__":
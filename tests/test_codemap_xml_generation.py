@@ -87,7 +87,7 @@ class TestCodemapXMLGeneration:
         bin_file.write_bytes(b"\x00\x01\x02\x03")
         paths = {str(bin_file)}
 
-        with patch("domain.prompt.generator.is_binary_file") as mock_binary:
+        with patch("domain.prompt.content_snapshot.is_binary_file") as mock_binary:
             mock_binary.return_value = True
 
             # Act
@@ -200,7 +200,7 @@ class TestCodemapXMLGeneration:
             # Assert: Should use normal flow without splitting
             assert '<file path="test.py">' in result
             mock_collect.assert_called_once_with(
-                selected_paths, 1024 * 1024, temp_workspace, True
+                selected_paths, 1024 * 1024, temp_workspace, True, None
             )
 
     def test_generate_file_contents_xml_empty_codemap_paths(self, temp_workspace):
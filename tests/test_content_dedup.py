@@ -0,0 +1,223 @@
+"""
+Tests cho dedup token counting theo content hash (domain.tokenization.dedup).
+
+Kiem tra:
+- BlobCounts: moi digest chi compute 1 lan, ke ca khi nhieu thread cung gap
+- ContentHashIndex: het hieu luc khi mtime/size doi, gioi han LRU
+- TokenizationService: file trung noi dung chi encode 1 lan (thread + HF
+  batch path), content_digest() tra ve hash da ghi
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import infrastructure.adapters.process_counter as process_counter
+import infrastructure.adapters.tokenization_service as service_module
+from domain.tokenization.cancellation import start_token_counting
+from domain.tokenization.dedup import BlobCounts, ContentHashIndex, content_hash
+from infrastructure.adapters.tokenization_service import TokenizationService
+from infrastructure.persistence.token_count_store import TokenCountStore
+
+
+class _CountingEncoder:
+    def __init__(self):
+        self.texts = []
+        self._lock = threading.Lock()
+
+    def encode(self, text):
+        with self._lock:
+            self.texts.append(text)
+        return text.split()
+
+
+class _FakeEncoding:
+    def __init__(self, ids):
+        self.ids = ids
+
+
+class _FakeHFTokenizer:
+    def __init__(self):
+        self.batches = []
+
+    def encode_batch(self, texts):
+        self.batches.append(list(texts))
+        return [_FakeEncoding(t.split()) for t in texts]
+
+
+def _write(path: Path, content: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    # Lui mtime de khong roi vao racy window
+    old = time.time() - 60
+    os.utime(path, (old, old))
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """3 ban copy LICENSE, 4 `__init__.py` giong nhau, 2 file rieng."""
+    license_text = "Permission is hereby granted free of charge\n" * 20
+    paths = [
+        _write(tmp_path / d / "LICENSE", license_text) for d in ("a", "b", "vendor/c")
+    ]
+    paths += [
+        _write(tmp_path / d / "__init__.py", "from . import core\n")
+        for d in ("a", "b", "c", "d")
+    ]
+    paths.append(_write(tmp_path / "main.py", "print('hello world')\n"))
+    paths.append(_write(tmp_path / "util.py", "def util(): return 1\n"))
+    return paths
+
+
+def _service(**kwargs) -> TokenizationService:
+    service = TokenizationService(process_workers=0, **kwargs)
+    service._encoder = _CountingEncoder()
+    service._encoder_type = "tiktoken"
+    start_token_counting()
+    return service
+
+
+class TestBlobCounts:
+    def test_compute_moi_digest_1_lan(self):
+        blobs = BlobCounts()
+        calls = []
+
+        assert blobs.count(b"a", lambda: calls.append("a") or 3) == (3, False)
+        assert blobs.count(b"a", lambda: calls.append("a") or 9) == (3, True)
+        assert blobs.count(b"b", lambda: calls.append("b") or 5) == (5, False)
+        assert calls == ["a", "b"]
+        assert (blobs.unique, blobs.duplicates) == (2, 1)
+
+    def test_thread_thu_2_cho_thread_dang_dem(self):
+        blobs = BlobCounts()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 7
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(blobs.count(b"x", slow)))
+        first.start()
+        started.wait(5)
+        second = threading.Thread(
+            target=lambda: results.append(blobs.count(b"x", slow))
+        )
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        assert calls == [1]
+        assert sorted(results) == [(7, False), (7, True)]
+
+    def test_compute_loi_khong_giu_pending(self):
+        blobs = BlobCounts()
+
+        def boom():
+            raise ValueError("encode failed")
+
+        with pytest.raises(ValueError):
+            blobs.count(b"x", boom)
+        assert blobs.count(b"x", lambda: 4) == (4, False)
+
+
+class TestContentHashIndex:
+    def test_het_hieu_luc_khi_file_doi(self):
+        index = ContentHashIndex()
+        index.put("a.py", 100, 10, b"digest")
+
+        assert index.get("a.py", 100, 10) == b"digest"
+        assert index.get("a.py", 101, 10) is None
+        assert index.get("a.py", 100, 11) is None
+        index.remove("a.py")
+        assert index.get("a.py", 100, 10) is None
+
+    def test_gioi_han_lru(self):
+        index = ContentHashIndex(max_entries=2)
+        index.put("a", 1, 1, b"a")
+        index.put("b", 1, 1, b"b")
+        index.get("a", 1, 1)
+        index.put("c", 1, 1, b"c")
+
+        assert len(index) == 2
+        assert index.get("b", 1, 1) is None
+        assert index.get("a", 1, 1) == b"a"
+
+
+class TestServiceDedup:
+    def test_thread_path_encode_moi_noi_dung_1_lan(self, tree):
+        service = _service()
+
+        results = service.count_tokens_batch_parallel(tree, max_workers=4)
+
+        for path in tree:
+            assert results[str(path)] == len(path.read_text().split())
+        assert len(service._encoder.texts) == 4
+        assert len(set(service._encoder.texts)) == 4
+
+    def test_ban_copy_duoc_ghi_vao_count_store(self, tree, tmp_path):
+        store = TokenCountStore(tmp_path / "cache")
+        try:
+            service = _service(count_store=store)
+            service.count_tokens_batch_parallel(tree, max_workers=4)
+            key = service._store_key()
+            for path in tree:
+                stat = path.stat()
+                assert store.get_by_path(
+                    str(path), stat.st_mtime_ns, stat.st_size, key
+                ) == len(path.read_text().split())
+        finally:
+            store.close()
+
+    def test_hf_batch_encode_noi_dung_trung_1_lan(self, tree):
+        service = _service()
+        service._tokenizer_repo = "org/model"
+        tokenizer = _FakeHFTokenizer()
+
+        with (
+            patch.object(service_module, "HAS_TOKENIZERS", True),
+            patch(
+                "infrastructure.adapters.encoders._get_hf_tokenizer",
+                return_value=tokenizer,
+            ),
+        ):
+            results = service.count_tokens_batch_parallel(tree)
+
+        for path in tree:
+            assert results[str(path)] == len(path.read_text().split())
+        assert len(tokenizer.batches) == 1
+        assert len(tokenizer.batches[0]) == 4
+
+    def test_content_digest_ghi_lai_khi_dem(self, tree):
+        service = _service()
+        target = tree[0]
+        assert service.content_digest(target) is None
+
+        service.count_tokens_batch_parallel(tree, max_workers=4)
+        digest = content_hash(target.read_text(encoding="utf-8"))
+        assert all(service.content_digest(p) == digest for p in tree[:3])
+
+        _write(target, "changed content\n")
+        assert service.content_digest(target) is None
+
+    def test_process_worker_nho_noi_dung_da_dem(self, tree):
+        encoder = _CountingEncoder()
+        process_counter._worker_encoder = encoder
+        process_counter._worker_blobs.clear()
+        try:
+            result = process_counter.count_batch(list(enumerate(map(str, tree))))
+        finally:
+            process_counter._worker_encoder = None
+            process_counter._worker_blobs.clear()
+
+        assert list(result.counts) == [len(p.read_text().split()) for p in tree]
+        assert len(encoder.texts) == 4
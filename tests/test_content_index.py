@@ -0,0 +1,183 @@
+"""
+Tests cho application.services.content_index (trigram `code:` search).
+
+Kiem tra cac truong hop:
+- Candidates tu posting lists, query ngan hon 3 ky tu
+- Search xac nhan noi dung, stream qua on_match, bo binary
+- Cap nhat tang dan khi file sua/xoa/them
+- Compact giu ket qua dung
+- Luu/doc qua ContentIndexStore, khoi dong lai chi doc file da doi
+"""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from application.services import content_index as content_index_module
+from application.services.content_index import ContentIndexService, TrigramIndex
+from application.services.workspace_catalog import WorkspaceCatalogService
+from infrastructure.filesystem.ignore_engine import IgnoreEngine
+from infrastructure.persistence.content_index_store import ContentIndexStore
+
+
+def _write(path: Path, content: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    # Lui mtime de khong roi vao racy window
+    old = time.time() - 60
+    os.utime(path, (old, old))
+    return path
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Path:
+    root = tmp_path / "ws"
+    _write(root / "main.py", "def RunServer():\n    pass\n")
+    _write(root / "src" / "util.py", "def helper():\n    return run_server\n")
+    _write(root / "README.md", "Nothing relevant here\n")
+    (root / "logo.png").write_bytes(b"\x89PNG\x00\x00def runserver")
+    return root
+
+
+@pytest.fixture
+def catalogs() -> WorkspaceCatalogService:
+    return WorkspaceCatalogService(IgnoreEngine())
+
+
+def _names(paths):
+    return sorted(Path(p).name for p in paths)
+
+
+class TestTrigramIndex:
+    """Index trigram thuan (khong dung filesystem)."""
+
+    def test_candidates_giao_posting_lists(self):
+        index = TrigramIndex()
+        index.add("a.py", 1, 1, "def run_server")
+        index.add("b.py", 1, 1, "server")
+        index.add("c.py", 1, 1, "nothing")
+
+        assert sorted(index.candidates("server")) == ["a.py", "b.py"]
+        assert index.candidates("run_ser") == ["a.py"]
+        assert index.candidates("zzz") == []
+
+    def test_query_ngan_tra_ve_tat_ca(self):
+        index = TrigramIndex()
+        index.add("a.py", 1, 1, "abc")
+        index.add("b.py", 1, 1, "xyz")
+
+        assert sorted(index.candidates("x")) == ["a.py", "b.py"]
+
+    def test_remove_va_compact(self):
+        index = TrigramIndex()
+        for i in range(10):
+            index.add(f"f{i}.py", 1, 1, f"token{i} shared")
+        for i in range(5):
+            index.remove(f"f{i}.py")
+        index.add("f9.py", 2, 1, "changed shared")
+        index.compact(force=True)
+
+        assert sorted(index.candidates("shared")) == [f"f{i}.py" for i in range(5, 10)]
+        assert index.candidates("token9") == []
+        assert index.candidates("token7") == ["f7.py"]
+
+    def test_round_trip_dict(self):
+        index = TrigramIndex()
+        index.add("a.py", 5, 7, "hello world")
+        index.remove("a.py")
+        index.add("b.py", 6, 8, "world peace")
+
+        restored = TrigramIndex.from_dict(index.to_dict())
+
+        assert restored is not None
+        assert restored.files == {"b.py": (0, 6, 8)}
+        assert restored.candidates("world") == ["b.py"]
+
+    def test_from_dict_sai_version(self):
+        data = TrigramIndex().to_dict()
+        data["version"] = -1
+        assert TrigramIndex.from_dict(data) is None
+
+
+class TestContentIndexService:
+    """Search qua service voi workspace catalog that."""
+
+    def test_search_case_insensitive_va_bo_binary(self, catalogs, workspace):
+        service = ContentIndexService(catalogs)
+
+        assert _names(service.search(workspace, "runserver")) == ["main.py"]
+        assert _names(service.search(workspace, "RUN_SERVER")) == ["util.py"]
+        assert service.search(workspace, "   ") == []
+
+    def test_on_match_stream_ket_qua(self, catalogs, workspace):
+        service = ContentIndexService(catalogs)
+        streamed = []
+
+        results = service.search(workspace, "def ", on_match=streamed.append)
+
+        assert sorted(streamed) == sorted(results)
+        assert _names(results) == ["main.py", "util.py"]
+
+    def test_cancel_dung_som(self, catalogs, workspace):
+        service = ContentIndexService(catalogs)
+
+        assert service.search(workspace, "def", is_cancelled=lambda: True) == []
+
+    def test_chi_doc_lai_file_da_doi(self, catalogs, workspace):
+        service = ContentIndexService(catalogs)
+        service.warm(workspace)
+
+        _write(workspace / "src" / "util.py", "def helper():\n    return 42\n")
+        catalogs.refresh_path(str(workspace / "src" / "util.py"))
+        (workspace / "README.md").unlink()
+        catalogs.refresh_path(str(workspace / "README.md"))
+
+        with patch.object(
+            content_index_module, "_read_lower", wraps=content_index_module._read_lower
+        ) as read:
+            results = service.search(workspace, "return 42")
+
+        assert _names(results) == ["util.py"]
+        # 1 lan khi sync file da sua + 1 lan xac nhan ung vien
+        assert [Path(c.args[0]).name for c in read.call_args_list] == [
+            "util.py",
+            "util.py",
+        ]
+
+    def test_luu_va_load_lai_tu_store(self, catalogs, workspace, tmp_path):
+        store = ContentIndexStore(tmp_path / "index_cache")
+        ContentIndexService(catalogs, store).warm(workspace)
+        assert store.index_path(workspace).exists()
+
+        fresh = ContentIndexService(catalogs, store)
+        with patch.object(
+            content_index_module, "_read_lower", wraps=content_index_module._read_lower
+        ) as read:
+            results = fresh.search(workspace, "helper")
+
+        assert _names(results) == ["util.py"]
+        # Index load tu dia -> chi doc file ung vien de xac nhan
+        assert read.call_count == 1
+
+
+class TestContentIndexStore:
+    def test_file_hong_tra_ve_none(self, tmp_path, workspace):
+        store = ContentIndexStore(tmp_path / "index_cache")
+        path = store.index_path(workspace)
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"not gzip")
+
+        assert store.load(workspace) is None
+
+    def test_root_khac_tra_ve_none(self, tmp_path, workspace):
+        store = ContentIndexStore(tmp_path / "index_cache")
+        assert store.save(workspace, {"version": 1})
+
+        assert store.load(workspace) == {"version": 1}
+        with patch.object(
+            store, "index_path", return_value=store.index_path(workspace)
+        ):
+            assert store.load(tmp_path / "other") is None
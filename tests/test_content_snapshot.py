@@ -0,0 +1,197 @@
+"""
+Tests cho ContentSnapshot (domain.prompt.content_snapshot).
+
+Kiem tra:
+- load_entry: binary, file qua lon, file rong, chuan hoa CRLF, loi doc
+- ContentSnapshot: moi file doc 1 lan, memo ket qua dan xuat
+- PromptBuildService: 1 lan build doc moi file dung 1 lan, moi buoc thay cung
+  1 phien ban file ke ca khi file bi sua giua chung
+- Security scan dung noi dung trong snapshot
+"""
+
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+import pytest
+
+import domain.prompt.content_snapshot as content_snapshot
+import infrastructure.adapters.security_check as security_check
+from application.services.prompt_build_service import PromptBuildService
+from domain.prompt.content_snapshot import ContentSnapshot, load_entry, read_entry
+from domain.prompt.file_collector import collect_files
+from infrastructure.adapters.encoder_registry import get_tokenization_service
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Path:
+    (tmp_path / "main.py").write_text(
+        "from utils import helper\n\nprint(helper())\n", encoding="utf-8"
+    )
+    (tmp_path / "utils.py").write_text(
+        "def helper():\n    return 'ok'\n", encoding="utf-8"
+    )
+    (tmp_path / "notes.md").write_text("# Notes\n", encoding="utf-8")
+    return tmp_path
+
+
+def _count_reads():
+    """Patch _read_bytes de dem so lan doc moi file."""
+    calls: List[str] = []
+    real = content_snapshot._read_bytes
+
+    def counting(path_str, size):
+        calls.append(path_str)
+        return real(path_str, size)
+
+    return calls, patch.object(content_snapshot, "_read_bytes", side_effect=counting)
+
+
+class TestLoadEntry:
+    def test_file_text_chuan_hoa_newline(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_bytes(b"x = 1\r\ny = 2\rz = 3\n")
+
+        entry = load_entry(str(path))
+
+        assert entry.is_file and not entry.binary
+        assert entry.content == path.read_text(encoding="utf-8")
+        assert entry.mtime == path.stat().st_mtime
+
+    def test_binary_khong_doc_noi_dung(self, tmp_path):
+        by_ext = tmp_path / "logo.png"
+        by_ext.write_bytes(b"\x89PNG\r\n")
+        by_probe = tmp_path / "data.xyz"
+        by_probe.write_bytes(b"abc\x00def")
+
+        assert load_entry(str(by_ext)).binary is True
+        assert load_entry(str(by_ext)).content is None
+        assert load_entry(str(by_probe)).binary is True
+        assert load_entry(str(by_probe)).content is None
+
+    def test_file_qua_lon_va_file_rong(self, tmp_path):
+        big = tmp_path / "big.txt"
+        big.write_text("a" * 100, encoding="utf-8")
+        empty = tmp_path / "empty.py"
+        empty.write_text("", encoding="utf-8")
+
+        entry = load_entry(str(big), max_file_size=10)
+        assert (entry.is_file, entry.binary, entry.size) == (True, False, 100)
+        assert entry.content is None
+        assert load_entry(str(empty)).content == ""
+
+    def test_file_lon_doc_bang_mmap(self, tmp_path):
+        path = tmp_path / "large.py"
+        text = "value = 1\n" * (content_snapshot.MMAP_MIN_BYTES // 10 + 1)
+        path.write_text(text, encoding="utf-8")
+
+        assert load_entry(str(path)).content == text
+
+    def test_loi_doc_va_file_khong_ton_tai(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n", encoding="utf-8")
+
+        with patch.object(
+            content_snapshot, "_read_bytes", side_effect=PermissionError("denied")
+        ):
+            entry = load_entry(str(path))
+        assert entry.content is None and "denied" in entry.error
+        assert load_entry(str(tmp_path / "missing.py")).is_file is False
+
+
+class TestContentSnapshot:
+    def test_moi_file_doc_1_lan(self, workspace):
+        paths = sorted(str(p) for p in workspace.iterdir())
+        calls, patcher = _count_reads()
+
+        with patcher:
+            snapshot = ContentSnapshot(paths).load()
+            for path in paths:
+                snapshot.get(path)
+                read_entry(path, snapshot=snapshot)
+
+        assert sorted(calls) == paths
+        assert snapshot.disk_reads == len(paths)
+        assert len(snapshot) == len(paths)
+
+    def test_gioi_han_lon_hon_snapshot_doc_disk(self, workspace):
+        path = str(workspace / "main.py")
+        snapshot = ContentSnapshot([path], max_file_size=10).load()
+
+        assert snapshot.get(path).content is None
+        assert read_entry(path, 1024, snapshot).content is not None
+
+    def test_file_entry_duoc_memo(self, workspace):
+        paths = {str(workspace / "main.py"), str(workspace / "utils.py")}
+        snapshot = ContentSnapshot(paths).load()
+
+        first = collect_files(paths, 1024 * 1024, workspace, True, snapshot)
+        with patch(
+            "domain.prompt.file_collector.extract_local_imports",
+            side_effect=AssertionError("khong duoc tinh lai"),
+        ):
+            second = collect_files(paths, 1024 * 1024, workspace, True, snapshot)
+
+        assert [e.content for e in first] == [e.content for e in second]
+        assert first[0] is second[0]
+
+
+class TestPromptBuildWithSnapshot:
+    def _build(self, service, workspace, **kwargs):
+        return service.build_prompt_full(
+            file_paths=[workspace / "main.py", workspace / "utils.py"],
+            workspace=workspace,
+            instructions="Review",
+            output_format="xml",
+            include_git_changes=False,
+            use_relative_paths=True,
+            **kwargs,
+        )
+
+    def test_build_doc_moi_file_1_lan(self, workspace):
+        service = PromptBuildService(tokenization_service=get_tokenization_service())
+        calls, patcher = _count_reads()
+
+        with patcher:
+            result = self._build(service, workspace, max_tokens=10)
+
+        assert result.trimmed is True
+        assert len(calls) == len(set(calls))
+
+    def test_file_sua_giua_chung_van_dung_ban_da_doc(self, workspace):
+        service = PromptBuildService(tokenization_service=get_tokenization_service())
+        main = workspace / "main.py"
+        snapshot = ContentSnapshot([str(main), str(workspace / "utils.py")]).load()
+
+        main.write_text("print('edited after scan')\n", encoding="utf-8")
+        result = self._build(service, workspace, snapshot=snapshot)
+
+        assert "edited after scan" not in result.prompt_text
+        assert "print(helper())" in result.prompt_text
+
+    def test_security_scan_dung_noi_dung_snapshot(self, workspace):
+        path = str(workspace / "main.py")
+        snapshot = ContentSnapshot([path]).load()
+        (workspace / "main.py").write_text("changed\n", encoding="utf-8")
+        security_check.clear_security_cache()
+        scanned = []
+
+        def fake_scan(content, file_path=None):
+            scanned.append((file_path, content))
+            return []
+
+        try:
+            with (
+                patch.object(security_check, "scan_for_secrets", fake_scan),
+                patch.object(
+                    content_snapshot,
+                    "_read_bytes",
+                    side_effect=AssertionError("khong duoc doc lai"),
+                ),
+            ):
+                security_check.scan_secrets_in_files_cached({path}, snapshot=snapshot)
+        finally:
+            security_check.clear_security_cache()
+
+        assert scanned == [(path, snapshot.get(path).content)]
+        assert "print(helper())" in scanned[0][1]
@@ -165,7 +165,10 @@ class TestCollectFilesErrorHandling:
         f = tmp_path / "unreadable.py"
         f.write_text("content", encoding="utf-8")
 
-        with patch.object(Path, "read_text", side_effect=OSError("Permission denied")):
+        with patch(
+            "domain.prompt.content_snapshot._read_bytes",
+            side_effect=OSError("Permission denied"),
+        ):
             result = collect_files({str(f)})
 
         assert len(result) == 1
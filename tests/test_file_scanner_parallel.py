@@ -0,0 +1,135 @@
+"""
+Tests cho parallel full scan cua FileScanner (ScanConfig.max_workers > 1).
+
+Kiem tra cac truong hop:
+- Tree song song giong het tree tuan tu (thu tu, ignore, quick skip)
+- Parallel scan dung lai workspace snapshot
+- Cancel giua chung van tra ve tree hop le va khong treo
+- Scan khac bat dau giua chung khong lam thieu tree dang scan
+"""
+
+from pathlib import Path
+
+import pytest
+
+from infrastructure.filesystem.file_scanner import (
+    FileScanner,
+    ScanConfig,
+    start_scanning,
+    stop_scanning,
+)
+from infrastructure.filesystem.file_utils import ConcreteDirectoryScanner
+from infrastructure.filesystem.ignore_engine import IgnoreEngine
+from infrastructure.filesystem.scan_snapshot import ScanSnapshotStore
+
+
+def _flatten(item, depth: int = 0) -> list:
+    """Flatten TreeItem theo thu tu duyet (giu thu tu children)."""
+    result = [(depth, item.label, item.path, item.is_dir)]
+    for child in item.children:
+        result.extend(_flatten(child, depth + 1))
+    return result
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Path:
+    root = tmp_path / "ws"
+    root.mkdir()
+    (root / ".gitignore").write_text("*.log\nbuild/\n")
+    for i in range(6):
+        pkg = root / f"pkg{i}" / "sub"
+        pkg.mkdir(parents=True)
+        for j in range(4):
+            (pkg.parent / f"Mod{j}.py").write_text(f"x = {j}\n")
+            (pkg / f"leaf{j}.py").write_text("pass\n")
+        (pkg.parent / "debug.log").write_text("log\n")
+    (root / "pkg0" / ".gitignore").write_text("Mod1.py\n!debug.log\n")
+    (root / "build").mkdir()
+    (root / "build" / "out.py").write_text("pass\n")
+    (root / "node_modules" / "lib").mkdir(parents=True)
+    (root / "node_modules" / "lib" / "index.js").write_text("x\n")
+    (root / "image.bin").write_bytes(b"\x00\x01\x02" * 100)
+    return root
+
+
+class TestParallelScan:
+    """Test suite cho FileScanner._scan_parallel."""
+
+    def test_tree_giong_het_scan_tuan_tu(self, workspace: Path):
+        """Thu tu children, ignore rules va quick skip giong scan tuan tu."""
+        scanner = FileScanner(IgnoreEngine())
+        sequential = scanner.scan(workspace, ScanConfig(max_workers=1))
+        parallel = scanner.scan(workspace, ScanConfig(max_workers=4))
+
+        assert _flatten(parallel) == _flatten(sequential)
+        paths = {entry[2] for entry in _flatten(parallel)}
+        assert str(workspace / "pkg0" / "Mod1.py") not in paths
+        assert str(workspace / "pkg0" / "debug.log") in paths
+        assert str(workspace / "pkg1" / "debug.log") not in paths
+        assert str(workspace / "build") not in paths
+        assert str(workspace / "node_modules") not in paths
+
+    def test_progress_dem_dung(self, workspace: Path):
+        """Progress cuoi cung co so directories/files bang scan tuan tu."""
+        events = []
+        scanner = FileScanner(IgnoreEngine())
+        scanner.scan(workspace, ScanConfig(max_workers=4), events.append)
+        parallel_last = events[-1]
+
+        events.clear()
+        scanner.scan(workspace, ScanConfig(max_workers=1), events.append)
+        sequential_last = events[-1]
+
+        assert parallel_last.directories == sequential_last.directories
+        assert parallel_last.files == sequential_last.files
+
+    def test_parallel_dung_lai_snapshot(self, tmp_path: Path, workspace: Path):
+        """Warm parallel scan dung lai toan bo directories tu snapshot."""
+        events = []
+        scanner = FileScanner(
+            IgnoreEngine(), snapshot_store=ScanSnapshotStore(tmp_path / "snap")
+        )
+        cold = scanner.scan(workspace, ScanConfig(max_workers=4))
+        warm = scanner.scan(workspace, ScanConfig(max_workers=4), events.append)
+
+        assert _flatten(warm) == _flatten(cold)
+        assert events[-1].reused_directories == events[-1].directories
+
+    def test_cancel_giua_chung(self, workspace: Path):
+        """stop_scanning() trong luc scan -> tra ve tree (co the thieu), khong treo."""
+
+        def cancel_on_first_progress(_progress):
+            stop_scanning()
+
+        scanner = FileScanner(IgnoreEngine())
+        tree = scanner.scan(
+            workspace, ScanConfig(max_workers=4), cancel_on_first_progress
+        )
+        assert tree.is_dir
+        assert tree.path == str(workspace)
+
+    def test_scan_khac_bat_dau_khong_lam_thieu_tree(self, workspace: Path):
+        """Scan moi (generation moi) chi chan luu snapshot, khong cat tree cu."""
+        scanner = FileScanner(IgnoreEngine())
+        sequential = scanner.scan(workspace, ScanConfig(max_workers=1))
+
+        started = []
+
+        def start_other_scan(_progress):
+            if not started:
+                started.append(start_scanning())
+
+        parallel = scanner.scan(workspace, ScanConfig(max_workers=4), start_other_scan)
+
+        assert started
+        assert _flatten(parallel) == _flatten(sequential)
+
+    def test_scanner_cua_app_scan_song_song(self, workspace: Path):
+        """ConcreteDirectoryScanner truyen max_workers vao ScanConfig."""
+        sequential = ConcreteDirectoryScanner(IgnoreEngine(), max_workers=1)
+        parallel = ConcreteDirectoryScanner(IgnoreEngine(), max_workers=4)
+
+        assert parallel._scan_config(None, True).max_workers == 4
+        assert _flatten(parallel.scan_directory(workspace)) == _flatten(
+            sequential.scan_directory(workspace)
+        )
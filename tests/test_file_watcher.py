@@ -6,6 +6,7 @@ Test các chức năng:
 - Callback được gọi khi có file change
 """
 
+import os
 import tempfile
 import time
 from pathlib import Path
@@ -127,3 +128,71 @@ class TestFileWatcher:
                 assert watcher.current_path == path2
 
                 watcher.stop()
+
+
+class TestGitIgnoreStrategy:
+    """Test GitIgnoreStrategy dung chung IgnoreMatcher voi scanner."""
+
+    def _make_strategy(self, root: Path):
+        from infrastructure.filesystem.file_watcher.ignore_strategies import (
+            GitIgnoreStrategy,
+        )
+        from infrastructure.filesystem.ignore_engine import IgnoreEngine
+
+        engine = IgnoreEngine()
+        matcher = engine.compile_matcher(root, use_default_ignores=False)
+        return GitIgnoreStrategy(root, matcher, engine, use_default_ignores=False)
+
+    def test_ignore_file_va_directory_theo_gitignore(self, tmp_path):
+        """Event trong directory bi ignore hoac file bi ignore bi bo qua."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".gitignore").write_text("out/\n*.log\n")
+        strategy = self._make_strategy(tmp_path)
+
+        assert strategy.should_ignore(str(tmp_path / "out" / "a.js"))
+        assert strategy.should_ignore(str(tmp_path / "src" / "debug.log"))
+        assert not strategy.should_ignore(str(tmp_path / "src" / "main.py"))
+        assert not strategy.should_ignore("/somewhere/else/debug.log")
+
+    def test_sua_nested_gitignore_reset_cache(self, tmp_path):
+        """Event tren .gitignore khong bi ignore va lam luat moi co hieu luc."""
+        (tmp_path / ".git").mkdir()
+        src = tmp_path / "src"
+        src.mkdir()
+        strategy = self._make_strategy(tmp_path)
+        assert not strategy.should_ignore(str(src / "gen.py"))
+
+        (src / ".gitignore").write_text("gen.py\n")
+        assert not strategy.should_ignore(str(src / ".gitignore"))
+        assert strategy.should_ignore(str(src / "gen.py"))
+
+    def test_sua_gitignore_root_compile_lai_root_matcher(self, tmp_path):
+        """Sua .gitignore o root -> luat moi co hieu luc ngay."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".gitignore").write_text("*.log\n")
+        strategy = self._make_strategy(tmp_path)
+        assert not strategy.should_ignore(str(tmp_path / "a.tmp"))
+
+        (tmp_path / ".gitignore").write_text("*.tmp\n")
+        os.utime(tmp_path / ".gitignore", (1, 1))
+        assert not strategy.should_ignore(str(tmp_path / ".gitignore"))
+
+        assert strategy.should_ignore(str(tmp_path / "a.tmp"))
+        assert not strategy.should_ignore(str(tmp_path / "a.log"))
+
+    def test_composite_ket_hop_default(self, tmp_path):
+        """CompositeIgnoreStrategy ignore neu bat ky strategy nao ignore."""
+        from infrastructure.filesystem.file_watcher.ignore_strategies import (
+            CompositeIgnoreStrategy,
+            DefaultIgnoreStrategy,
+        )
+
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".gitignore").write_text("*.tmp\n")
+        strategy = CompositeIgnoreStrategy(
+            [DefaultIgnoreStrategy(), self._make_strategy(tmp_path)]
+        )
+
+        assert strategy.should_ignore(str(tmp_path / "node_modules" / "x.js"))
+        assert strategy.should_ignore(str(tmp_path / "a.tmp"))
+        assert not strategy.should_ignore(str(tmp_path / "a.py"))
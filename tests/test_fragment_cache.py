@@ -0,0 +1,264 @@
+"""
+Tests cho fragment-level prompt cache (domain.prompt.fragment_cache).
+
+Kiem tra:
+- Generator co/khong co fragment cache cho cung output (xml, plain, smart,
+  codemap), ca khi cache lanh va khi da am
+- Build lan 2 khong doc/render lai file khong doi; them 1 file chi render
+  file do; sua file thi fragment cu het hieu luc
+- Token count ghep tu fragment khop voi dem khong cache
+- LRU theo so ky tu, doi model xoa cache, invalidate_path
+"""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import domain.prompt.content_snapshot as content_snapshot
+from application.services.prompt_build_service import PromptBuildService
+from domain.prompt.content_snapshot import ContentSnapshot
+from domain.prompt.fragment_cache import FileFragment, FragmentCache
+from domain.prompt.generator import (
+    generate_file_contents_plain,
+    generate_file_contents_xml,
+    generate_smart_context,
+)
+from domain.prompt.token_ledger import TokenLedger
+from infrastructure.adapters.encoder_registry import get_tokenization_service
+
+
+class _WordTokenizer:
+    def __init__(self):
+        self.generation = 0
+
+    def count_tokens(self, text):
+        return len(text.split())
+
+    def model_generation(self):
+        return self.generation
+
+
+def _write(path: Path, content: str) -> Path:
+    path.write_text(content, encoding="utf-8")
+    # Lui mtime de khong roi vao racy window
+    old = time.time() - 60
+    os.utime(path, (old, old))
+    return path
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Path:
+    _write(tmp_path / "main.py", "from utils import helper\n\nprint(helper())\n")
+    _write(tmp_path / "utils.py", "def helper():\n    return 'ok'\n" * 5)
+    _write(tmp_path / "notes.md", "# Notes\n\nSome ]]> text\n")
+    _write(tmp_path / "logo.png", "\x89PNG")
+    return tmp_path
+
+
+def _paths(workspace: Path) -> set[str]:
+    return {str(p) for p in workspace.iterdir()}
+
+
+def _session(cache: FragmentCache, paths):
+    return cache.session(ContentSnapshot(paths))
+
+
+@pytest.mark.parametrize(
+    "generate, kwargs",
+    [
+        (generate_file_contents_xml, {}),
+        (generate_file_contents_plain, {}),
+        (generate_smart_context, {}),
+        (generate_file_contents_xml, {"codemap": True}),
+        (generate_file_contents_plain, {"codemap": True}),
+    ],
+)
+@pytest.mark.parametrize("relative", [False, True])
+def test_output_giong_khong_cache(workspace, generate, kwargs, relative):
+    paths = _paths(workspace)
+    args = dict(workspace_root=workspace, use_relative_paths=relative)
+    if kwargs.get("codemap"):
+        args["codemap_paths"] = {str(workspace / "utils.py")}
+    cache = FragmentCache(TokenLedger(_WordTokenizer()))
+
+    expected = generate(paths, **args)
+    cold = generate(paths, **args, fragments=_session(cache, paths))
+    warm = generate(paths, **args, fragments=_session(cache, paths))
+
+    assert cold == expected
+    assert warm == expected
+    assert cache.hits > 0
+
+
+def test_segments_theo_thu_tu_va_dem_dung(workspace):
+    paths = _paths(workspace)
+    tokenizer = _WordTokenizer()
+    cache = FragmentCache(TokenLedger(tokenizer))
+    session = _session(cache, paths)
+
+    text = generate_file_contents_xml(
+        paths, workspace_root=workspace, fragments=session
+    )
+
+    segments = session.segments()
+    positions = [text.find(block) for block, _ in segments]
+    assert positions == sorted(positions) and -1 not in positions
+    assert all(tokens == len(block.split()) for block, tokens in segments)
+
+
+class TestBuildWithFragments:
+    def _build(self, service, files, workspace, **kwargs):
+        return service.build_prompt_full(
+            file_paths=files,
+            workspace=workspace,
+            instructions="Review",
+            output_format=kwargs.pop("output_format", "xml"),
+            include_git_changes=False,
+            use_relative_paths=True,
+            **kwargs,
+        )
+
+    def test_build_lan_2_khong_doc_va_render_lai(self, workspace):
+        service = PromptBuildService(tokenization_service=get_tokenization_service())
+        files = [workspace / "main.py", workspace / "utils.py"]
+        first = self._build(service, files, workspace)
+
+        with (
+            patch.object(
+                content_snapshot,
+                "_read_bytes",
+                side_effect=AssertionError("khong duoc doc lai"),
+            ),
+            patch(
+                "domain.prompt.generator.collect_files",
+                side_effect=AssertionError("khong duoc render lai"),
+            ),
+        ):
+            second = self._build(service, files, workspace)
+
+        assert second.prompt_text == first.prompt_text
+        assert second.total_tokens == first.total_tokens
+        assert [f.tokens for f in second.files] == [f.tokens for f in first.files]
+
+    def test_them_1_file_chi_doc_file_do(self, workspace):
+        service = PromptBuildService(tokenization_service=get_tokenization_service())
+        files = [workspace / "main.py", workspace / "utils.py"]
+        self._build(service, files, workspace)
+        reads = []
+        real = content_snapshot._read_bytes
+
+        def counting(path_str, size):
+            reads.append(path_str)
+            return real(path_str, size)
+
+        with patch.object(content_snapshot, "_read_bytes", side_effect=counting):
+            result = self._build(service, files + [workspace / "notes.md"], workspace)
+
+        assert reads == [str(workspace / "notes.md")]
+        assert "Some ]]]]><![CDATA[> text" in result.prompt_text
+
+    def test_sua_file_lam_fragment_het_hieu_luc(self, workspace):
+        service = PromptBuildService(tokenization_service=get_tokenization_service())
+        files = [workspace / "main.py", workspace / "utils.py"]
+        self._build(service, files, workspace, output_format="plain")
+
+        _write(workspace / "main.py", "print('edited')\n")
+        result = self._build(service, files, workspace, output_format="plain")
+
+        assert "print('edited')" in result.prompt_text
+        assert "print(helper())" not in result.prompt_text
+
+    @pytest.mark.parametrize("output_format", ["xml", "plain", "compress"])
+    def test_token_giong_service_khong_cache(self, workspace, output_format):
+        files = [workspace / "main.py", workspace / "utils.py", workspace / "notes.md"]
+        cached = PromptBuildService(tokenization_service=get_tokenization_service())
+        self._build(cached, files, workspace, output_format=output_format)
+        warm = self._build(cached, files, workspace, output_format=output_format)
+        cold = PromptBuildService(tokenization_service=get_tokenization_service())
+        cold.fragment_cache._max_chars = 0  # khong giu fragment nao
+        expected = self._build(cold, files, workspace, output_format=output_format)
+
+        assert warm.prompt_text == expected.prompt_text
+        assert abs(warm.total_tokens - expected.total_tokens) <= 5
+        assert [(f.path, f.tokens) for f in warm.files] == [
+            (f.path, f.tokens) for f in expected.files
+        ]
+
+
+class TestFragmentCache:
+    def _fill(self, cache, workspace, names):
+        paths = {str(workspace / name) for name in names}
+        session = _session(cache, paths)
+        generate_file_contents_xml(paths, workspace_root=workspace, fragments=session)
+
+    def test_lru_theo_so_ky_tu(self, workspace):
+        cache = FragmentCache(TokenLedger(_WordTokenizer()), max_chars=700)
+
+        self._fill(cache, workspace, ["main.py", "utils.py", "notes.md"])
+
+        assert 0 < len(cache) < 3
+        assert cache._chars <= 700
+
+    def test_doi_model_xoa_cache(self, workspace):
+        tokenizer = _WordTokenizer()
+        cache = FragmentCache(TokenLedger(tokenizer))
+        self._fill(cache, workspace, ["main.py", "utils.py"])
+        assert len(cache) == 2
+
+        tokenizer.generation += 1
+        self._fill(cache, workspace, ["main.py"])
+
+        assert len(cache) == 1
+
+    def test_invalidate_path(self, workspace):
+        cache = FragmentCache(TokenLedger(_WordTokenizer()))
+        self._fill(cache, workspace, ["main.py", "utils.py"])
+
+        cache.invalidate_path(str(workspace / "main.py"))
+        assert len(cache) == 1
+
+        # File moi tao co the doi <dependencies> cua file khac -> xoa het
+        (workspace / "new.py").write_text("x = 1\n")
+        cache.invalidate_path(str(workspace / "new.py"), created=True)
+        assert len(cache) == 0
+
+    def test_sua_file_chua_cache_khong_xoa(self, workspace):
+        cache = FragmentCache(TokenLedger(_WordTokenizer()))
+        self._fill(cache, workspace, ["main.py"])
+        other = workspace / "other.py"
+        other.write_text("y = 2\n")
+
+        cache.invalidate_path(str(other))
+
+        assert len(cache) == 1
+
+    def test_xoa_file_xoa_het(self, workspace):
+        cache = FragmentCache(TokenLedger(_WordTokenizer()))
+        self._fill(cache, workspace, ["main.py"])
+
+        # File da xoa co the la import cua file khac (ca khi chua cache)
+        cache.invalidate_path(str(workspace / "gone.py"))
+
+        assert len(cache) == 0
+
+    def test_file_khong_co_noi_dung_khong_cache(self, workspace):
+        cache = FragmentCache(TokenLedger(_WordTokenizer()))
+        path = str(workspace / "logo.png")
+        session = _session(cache, [path])
+
+        fragment = session.fragment(path, "xml", 1024, lambda entry: "<skipped/>")
+
+        assert fragment == FileFragment("<skipped/>", 1)
+        assert len(cache) == 0
+
+
+def test_ledger_dung_count_da_biet():
+    ledger = TokenLedger(_WordTokenizer())
+    block = "word " * 40
+
+    total = ledger.count_composite(f"<a>{block}</a>", [(block, 1000)])
+
+    assert total == 1000 + 2
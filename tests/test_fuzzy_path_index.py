@@ -0,0 +1,140 @@
+"""
+Tests cho application.services.fuzzy_path_index.
+
+Kiem tra cac truong hop:
+- Match subsequence, case-insensitive, khong match
+- Xep hang: basename/lien tiep/boundary truoc match rai rac
+- Top-K va last_match_count
+- Thu hep tang dan khi go them / xoa ky tu
+- add/remove/compact giu ket qua dung
+"""
+
+from unittest.mock import patch
+
+from application.services import fuzzy_path_index as fuzzy_module
+from application.services.fuzzy_path_index import FuzzyPathIndex, common_root
+
+ROOT = "/ws"
+
+
+def _index(*rel_paths: str) -> FuzzyPathIndex:
+    return FuzzyPathIndex([f"{ROOT}/{rel}" for rel in rel_paths], root=ROOT)
+
+
+def _rel(paths):
+    return [p[len(ROOT) + 1 :] for p in paths]
+
+
+class TestMatching:
+    def test_subsequence_va_case_insensitive(self):
+        index = _index("src/fuzzy_path_index.py", "src/main.py", "README.md")
+
+        assert _rel(index.search("FPI")) == ["src/fuzzy_path_index.py"]
+        assert _rel(index.search("readme")) == ["README.md"]
+        assert index.search("xyz") == []
+        assert index.search("   ") == []
+
+    def test_khong_match_theo_root(self):
+        """Root workspace khong tham gia match."""
+        index = _index("a.py")
+        assert index.search("ws") == []
+
+
+class TestRanking:
+    def test_basename_truoc_thu_muc(self):
+        index = _index("config/app.py", "src/config.py")
+
+        assert _rel(index.search("config")) == ["src/config.py", "config/app.py"]
+
+    def test_lien_tiep_truoc_rai_rac(self):
+        index = _index("main_test.py", "m_a_i_n.py")
+
+        assert _rel(index.search("main")) == ["main_test.py", "m_a_i_n.py"]
+
+    def test_boundary_va_camel_case(self):
+        index = _index("src/TokenService.py", "src/tokenservice_helpers.py")
+
+        assert _rel(index.search("ts"))[0] == "src/TokenService.py"
+
+    def test_cung_diem_path_ngan_roi_alphabet(self):
+        index = _index("b/config.json", "a/config.json", "long/dir/config.json")
+
+        assert _rel(index.search("config")) == [
+            "a/config.json",
+            "b/config.json",
+            "long/dir/config.json",
+        ]
+
+
+class TestTopK:
+    def test_limit_va_match_count(self):
+        index = _index(*(f"dir/file_{i}.py" for i in range(50)), "file.py")
+
+        results = index.search("file", limit=5)
+
+        assert len(results) == 5
+        assert _rel(results)[0] == "file.py"
+        assert index.last_match_count == 51
+
+    def test_tier_lon_chi_cham_path_ngan_nhat(self):
+        index = _index("aaaa/long_name_x.py", "x.py", "b/x.py")
+
+        with patch.object(fuzzy_module, "MAX_SCORED_PER_TIER", 2):
+            results = index.search("x", limit=2)
+
+        assert _rel(results) == ["x.py", "b/x.py"]
+
+
+class TestNarrowing:
+    def test_query_mo_rong_chi_loc_ung_vien_truoc(self):
+        index = _index("alpha.py", "beta.py", "alphabet.py")
+        index.search("al")
+        # beta.py da bi loai o buoc "al": du text doi cung khong duoc xet lai
+        index._texts[1] = "alphx.py"
+
+        assert _rel(index.search("alph")) == ["alpha.py", "alphabet.py"]
+
+    def test_xoa_ky_tu_dung_lai_buoc_truoc(self):
+        index = _index("alpha.py", "beta.py")
+        index.search("a")
+        index.search("alp")
+
+        with patch.object(
+            fuzzy_module,
+            "_subsequence_pattern",
+            wraps=fuzzy_module._subsequence_pattern,
+        ) as compile_query:
+            assert _rel(index.search("a")) == ["alpha.py", "beta.py"]
+        # Chi compile de cham diem, khong quet lai de thu hep
+        assert compile_query.call_count == 1
+
+    def test_query_khac_nhanh_quet_lai(self):
+        index = _index("alpha.py", "beta.py")
+        index.search("alp")
+
+        assert _rel(index.search("bet")) == ["beta.py"]
+
+
+class TestMutation:
+    def test_add_remove(self):
+        index = _index("old.py")
+        index.search("py")
+
+        index.add(f"{ROOT}/new.py")
+        index.remove(f"{ROOT}/old.py")
+
+        assert _rel(index.search("py")) == ["new.py"]
+        assert len(index) == 1
+
+    def test_compact_giu_ket_qua(self):
+        index = _index(*(f"f{i}.py" for i in range(8)))
+        for i in range(4):
+            index.remove(f"{ROOT}/f{i}.py")
+
+        assert index._dead == 0
+        assert _rel(index.search("f")) == [f"f{i}.py" for i in range(4, 8)]
+
+
+def test_common_root():
+    assert common_root(["/ws/a/x.py", "/ws/b/y.py"]) == "/ws"
+    assert common_root([]) == ""
@@ -0,0 +1,184 @@
+"""
+Tests cho infrastructure.git.git_index va git index mode cua FileScanner /
+WorkspaceCatalogService.
+
+Kiem tra cac truong hop:
+- Tracked + untracked khong bi ignore, bo file da xoa va file bi ignore
+- Loc them default ignores / excluded patterns qua matcher
+- Folder khong phai git repo -> None, scanner/catalog fallback walker
+- Tree tu git index giong het tree cua walker
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from application.services import workspace_config
+from application.services.workspace_catalog import WorkspaceCatalogService
+from infrastructure.filesystem.file_scanner import FileScanner, ScanConfig
+from infrastructure.filesystem.ignore_engine import IgnoreEngine
+from infrastructure.git.git_index import list_git_files
+from infrastructure.git.git_utils import GitService
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("git") is None, reason="git is not installed"
+)
+
+
+def _git(root: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=root,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _flatten(item, depth: int = 0) -> list:
+    """Flatten TreeItem theo thu tu duyet (giu thu tu children)."""
+    result = [(depth, item.label, item.path, item.is_dir)]
+    for child in item.children:
+        result.extend(_flatten(child, depth + 1))
+    return result
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / ".gitignore").write_text("*.log\nbuild/\n")
+    for i in range(3):
+        pkg = root / f"Pkg{i}" / "sub"
+        pkg.mkdir(parents=True)
+        (pkg.parent / "mod.py").write_text("x = 1\n")
+        (pkg / "leaf.py").write_text("pass\n")
+        (pkg.parent / "debug.log").write_text("log\n")
+    (root / "Pkg0" / ".gitignore").write_text("mod.py\n")
+    (root / "build").mkdir()
+    (root / "build" / "out.py").write_text("pass\n")
+    (root / "node_modules" / "lib").mkdir(parents=True)
+    (root / "node_modules" / "lib" / "index.js").write_text("x\n")
+    (root / "image.bin").write_bytes(b"\x00\x01\x02" * 100)
+    (root / "README.md").write_text("# repo\n")
+    _git(root, "init", "-q")
+    _git(root, "add", ".")
+    _git(root, "commit", "-qm", "init")
+    return root
+
+
+class TestListGitFiles:
+    """Test suite cho list_git_files."""
+
+    def test_tracked_untracked_va_deleted(self, repo: Path):
+        (repo / "new.py").write_text("pass\n")
+        (repo / "scratch.log").write_text("log\n")
+        (repo / "README.md").unlink()
+
+        files = set(list_git_files(repo))
+
+        assert "new.py" in files
+        assert "Pkg1/sub/leaf.py" in files
+        assert "README.md" not in files
+        assert "scratch.log" not in files
+        assert "Pkg0/mod.py" not in files
+        assert not any(path.startswith("build/") for path in files)
+
+    def test_matcher_loc_default_ignores(self, repo: Path):
+        matcher = IgnoreEngine().compile_matcher(
+            repo, excluded_patterns=["Pkg2"], use_gitignore=False
+        )
+
+        files = set(list_git_files(repo, matcher))
+
+        assert not any(path.startswith("node_modules/") for path in files)
+        assert not any(path.startswith("Pkg2/") for path in files)
+        assert "Pkg1/mod.py" in files
+
+    def test_workspace_la_thu_muc_con(self, repo: Path):
+        assert sorted(list_git_files(repo / "Pkg1")) == ["mod.py", "sub/leaf.py"]
+
+    def test_khong_phai_git_repo(self, tmp_path: Path):
+        (tmp_path / "plain").mkdir()
+        (tmp_path / "plain" / "a.py").write_text("pass\n")
+
+        assert list_git_files(tmp_path / "plain") is None
+
+
+class TestFileScannerGitIndex:
+    """FileScanner voi ScanConfig.use_git_index."""
+
+    def test_tree_giong_walker(self, repo: Path):
+        scanner = FileScanner(IgnoreEngine())
+        walked = scanner.scan(repo, ScanConfig())
+        indexed = scanner.scan(repo, ScanConfig(use_git_index=True))
+
+        assert _flatten(indexed) == _flatten(walked)
+
+    def test_fallback_walker_khi_khong_phai_git_repo(self, tmp_path: Path):
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "a.py").write_text("pass\n")
+        scanner = FileScanner(IgnoreEngine())
+
+        tree = scanner.scan(tmp_path, ScanConfig(use_git_index=True))
+
+        assert [child.label for child in tree.children] == ["src"]
+        assert [child.label for child in tree.children[0].children] == ["a.py"]
+
+
+class TestDirectoryScannerGitIndex:
+    """Scanner cua app theo setting use_git_index."""
+
+    @pytest.mark.parametrize("enabled", [True, False])
+    def test_theo_setting(self, repo: Path, monkeypatch, enabled):
+        from infrastructure.filesystem.file_utils import ConcreteDirectoryScanner
+
+        monkeypatch.setattr(workspace_config, "get_use_git_index", lambda: enabled)
+        calls = []
+        real_scan_git_index = FileScanner._scan_git_index
+
+        def scan_git_index(self, *args):
+            calls.append(args[0])
+            return real_scan_git_index(self, *args)
+
+        monkeypatch.setattr(FileScanner, "_scan_git_index", scan_git_index)
+        walked = FileScanner(IgnoreEngine()).scan(repo, ScanConfig())
+
+        tree = ConcreteDirectoryScanner(IgnoreEngine()).scan_directory(repo)
+
+        assert calls == ([repo.resolve()] if enabled else [])
+        assert _flatten(tree) == _flatten(walked)
+
+
+class TestWorkspaceCatalogGitIndex:
+    """WorkspaceCatalogService khi bat setting use_git_index."""
+
+    def test_catalog_tu_git_index(self, repo: Path, monkeypatch):
+        monkeypatch.setattr(workspace_config, "get_use_git_index", lambda: True)
+        (repo / "new.py").write_text("pass\n")
+        service = WorkspaceCatalogService(IgnoreEngine(), git_service=GitService())
+
+        catalog = service.get_catalog(repo)
+
+        assert catalog.git_indexed
+        assert catalog.get("new.py") is not None
+        assert catalog.get("Pkg0/sub/leaf.py") is not None
+        assert catalog.get("build/out.py") is None
+        assert catalog.get("node_modules/lib/index.js") is None
+
+    def test_doi_setting_build_lai(self, repo: Path, monkeypatch):
+        use_git_index = [False]
+        monkeypatch.setattr(
+            workspace_config, "get_use_git_index", lambda: use_git_index[0]
+        )
+        service = WorkspaceCatalogService(IgnoreEngine(), git_service=GitService())
+        walked = service.get_catalog(repo)
+
+        use_git_index[0] = True
+        indexed = service.get_catalog(repo)
+
+        assert indexed is not walked
+        assert sorted(e.rel_path for e in indexed.entries()) == sorted(
+            e.rel_path for e in walked.entries()
+        )
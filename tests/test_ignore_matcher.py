@@ -0,0 +1,186 @@
+"""
+Tests cho infrastructure.filesystem.ignore_matcher va cac API matcher cua IgnoreEngine.
+
+Kiem tra cac truong hop:
+- Ket qua giong het cach duyet reversed(spec_stack) bang pathspec truoc day
+- Negation (!pattern) o .gitignore long nhau
+- Workspace nam trong git repo cha (prefix)
+- descend_matcher / matcher_for_directory
+- Path dung separator native (Windows)
+"""
+
+import os
+from pathlib import Path
+
+import pathspec
+import pytest
+
+import infrastructure.filesystem.ignore_matcher as ignore_matcher_module
+from infrastructure.filesystem.ignore_engine import IgnoreEngine
+from infrastructure.filesystem.ignore_matcher import IgnoreMatcher, _required_literal
+
+
+def _spec_stack_ignored(levels, rel_path: str, is_dir: bool = False) -> bool:
+    """Cach cu: duyet spec_stack tu level sau cung, moi level rel tu base cua no."""
+    for base, spec in reversed(levels):
+        if base and not rel_path.startswith(base + "/"):
+            continue
+        local = rel_path[len(base) + 1 :] if base else rel_path
+        if is_dir:
+            local += "/"
+        result = spec.check_file(local)
+        if result.include is not None:
+            return bool(result.include)
+    return False
+
+
+class TestIgnoreMatcher:
+    """Test suite cho IgnoreMatcher."""
+
+    ROOT_PATTERNS = [".git", "node_modules", "*.log", "build/", "!keep.log", "/dist"]
+    NESTED_PATTERNS = ["*.tmp", "!important.tmp", "generated/", "!debug.log"]
+
+    PATHS = [
+        ("main.py", False),
+        ("app.log", False),
+        ("keep.log", False),
+        ("src/keep.log", False),
+        ("node_modules", True),
+        ("src/node_modules", True),
+        ("build", True),
+        ("build", False),
+        ("dist", True),
+        ("src/dist", True),
+        ("src/a.tmp", False),
+        ("src/important.tmp", False),
+        ("src/debug.log", False),
+        ("src/generated", True),
+        ("src/pkg/generated", True),
+        ("other/a.tmp", False),
+        ("other/debug.log", False),
+    ]
+
+    def test_giong_het_spec_stack(self):
+        """Moi path cho ket qua giong cach duyet reversed(spec_stack)."""
+        levels = [
+            ("", pathspec.PathSpec.from_lines("gitignore", self.ROOT_PATTERNS)),
+            ("src", pathspec.PathSpec.from_lines("gitignore", self.NESTED_PATTERNS)),
+        ]
+        matcher = IgnoreMatcher.for_workspace(self.ROOT_PATTERNS).descend(
+            "src", self.NESTED_PATTERNS
+        )
+
+        for rel_path, is_dir in self.PATHS:
+            expected = _spec_stack_ignored(levels, rel_path, is_dir)
+            assert matcher.is_ignored(rel_path, is_dir=is_dir) == expected, rel_path
+
+    def test_nested_negation_override_root(self):
+        """!pattern o .gitignore long nhau bo ignore cua root cho subtree do."""
+        matcher = IgnoreMatcher.for_workspace(["*.log"]).descend("src", ["!debug.log"])
+        assert not matcher.is_ignored("src/debug.log")
+        assert matcher.is_ignored("src/other.log")
+        assert matcher.is_ignored("debug.log")
+
+    def test_descend_khong_pattern_tra_ve_chinh_no(self):
+        """Directory khong co rule moi dung lai matcher cha."""
+        matcher = IgnoreMatcher.for_workspace(["*.log"])
+        assert matcher.descend("src", []) is matcher
+        assert matcher.descend("src", ["# comment"]) is matcher
+
+    def test_parent_git_root_prefix(self):
+        """Rules cua git root cha match theo duong dan tu git root."""
+        matcher = IgnoreMatcher.for_workspace(
+            ["*.log"], parent_patterns=["/ws/secret.txt", "cache/"], prefix="ws/"
+        )
+        assert matcher.is_ignored("secret.txt")
+        assert not matcher.is_ignored("sub/secret.txt")
+        assert matcher.is_ignored("cache", is_dir=True)
+        assert matcher.is_ignored("a.log")
+
+    def test_windows_separator(self, monkeypatch):
+        """Path voi separator native van match nhu posix."""
+        monkeypatch.setattr(ignore_matcher_module, "_NATIVE_SEP", "\\")
+        matcher = IgnoreMatcher.for_workspace(["/build/out"]).descend("src", ["*.tmp"])
+        assert matcher.is_ignored("build\\out")
+        assert matcher.is_ignored("src\\deep\\a.tmp")
+        assert not matcher.is_ignored("lib\\a.tmp")
+
+    @pytest.mark.parametrize(
+        "line, literal",
+        [
+            ("node_modules", "node_modules"),
+            ("*.log", ".log"),
+            ("!build/", "build"),
+            ("**/[Tt]emp/*.cache", ".cache"),
+            ("foo\\*bar", ""),
+            ("*", ""),
+        ],
+    )
+    def test_required_literal(self, line: str, literal: str):
+        """Literal bat buoc la doan khong chua glob dai nhat."""
+        assert _required_literal(line) == literal
+
+
+class TestIgnoreEngineMatcher:
+    """Test suite cho compile_matcher / descend_matcher / matcher_for_directory."""
+
+    def test_compile_matcher_co_cache(self, tmp_path: Path):
+        """Cung patterns -> tra ve cung matcher object."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".gitignore").write_text("*.log\n")
+        engine = IgnoreEngine()
+        first = engine.compile_matcher(tmp_path, use_default_ignores=False)
+        assert engine.compile_matcher(tmp_path, use_default_ignores=False) is first
+        assert first.is_ignored("a.log")
+
+        (tmp_path / ".gitignore").write_text("*.tmp\n")
+        os.utime(tmp_path / ".gitignore", (1, 1))
+        second = engine.compile_matcher(tmp_path, use_default_ignores=False)
+        assert second is not first
+        assert second.is_ignored("a.tmp")
+        assert not second.is_ignored("a.log")
+
+    def test_matcher_cache_gioi_han_lru(self, tmp_path: Path, monkeypatch):
+        """Cache giu toi da MAX_MATCHER_CACHE matcher, bo entry dung lau nhat."""
+        import infrastructure.filesystem.ignore_engine as ignore_engine_module
+
+        monkeypatch.setattr(ignore_engine_module, "MAX_MATCHER_CACHE", 2)
+        engine = IgnoreEngine()
+        first = engine.compile_matcher(tmp_path, excluded_patterns=["a"])
+        engine.compile_matcher(tmp_path, excluded_patterns=["b"])
+        assert engine.compile_matcher(tmp_path, excluded_patterns=["a"]) is first
+
+        engine.compile_matcher(tmp_path, excluded_patterns=["c"])
+
+        assert len(engine._matcher_cache) == 2
+        assert engine.compile_matcher(tmp_path, excluded_patterns=["a"]) is first
+
+    def test_workspace_trong_repo_cha(self, tmp_path: Path):
+        """Rules cua .gitignore o git root cha van ap dung cho workspace con."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".gitignore").write_text("/ws/secret.txt\n")
+        workspace = tmp_path / "ws"
+        workspace.mkdir()
+
+        matcher = IgnoreEngine().compile_matcher(workspace, use_default_ignores=False)
+        assert matcher.is_ignored("secret.txt")
+        assert not matcher.is_ignored("public.txt")
+
+    def test_matcher_for_directory_gom_gitignore_tren_duong(self, tmp_path: Path):
+        """Matcher cua folder con gom .gitignore cua cac folder cha."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "a" / ".gitignore").write_text("*.gen\n")
+        (tmp_path / "a" / "b" / ".gitignore").write_text("!keep.gen\n")
+
+        engine = IgnoreEngine()
+        matcher = engine.matcher_for_directory(
+            tmp_path, tmp_path / "a" / "b", use_default_ignores=False
+        )
+        assert matcher.is_ignored("a/b/x.gen")
+        assert not matcher.is_ignored("a/b/keep.gen")
+
+        root_matcher = engine.compile_matcher(tmp_path, use_default_ignores=False)
+        assert not root_matcher.is_ignored("a/b/x.gen")
+        descended = engine.descend_matcher(root_matcher, tmp_path / "a", "a")
+        assert descended.is_ignored("a/x.gen")
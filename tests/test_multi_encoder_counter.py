@@ -0,0 +1,128 @@
+"""Tests cho MultiEncoderCounter: dem 1 selection tren nhieu tokenizer."""
+
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+from domain.config.model_config import ModelConfig
+from infrastructure.adapters import multi_encoder_counter as mec
+from infrastructure.adapters.encoders import load_encoder, reset_encoder
+from infrastructure.adapters.multi_encoder_counter import MultiEncoderCounter
+from infrastructure.adapters.tokenization_service import TokenizationService
+from infrastructure.persistence.token_count_store import TokenCountStore
+
+
+class FakeEncoder:
+    """Encoder gia: "words" tach theo khoang trang, "chars" theo ky tu."""
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.calls = 0
+
+    def encode(self, text):
+        self.calls += 1
+        return text.split() if self.mode == "words" else list(text)
+
+
+@pytest.fixture
+def encoders():
+    fakes = {"repo/words": FakeEncoder("words"), "repo/chars": FakeEncoder("chars")}
+    with patch.object(
+        mec, "load_encoder", side_effect=lambda repo: (fakes[repo], "tiktoken")
+    ):
+        yield fakes
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"mod_{i}.py"
+        path.write_text(f"value_{i} = compute({i}) + offset\n" * (i + 1))
+        paths.append(path)
+    (tmp_path / "empty.py").write_text("")
+    paths.append(tmp_path / "empty.py")
+    return paths
+
+
+def test_counts_each_encoder_and_reads_files_once(encoders, files):
+    counter = MultiEncoderCounter()
+
+    with patch.object(mec, "read_file_mmap", wraps=mec.read_file_mmap) as reader:
+        counts = counter.count_files(files, ["repo/words", "repo/chars", "repo/words"])
+
+    assert set(counts) == {"repo/words", "repo/chars"}
+    for path in files:
+        text = path.read_text()
+        assert counts["repo/words"][str(path)] == len(text.split())
+        assert counts["repo/chars"][str(path)] == len(text)
+    reads = Counter(str(call.args[0]) for call in reader.call_args_list)
+    assert reads and set(reads.values()) == {1}
+
+
+def test_second_count_served_from_cache(encoders, files):
+    counter = MultiEncoderCounter()
+    first = counter.count_files(files, ["repo/words", "repo/chars"])
+    calls = {repo: fake.calls for repo, fake in encoders.items()}
+
+    assert counter.count_files(files, ["repo/words", "repo/chars"]) == first
+    assert {repo: fake.calls for repo, fake in encoders.items()} == calls
+
+
+def test_count_store_shared_between_counters(encoders, files, tmp_path):
+    store = TokenCountStore(tmp_path / "cache")
+    try:
+        first = MultiEncoderCounter(count_store=store).count_files(
+            files, ["repo/words"]
+        )
+        calls = encoders["repo/words"].calls
+        second = MultiEncoderCounter(count_store=store).count_files(
+            files, ["repo/words"]
+        )
+    finally:
+        store.close()
+
+    assert second == first
+    assert encoders["repo/words"].calls == calls
+
+
+def test_compare_models_groups_by_tokenizer(encoders, files):
+    models = [
+        ModelConfig(id="a", name="A", context_length=10, tokenizer_repo="repo/chars"),
+        ModelConfig(
+            id="b", name="B", context_length=10**6, tokenizer_repo="repo/chars"
+        ),
+        ModelConfig(id="c", name="C", context_length=100, tokenizer_repo="repo/words"),
+    ]
+    totals = MultiEncoderCounter().compare_models(files, models)
+
+    chars = sum(len(p.read_text()) for p in files)
+    words = sum(len(p.read_text().split()) for p in files)
+    assert [(t.model_id, t.tokens) for t in totals] == [
+        ("a", chars),
+        ("b", chars),
+        ("c", words),
+    ]
+    assert not totals[0].fits and totals[1].fits and totals[2].fits
+    assert encoders["repo/chars"].calls == 3
+
+
+def test_matches_tokenization_service_for_openai(files):
+    service = TokenizationService()
+    if service._get_or_create_encoder() is None:
+        pytest.skip("no encoder available")
+
+    counts = MultiEncoderCounter().count_files(files, [None])[None]
+
+    for path in files:
+        assert counts[str(path)] == service.count_tokens_for_file(path)
+
+
+def test_load_encoder_survives_model_reset():
+    encoder, encoder_type = load_encoder(None)
+    if encoder is None:
+        pytest.skip("no encoder available")
+
+    reset_encoder()
+    assert load_encoder(None) == (encoder, encoder_type)
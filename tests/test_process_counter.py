@@ -0,0 +1,188 @@
+"""
+Tests cho infrastructure.adapters.process_counter (dem token bang process pool).
+
+Kiem tra cac truong hop:
+- count_batch trong worker: count khop TokenizationService, bo qua binary
+- Worker khong co encoder cung loai -> raise de parent fallback
+- count_tokens_process_pool: file hit cache khong gui sang worker
+- TokenizationService chon process pool tren nguong, fallback khi pool loi
+- get_worker_count biet encoder co nha GIL khong
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import infrastructure.adapters.process_counter as process_counter
+import infrastructure.adapters.tokenization_service as service_module
+from domain.tokenization.batch import GIL_BOUND_MAX_WORKERS, get_worker_count
+from domain.tokenization.cancellation import start_token_counting
+from infrastructure.adapters.encoders import encoder_releases_gil
+from infrastructure.adapters.tokenization_service import TokenizationService
+from infrastructure.persistence.token_count_store import TokenCountStore
+
+
+def _write(path: Path, content: str) -> Path:
+    path.write_text(content, encoding="utf-8")
+    # Lui mtime de khong roi vao racy window
+    old = time.time() - 60
+    os.utime(path, (old, old))
+    return path
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = [
+        _write(tmp_path / f"f{i}.py", f"def func_{i}(x):\n    return x * {i}\n" * i)
+        for i in range(1, 6)
+    ]
+    binary = tmp_path / "logo.png"
+    binary.write_bytes(b"\x89PNG\x00\x00binary")
+    return paths + [binary]
+
+
+@pytest.fixture
+def service():
+    svc = TokenizationService()
+    if svc._get_or_create_encoder() is None:
+        pytest.skip("Khong co encoder rs-bpe/tiktoken")
+    start_token_counting()
+    return svc
+
+
+@pytest.fixture
+def worker(service):
+    """Khoi tao trang thai worker ngay trong process test."""
+    process_counter.init_worker(service._encoder_type, None, None)
+    yield
+    process_counter._worker_encoder = None
+    process_counter._worker_reader = None
+
+
+class TestCountBatch:
+    def test_count_khop_service(self, service, worker, files):
+        result = process_counter.count_batch(list(enumerate(map(str, files))))
+
+        assert list(result.path_ids) == list(range(len(files)))
+        for i, path in enumerate(files[:-1]):
+            assert result.counts[i] == service.count_tokens(path.read_text())
+            assert result.mtimes[i] == path.stat().st_mtime
+        # Binary: khong dem, khong cache
+        assert result.counts[-1] == 0
+        assert result.mtimes[-1] == 0
+        assert len(result.hashes) == 16 * len(files)
+
+    def test_encoder_khac_loai_raise(self, files):
+        process_counter.init_worker("khong-ton-tai", None, None)
+
+        with pytest.raises(RuntimeError):
+            process_counter.count_batch([(0, str(files[0]))])
+
+    def test_dung_count_store_read_only(self, service, files, tmp_path):
+        store = TokenCountStore(tmp_path / "cache")
+        digest = service_module.content_hash(files[0].read_text())
+        store.put(digest, "enc", 999)
+        store.close()
+
+        process_counter.init_worker(service._encoder_type, str(store.db_path), "enc")
+        try:
+            result = process_counter.count_batch([(0, str(files[0]))])
+        finally:
+            process_counter._worker_reader = None
+
+        assert result.counts[0] == 999
+
+
+def test_process_pool_bo_qua_file_trong_cache(service, worker, files):
+    cached_path = str(files[0])
+    submitted = []
+    real_count_batch = process_counter.count_batch
+
+    def spy(batch):
+        submitted.extend(path for _, path in batch)
+        return real_count_batch(batch)
+
+    with (
+        ThreadPoolExecutor(max_workers=1) as executor,
+        patch.object(process_counter, "count_batch", spy),
+    ):
+        results = process_counter.count_tokens_process_pool(
+            files,
+            executor,
+            lambda path, mtime: 7 if path == cached_path else None,
+            lambda entries: None,
+            update_cache=True,
+        )
+
+    assert results[cached_path] == 7
+    assert cached_path not in submitted
+    assert set(results) == {str(p) for p in files}
+
+
+class TestServiceProcessBackend:
+    def test_spawn_pool_khop_thread_pool(self, files, tmp_path):
+        threaded = TokenizationService(process_workers=0)
+        pooled = TokenizationService(
+            count_store=TokenCountStore(tmp_path / "cache"), process_workers=2
+        )
+        start_token_counting()
+        if pooled._get_or_create_encoder() is None:
+            pytest.skip("Khong co encoder rs-bpe/tiktoken")
+
+        try:
+            with patch.object(service_module, "PROCESS_POOL_MIN_FILES", 1):
+                assert pooled._should_use_processes(len(files))
+                results = pooled.count_tokens_batch_parallel(files)
+        finally:
+            pooled.shutdown_workers()
+
+        assert results == threaded.count_tokens_batch_parallel(files)
+        # Ket qua duoc dua vao TokenCache va count store
+        with patch.object(pooled, "count_tokens") as count:
+            assert pooled.count_tokens_for_file(files[1]) == results[str(files[1])]
+            pooled.clear_cache()
+            assert pooled.count_tokens_for_file(files[1]) == results[str(files[1])]
+        count.assert_not_called()
+
+    def test_pool_loi_fallback_thread(self, service, files):
+        service._process_workers = 2
+        expected = TokenizationService(process_workers=0).count_tokens_batch_parallel(
+            files
+        )
+
+        with (
+            patch.object(service_module, "PROCESS_POOL_MIN_FILES", 1),
+            patch.object(
+                service_module,
+                "count_tokens_process_pool",
+                side_effect=RuntimeError("broken"),
+            ),
+        ):
+            assert service.count_tokens_batch_parallel(files) == expected
+        assert service._process_pool is None
+
+    def test_duoi_nguong_hoac_1_cpu_khong_dung_pool(self, service):
+        service._process_workers = 2
+        assert not service._should_use_processes(10)
+        service._process_workers = 1
+        assert not service._should_use_processes(10_000)
+
+    def test_hf_repo_khong_dung_pool(self, service):
+        service._process_workers = 2
+        service._tokenizer_repo = "Xenova/claude-tokenizer"
+        assert not service._should_use_processes(10_000)
+
+
+class TestGilAwareWorkerCount:
+    def test_encoder_giu_gil_bi_gioi_han(self):
+        assert get_worker_count(100_000, releases_gil=False) <= GIL_BOUND_MAX_WORKERS
+        assert get_worker_count(0, releases_gil=False) == 1
+
+    def test_encoder_releases_gil(self):
+        assert encoder_releases_gil("tiktoken")
+        assert encoder_releases_gil("hf")
+        assert not encoder_releases_gil("rs_bpe")
@@ -0,0 +1,184 @@
+"""
+Tests cho streaming prompt assembly (domain.prompt.prompt_sink + iter_prompt).
+
+Kiem tra:
+- iter_prompt / iter_smart_prompt ghep lai dung bang assemble_*()
+- file_contents dang iterable fragment cho cung prompt
+- FileSink ghi theo chunk, TokenCountingSink dem token tren stream
+- PromptBuildService.build_prompt_full(sink=...) ghi prompt vao sink
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import domain.prompt.prompt_sink as prompt_sink
+from application.services.prompt_build_service import PromptBuildService
+from domain.config.output_format import OutputStyle
+from domain.prompt.assembler import (
+    _strip_fragments,
+    assemble_prompt,
+    assemble_smart_prompt,
+    iter_prompt,
+    iter_smart_prompt,
+)
+from domain.prompt.prompt_sink import (
+    FileSink,
+    StringSink,
+    TokenCountingSink,
+    write_fragments,
+)
+from infrastructure.adapters.encoder_registry import get_tokenization_service
+from shared.types.git_types import GitDiffResult, GitLogResult
+
+_GIT_DIFFS = GitDiffResult(work_tree_diff="diff --git a b", staged_diff="")
+_GIT_LOGS = GitLogResult(log_content="abc123 fix", commits=[])
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Path:
+    (tmp_path / "main.py").write_text(
+        "def run():\n    print('Hello World')\n" * 10, encoding="utf-8"
+    )
+    (tmp_path / "utils.py").write_text(
+        "def format_msg(msg):\n    return f'[{msg}]'\n" * 10, encoding="utf-8"
+    )
+    return tmp_path
+
+
+class TestIterPrompt:
+    @pytest.mark.parametrize("style", [OutputStyle.XML, OutputStyle.PLAIN])
+    @pytest.mark.parametrize("at_top", [False, True])
+    def test_ghep_lai_bang_assemble_prompt(self, style, at_top):
+        args = ("src/\n  a.py", "<files>\nx = 1\n</files>", "  Fix bug \n", True)
+        kwargs = dict(
+            git_diffs=_GIT_DIFFS,
+            git_logs=_GIT_LOGS,
+            output_style=style,
+            project_rules="Rule A",
+            instructions_at_top=at_top,
+            workspace_root=Path("/tmp/project"),
+        )
+
+        expected = assemble_prompt(*args, **kwargs)
+        fragments = list(iter_prompt(*args, **kwargs))
+
+        assert len(fragments) > 1
+        assert "".join(fragments) == expected
+
+    @pytest.mark.parametrize("style", [OutputStyle.XML, OutputStyle.PLAIN])
+    def test_file_contents_dang_fragment(self, style):
+        blocks = ["<file path='a.py'>\na\n</file>\n", "<file path='b.py'>\nb\n</file>"]
+
+        expected = assemble_prompt("src/", "".join(blocks), "Fix", output_style=style)
+        streamed = "".join(iter_prompt("src/", iter(blocks), "Fix", output_style=style))
+
+        assert streamed == expected
+
+    @pytest.mark.parametrize("style", [OutputStyle.XML, OutputStyle.PLAIN])
+    @pytest.mark.parametrize("at_top", [False, True])
+    def test_smart_prompt_ghep_lai_bang_assemble(self, style, at_top):
+        args = ("  class A: ...\n\n", "src/", "Explain", _GIT_DIFFS, _GIT_LOGS)
+        kwargs = dict(
+            project_rules="Rule A", instructions_at_top=at_top, output_style=style
+        )
+
+        expected = assemble_smart_prompt(*args, **kwargs)
+
+        assert "".join(iter_smart_prompt(*args, **kwargs)) == expected
+
+    @pytest.mark.parametrize(
+        "fragments",
+        [
+            ["  \n", " a", " \n", "\n", "b  ", "\n"],
+            ["\n", "  ", "\n"],
+            ["a", "", "b"],
+            ["x\n\n"],
+        ],
+    )
+    def test_strip_fragments_nhu_strip(self, fragments):
+        assert "".join(_strip_fragments(fragments)) == "".join(fragments).strip()
+
+
+class TestSinks:
+    def test_file_sink_ghi_theo_chunk(self, tmp_path):
+        path = tmp_path / "prompt.txt"
+        text = "abcdefghij" * 5
+
+        with patch.object(prompt_sink, "WRITE_CHUNK_CHARS", 7):
+            with FileSink(path) as sink:
+                write_fragments(["head\n", text, "", "tail"], sink)
+
+        assert path.read_text(encoding="utf-8") == "head\n" + text + "tail"
+        assert sink.chars_written == len("head\n" + text + "tail")
+
+    def test_file_sink_prompt_rong_van_tao_file(self, tmp_path):
+        path = tmp_path / "empty.txt"
+
+        FileSink(path).close()
+
+        assert path.read_text(encoding="utf-8") == ""
+
+    def test_token_counting_sink(self):
+        inner = StringSink()
+        counting = TokenCountingSink(inner, lambda text: len(text.split()))
+
+        write_fragments(["one two ", "", "three"], counting)
+
+        assert counting.tokens == 3
+        assert inner.getvalue() == "one two three"
+
+
+class TestBuildPromptToSink:
+    def _build(self, service, workspace, **kwargs):
+        return service.build_prompt_full(
+            file_paths=[workspace / "main.py", workspace / "utils.py"],
+            workspace=workspace,
+            instructions="Review this code",
+            output_format="xml",
+            include_git_changes=False,
+            use_relative_paths=True,
+            **kwargs,
+        )
+
+    def test_stream_giong_prompt_khong_stream(self, workspace):
+        service = PromptBuildService(tokenization_service=get_tokenization_service())
+        with patch(
+            "domain.prompt.template_manager._get_language_directive", return_value=""
+        ):
+            expected = self._build(service, workspace)
+            sink = StringSink()
+            streamed = self._build(service, workspace, sink=sink)
+
+        assert streamed.prompt_text == ""
+        assert sink.getvalue() == expected.prompt_text
+        assert abs(streamed.total_tokens - expected.total_tokens) <= 5
+        content_tokens = expected.breakdown["content_tokens"]
+        assert streamed.breakdown["content_tokens"] == content_tokens
+        assert [f.tokens for f in streamed.files] == [f.tokens for f in expected.files]
+
+    def test_stream_ra_file(self, workspace, tmp_path):
+        service = PromptBuildService(tokenization_service=get_tokenization_service())
+        path = tmp_path / "out" / "prompt.txt"
+        path.parent.mkdir()
+
+        with FileSink(path) as sink:
+            result = self._build(service, workspace, sink=sink)
+
+        text = path.read_text(encoding="utf-8")
+        assert text.startswith("<project>") and text.endswith("</project>")
+        assert result.total_tokens > 0
+
+    def test_trim_ghi_prompt_da_trim_vao_sink(self, workspace):
+        service = PromptBuildService(tokenization_service=get_tokenization_service())
+        full = self._build(service, workspace)
+        sink = StringSink()
+
+        result = self._build(
+            service, workspace, sink=sink, max_tokens=int(full.total_tokens * 0.75)
+        )
+
+        assert result.trimmed is True
+        assert result.prompt_text == ""
+        assert "<trimmed_context_notes>" in sink.getvalue()
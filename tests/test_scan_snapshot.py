@@ -0,0 +1,221 @@
+"""
+Tests cho infrastructure.filesystem.scan_snapshot va warm scan cua FileScanner.
+
+Kiem tra cac truong hop:
+- Round-trip save/load snapshot
+- Warm scan khong goi scandir khi workspace khong doi
+- Them file chi re-scan directory bi doi
+- Sua .gitignore long nhau invalidate directory tuong ung
+- Doi ScanConfig -> full rescan
+"""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import infrastructure.filesystem.file_scanner as file_scanner_module
+from infrastructure.filesystem.file_scanner import FileScanner, ScanConfig
+from infrastructure.filesystem.ignore_engine import IgnoreEngine
+from infrastructure.filesystem.scan_snapshot import (
+    DirectoryRecord,
+    ScanSnapshotStore,
+    WorkspaceSnapshot,
+)
+
+
+def _collect_paths(item) -> set:
+    """Flatten TreeItem thanh set relative labels."""
+    result = set()
+    stack = [item]
+    while stack:
+        node = stack.pop()
+        result.add((node.path, node.is_dir))
+        stack.extend(node.children)
+    return result
+
+
+def _bump_mtime(path: Path, offset_ns: int = 5_000_000_000) -> None:
+    """Dat mtime ro rang de khong phu thuoc do phan giai mtime cua filesystem."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + offset_ns))
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Path:
+    root = tmp_path / "ws"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "docs").mkdir()
+    (root / "src" / "main.py").write_text("print('hi')\n")
+    (root / "src" / "pkg" / "mod.py").write_text("x = 1\n")
+    (root / "docs" / "readme.md").write_text("# docs\n")
+    return root
+
+
+@pytest.fixture
+def scandir_counter(monkeypatch):
+    """Dem so lan FileScanner goi os.scandir."""
+    calls = []
+    real_scandir = os.scandir
+
+    def counting_scandir(path):
+        calls.append(str(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(file_scanner_module.os, "scandir", counting_scandir)
+    return calls
+
+
+def _make_scanner(tmp_path: Path) -> FileScanner:
+    return FileScanner(
+        IgnoreEngine(), snapshot_store=ScanSnapshotStore(tmp_path / "snap")
+    )
+
+
+class TestScanSnapshotStore:
+    """Test suite cho ScanSnapshotStore."""
+
+    def test_save_load_round_trip(self, tmp_path: Path):
+        """Snapshot ghi xuong dia duoc doc lai nguyen ven."""
+        store = ScanSnapshotStore(tmp_path / "snap")
+        snapshot = WorkspaceSnapshot(
+            root=str(tmp_path),
+            config_key="cfg",
+            directories={
+                "": DirectoryRecord(1, "cfg", ["a"], ["x.py"]),
+                "a": DirectoryRecord(2, "cfg", [], ["y.py"]),
+            },
+        )
+        assert store.save(snapshot)
+
+        loaded = store.load(tmp_path)
+        assert loaded is not None
+        assert loaded.config_key == "cfg"
+        assert loaded.directories == snapshot.directories
+        assert loaded.file_count() == 2
+
+    def test_load_file_hong_tra_ve_none(self, tmp_path: Path):
+        """File snapshot hong khong lam crash, chi tra ve None."""
+        store = ScanSnapshotStore(tmp_path / "snap")
+        path = store.snapshot_path(tmp_path)
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"not gzip")
+        assert store.load(tmp_path) is None
+
+
+class TestWarmScan:
+    """Test suite cho FileScanner.scan() voi snapshot."""
+
+    def test_warm_scan_khong_goi_scandir(
+        self, tmp_path: Path, workspace: Path, scandir_counter
+    ):
+        """Workspace khong doi -> warm scan dung lai toan bo snapshot."""
+        scanner = _make_scanner(tmp_path)
+        cold = scanner.scan(workspace)
+        assert len(scandir_counter) == 4
+
+        scandir_counter.clear()
+        warm = scanner.scan(workspace)
+        assert scandir_counter == []
+        assert _collect_paths(warm) == _collect_paths(cold)
+
+    def test_them_file_chi_rescan_directory_bi_doi(
+        self, tmp_path: Path, workspace: Path, scandir_counter
+    ):
+        """Them file vao src/pkg chi lam src/pkg bi scandir lai."""
+        scanner = _make_scanner(tmp_path)
+        scanner.scan(workspace)
+
+        pkg = workspace / "src" / "pkg"
+        (pkg / "new.py").write_text("y = 2\n")
+        _bump_mtime(pkg)
+
+        scandir_counter.clear()
+        tree = scanner.scan(workspace)
+        assert scandir_counter == [str(pkg)]
+        assert (str(pkg / "new.py"), False) in _collect_paths(tree)
+
+    def test_sua_nested_gitignore_invalidate_directory(
+        self, tmp_path: Path, workspace: Path, scandir_counter
+    ):
+        """Sua noi dung .gitignore long nhau -> directory do duoc loc lai."""
+        src = workspace / "src"
+        gitignore = src / ".gitignore"
+        gitignore.write_text("")
+        scanner = _make_scanner(tmp_path)
+        tree = scanner.scan(workspace)
+        assert (str(src / "main.py"), False) in _collect_paths(tree)
+
+        gitignore.write_text("main.py\n")
+        _bump_mtime(gitignore)
+
+        scandir_counter.clear()
+        tree = scanner.scan(workspace)
+        assert str(src) in scandir_counter
+        assert str(workspace / "docs") not in scandir_counter
+        assert (str(src / "main.py"), False) not in _collect_paths(tree)
+
+    def test_doi_config_full_rescan(
+        self, tmp_path: Path, workspace: Path, scandir_counter
+    ):
+        """Doi excluded_patterns -> snapshot cu bi bo, scan lai toan bo."""
+        scanner = _make_scanner(tmp_path)
+        scanner.scan(workspace)
+
+        scandir_counter.clear()
+        tree = scanner.scan(workspace, ScanConfig(excluded_patterns=["docs"]))
+        assert len(scandir_counter) == 3
+        assert (str(workspace / "docs"), True) not in _collect_paths(tree)
+
+    def test_load_snapshot_tra_ve_tree_khong_scan(
+        self, tmp_path: Path, workspace: Path, scandir_counter
+    ):
+        """load_snapshot() dung tree tu snapshot ma khong cham workspace."""
+        scanner = _make_scanner(tmp_path)
+        assert scanner.load_snapshot(workspace) is None
+
+        cold = scanner.scan(workspace)
+        scandir_counter.clear()
+        cached = scanner.load_snapshot(workspace)
+        assert cached is not None
+        assert scandir_counter == []
+        assert _collect_paths(cached) == _collect_paths(cold)
+        assert scanner.load_snapshot(workspace, ScanConfig(use_gitignore=False)) is None
+
+
+class TestConcreteDirectoryScannerSnapshot:
+    """Scanner cua app: full scan luu snapshot, load_snapshot doc lai."""
+
+    def test_scan_roi_load_snapshot(
+        self, tmp_path: Path, workspace: Path, scandir_counter
+    ):
+        from infrastructure.filesystem.file_utils import ConcreteDirectoryScanner
+
+        scanner = ConcreteDirectoryScanner(
+            IgnoreEngine(), snapshot_store=ScanSnapshotStore(tmp_path / "snap")
+        )
+        assert scanner.load_snapshot(workspace) is None
+
+        tree = scanner.scan_directory(
+            workspace, excluded_patterns=["docs"], use_snapshot=True
+        )
+        scandir_counter.clear()
+        cached = scanner.load_snapshot(workspace, excluded_patterns=["docs"])
+
+        assert cached is not None
+        assert scandir_counter == []
+        assert _collect_paths(cached) == _collect_paths(tree)
+        assert scanner.load_snapshot(workspace) is None  # excluded khac
+
+    def test_scan_cho_prompt_khong_dung_snapshot(self, tmp_path: Path, workspace: Path):
+        from infrastructure.filesystem.file_utils import ConcreteDirectoryScanner
+
+        store = ScanSnapshotStore(tmp_path / "snap")
+        scanner = ConcreteDirectoryScanner(IgnoreEngine(), snapshot_store=store)
+
+        with patch.object(store, "load", wraps=store.load) as load:
+            scanner.scan_directory(workspace)
+
+        load.assert_not_called()
+        assert scanner.load_snapshot(workspace) is None
@@ -58,6 +58,17 @@ class TestServiceContainerCreation:
         # tokenization property tra ve instance do container so huu
         assert isinstance(container.tokenization, ITokenizationService)
 
+    def test_multi_encoder_counter_tao_khi_can(self):
+        """MultiEncoderCounter chi tao khi duoc dung, roi dung lai instance do."""
+        from presentation.service_container import ServiceContainer
+
+        container = ServiceContainer()
+        assert container._multi_encoder_counter is None
+
+        counter = container.multi_encoder_counter
+        assert counter is container.multi_encoder_counter
+        assert counter._count_store is container._token_count_store
+
     def test_two_containers_share_cache_registry_until_phase2(self):
         """Moi container hien su dung module-level cache_registry."""
         from presentation.service_container import ServiceContainer
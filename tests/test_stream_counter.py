@@ -0,0 +1,124 @@
+"""Tests cho stream_counter va duong dem file lon cua TokenizationService."""
+
+from unittest.mock import patch
+
+import pytest
+
+from domain.tokenization.cancellation import start_token_counting, stop_token_counting
+from domain.tokenization.dedup import content_hash
+from infrastructure.adapters.parallel_counter import read_file_mmap
+from infrastructure.adapters.stream_counter import (
+    _split_point,
+    count_tokens_streaming,
+)
+from infrastructure.adapters.tokenization_service import TokenizationService
+
+
+@pytest.fixture
+def service():
+    service = TokenizationService()
+    if service._get_or_create_encoder() is None:
+        pytest.skip("no encoder available")
+    return service
+
+
+def _write_source(path, lines=4000):
+    text = "".join(
+        f"def func_{i}(value):\n    return value * {i} + len('chuỗi {i}')\n"
+        for i in range(lines)
+    )
+    path.write_text(text, encoding="utf-8")
+    return text
+
+
+def test_streaming_matches_whole_file_count(tmp_path, service):
+    path = tmp_path / "big.py"
+    text = _write_source(path)
+
+    result = count_tokens_streaming(path, service.count_tokens, chunk_bytes=8192)
+
+    assert result is not None
+    whole = service.count_tokens(text)
+    assert abs(result.count - whole) <= whole * 0.001
+    assert result.digest == content_hash(read_file_mmap(path))
+
+
+def test_split_point_keeps_utf8_characters(tmp_path):
+    import mmap
+
+    path = tmp_path / "cjk.txt"
+    path.write_bytes("漢字".encode("utf-8") * 1000)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = _split_point(mm, 0, 1001)
+        assert mm[:end].decode("utf-8")
+
+
+def test_single_long_line_without_whitespace(tmp_path):
+    path = tmp_path / "blob.txt"
+    path.write_text("é" * 50_000, encoding="utf-8")
+
+    result = count_tokens_streaming(path, len, chunk_bytes=4097)
+
+    assert result is not None
+    assert result.count == 50_000
+
+
+def test_progress_and_cancellation(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_text("word " * 20_000, encoding="utf-8")
+    size = path.stat().st_size
+    seen = []
+
+    result = count_tokens_streaming(
+        path, len, chunk_bytes=10_000, progress=lambda done, total: seen.append(done)
+    )
+    assert result is not None
+    assert seen == sorted(seen) and seen[-1] == size and len(seen) >= 10
+
+    calls = []
+    cancelled = count_tokens_streaming(
+        path,
+        lambda text: calls.append(text) or len(text),
+        chunk_bytes=10_000,
+        is_cancelled=lambda: len(calls) >= 3,
+    )
+    assert cancelled is None
+
+
+def test_service_streams_files_above_guardrail(tmp_path, service):
+    path = tmp_path / "schema.sql"
+    text = _write_source(path, lines=200)
+
+    with patch("infrastructure.adapters.tokenization_service.MAX_BYTES", 1024):
+        count = service.count_tokens_for_file(path)
+        # Lan 2 lay tu TokenCache
+        with patch(
+            "infrastructure.adapters.tokenization_service.count_tokens_streaming"
+        ) as stream:
+            assert service.count_tokens_for_file(path) == count
+            stream.assert_not_called()
+
+    assert abs(count - service.count_tokens(text)) <= 5
+
+
+def test_batch_counts_large_files_after_small_ones(tmp_path, service):
+    small = tmp_path / "small.py"
+    small.write_text("x = 1\n", encoding="utf-8")
+    large = tmp_path / "large.py"
+    _write_source(large, lines=200)
+
+    start_token_counting()
+    try:
+        with patch("infrastructure.adapters.tokenization_service.MAX_BYTES", 1024):
+            results = service.count_tokens_batch_parallel([small, large])
+    finally:
+        stop_token_counting()
+
+    assert results[str(small)] > 0
+    assert results[str(large)] > 100
+
+
+def test_binary_large_file_counts_zero(tmp_path, service):
+    path = tmp_path / "dump.bin"
+    path.write_bytes(b"\x00\x01\x02" * 1000)
+    assert service.count_tokens_for_large_file(path) == 0
@@ -0,0 +1,160 @@
+"""
+Tests cho application.services.symbol_index (`sym:` search).
+
+Kiem tra cac truong hop:
+- warm trich xuat symbols (bo import), search exact/prefix/fuzzy
+- Chua warm -> search rong, khong trich xuat tren thread goi
+- Dong bo tang dan: chi parse lai file da sua, bo file da xoa
+- refresh_path tu file watcher -> dong bo lai trong background
+- Trich xuat qua process pool
+- search_in_index voi prefix "sym:"
+"""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from application.services import symbol_index as symbol_module
+from application.services.symbol_index import SymbolIndexService
+from application.services.workspace_catalog import WorkspaceCatalogService
+from application.services.workspace_index import search_in_index
+from infrastructure.filesystem.ignore_engine import IgnoreEngine
+
+
+def _write(path: Path, content: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    # Lui mtime de khong roi vao racy window
+    old = time.time() - 60
+    os.utime(path, (old, old))
+    return path
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Path:
+    root = tmp_path / "ws"
+    _write(
+        root / "services" / "tokenization.py",
+        "import os\n\n\nclass TokenizationService:\n"
+        "    def count_tokens(self, text):\n        return len(text)\n",
+    )
+    _write(
+        root / "services" / "token_cache.py",
+        "class TokenCache:\n    pass\n\n\ndef tokenize_all(items):\n    return items\n",
+    )
+    _write(root / "README.md", "# TokenizationService docs\n")
+    return root
+
+
+@pytest.fixture
+def catalogs() -> WorkspaceCatalogService:
+    return WorkspaceCatalogService(IgnoreEngine())
+
+
+@pytest.fixture
+def service(catalogs) -> SymbolIndexService:
+    return SymbolIndexService(catalogs, max_workers=0)
+
+
+def _names(locations):
+    return [location.name for location in locations]
+
+
+class TestSymbolSearch:
+    def test_warm_va_exact_match(self, service, workspace):
+        service.warm(workspace)
+
+        hits = service.search(workspace, "tokenizationservice")
+
+        assert _names(hits) == ["TokenizationService"]
+        assert hits[0].kind == "class"
+        assert hits[0].rel_path == "services/tokenization.py"
+        assert hits[0].line == 4
+
+    def test_prefix_ngan_truoc_roi_fuzzy(self, service, workspace):
+        service.warm(workspace)
+
+        names = _names(service.search(workspace, "token"))
+
+        # Prefix (ngan truoc) dung dau, import va README khong duoc index
+        assert names[:3] == ["TokenCache", "tokenize_all", "TokenizationService"]
+        assert "os" not in names
+        assert _names(service.search(workspace, "ctok")) == ["count_tokens"]
+
+    def test_limit(self, service, workspace):
+        service.warm(workspace)
+
+        assert len(service.search(workspace, "t", limit=2)) == 2
+
+    def test_chua_warm_tra_ve_rong(self, service, workspace):
+        with patch.object(symbol_module, "_extract_file") as extract:
+            assert service.search(workspace, "TokenCache") == []
+        extract.assert_not_called()
+
+
+class TestIncrementalSync:
+    def test_chi_parse_lai_file_da_doi(self, service, catalogs, workspace):
+        service.warm(workspace)
+        _write(workspace / "services" / "token_cache.py", "class LruCache:\n    pass\n")
+        catalogs.refresh_path(str(workspace / "services" / "token_cache.py"))
+        (workspace / "services" / "tokenization.py").unlink()
+        catalogs.refresh_path(str(workspace / "services" / "tokenization.py"))
+
+        with patch.object(
+            symbol_module, "_extract_file", wraps=symbol_module._extract_file
+        ) as extract:
+            service.warm(workspace)
+
+        assert [Path(c.args[0]).name for c in extract.call_args_list] == [
+            "token_cache.py"
+        ]
+        assert _names(service.search(workspace, "lrucache")) == ["LruCache"]
+        assert service.search(workspace, "TokenizationService") == []
+
+    def test_refresh_path_dong_bo_background(self, service, catalogs, workspace):
+        service.warm(workspace)
+        new_file = _write(workspace / "models.py", "class UserModel:\n    pass\n")
+        catalogs.refresh_path(str(new_file))
+
+        with patch.object(symbol_module, "SYNC_DELAY_SECONDS", 0):
+            service.refresh_path(str(new_file))
+            deadline = time.time() + 5
+            while not service.search(workspace, "UserModel") and time.time() < deadline:
+                time.sleep(0.02)
+
+        assert _names(service.search(workspace, "UserModel")) == ["UserModel"]
+
+    def test_refresh_path_ngoai_workspace_bo_qua(self, service, workspace, tmp_path):
+        service.warm(workspace)
+
+        with patch("threading.Thread") as thread:
+            service.refresh_path(str(tmp_path / "other" / "x.py"))
+        thread.assert_not_called()
+
+
+def test_process_pool_extraction(catalogs, workspace):
+    service = SymbolIndexService(catalogs, max_workers=2)
+
+    with patch.object(symbol_module, "PROCESS_POOL_MIN_FILES", 1):
+        service.warm(workspace)
+
+    assert _names(service.search(workspace, "TokenCache")) == ["TokenCache"]
+
+
+def test_search_in_index_sym_prefix(workspace):
+    from domain.ports.registry import DomainRegistry
+
+    index = {"tokenization.py": [str(workspace / "services" / "tokenization.py")]}
+    service = SymbolIndexService(WorkspaceCatalogService(IgnoreEngine()), max_workers=0)
+    service.warm(workspace)
+
+    with patch.object(DomainRegistry, "_symbol_index", service):
+        assert search_in_index(index, "sym: count_tokens", workspace) == [
+            str(workspace / "services" / "tokenization.py")
+        ]
+        assert search_in_index(index, "sym:   ", workspace) == []
+        # Khong co workspace -> khong tra cuu duoc symbol
+        assert search_in_index(index, "sym:TokenCache") == []
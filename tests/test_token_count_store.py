@@ -0,0 +1,185 @@
+"""
+Tests cho infrastructure.persistence.token_count_store va count store trong
+TokenizationService.
+
+Kiem tra cac truong hop:
+- Ghi/doc theo content hash va theo path (mtime + size)
+- Du lieu con sau khi mo lai store (restart app)
+- Database hong -> tao lai
+- Prune dong cu khi vuot gioi han
+- TokenizationService: restart khong dem lai, touch/checkout cung noi dung
+  khong dem lai, doi encoder la key khac
+"""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from domain.tokenization.cancellation import start_token_counting
+from infrastructure.adapters.tokenization_service import TokenizationService
+from infrastructure.persistence.token_count_store import TokenCountStore
+
+HASH_A = b"a" * 16
+HASH_B = b"b" * 16
+
+
+class TestTokenCountStore:
+    def test_get_by_hash_va_path(self, tmp_path):
+        store = TokenCountStore(tmp_path)
+        store.put(HASH_A, "enc", 42, path="/ws/a.py", mtime_ns=100, size=10)
+
+        # Doc duoc ca khi con trong buffer
+        assert store.get_by_hash(HASH_A, "enc") == 42
+        assert store.get_by_path("/ws/a.py", 100, 10, "enc") == 42
+
+        store.flush()
+        assert store.get_by_hash(HASH_A, "enc") == 42
+        assert store.get_by_path("/ws/a.py", 100, 10, "enc") == 42
+
+    def test_miss_khi_stat_hoac_encoder_khac(self, tmp_path):
+        store = TokenCountStore(tmp_path)
+        store.put(HASH_A, "enc", 42, path="/ws/a.py", mtime_ns=100, size=10)
+        store.flush()
+
+        assert store.get_by_path("/ws/a.py", 101, 10, "enc") is None
+        assert store.get_by_path("/ws/a.py", 100, 11, "enc") is None
+        assert store.get_by_path("/ws/a.py", 100, 10, "other") is None
+        assert store.get_by_hash(HASH_A, "other") is None
+
+    def test_con_du_lieu_sau_khi_mo_lai(self, tmp_path):
+        store = TokenCountStore(tmp_path)
+        store.put(HASH_A, "enc", 42, path="/ws/a.py", mtime_ns=100, size=10)
+        store.close()
+
+        reopened = TokenCountStore(tmp_path)
+        assert reopened.get_by_path("/ws/a.py", 100, 10, "enc") == 42
+
+    def test_database_hong_tao_lai(self, tmp_path):
+        (tmp_path / TokenCountStore.FILE_NAME).write_bytes(b"not a database" * 100)
+
+        store = TokenCountStore(tmp_path)
+        store.put(HASH_A, "enc", 7)
+        store.flush()
+
+        assert store.get_by_hash(HASH_A, "enc") == 7
+
+    def test_prune_dong_cu(self, tmp_path):
+        store = TokenCountStore(tmp_path)
+        with patch("time.time", return_value=1000):
+            store.put(HASH_A, "enc", 1)
+            store.flush()
+        with patch("time.time", return_value=2000):
+            store.put(HASH_B, "enc", 2)
+            store.close()
+
+        pruned = TokenCountStore(tmp_path, max_count_rows=1)
+        assert pruned.get_by_hash(HASH_A, "enc") is None
+        assert pruned.get_by_hash(HASH_B, "enc") == 2
+
+
+class _FakeEncoder:
+    def encode(self, text):
+        return text.split()
+
+
+def _write(path: Path, content: str, age: float = 60) -> Path:
+    path.write_text(content, encoding="utf-8")
+    # Lui mtime de khong roi vao racy window
+    old = time.time() - age
+    os.utime(path, (old, old))
+    return path
+
+
+@pytest.fixture
+def make_service(tmp_path):
+    store_dir = tmp_path / "cache"
+
+    def factory(store=None):
+        service = TokenizationService(count_store=store or TokenCountStore(store_dir))
+        service._encoder = _FakeEncoder()
+        service._encoder_type = "tiktoken"
+        return service
+
+    return factory
+
+
+class TestTokenizationServiceCountStore:
+    def test_restart_khong_dem_lai(self, make_service, tmp_path):
+        file_path = _write(tmp_path / "a.py", "one two three")
+        first = make_service()
+        assert first.count_tokens_for_file(file_path) == 3
+        first.flush_count_store()
+
+        second = make_service()
+        with patch.object(second, "count_tokens") as count:
+            assert second.count_tokens_for_file(file_path) == 3
+        count.assert_not_called()
+
+    def test_touch_cung_noi_dung_khong_dem_lai(self, make_service, tmp_path):
+        file_path = _write(tmp_path / "a.py", "one two three")
+        service = make_service()
+        service.count_tokens_for_file(file_path)
+        copy = _write(tmp_path / "b.py", "one two three", age=30)
+        start_token_counting()
+
+        with patch.object(service, "count_tokens") as count:
+            service.clear_cache()
+            _write(file_path, "one two three", age=30)
+            assert service.count_tokens_for_file(file_path) == 3
+            assert service.count_tokens_batch_parallel([copy]) == {str(copy): 3}
+        count.assert_not_called()
+
+    def test_noi_dung_doi_dem_lai(self, make_service, tmp_path):
+        file_path = _write(tmp_path / "a.py", "one two three")
+        service = make_service()
+        service.count_tokens_for_file(file_path)
+
+        _write(file_path, "one two", age=30)
+        assert service.count_tokens_for_file(file_path) == 2
+
+    def test_doi_encoder_la_key_khac(self, make_service, tmp_path):
+        file_path = _write(tmp_path / "a.py", "one two three")
+        service = make_service()
+        service.count_tokens_for_file(file_path)
+
+        service.set_model_config("some/other-tokenizer")
+        service._encoder = _FakeEncoder()
+        service._encoder_type = "tiktoken"
+        with patch.object(service, "count_tokens", return_value=9) as count:
+            assert service.count_tokens_for_file(file_path) == 9
+        count.assert_called_once()
+
+    def test_khong_luu_khi_dang_uoc_luong(self, tmp_path):
+        store = TokenCountStore(tmp_path / "cache")
+        service = TokenizationService(count_store=store)
+        file_path = _write(tmp_path / "a.py", "one two three")
+
+        with patch.object(service, "_get_or_create_encoder", return_value=None):
+            service.count_tokens_for_file(file_path)
+        service.flush_count_store()
+
+        assert not store.db_path.exists()
+
+    def test_token_count_worker_lan_hai_khong_goi_encoder(self, make_service, tmp_path):
+        from presentation.components.file_tree.file_tree_model import TokenCountWorker
+
+        file_path = _write(tmp_path / "a.py", "one two three")
+
+        def run_worker(service):
+            counts: dict = {}
+            worker = TokenCountWorker([str(file_path)], tokenization_service=service)
+            worker.signals.token_counts_batch.connect(counts.update)
+            worker.run()
+            return counts
+
+        first = make_service()
+        assert run_worker(first) == {str(file_path): 3}
+        first.flush_count_store()
+
+        second = make_service()
+        with patch.object(second, "count_tokens") as count:
+            assert run_worker(second) == {str(file_path): 3}
+        count.assert_not_called()
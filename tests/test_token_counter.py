@@ -128,15 +128,15 @@ class TestCountTokensForFile:
         result = self.service.count_tokens_for_file(file_path)
         assert result == 0
 
-    def test_large_file_skipped(self, tmp_path):
-        """File > 5MB is skipped."""
+    def test_large_file_streamed(self, tmp_path):
+        """File > 5MB is counted by streaming chunks."""
         file_path = tmp_path / "large.txt"
         # Create file > 5MB
         file_path.write_text("x" * (6 * 1024 * 1024))
 
         self.service.clear_cache()
         result = self.service.count_tokens_for_file(file_path)
-        assert result == 0
+        assert result > 0
 
     def test_directory_returns_zero(self, tmp_path):
         """Directory path returns 0."""
@@ -0,0 +1,139 @@
+"""Tests cho TokenEstimator, TokenEstimatorStore va tich hop hieu chinh."""
+
+import pytest
+
+from domain.ports.tokenization_port import TokenEstimate
+from domain.tokenization.estimator import (
+    DEFAULT_TOKENS_PER_BYTE,
+    MIN_CALIBRATION_BYTES,
+    TokenEstimator,
+    group_sizes,
+    language_key,
+)
+from infrastructure.persistence.token_estimator_store import TokenEstimatorStore
+
+
+def _calibrate(estimator: TokenEstimator, name: str, ratio: float, n: int = 50):
+    for i in range(n):
+        size = 1000 + i * 37
+        estimator.observe(name, size, round(size * ratio))
+
+
+def test_language_key_and_grouping():
+    assert language_key("src/App.PY") == ".py"
+    assert language_key("dist/bundle.min.js") == "minified"
+    assert language_key("Makefile") == ""
+    assert group_sizes([("a.py", 10), ("b.py", 5), ("c.min.css", 7)]) == {
+        ".py": 15,
+        "minified": 7,
+    }
+
+
+def test_prior_estimate_brackets_default_ratio():
+    estimate = TokenEstimator().estimate("a.py", 10_000)
+    assert estimate.tokens == round(10_000 * DEFAULT_TOKENS_PER_BYTE)
+    assert estimate.low < estimate.tokens < estimate.high
+
+
+def test_calibration_converges_and_tightens_bounds():
+    estimator = TokenEstimator()
+    estimator.set_active_encoder("rs_bpe:")
+    before = estimator.estimate("a.py", 10_000)
+    _calibrate(estimator, "x.py", 0.2)
+
+    after = estimator.estimate("a.py", 10_000)
+    assert after.tokens == pytest.approx(2000, rel=0.05)
+    assert after.high - after.low < before.high - before.low
+
+
+def test_calibration_is_per_encoder():
+    estimator = TokenEstimator()
+    estimator.set_active_encoder("hf:repo")
+    _calibrate(estimator, "x.py", 0.5)
+    estimator.set_active_encoder("rs_bpe:")
+    assert estimator.estimate("a.py", 1000).tokens == round(
+        1000 * DEFAULT_TOKENS_PER_BYTE
+    )
+
+
+def test_unseen_key_follows_encoder_offset():
+    estimator = TokenEstimator()
+    _calibrate(estimator, "x.py", 0.56)  # gap doi prior
+    # .rs chua co du lieu nhung encoder dem nhieu hon prior -> keo len
+    assert estimator.estimate("lib.rs", 1000).tokens > 1000 * DEFAULT_TOKENS_PER_BYTE
+
+
+def test_small_files_are_ignored():
+    estimator = TokenEstimator()
+    estimator.observe("a.py", MIN_CALIBRATION_BYTES - 1, 1000)
+    assert estimator.estimate("a.py", 1000).tokens == 280
+
+
+def test_estimates_add():
+    assert TokenEstimate(1, 0, 2) + TokenEstimate(3, 3, 3) == TokenEstimate(4, 3, 5)
+
+
+def test_store_round_trip(tmp_path):
+    estimator = TokenEstimator(TokenEstimatorStore(tmp_path))
+    estimator.set_active_encoder("tiktoken:")
+    _calibrate(estimator, "x.json", 0.5)
+    estimator.flush()
+
+    restored = TokenEstimator(TokenEstimatorStore(tmp_path))
+    restored.set_active_encoder("tiktoken:")
+    assert restored.estimate("y.json", 1000) == estimator.estimate("y.json", 1000)
+
+
+def test_store_ignores_corrupt_file(tmp_path):
+    store = TokenEstimatorStore(tmp_path)
+    store.path.write_text("{not json", encoding="utf-8")
+    assert store.load() is None
+    assert TokenEstimator(store).estimate("a.py", 100).tokens == 28
+
+
+def test_tokenization_service_calibrates_from_exact_counts(tmp_path):
+    from infrastructure.adapters.tokenization_service import TokenizationService
+
+    estimator = TokenEstimator()
+    service = TokenizationService(estimator=estimator)
+    if service._get_or_create_encoder() is None:
+        pytest.skip("no encoder available")
+
+    path = tmp_path / "a.py"
+    path.write_text("def f(x):\n    return x * 2\n" * 40, encoding="utf-8")
+    exact = service.count_tokens_for_file(path)
+
+    assert estimator.active_encoder.startswith(service._encoder_type)
+    # 1 quan sat ~ 1/6 trong so (prior = 5) -> uoc luong dich ve phia count that
+    prior = round(path.stat().st_size * DEFAULT_TOKENS_PER_BYTE)
+    estimate = estimator.estimate("b.py", path.stat().st_size).tokens
+    assert abs(estimate - exact) < abs(prior - exact) or prior == exact
+
+
+class _CountingTokenizer:
+    def __init__(self):
+        self.calls = 0
+
+    def count_tokens_batch_parallel(self, file_paths, **_) -> dict:
+        self.calls += 1
+        return {str(p): p.stat().st_size // 4 for p in file_paths}
+
+
+def test_token_count_worker_emits_estimates_then_counts(tmp_path):
+    from presentation.components.file_tree.file_tree_model import TokenCountWorker
+
+    path = tmp_path / "a.py"
+    path.write_text("a" * 1000, encoding="utf-8")
+    estimator = TokenEstimator()
+    before = estimator.estimate("a.py", 1000).tokens
+    estimates, counts = [], []
+
+    worker = TokenCountWorker(
+        [str(path)], tokenization_service=_CountingTokenizer(), estimator=estimator
+    )
+    worker.signals.token_estimates.connect(estimates.append)
+    worker.signals.token_counts_batch.connect(counts.append)
+    worker.run()
+
+    assert estimates == [{str(path): before}]
+    assert counts == [{str(path): 250}]
@@ -0,0 +1,140 @@
+"""Tests cho TokenLedger va dem token theo segment trong PromptBuildService."""
+
+from collections import Counter
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from application.services.prompt_build_service import PromptBuildService
+from domain.ports.tokenization_port import ITokenizationService
+from domain.prompt.token_ledger import TokenLedger
+
+
+class WordCounter(ITokenizationService):
+    """Dem token = so tu, ghi lai moi text da dem."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.generation = 0
+
+    def count_tokens(self, text: str) -> int:
+        self.calls[text] += 1
+        return len(text.split())
+
+    def count_tokens_for_file(self, file_path: Path) -> int:
+        return 0
+
+    def count_tokens_batch_parallel(self, file_paths, max_workers=None):
+        return {}
+
+    def set_model_config(self, tokenizer_repo=None) -> None:
+        self.generation += 1
+
+    def reset_encoder(self) -> None:
+        pass
+
+    def clear_cache(self) -> None:
+        pass
+
+    def clear_file_from_cache(self, path: str) -> None:
+        pass
+
+    def model_generation(self) -> int:
+        return self.generation
+
+
+def _block(name: str) -> str:
+    return f"def {name}(value):\n" + "    value = value + 1\n" * 8
+
+
+def test_count_tokens_memoized_by_content():
+    tok = WordCounter()
+    ledger = TokenLedger(tok)
+    text = _block("alpha")
+
+    assert ledger.count_tokens(text) == ledger.count_tokens(text[:] + "")
+    assert tok.calls[text] == 1
+
+
+def test_short_texts_are_not_memoized():
+    tok = WordCounter()
+    ledger = TokenLedger(tok)
+
+    ledger.count_tokens("a b c")
+    ledger.count_tokens("a b c")
+    assert tok.calls["a b c"] == 2
+
+
+def test_composite_is_segment_sum_plus_glue():
+    tok = WordCounter()
+    ledger = TokenLedger(tok)
+    first, second = _block("alpha"), _block("beta")
+    text = f"<files>\n{first}\n<sep/>\n{second}\n</files>"
+
+    total = ledger.count_composite(text, [first, second])
+
+    assert total == len(text.split())
+    assert tok.calls[first] == 1 and tok.calls[second] == 1
+    # Lan 2: memo ca text, khong dem lai gi
+    tok.calls.clear()
+    assert ledger.count_composite(text, [first, second]) == total
+    assert not tok.calls
+
+
+def test_composite_skips_missing_segments_and_respects_max_gap():
+    tok = WordCounter()
+    ledger = TokenLedger(tok)
+    first, second = _block("alpha"), _block("beta")
+    text = first + "x " * 100 + second
+
+    assert ledger.count_composite(text, [_block("gamma"), first, second]) == len(
+        text.split()
+    )
+    ledger.clear()
+    tok.calls.clear()
+    ledger.count_composite(text, [first, second], max_gap=10)
+    assert tok.calls[second] == 0
+
+
+def test_memo_invalidated_on_model_change():
+    tok = WordCounter()
+    ledger = TokenLedger(tok)
+    text = _block("alpha")
+
+    ledger.count_tokens(text)
+    tok.set_model_config("other/model")
+    ledger.count_tokens(text)
+    assert tok.calls[text] == 2
+
+
+@patch("infrastructure.git.git_utils.get_git_logs", return_value=None)
+@patch("infrastructure.git.git_utils.get_git_diffs", return_value=None)
+def test_build_prompt_counts_each_file_once(mock_diff, mock_logs, tmp_path):
+    files = []
+    for name in ("alpha", "beta", "gamma"):
+        path = tmp_path / f"{name}.py"
+        path.write_text(_block(name), encoding="utf-8")
+        files.append(path)
+
+    tok = WordCounter()
+    service = PromptBuildService(tokenization_service=tok)
+    with patch(
+        "infrastructure.persistence.settings_manager.load_app_settings"
+    ) as mock_settings:
+        settings = MagicMock()
+        settings.get_rule_filenames_set.return_value = set()
+        mock_settings.return_value = settings
+        result = service.build_prompt_full(
+            file_paths=files,
+            workspace=tmp_path,
+            instructions="explain " * 20,
+            output_format="xml",
+            include_git_changes=False,
+            use_relative_paths=True,
+        )
+
+    assert result.total_tokens == len(result.prompt_text.split())
+    assert tok.calls[result.prompt_text] == 0
+    for info in result.files:
+        assert info.tokens == len(_block(Path(info.path).stem).split())
+    for path in files:
+        assert tok.calls[path.read_text(encoding="utf-8")] == 1
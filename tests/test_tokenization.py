@@ -322,6 +322,81 @@ class TestTokenCacheInstance:
         assert cache_b.get("/test.py", 1.0) is None
 
 
+class TestShardedTokenCache:
+    """TokenCache chia shard, gioi han theo byte budget."""
+
+    def test_entries_spread_over_shards(self):
+        cache = TokenCache(shards=8)
+        for i in range(200):
+            cache.put(f"/src/file_{i}.py", 1.0, i)
+        assert len(cache) == 200
+        assert sum(1 for shard in cache._shards if shard.store) > 1
+        assert cache.get("/src/file_7.py", 1.0) == 7
+
+    def test_byte_budget_evicts_oldest(self):
+        cache = TokenCache(max_bytes=64 * 1024, shards=4)
+        for i in range(2000):
+            cache.put(f"/repo/pkg/module_{i:05d}.py", 1.0, i)
+
+        stats = cache.stats()
+        assert stats["bytes"] <= 64 * 1024
+        assert stats["evictions"] == 2000 - stats["entries"]
+        assert cache.get("/repo/pkg/module_01999.py", 1.0) == 1999
+        assert cache.get("/repo/pkg/module_00000.py", 1.0) is None
+
+    def test_stats_count_hits_and_misses(self):
+        cache = TokenCache()
+        cache.put("/a.py", 1.0, 10)
+        cache.get("/a.py", 1.0)
+        cache.get_no_move("/a.py", 1.0)
+        cache.get("/a.py", 2.0)
+        cache.get("/missing.py", 1.0)
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 2)
+        assert stats["entries"] == 1 and stats["bytes"] > 0
+
+    def test_resize_for_entries_grows_and_shrinks(self):
+        from domain.tokenization.cache import MAX_BUDGET_BYTES, MIN_BUDGET_BYTES
+
+        cache = TokenCache(shards=4)
+        cache.resize_for_entries(10)
+        assert cache.stats()["budget_bytes"] == MIN_BUDGET_BYTES
+        cache.resize_for_entries(200_000)
+        assert MIN_BUDGET_BYTES < cache.stats()["budget_bytes"] <= MAX_BUDGET_BYTES
+
+        for i in range(1000):
+            cache.put(f"/p/{i}.py", 1.0, i)
+        cache.set_max_bytes(8 * 1024)
+        assert cache.stats()["bytes"] <= 8 * 1024
+        assert len(cache) < 1000
+
+    def test_put_batch_and_clear_file_track_bytes(self):
+        cache = TokenCache(shards=4)
+        cache.put_batch({f"/b/{i}.py": (1.0, i) for i in range(50)})
+        before = cache.stats()["bytes"]
+        cache.clear_file("/b/3.py")
+        assert cache.get("/b/3.py", 1.0) is None
+        assert cache.stats()["bytes"] < before
+        cache.clear()
+        assert cache.stats()["bytes"] == 0 and len(cache) == 0
+
+    def test_cache_registry_exposes_counters(self):
+        from infrastructure.adapters.cache_adapters import TokenCacheAdapter
+        from infrastructure.adapters.cache_registry import CacheRegistry
+
+        service = TokenizationService()
+        service._cache.put("/a.py", 1.0, 5)
+        service._cache.get("/a.py", 1.0)
+        registry = CacheRegistry()
+        registry.register("token_cache", TokenCacheAdapter(service))
+
+        stats = registry.get_stats()
+        assert stats["token_cache"] == 1
+        assert stats["token_cache.hits"] == 1
+        assert "token_cache.evictions" in stats
+
+
 # ============================================================================
 # COUNTER MODULE TESTS
 # ============================================================================
@@ -0,0 +1,100 @@
+"""Tests cho tools/benchmarks/tokenization_benchmark.py (regression gate)."""
+
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BENCHMARK = ROOT / "tools" / "benchmarks" / "tokenization_benchmark.py"
+
+
+def _load_module():
+    spec = importlib.util.spec_from_file_location("tokenization_benchmark", BENCHMARK)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(BENCHMARK), "--scale", "0.01", "--runs", "1", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def _scale_baseline(path: Path, factor: float) -> None:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    for result in data["results"].values():
+        result["mb_per_s"] *= factor
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_generate_corpora_is_deterministic(tmp_path):
+    module = _load_module()
+    first = module.generate_corpora(tmp_path / "a", 0.01, seed=7)
+    second = module.generate_corpora(tmp_path / "b", 0.01, seed=7)
+
+    assert set(first) == {
+        "small_files",
+        "huge_files",
+        "minified_js",
+        "cjk",
+        "binary_mixed",
+    }
+    for name, paths in first.items():
+        assert [p.read_bytes() for p in paths] == [p.read_bytes() for p in second[name]]
+    assert any(b"\x00" in p.read_bytes() for p in first["binary_mixed"])
+
+
+def test_find_regressions_uses_threshold():
+    module = _load_module()
+    baseline = {
+        "enc/small/file": {"mb_per_s": 10.0},
+        "enc/small/batch": {"mb_per_s": 10.0},
+        "enc/gone/file": {"mb_per_s": 10.0},
+    }
+    current = {
+        "enc/small/file": {"mb_per_s": 8.5},
+        "enc/small/batch": {"mb_per_s": 7.0},
+        "enc/new/file": {"mb_per_s": 1.0},
+    }
+
+    regressions = module.find_regressions(current, baseline, threshold=0.2)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("enc/small/batch")
+
+
+def test_strict_gate_against_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    output = tmp_path / "out.json"
+
+    written = _run("--write-baseline", "--baseline", str(baseline))
+    assert written.returncode == 0, written.stdout + written.stderr
+    keys = set(json.loads(baseline.read_text(encoding="utf-8"))["results"])
+    assert any(key.endswith("/small_files/cache_hit") for key in keys)
+
+    # Baseline cham hon nhieu -> khong regression
+    _scale_baseline(baseline, 0.001)
+    passed = _run("--strict", "--baseline", str(baseline), "--output", str(output))
+    assert passed.returncode == 0, passed.stdout + passed.stderr
+    assert set(json.loads(output.read_text(encoding="utf-8"))["results"]) == keys
+
+    # Baseline nhanh hon nhieu -> moi kich ban deu regression
+    _scale_baseline(baseline, 1e6)
+    failed = _run("--strict", "--baseline", str(baseline))
+    assert failed.returncode == 1
+    assert "REGRESSION" in failed.stdout
+
+
+def test_strict_without_baseline_fails(tmp_path):
+    proc = _run(
+        "--strict", "--baseline", str(tmp_path / "missing.json"), "--corpus", "cjk"
+    )
+    assert proc.returncode == 2
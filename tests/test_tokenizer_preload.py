@@ -0,0 +1,116 @@
+"""Tests cho preload encoder o background va TokenizerStore."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from infrastructure.adapters import encoders
+from infrastructure.adapters.tokenization_service import TokenizationService
+from infrastructure.persistence.tokenizer_store import TokenizerStore
+
+tokenizers = pytest.importorskip("tokenizers")
+
+
+class FakeEncoder:
+    def encode(self, text):
+        return text.split()
+
+
+def _word_tokenizer():
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    vocab = {"[UNK]": 0, "hello": 1, "world": 2}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    return tokenizer
+
+
+def test_preload_loads_encoder_once_in_background():
+    service = TokenizationService()
+    release = threading.Event()
+    calls = []
+
+    def slow_get_encoder(tokenizer_repo=None):
+        calls.append(threading.current_thread().name)
+        release.wait(5)
+        return FakeEncoder()
+
+    with patch(
+        "infrastructure.adapters.tokenization_service._get_encoder",
+        side_effect=slow_get_encoder,
+    ):
+        future = service.preload()
+        assert service.preload() is future
+        assert not future.done()
+
+        # Dem trong luc dang load: cho encoder cua preload, khong load lai
+        result = []
+        counter = threading.Thread(
+            target=lambda: result.append(service.count_tokens("a b c"))
+        )
+        counter.start()
+        release.set()
+        counter.join(5)
+
+        assert future.result(5) is True
+        assert result == [3]
+        assert calls == ["tokenizer-preload"]
+        assert service.wait_until_ready(1)
+
+
+def test_model_change_starts_new_preload():
+    service = TokenizationService()
+    with patch(
+        "infrastructure.adapters.tokenization_service._get_encoder",
+        return_value=FakeEncoder(),
+    ):
+        first = service.preload()
+        assert first.result(5)
+        service.set_model_config(None)
+        second = service.preload()
+        assert second is not first
+        assert second.result(5)
+
+
+def test_wait_until_ready_times_out():
+    service = TokenizationService()
+    release = threading.Event()
+    with patch(
+        "infrastructure.adapters.tokenization_service._get_encoder",
+        side_effect=lambda tokenizer_repo=None: release.wait(5) and FakeEncoder(),
+    ):
+        assert service.wait_until_ready(0.01) is False
+        release.set()
+        assert service.wait_until_ready(5) is True
+
+
+def test_tokenizer_store_roundtrip(tmp_path):
+    store = TokenizerStore(tmp_path)
+    assert store.load("org/model") is None
+
+    assert store.save("org/model", _word_tokenizer())
+    assert store.path_for("org/model").name == "org--model.json"
+    loaded = store.load("org/model")
+    assert loaded.encode("hello world").ids == [1, 2]
+
+    store.path_for("org/model").write_text("{broken")
+    assert store.load("org/model") is None
+
+
+def test_hf_tokenizer_served_from_store_without_hub(tmp_path):
+    store = TokenizerStore(tmp_path)
+    encoders.configure_tokenizer_store(store)
+    try:
+        with patch.object(
+            encoders.Tokenizer, "from_pretrained", return_value=_word_tokenizer()
+        ) as hub:
+            assert encoders._load_hf_tokenizer("org/model") is not None
+            assert hub.call_count == 1
+            assert store.path_for("org/model").exists()
+
+            loaded = encoders._load_hf_tokenizer("org/model")
+            assert hub.call_count == 1
+            assert loaded.encode("world hello").ids == [2, 1]
+    finally:
+        encoders.configure_tokenizer_store(None)
@@ -0,0 +1,173 @@
+"""
+Tests cho infrastructure.filesystem.file_watcher.tree_deltas va che do
+on_tree_deltas cua TimerEventDebouncer.
+
+Kiem tra cac truong hop:
+- created/deleted cung path trong 1 batch triet tieu nhau
+- Xoa folder bo cac delta cua path con
+- moved -> rename, chuoi moved gop lai
+- Debouncer gui deltas thay vi on_batch_change, overflow -> full refresh
+"""
+
+import os
+from unittest.mock import Mock
+
+from application.interfaces.file_watcher_port import (
+    FileChangeEvent,
+    TreeDelta,
+    WatcherCallbacks,
+)
+from infrastructure.filesystem.file_watcher import debouncer as debouncer_module
+from infrastructure.filesystem.file_watcher.debouncer import TimerEventDebouncer
+from infrastructure.filesystem.file_watcher.handler import WorkspaceEventHandler
+from infrastructure.filesystem.file_watcher.tree_deltas import build_tree_deltas
+
+ROOT = os.path.join(os.sep, "ws")
+
+
+def _p(*parts: str) -> str:
+    return os.path.join(ROOT, *parts)
+
+
+def _event(kind: str, path: str, is_dir: bool = False, dest: str = None):
+    return FileChangeEvent(kind, path, is_dir, dest_path=dest)
+
+
+class TestBuildTreeDeltas:
+    """Test suite cho build_tree_deltas."""
+
+    def test_file_tam_tao_roi_xoa_khong_co_delta(self):
+        events = [
+            _event("created", _p("a.tmp")),
+            _event("modified", _p("a.tmp")),
+            _event("deleted", _p("a.tmp")),
+        ]
+        assert build_tree_deltas(events) == []
+
+    def test_xoa_roi_tao_lai_khong_doi_cau_truc(self):
+        events = [_event("deleted", _p("a.py")), _event("created", _p("a.py"))]
+        assert build_tree_deltas(events) == []
+
+    def test_xoa_folder_bo_delta_cua_con(self):
+        events = [
+            _event("deleted", _p("pkg", "a.py")),
+            _event("created", _p("pkg", "b.py")),
+            _event("deleted", _p("pkg"), is_dir=True),
+        ]
+        assert build_tree_deltas(events) == [TreeDelta("remove", _p("pkg"), True)]
+
+    def test_insert_parent_truoc_child(self):
+        events = [
+            _event("created", _p("pkg", "sub", "x.py")),
+            _event("created", _p("pkg"), is_dir=True),
+            _event("created", _p("pkg", "sub"), is_dir=True),
+        ]
+        assert [d.path for d in build_tree_deltas(events)] == [
+            _p("pkg"),
+            _p("pkg", "sub"),
+            _p("pkg", "sub", "x.py"),
+        ]
+
+    def test_moved_thanh_rename_va_gop_chuoi(self):
+        events = [
+            _event("moved", _p("a.py"), dest=_p("b.py")),
+            _event("moved", _p("b.py"), dest=_p("c.py")),
+            _event("created", _p("new.py")),
+        ]
+        assert build_tree_deltas(events) == [
+            TreeDelta("rename", _p("a.py"), False, new_path=_p("c.py")),
+            TreeDelta("insert", _p("new.py"), False),
+        ]
+
+    def test_atomic_save_file_tam_moi_tao(self):
+        """Editor ghi file tam roi rename de len file cu -> khong doi cau truc."""
+        events = [
+            _event("created", _p(".a.py.swp")),
+            _event("moved", _p(".a.py.swp"), dest=_p("a.py")),
+        ]
+        assert build_tree_deltas(events) == [TreeDelta("insert", _p("a.py"), False)]
+
+
+class TestDebouncerTreeDeltas:
+    """Test TimerEventDebouncer voi on_tree_deltas."""
+
+    def _debouncer(self, **callbacks):
+        debouncer = TimerEventDebouncer(WatcherCallbacks(**callbacks))
+        # Goi _trigger_callback truc tiep, khong cho timer
+        debouncer._pending_events = []
+        return debouncer
+
+    def test_gui_deltas_khong_full_refresh(self):
+        on_deltas, on_batch = Mock(), Mock()
+        debouncer = self._debouncer(on_tree_deltas=on_deltas, on_batch_change=on_batch)
+        debouncer._pending_events = [_event("created", _p("a.py"))]
+
+        debouncer._trigger_callback()
+
+        on_deltas.assert_called_once_with([TreeDelta("insert", _p("a.py"), False)])
+        on_batch.assert_not_called()
+
+    def test_chi_modified_khong_goi_callback_cau_truc(self):
+        on_deltas, on_batch, on_modified = Mock(), Mock(), Mock()
+        debouncer = self._debouncer(
+            on_file_modified=on_modified,
+            on_tree_deltas=on_deltas,
+            on_batch_change=on_batch,
+        )
+        debouncer._pending_events = [_event("modified", _p("a.py"))]
+
+        debouncer._trigger_callback()
+
+        on_modified.assert_called_once_with(_p("a.py"))
+        on_deltas.assert_not_called()
+        on_batch.assert_not_called()
+
+    def test_overflow_fallback_full_refresh(self, monkeypatch):
+        monkeypatch.setattr(debouncer_module, "MAX_INCREMENTAL_EVENTS", 2)
+        on_deltas, on_batch = Mock(), Mock()
+        debouncer = self._debouncer(on_tree_deltas=on_deltas, on_batch_change=on_batch)
+        debouncer._pending_events = [
+            _event("created", _p(f"f{i}.py")) for i in range(3)
+        ]
+
+        debouncer._trigger_callback()
+
+        on_batch.assert_called_once_with()
+        on_deltas.assert_not_called()
+
+    def test_moved_invalidate_ca_hai_dau(self):
+        on_deleted, on_modified = Mock(), Mock()
+        debouncer = self._debouncer(
+            on_file_deleted=on_deleted, on_file_modified=on_modified
+        )
+        debouncer._pending_events = [_event("moved", _p("a.py"), dest=_p("b.py"))]
+
+        debouncer._trigger_callback()
+
+        on_deleted.assert_called_once_with(_p("a.py"))
+        on_modified.assert_called_once_with(_p("b.py"))
+
+
+class TestHandlerMovedEvents:
+    """Test WorkspaceEventHandler voi move qua ranh gioi ignore."""
+
+    def _handle(self, ignored: set, src: str, dest: str):
+        strategy = Mock()
+        strategy.should_ignore.side_effect = lambda path: path in ignored
+        debouncer = Mock()
+        handler = WorkspaceEventHandler(strategy, debouncer)
+        watchdog_event = Mock(src_path=src, dest_path=dest, is_directory=False)
+        handler._handle_event(watchdog_event, "moved")
+        return [call.args[0] for call in debouncer.add_event.call_args_list]
+
+    def test_move_binh_thuong_giu_dest(self):
+        events = self._handle(set(), _p("a.py"), _p("b.py"))
+        assert events == [_event("moved", _p("a.py"), dest=_p("b.py"))]
+
+    def test_move_tu_path_ignored_thanh_created(self):
+        events = self._handle({_p("a.tmp")}, _p("a.tmp"), _p("a.py"))
+        assert events == [_event("created", _p("a.py"))]
+
+    def test_move_vao_path_ignored_thanh_deleted(self):
+        events = self._handle({_p("a.tmp")}, _p("a.py"), _p("a.tmp"))
+        assert events == [_event("deleted", _p("a.py"))]
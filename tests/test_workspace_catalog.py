@@ -0,0 +1,209 @@
+"""
+Tests cho application.services.workspace_catalog.
+
+Kiem tra cac truong hop:
+- Build 1 lan du nhieu consumer goi dong thoi
+- Loc ignored/binary files, files() theo folder
+- refresh_path cho file moi, file bi xoa, folder moi
+- Doi .gitignore -> catalog build lai
+- WorkspaceScanner doc tu catalog
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from application.services import workspace_catalog as catalog_module
+from application.services.workspace_catalog import WorkspaceCatalogService
+from application.services.workspace_index import WorkspaceScanner
+from infrastructure.filesystem.ignore_engine import IgnoreEngine
+
+
+def _write(path: Path, content: bytes = b"print('x')\n") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    # Lui mtime de khong roi vao racy window cua binary cache
+    old = time.time() - 60
+    os.utime(path, (old, old))
+    return path
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Path:
+    _write(tmp_path / "main.py")
+    _write(tmp_path / "src" / "util.py")
+    _write(tmp_path / "src" / "logo.png", b"\x89PNG\x00\x00binary")
+    _write(tmp_path / "generated" / "out.py")
+    _write(tmp_path / ".gitignore", b"generated/\n")
+    return tmp_path
+
+
+@pytest.fixture
+def service() -> WorkspaceCatalogService:
+    return WorkspaceCatalogService(IgnoreEngine())
+
+
+def _rel(catalog, paths):
+    return sorted(Path(p).relative_to(catalog.root).as_posix() for p in paths)
+
+
+class TestWorkspaceCatalogBuild:
+    """Build catalog va cac query co ban."""
+
+    def test_loc_ignored_va_binary(self, service, workspace):
+        catalog = service.get_catalog(workspace)
+
+        assert _rel(catalog, catalog.files()) == [
+            ".gitignore",
+            "main.py",
+            "src/util.py",
+        ]
+        assert "src/logo.png" in _rel(catalog, catalog.files(include_binary=True))
+        assert catalog.get("generated/out.py") is None
+
+    def test_entry_metadata(self, service, workspace):
+        entry = service.get_catalog(workspace).get("src/util.py")
+
+        assert entry is not None
+        assert entry.extension == ".py"
+        assert entry.size == len(b"print('x')\n")
+        assert entry.language == "python"
+        assert not entry.is_binary
+
+    def test_files_theo_folder(self, service, workspace):
+        catalog = service.get_catalog(workspace)
+
+        assert _rel(catalog, catalog.files(workspace / "src")) == ["src/util.py"]
+        assert catalog.files(workspace.parent) == []
+
+    def test_search_index(self, service, workspace):
+        index = service.get_catalog(workspace).search_index()
+
+        assert set(index) == {".gitignore", "main.py", "util.py"}
+
+    def test_goi_dong_thoi_chi_walk_1_lan(self, service, workspace):
+        real_walk = catalog_module._walk_files
+        calls = []
+
+        def slow_walk(*args):
+            calls.append(args)
+            time.sleep(0.05)
+            return real_walk(*args)
+
+        results = []
+        with patch.object(catalog_module, "_walk_files", side_effect=slow_walk):
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(service.get_catalog(workspace))
+                )
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            service.get_catalog(workspace)
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_peek_khong_build(self, service, workspace):
+        assert service.peek_catalog(workspace) is None
+        catalog = service.get_catalog(workspace)
+        assert service.peek_catalog(workspace) is catalog
+
+    def test_doi_gitignore_build_lai(self, service, workspace):
+        first = service.get_catalog(workspace)
+        _write(workspace / ".gitignore", b"src/\n")
+
+        second = service.get_catalog(workspace)
+
+        assert second is not first
+        assert second.get("generated/out.py") is not None
+        assert second.get("src/util.py") is None
+
+    def test_lru_eviction(self, tmp_path):
+        service = WorkspaceCatalogService(IgnoreEngine(), max_catalogs=1)
+        _write(tmp_path / "a" / "x.py")
+        _write(tmp_path / "b" / "y.py")
+
+        service.get_catalog(tmp_path / "a")
+        service.get_catalog(tmp_path / "b")
+
+        assert service.peek_catalog(tmp_path / "a") is None
+        assert service.peek_catalog(tmp_path / "b") is not None
+
+
+class TestWorkspaceCatalogRefresh:
+    """refresh_path/invalidate tu file watcher."""
+
+    def test_file_moi(self, service, workspace):
+        catalog = service.get_catalog(workspace)
+        new_file = _write(workspace / "src" / "new.py")
+
+        service.refresh_path(str(new_file))
+
+        assert catalog.get("src/new.py") is not None
+
+    def test_file_bi_xoa(self, service, workspace):
+        catalog = service.get_catalog(workspace)
+        (workspace / "main.py").unlink()
+
+        service.refresh_path(str(workspace / "main.py"))
+
+        assert catalog.get("main.py") is None
+
+    def test_folder_moi_va_folder_bi_xoa(self, service, workspace):
+        catalog = service.get_catalog(workspace)
+        _write(workspace / "pkg" / "a.py")
+        _write(workspace / "pkg" / "sub" / "b.py")
+
+        service.refresh_path(str(workspace / "pkg"))
+        assert _rel(catalog, catalog.files(workspace / "pkg")) == [
+            "pkg/a.py",
+            "pkg/sub/b.py",
+        ]
+
+        for path in [workspace / "pkg" / "sub" / "b.py", workspace / "pkg" / "a.py"]:
+            path.unlink()
+        (workspace / "pkg" / "sub").rmdir()
+        (workspace / "pkg").rmdir()
+        service.refresh_path(str(workspace / "pkg"))
+        assert catalog.files(workspace / "pkg") == []
+
+    def test_file_bi_ignore_khong_them(self, service, workspace):
+        catalog = service.get_catalog(workspace)
+        new_file = _write(workspace / "generated" / "gen.py")
+
+        service.refresh_path(str(new_file))
+
+        assert catalog.get("generated/gen.py") is None
+
+    def test_invalidate(self, service, workspace):
+        service.get_catalog(workspace)
+        service.invalidate(workspace)
+        assert service.peek_catalog(workspace) is None
+
+
+class TestWorkspaceScannerCatalog:
+    """WorkspaceScanner dung catalog thay vi walk lai."""
+
+    def test_collect_files_tu_catalog(self, service, workspace):
+        scanner = WorkspaceScanner(catalog=service)
+
+        with patch.object(
+            catalog_module, "_walk_files", wraps=catalog_module._walk_files
+        ) as walk:
+            files = scanner.collect_files(workspace)
+            scanner.collect_files(workspace)
+
+        assert walk.call_count == 1
+        assert sorted(Path(f).name for f in files) == [
+            ".gitignore",
+            "main.py",
+            "util.py",
+        ]
@@ -2,7 +2,7 @@
 Test Workspace Index - Unit tests cho services/workspace_index.py.
 
 Verify:
-1. build_search_index() - correct filtering, binary skip, pathspec respect
+1. build_search_index() - correct filtering, binary skip, ignore rules respect
 2. search_in_index() - case-insensitive, empty query, empty index
 3. collect_files_from_disk() - binary skip, gitignore respect
 
@@ -11,8 +11,10 @@ nen ta patch o module goc (core.ignore_engine, core.utils.file_utils, etc.)
 thay vi patch o services.workspace_index.
 """
 
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+from domain.ports.registry import DomainRegistry
 from application.services.workspace_index import (
     build_search_index,
     search_in_index,
@@ -98,65 +100,25 @@ class TestSearchInIndex:
         result = search_in_index(index, "nonexistent")
         assert result == []
 
-    @patch("builtins.open", new_callable=MagicMock)
-    @patch("os.path.getsize", return_value=100)
-    def test_content_search_basic(self, mock_getsize, mock_open):
-        """Tim kiem noi dung hieu qua voi prefix code:"""
-        index = {
-            "main.py": ["/project/main.py"],
-            "utils.py": ["/project/utils.py"],
-        }
-
-        # Mock file content
-        def mock_file_content(*args, **kwargs):
-            file_path = args[0]
-            mock_file = MagicMock()
-            if "main.py" in file_path:
-                mock_file.__enter__.return_value.read.return_value = (
-                    "def hello_world():\n    pass"
-                )
-            else:
-                mock_file.__enter__.return_value.read.return_value = "import os\n"
-            return mock_file
-
-        mock_open.side_effect = mock_file_content
-
-        # Search for "hello"
-        result = search_in_index(index, "code: hello")
-        assert result == ["/project/main.py"]
-
-    @patch("builtins.open", new_callable=MagicMock)
-    @patch("os.path.getsize", return_value=100)
-    def test_content_search_case_insensitive(self, mock_getsize, mock_open):
-        """Tim kiem noi dung khong phan biet hoa thuong."""
+    def test_content_search_delegates_to_content_index(self):
+        """Prefix code: (khong phan biet hoa thuong) di qua content index."""
         index = {"main.py": ["/project/main.py"]}
+        content_index = MagicMock()
+        content_index.search.return_value = ["/project/main.py"]
 
-        mock_file = MagicMock()
-        mock_file.__enter__.return_value.read.return_value = "class MyAwesomeModel:"
-        mock_open.return_value = mock_file
+        with patch.object(DomainRegistry, "content_index", return_value=content_index):
+            result = search_in_index(index, "cOdE: AWESOME", Path("/project"))
 
-        result = search_in_index(index, "cOdE: AWESOME")
         assert result == ["/project/main.py"]
+        content_index.search.assert_called_once_with(Path("/project"), "AWESOME")
 
-    @patch("builtins.open", new_callable=MagicMock)
-    @patch("os.path.getsize", return_value=100)
-    def test_content_search_skip_large_files(self, mock_getsize, mock_open):
-        """Bo qua cac file qua lon khi tim kiem noi dung."""
-        index = {"large.txt": ["/project/large.txt"]}
-        # MAX_CONTENT_SEARCH_SIZE = 2 * 1024 * 1024
-        mock_getsize.return_value = 3 * 1024 * 1024
-
-        result = search_in_index(index, "code: find_me")
-        assert result == []
-        mock_open.assert_not_called()
-
-    @patch("builtins.open", side_effect=PermissionError("Permission denied"))
-    @patch("os.path.getsize", return_value=100)
-    def test_content_search_handle_read_error(self, mock_getsize, mock_open):
-        """Bo qua loi doc file khi tim kiem noi dung."""
-        index = {"secret.txt": ["/project/secret.txt"]}
-        result = search_in_index(index, "code: secret")
-        assert result == []
+    def test_content_search_without_workspace_or_query(self):
+        """Khong co workspace hoac query rong sau prefix -> khong search."""
+        index = {"main.py": ["/project/main.py"]}
+        with patch.object(DomainRegistry, "content_index") as content_index:
+            assert search_in_index(index, "code: hello") == []
+            assert search_in_index(index, "code:   ", Path("/project")) == []
+        content_index.assert_not_called()
 
 
 # =============================================================================
@@ -174,8 +136,8 @@ class TestBuildSearchIndex:
         sub.mkdir()
         (sub / "app.py").write_text("# app")
 
-        mock_spec = MagicMock()
-        mock_spec.match_file.return_value = False
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.return_value = False
 
         with (
             patch(
@@ -199,8 +161,8 @@ class TestBuildSearchIndex:
                 return_value=False,
             ),
             patch(
-                "infrastructure.filesystem.ignore_engine.IgnoreEngine.build_pathspec",
-                return_value=mock_spec,
+                "infrastructure.filesystem.ignore_engine.IgnoreEngine.compile_matcher",
+                return_value=mock_matcher,
             ),
         ):
             index = build_search_index(tmp_path)
@@ -219,8 +181,8 @@ class TestBuildSearchIndex:
         def mock_is_binary(path):
             return str(path).endswith(".png")
 
-        mock_spec = MagicMock()
-        mock_spec.match_file.return_value = False
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.return_value = False
 
         with (
             patch(
@@ -244,8 +206,8 @@ class TestBuildSearchIndex:
                 return_value=False,
             ),
             patch(
-                "infrastructure.filesystem.ignore_engine.IgnoreEngine.build_pathspec",
-                return_value=mock_spec,
+                "infrastructure.filesystem.ignore_engine.IgnoreEngine.compile_matcher",
+                return_value=mock_matcher,
             ),
         ):
             index = build_search_index(tmp_path)
@@ -254,15 +216,15 @@ class TestBuildSearchIndex:
         assert "image.png" not in index
 
     def test_ignored_files_skipped(self, tmp_path):
-        """Files matching pathspec bi bo qua."""
+        """Files matching ignore rules bi bo qua."""
         (tmp_path / "code.py").write_text("# code")
         (tmp_path / "secret.env").write_text("KEY=val")
 
-        def mock_match(rel_path):
+        def mock_match(rel_path, is_dir=False):
             return rel_path.endswith(".env")
 
-        mock_spec = MagicMock()
-        mock_spec.match_file.side_effect = mock_match
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.side_effect = mock_match
 
         with (
             patch(
@@ -282,8 +244,8 @@ class TestBuildSearchIndex:
                 return_value=False,
             ),
             patch(
-                "application.services.workspace_index._get_ignore_spec",
-                return_value=mock_spec,
+                "application.services.workspace_index._get_ignore_matcher",
+                return_value=mock_matcher,
             ),
         ):
             index = build_search_index(tmp_path)
@@ -295,8 +257,8 @@ class TestBuildSearchIndex:
         """Generation check stale tra ve index rong."""
         (tmp_path / "file.py").write_text("# code")
 
-        mock_spec = MagicMock()
-        mock_spec.match_file.return_value = False
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.return_value = False
 
         with (
             patch(
@@ -320,8 +282,8 @@ class TestBuildSearchIndex:
                 return_value=False,
             ),
             patch(
-                "infrastructure.filesystem.ignore_engine.IgnoreEngine.build_pathspec",
-                return_value=mock_spec,
+                "infrastructure.filesystem.ignore_engine.IgnoreEngine.compile_matcher",
+                return_value=mock_matcher,
             ),
         ):
             # generation_check tra ve False -> cancel ngay
@@ -331,8 +293,8 @@ class TestBuildSearchIndex:
 
     def test_empty_workspace(self, tmp_path):
         """Workspace rong tra ve index rong."""
-        mock_spec = MagicMock()
-        mock_spec.match_file.return_value = False
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.return_value = False
 
         with (
             patch(
@@ -348,8 +310,8 @@ class TestBuildSearchIndex:
                 return_value=False,
             ),
             patch(
-                "infrastructure.filesystem.ignore_engine.IgnoreEngine.build_pathspec",
-                return_value=mock_spec,
+                "infrastructure.filesystem.ignore_engine.IgnoreEngine.compile_matcher",
+                return_value=mock_matcher,
             ),
         ):
             index = build_search_index(tmp_path)
@@ -371,8 +333,8 @@ class TestCollectFilesFromDisk:
         sub.mkdir()
         (sub / "c.py").write_text("# c")
 
-        mock_spec = MagicMock()
-        mock_spec.match_file.return_value = False
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.return_value = False
 
         with (
             patch(
@@ -396,8 +358,8 @@ class TestCollectFilesFromDisk:
                 return_value=False,
             ),
             patch(
-                "infrastructure.filesystem.ignore_engine.IgnoreEngine.build_pathspec",
-                return_value=mock_spec,
+                "infrastructure.filesystem.ignore_engine.IgnoreEngine.compile_matcher",
+                return_value=mock_matcher,
             ),
         ):
             result = collect_files_from_disk(tmp_path, workspace_path=tmp_path)
@@ -417,8 +379,8 @@ class TestCollectFilesFromDisk:
             path_str = str(path)
             return path_str.endswith(".jpg") or path_str.endswith(".png")
 
-        mock_spec = MagicMock()
-        mock_spec.match_file.return_value = False
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.return_value = False
 
         with (
             patch(
@@ -442,8 +404,8 @@ class TestCollectFilesFromDisk:
                 return_value=False,
             ),
             patch(
-                "infrastructure.filesystem.ignore_engine.IgnoreEngine.build_pathspec",
-                return_value=mock_spec,
+                "infrastructure.filesystem.ignore_engine.IgnoreEngine.compile_matcher",
+                return_value=mock_matcher,
             ),
         ):
             result = collect_files_from_disk(tmp_path, workspace_path=tmp_path)
@@ -455,8 +417,8 @@ class TestCollectFilesFromDisk:
         """Ket qua khong co duplicates."""
         (tmp_path / "file.py").write_text("# code")
 
-        mock_spec = MagicMock()
-        mock_spec.match_file.return_value = False
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.return_value = False
 
         with (
             patch(
@@ -480,8 +442,8 @@ class TestCollectFilesFromDisk:
                 return_value=False,
             ),
             patch(
-                "infrastructure.filesystem.ignore_engine.IgnoreEngine.build_pathspec",
-                return_value=mock_spec,
+                "infrastructure.filesystem.ignore_engine.IgnoreEngine.compile_matcher",
+                return_value=mock_matcher,
             ),
         ):
             result = collect_files_from_disk(tmp_path, workspace_path=tmp_path)
@@ -491,8 +453,8 @@ class TestCollectFilesFromDisk:
 
     def test_permission_error_handled(self, tmp_path):
         """PermissionError khong crash, tra ve ket qua rong."""
-        mock_spec = MagicMock()
-        mock_spec.match_file.return_value = False
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.return_value = False
 
         with (
             patch(
@@ -508,8 +470,8 @@ class TestCollectFilesFromDisk:
                 return_value=False,
             ),
             patch(
-                "infrastructure.filesystem.ignore_engine.IgnoreEngine.build_pathspec",
-                return_value=mock_spec,
+                "infrastructure.filesystem.ignore_engine.IgnoreEngine.compile_matcher",
+                return_value=mock_matcher,
             ),
             patch("os.walk", side_effect=PermissionError("denied")),
         ):
@@ -519,8 +481,8 @@ class TestCollectFilesFromDisk:
 
     def test_empty_folder(self, tmp_path):
         """Folder rong tra ve list rong."""
-        mock_spec = MagicMock()
-        mock_spec.match_file.return_value = False
+        mock_matcher = MagicMock()
+        mock_matcher.is_ignored.return_value = False
 
         with (
             patch(
@@ -536,8 +498,8 @@ class TestCollectFilesFromDisk:
                 return_value=False,
             ),
             patch(
-                "infrastructure.filesystem.ignore_engine.IgnoreEngine.build_pathspec",
-                return_value=mock_spec,
+                "infrastructure.filesystem.ignore_engine.IgnoreEngine.compile_matcher",
+                return_value=mock_matcher,
             ),
         ):
             result = collect_files_from_disk(tmp_path, workspace_path=tmp_path)
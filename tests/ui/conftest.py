@@ -20,6 +20,7 @@ class FakeFileTreeWidget(QWidget):
     selection_changed = Signal(set)
     file_preview_requested = Signal(str)
     token_counting_done = Signal()
+    token_counting_progress = Signal(str, int)
     exclude_patterns_changed = Signal()
 
     def __init__(self, *args, **kwargs):
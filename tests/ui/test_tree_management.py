@@ -215,7 +215,7 @@ def test_on_file_deleted_delegates(context_view):
 
 
 def test_on_file_created_no_crash(context_view):
-    """Kiem tra _on_file_created khong lam gi (no cache invalidation)."""
+    """Kiem tra _on_file_created khong crash."""
     view = context_view
     view._tree_controller.on_file_created("/fake/workspace/new.py")
 
@@ -0,0 +1,432 @@
+"""
+Tokenization Benchmark - Do throughput cua stack dem token tren corpus tong hop.
+
+Corpus (sinh deterministic theo seed, co gian bang --scale):
+- small_files: nhieu file Python nho
+- huge_files: vai file rat lon (ca file > MAX_BYTES -> duong streaming)
+- minified_js: JS 1 dong rat dai
+- cjk: code + comment/chuoi CJK (nhieu byte moi ky tu)
+- binary_mixed: cay thu muc tron file binary (phai bo qua nhanh)
+
+Kich ban (moi encoder):
+- file: count_tokens_for_file tuan tu, cache lanh
+- parallel: count_tokens_parallel_standard (ThreadPool), cache lanh
+- batch: count_tokens_batch_parallel (API cong khai, chon backend tu dong)
+- batch_hf: count_tokens_batch_hf (chi encoder HF)
+- cache_hit: count_tokens_for_file lan 2 (TokenCache hit)
+
+Bao cao files/s va MB/s (lay lan nhanh nhat trong --runs lan).
+
+Che do:
+- report (mac dinh): in bao cao (so sanh voi baseline neu co), exit 0.
+- strict: exit 1 neu MB/s cua kich ban nao giam qua --threshold so voi
+  baseline (exit 2 neu chua co baseline).
+
+Su dung:
+    python tools/benchmarks/tokenization_benchmark.py
+    python tools/benchmarks/tokenization_benchmark.py --write-baseline
+    python tools/benchmarks/tokenization_benchmark.py --strict --threshold 0.15
+    python tools/benchmarks/tokenization_benchmark.py \\
+        --tokenizer-repo Xenova/claude-tokenizer --scale 0.25
+
+Baseline phu thuoc may: ghi baseline tren chinh may/CI se dung --strict.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from domain.tokenization.cancellation import (  # noqa: E402
+    start_token_counting,
+    stop_token_counting,
+)
+from infrastructure.adapters.parallel_counter import (  # noqa: E402
+    count_tokens_batch_hf,
+    count_tokens_parallel_standard,
+)
+from infrastructure.adapters.tokenization_service import (  # noqa: E402
+    TokenizationService,
+)
+
+BASELINE_PATH = ROOT / "tools" / "benchmarks" / "tokenization_baseline.json"
+# Giam MB/s qua nguong nay (ti le) so voi baseline -> regression
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_SEED = 1234
+PARALLEL_WORKERS = 8
+
+_WORDS = (
+    "value result config handler request response buffer token index cache "
+    "parser builder service adapter worker session context payload stream"
+).split()
+_CJK = "数据处理函数返回结果配置缓存请求响应令牌索引解析服务上下文文件路径字符串"
+_CJK += "データ処理関数結果設定要求応答文脈経路文字列"
+
+
+# ============================================================
+# Corpus generation
+# ============================================================
+
+
+def _python_source(rng: random.Random, target_bytes: int) -> str:
+    parts: List[str] = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        a, b, c = rng.sample(_WORDS, 3)
+        block = (
+            f"def {a}_{b}_{i}({c}, limit={rng.randint(1, 999)}):\n"
+            f'    """Return {a} {b} for {c}."""\n'
+            f"    {a} = [{c}[k] * {rng.randint(2, 9)} for k in range(limit)]\n"
+            f"    if len({a}) > {rng.randint(10, 99)}:\n"
+            f"        return {{'{b}': {a}, 'n': len({a})}}\n"
+            f"    return None\n\n"
+        )
+        parts.append(block)
+        size += len(block)
+        i += 1
+    return "".join(parts)
+
+
+def _minified_js(rng: random.Random, target_bytes: int) -> str:
+    parts: List[str] = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        a, b = rng.sample(_WORDS, 2)
+        chunk = (
+            f"function {a[0]}{i}({b[0]},e){{var t={b[0]}.{a}||{rng.randint(0, 99)};"
+            f"return e?t*{rng.randint(2, 9)}:{b[0]}.{b}(t)}};"
+        )
+        parts.append(chunk)
+        size += len(chunk)
+        i += 1
+    return "".join(parts)
+
+
+def _cjk_source(rng: random.Random, target_bytes: int) -> str:
+    parts: List[str] = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        text = "".join(rng.choice(_CJK) for _ in range(rng.randint(8, 40)))
+        line = f"# {text}\nlabel_{i} = '{text[::-1]}'  # {rng.choice(_WORDS)}\n"
+        parts.append(line)
+        size += len(line.encode("utf-8"))
+        i += 1
+    return "".join(parts)
+
+
+def _scaled(count: int, scale: float) -> int:
+    return max(1, int(count * scale))
+
+
+def generate_corpora(root: Path, scale: float, seed: int) -> Dict[str, List[Path]]:
+    """
+    Sinh cac corpus duoi `root`.
+
+    Returns:
+        {ten corpus: danh sach file}
+    """
+    rng = random.Random(seed)
+    corpora: Dict[str, List[Path]] = {}
+
+    def write(name: str, rel: str, data: str | bytes) -> None:
+        path = root / name / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, bytes):
+            path.write_bytes(data)
+        else:
+            path.write_text(data, encoding="utf-8")
+        corpora.setdefault(name, []).append(path)
+
+    for i in range(_scaled(2000, scale)):
+        source = _python_source(rng, rng.randint(600, 3000))
+        write("small_files", f"pkg_{i % 40}/mod_{i}.py", source)
+
+    huge_sizes = [2 * 1024 * 1024, 3 * 1024 * 1024, 6 * 1024 * 1024]
+    for i, size in enumerate(huge_sizes):
+        write("huge_files", f"huge_{i}.py", _python_source(rng, int(size * scale)))
+
+    for i in range(_scaled(50, scale)):
+        write("minified_js", f"dist/bundle_{i}.min.js", _minified_js(rng, 100_000))
+
+    for i in range(_scaled(300, scale)):
+        write("cjk", f"i18n/text_{i}.py", _cjk_source(rng, rng.randint(1000, 6000)))
+
+    for i in range(_scaled(500, scale)):
+        if i % 3 == 0:
+            blob = rng.randbytes(4096) + b"\x00" * 64
+            write("binary_mixed", f"assets/blob_{i}.bin", blob)
+        else:
+            source = _python_source(rng, rng.randint(600, 3000))
+            write("binary_mixed", f"src/file_{i}.py", source)
+
+    return corpora
+
+
+# ============================================================
+# Measurement
+# ============================================================
+
+
+@dataclass
+class Measurement:
+    files: int
+    bytes: int
+    seconds: float
+    files_per_s: float
+    mb_per_s: float
+
+
+def _measure(
+    run: Callable[[], object],
+    setup: Callable[[], None],
+    files: int,
+    total_bytes: int,
+    runs: int,
+) -> Measurement:
+    best = float("inf")
+    for _ in range(runs):
+        setup()
+        start_token_counting()
+        try:
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            stop_token_counting()
+    best = max(best, 1e-9)
+    return Measurement(
+        files=files,
+        bytes=total_bytes,
+        seconds=round(best, 6),
+        files_per_s=round(files / best, 1),
+        mb_per_s=round(total_bytes / best / (1024 * 1024), 3),
+    )
+
+
+def _size(paths: List[Path]) -> int:
+    return sum(p.stat().st_size for p in paths)
+
+
+def benchmark_encoder(
+    tokenizer_repo: Optional[str],
+    corpora: Dict[str, List[Path]],
+    runs: int,
+) -> Dict[str, Measurement]:
+    """
+    Chay moi kich ban tren moi corpus cho 1 encoder.
+
+    Returns:
+        {"<encoder>/<corpus>/<scenario>": Measurement}
+    """
+    service = TokenizationService(tokenizer_repo=tokenizer_repo)
+    service.wait_until_ready()
+    encoder_id = f"{service._encoder_type or 'estimate'}:{tokenizer_repo or ''}"
+    results: Dict[str, Measurement] = {}
+
+    for corpus, paths in corpora.items():
+        small, _ = TokenizationService._split_large_files(paths)
+        total, small_total = _size(paths), _size(small)
+        cold = service.clear_cache
+
+        def count_each(files: List[Path] = paths) -> None:
+            for path in files:
+                service.count_tokens_for_file(path)
+
+        scenarios: Dict[str, Measurement] = {
+            "file": _measure(count_each, cold, len(paths), total, runs),
+            "parallel": _measure(
+                partial(
+                    count_tokens_parallel_standard,
+                    small,
+                    PARALLEL_WORKERS,
+                    True,
+                    service._count_tokens_for_file_no_cache,
+                    service._cache.put_batch,
+                    service._count_tokens_batch_sequential,
+                ),
+                cold,
+                len(small),
+                small_total,
+                runs,
+            ),
+            "batch": _measure(
+                partial(service.count_tokens_batch_parallel, paths),
+                cold,
+                len(paths),
+                total,
+                runs,
+            ),
+        }
+        if service._encoder_type == "hf":
+            scenarios["batch_hf"] = _measure(
+                partial(
+                    count_tokens_batch_hf,
+                    small,
+                    tokenizer_repo,
+                    partial(service._cached_count_no_move, batch=True),
+                    service._cache.put_batch,
+                    service.count_tokens_batch_parallel,
+                ),
+                cold,
+                len(small),
+                small_total,
+                runs,
+            )
+        count_each()  # Lam nong TokenCache cho cache_hit
+        scenarios["cache_hit"] = _measure(
+            count_each, lambda: None, len(paths), total, runs
+        )
+
+        for scenario, measurement in scenarios.items():
+            results[f"{encoder_id}/{corpus}/{scenario}"] = measurement
+
+    service.shutdown_workers()
+    return results
+
+
+# ============================================================
+# Baseline comparison
+# ============================================================
+
+
+def find_regressions(
+    current: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Cac key co MB/s giam qua `threshold` so voi baseline (key moi bo qua)."""
+    regressions: List[str] = []
+    for key, base in sorted(baseline.items()):
+        now = current.get(key)
+        if now is None or base.get("mb_per_s", 0) <= 0:
+            continue
+        if now["mb_per_s"] < base["mb_per_s"] * (1 - threshold):
+            change = now["mb_per_s"] / base["mb_per_s"] - 1
+            regressions.append(
+                f"{key}: {base['mb_per_s']:.2f} -> {now['mb_per_s']:.2f} MB/s "
+                f"({change:+.0%})"
+            )
+    return regressions
+
+
+def _print_report(
+    results: Dict[str, Dict[str, float]],
+    baseline: Optional[Dict[str, Dict[str, float]]],
+) -> None:
+    print(f"\n{'=' * 96}")
+    print(
+        f"{'encoder/corpus/scenario':<48} {'files':>6} {'MB':>8} "
+        f"{'files/s':>10} {'MB/s':>9} {'vs base':>9}"
+    )
+    print(f"{'-' * 96}")
+    for key, m in results.items():
+        delta = ""
+        base = (baseline or {}).get(key)
+        if base and base.get("mb_per_s"):
+            delta = f"{m['mb_per_s'] / base['mb_per_s'] - 1:+.0%}"
+        print(
+            f"{key:<48} {m['files']:>6} {m['bytes'] / (1024 * 1024):>8.2f} "
+            f"{m['files_per_s']:>10.1f} {m['mb_per_s']:>9.2f} {delta:>9}"
+        )
+    print(f"{'=' * 96}")
+
+
+def _load_baseline(path: Path) -> Optional[Dict[str, Dict[str, float]]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    results = data.get("results") if isinstance(data, dict) else None
+    return results if isinstance(results, dict) else None
+
+
+def run(args: argparse.Namespace) -> int:
+    repos: List[Optional[str]] = [None] + list(args.tokenizer_repo or [])
+    with tempfile.TemporaryDirectory(prefix="synapse-token-bench-") as tmp:
+        corpus_root = Path(args.corpus_dir) if args.corpus_dir else Path(tmp)
+        corpora = generate_corpora(corpus_root, args.scale, args.seed)
+        if args.corpus:
+            corpora = {k: v for k, v in corpora.items() if k in args.corpus}
+
+        results: Dict[str, Dict[str, float]] = {}
+        for repo in repos:
+            for key, m in benchmark_encoder(repo, corpora, args.runs).items():
+                results[key] = asdict(m)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "runs": args.runs,
+        },
+        "results": results,
+    }
+    baseline_path = Path(args.baseline)
+    baseline = _load_baseline(baseline_path)
+    _print_report(results, baseline)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.write_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Baseline written: {baseline_path}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline at {baseline_path} (run with --write-baseline)")
+        return 2 if args.strict else 0
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions and args.strict:
+        return 1
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%} threshold")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--strict", action="store_true")
+    parser.add_argument("--write-baseline", action="store_true")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--output", help="Ghi ket qua JSON ra file nay")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument(
+        "--tokenizer-repo",
+        action="append",
+        help="Them encoder HF (lap lai duoc); encoder mac dinh luon chay",
+    )
+    parser.add_argument(
+        "--corpus", action="append", help="Chi chay corpus nay (lap lai duoc)"
+    )
+    parser.add_argument("--corpus-dir", help="Giu corpus o thu muc nay")
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())